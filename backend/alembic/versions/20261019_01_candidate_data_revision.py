@@ -0,0 +1,48 @@
+"""候选人数据修订号: candidates.data_revision.
+
+Revision ID: 20261019_01_candidate_data_revision
+Revises: 20251202_01_add_missing_fields
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = '20261019_01_candidate_data_revision'
+down_revision = '20251202_01_add_missing_fields'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(conn, table_name: str) -> bool:
+    """检查表是否存在"""
+    return table_name in inspect(conn).get_table_names()
+
+
+def _has_column(conn, table_name: str, column_name: str) -> bool:
+    """检查表是否有指定列"""
+    inspector = inspect(conn)
+    columns = [c['name'] for c in inspector.get_columns(table_name)]
+    return column_name in columns
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    
+    # 为 candidates 表添加 data_revision 字段（画像缓存版本号）
+    # 旧缓存记录的版本为时间戳哈希，升级后自然失效并按新版本重新生成
+    if _has_table(conn, 'candidates') and not _has_column(conn, 'candidates', 'data_revision'):
+        with op.batch_alter_table('candidates', schema=None) as batch_op:
+            batch_op.add_column(
+                sa.Column('data_revision', sa.Integer(), nullable=False, server_default='0')
+            )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    
+    if _has_table(conn, 'candidates') and _has_column(conn, 'candidates', 'data_revision'):
+        with op.batch_alter_table('candidates', schema=None) as batch_op:
+            batch_op.drop_column('data_revision')
@@ -0,0 +1,56 @@
+"""画像缓存访问统计: portrait_cache.last_hit_at, portrait_cache.hit_count.
+
+Revision ID: 20261019_02_portrait_cache_access_stats
+Revises: 20261019_01_candidate_data_revision
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = '20261019_02_portrait_cache_access_stats'
+down_revision = '20261019_01_candidate_data_revision'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(conn, table_name: str) -> bool:
+    """检查表是否存在"""
+    return table_name in inspect(conn).get_table_names()
+
+
+def _has_column(conn, table_name: str, column_name: str) -> bool:
+    """检查表是否有指定列"""
+    inspector = inspect(conn)
+    columns = [c['name'] for c in inspector.get_columns(table_name)]
+    return column_name in columns
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    
+    if not _has_table(conn, 'portrait_cache'):
+        return
+    
+    with op.batch_alter_table('portrait_cache', schema=None) as batch_op:
+        if not _has_column(conn, 'portrait_cache', 'last_hit_at'):
+            batch_op.add_column(sa.Column('last_hit_at', sa.DateTime(timezone=True), nullable=True))
+        if not _has_column(conn, 'portrait_cache', 'hit_count'):
+            batch_op.add_column(
+                sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0')
+            )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    
+    if not _has_table(conn, 'portrait_cache'):
+        return
+    
+    with op.batch_alter_table('portrait_cache', schema=None) as batch_op:
+        if _has_column(conn, 'portrait_cache', 'hit_count'):
+            batch_op.drop_column('hit_count')
+        if _has_column(conn, 'portrait_cache', 'last_hit_at'):
+            batch_op.drop_column('last_hit_at')
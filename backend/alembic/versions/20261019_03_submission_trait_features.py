@@ -0,0 +1,66 @@
+"""测评特质特征表: submission_trait_features.
+
+Revision ID: 20261019_03_submission_trait_features
+Revises: 20261019_02_portrait_cache_access_stats
+Create Date: 2026-10-19
+
+历史提交的特征通过 python -m app.scripts.backfill_trait_features 回填。
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = '20261019_03_submission_trait_features'
+down_revision = '20261019_02_portrait_cache_access_stats'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(conn, table_name: str) -> bool:
+    """检查表是否存在"""
+    return table_name in inspect(conn).get_table_names()
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    
+    if _has_table(conn, 'submission_trait_features'):
+        return
+    
+    op.create_table(
+        'submission_trait_features',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('submission_id', sa.Integer(), nullable=False),
+        sa.Column('candidate_id', sa.Integer(), nullable=True),
+        sa.Column('test_type', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+        sa.Column('trait_values', sa.LargeBinary(), nullable=False),
+        sa.Column('trait_mask', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('score_percentage', sa.Float(), nullable=True),
+        sa.Column('submitted_at', sa.DateTime(), nullable=True),
+        sa.Column('feature_version', sa.Integer(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['submission_id'], ['submissions.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['candidate_id'], ['candidates.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        op.f('ix_submission_trait_features_submission_id'),
+        'submission_trait_features', ['submission_id'], unique=True
+    )
+    op.create_index(
+        op.f('ix_submission_trait_features_candidate_id'),
+        'submission_trait_features', ['candidate_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    
+    if not _has_table(conn, 'submission_trait_features'):
+        return
+    
+    op.drop_index(op.f('ix_submission_trait_features_candidate_id'), table_name='submission_trait_features')
+    op.drop_index(op.f('ix_submission_trait_features_submission_id'), table_name='submission_trait_features')
+    op.drop_table('submission_trait_features')
@@ -0,0 +1,54 @@
+"""岗位画像评分版本: job_profiles.revision, profile_matches.profile_revision.
+
+Revision ID: 20261019_04_profile_match_revision
+Revises: 20261019_03_submission_trait_features
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = '20261019_04_profile_match_revision'
+down_revision = '20261019_03_submission_trait_features'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(conn, table_name: str) -> bool:
+    """检查表是否存在"""
+    return table_name in inspect(conn).get_table_names()
+
+
+def _has_column(conn, table_name: str, column_name: str) -> bool:
+    """检查表是否有指定列"""
+    inspector = inspect(conn)
+    columns = [c['name'] for c in inspector.get_columns(table_name)]
+    return column_name in columns
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    
+    if _has_table(conn, 'job_profiles') and not _has_column(conn, 'job_profiles', 'revision'):
+        with op.batch_alter_table('job_profiles', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('revision', sa.Integer(), nullable=False, server_default='0'))
+    
+    if _has_table(conn, 'profile_matches') and not _has_column(conn, 'profile_matches', 'profile_revision'):
+        with op.batch_alter_table('profile_matches', schema=None) as batch_op:
+            batch_op.add_column(
+                sa.Column('profile_revision', sa.Integer(), nullable=False, server_default='0')
+            )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    
+    if _has_table(conn, 'profile_matches') and _has_column(conn, 'profile_matches', 'profile_revision'):
+        with op.batch_alter_table('profile_matches', schema=None) as batch_op:
+            batch_op.drop_column('profile_revision')
+    
+    if _has_table(conn, 'job_profiles') and _has_column(conn, 'job_profiles', 'revision'):
+        with op.batch_alter_table('job_profiles', schema=None) as batch_op:
+            batch_op.drop_column('revision')
@@ -0,0 +1,55 @@
+"""upsert 冲突键唯一索引: profile_matches(profile_id, submission_id), portrait_cache(candidate_id, analysis_level).
+
+创建唯一索引前先清理重复记录（每组保留 id 最大即最后写入的一条）。
+
+Revision ID: 20261019_05_unique_upsert_keys
+Revises: 20261019_04_profile_match_revision
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = '20261019_05_unique_upsert_keys'
+down_revision = '20261019_04_profile_match_revision'
+branch_labels = None
+depends_on = None
+
+UNIQUE_KEYS = [
+    ('profile_matches', 'uq_profile_matches_profile_submission', ['profile_id', 'submission_id']),
+    ('portrait_cache', 'uq_portrait_cache_candidate_level', ['candidate_id', 'analysis_level']),
+]
+
+
+def _has_table(conn, table_name: str) -> bool:
+    """检查表是否存在"""
+    return table_name in inspect(conn).get_table_names()
+
+
+def _has_index(conn, table_name: str, index_name: str) -> bool:
+    """检查表是否有指定索引"""
+    return index_name in [i['name'] for i in inspect(conn).get_indexes(table_name)]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    
+    for table_name, index_name, columns in UNIQUE_KEYS:
+        if not _has_table(conn, table_name) or _has_index(conn, table_name, index_name):
+            continue
+        key = ', '.join(columns)
+        conn.execute(sa.text(
+            f"DELETE FROM {table_name} WHERE id NOT IN "
+            f"(SELECT MAX(id) FROM {table_name} GROUP BY {key})"
+        ))
+        op.create_index(index_name, table_name, columns, unique=True)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    
+    for table_name, index_name, _ in UNIQUE_KEYS:
+        if _has_table(conn, table_name) and _has_index(conn, table_name, index_name):
+            op.drop_index(index_name, table_name=table_name)
@@ -0,0 +1,52 @@
+"""特质常模表: trait_norms.
+
+Revision ID: 20261019_06_trait_norms
+Revises: 20261019_05_unique_upsert_keys
+Create Date: 2026-10-19
+
+历史数据通过 python -m app.scripts.rebuild_trait_norms 重建。
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = '20261019_06_trait_norms'
+down_revision = '20261019_05_unique_upsert_keys'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(conn, table_name: str) -> bool:
+    """检查表是否存在"""
+    return table_name in inspect(conn).get_table_names()
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    
+    if _has_table(conn, 'trait_norms'):
+        return
+    
+    op.create_table(
+        'trait_norms',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('trait', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+        sa.Column('segment', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+        sa.Column('counts', sa.LargeBinary(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('uq_trait_norms_trait_segment', 'trait_norms', ['trait', 'segment'], unique=True)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    
+    if not _has_table(conn, 'trait_norms'):
+        return
+    
+    op.drop_index('uq_trait_norms_trait_segment', table_name='trait_norms')
+    op.drop_table('trait_norms')
@@ -0,0 +1,77 @@
+"""题目答案统计聚合表: question_answer_counts, questionnaire_daily_stats.
+
+Revision ID: 20261019_07_answer_statistics
+Revises: 20261019_06_trait_norms
+Create Date: 2026-10-19
+
+历史数据通过 python -m app.scripts.rebuild_answer_stats 重建。
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = '20261019_07_answer_statistics'
+down_revision = '20261019_06_trait_norms'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(conn, table_name: str) -> bool:
+    """检查表是否存在"""
+    return table_name in inspect(conn).get_table_names()
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    
+    if not _has_table(conn, 'question_answer_counts'):
+        op.create_table(
+            'question_answer_counts',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('questionnaire_id', sa.Integer(), nullable=False),
+            sa.Column('question_id', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+            sa.Column('option_value', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+            sa.Column('count', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['questionnaire_id'], ['questionnaires.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(
+            'uq_question_answer_counts_key', 'question_answer_counts',
+            ['questionnaire_id', 'question_id', 'option_value'], unique=True
+        )
+    
+    if not _has_table(conn, 'questionnaire_daily_stats'):
+        op.create_table(
+            'questionnaire_daily_stats',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('questionnaire_id', sa.Integer(), nullable=False),
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('submissions', sa.Integer(), nullable=False),
+            sa.Column('score_sum', sa.Float(), nullable=False),
+            sa.Column('score_count', sa.Integer(), nullable=False),
+            sa.Column('duration_sum', sa.Float(), nullable=False),
+            sa.Column('duration_count', sa.Integer(), nullable=False),
+            sa.Column('grade_a', sa.Integer(), nullable=False),
+            sa.Column('grade_b', sa.Integer(), nullable=False),
+            sa.Column('grade_c', sa.Integer(), nullable=False),
+            sa.Column('grade_d', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['questionnaire_id'], ['questionnaires.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(
+            'uq_questionnaire_daily_stats_key', 'questionnaire_daily_stats',
+            ['questionnaire_id', 'day'], unique=True
+        )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    
+    if _has_table(conn, 'questionnaire_daily_stats'):
+        op.drop_index('uq_questionnaire_daily_stats_key', table_name='questionnaire_daily_stats')
+        op.drop_table('questionnaire_daily_stats')
+    if _has_table(conn, 'question_answer_counts'):
+        op.drop_index('uq_question_answer_counts_key', table_name='question_answer_counts')
+        op.drop_table('question_answer_counts')
@@ -0,0 +1,82 @@
+"""数据看板汇总表: analytics_daily_rollups, analytics_trait_rollups.
+
+Revision ID: 20261019_08_analytics_rollups
+Revises: 20261019_07_answer_statistics
+Create Date: 2026-10-19
+
+历史数据通过 python -m app.scripts.backfill_analytics 回填。
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = '20261019_08_analytics_rollups'
+down_revision = '20261019_07_answer_statistics'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(conn, table_name: str) -> bool:
+    """检查表是否存在"""
+    return table_name in inspect(conn).get_table_names()
+
+
+def _key_columns():
+    return [
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('position', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+        sa.Column('test_type', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    
+    if not _has_table(conn, 'analytics_daily_rollups'):
+        op.create_table(
+            'analytics_daily_rollups',
+            *_key_columns(),
+            sa.Column('submissions', sa.Integer(), nullable=False),
+            sa.Column('new_candidates', sa.Integer(), nullable=False),
+            sa.Column('match_count', sa.Integer(), nullable=False),
+            sa.Column('match_score_sum', sa.Float(), nullable=False),
+            sa.Column('match_ge_90', sa.Integer(), nullable=False),
+            sa.Column('match_80_90', sa.Integer(), nullable=False),
+            sa.Column('match_70_80', sa.Integer(), nullable=False),
+            sa.Column('match_lt_70', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(
+            'uq_analytics_daily_rollups_key', 'analytics_daily_rollups',
+            ['day', 'position', 'test_type'], unique=True
+        )
+    
+    if not _has_table(conn, 'analytics_trait_rollups'):
+        op.create_table(
+            'analytics_trait_rollups',
+            *_key_columns(),
+            sa.Column('trait', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+            sa.Column('score_sum', sa.Float(), nullable=False),
+            sa.Column('score_count', sa.Integer(), nullable=False),
+            sa.Column('high_count', sa.Integer(), nullable=False),
+            sa.Column('low_count', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(
+            'uq_analytics_trait_rollups_key', 'analytics_trait_rollups',
+            ['day', 'position', 'test_type', 'trait'], unique=True
+        )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    
+    if _has_table(conn, 'analytics_trait_rollups'):
+        op.drop_index('uq_analytics_trait_rollups_key', table_name='analytics_trait_rollups')
+        op.drop_table('analytics_trait_rollups')
+    if _has_table(conn, 'analytics_daily_rollups'):
+        op.drop_index('uq_analytics_daily_rollups_key', table_name='analytics_daily_rollups')
+        op.drop_table('analytics_daily_rollups')
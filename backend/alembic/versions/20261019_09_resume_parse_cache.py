@@ -0,0 +1,71 @@
+"""简历解析缓存: resume_parse_cache, candidates.resume_content_hash.
+
+Revision ID: 20261019_09_resume_parse_cache
+Revises: 20261019_08_analytics_rollups
+Create Date: 2026-10-19
+
+已上传简历的内容哈希在首次解析时补算。
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = '20261019_09_resume_parse_cache'
+down_revision = '20261019_08_analytics_rollups'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(conn, table_name: str) -> bool:
+    """检查表是否存在"""
+    return table_name in inspect(conn).get_table_names()
+
+
+def _has_column(conn, table_name: str, column_name: str) -> bool:
+    """检查表是否有指定列"""
+    inspector = inspect(conn)
+    columns = [c['name'] for c in inspector.get_columns(table_name)]
+    return column_name in columns
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    
+    if not _has_table(conn, 'resume_parse_cache'):
+        op.create_table(
+            'resume_parse_cache',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('content_hash', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+            sa.Column('parser_version', sqlmodel.sql.sqltypes.AutoString(length=40), nullable=False),
+            sa.Column('analysis_level', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+            sa.Column('clean_text', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+            sa.Column('parsed_data', sa.JSON(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(
+            'uq_resume_parse_cache_key', 'resume_parse_cache',
+            ['content_hash', 'parser_version', 'analysis_level'], unique=True
+        )
+    
+    if _has_table(conn, 'candidates') and not _has_column(conn, 'candidates', 'resume_content_hash'):
+        with op.batch_alter_table('candidates', schema=None) as batch_op:
+            batch_op.add_column(
+                sa.Column('resume_content_hash', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=True)
+            )
+            batch_op.create_index('ix_candidates_resume_content_hash', ['resume_content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    
+    if _has_table(conn, 'candidates') and _has_column(conn, 'candidates', 'resume_content_hash'):
+        with op.batch_alter_table('candidates', schema=None) as batch_op:
+            batch_op.drop_index('ix_candidates_resume_content_hash')
+            batch_op.drop_column('resume_content_hash')
+    if _has_table(conn, 'resume_parse_cache'):
+        op.drop_index('uq_resume_parse_cache_key', table_name='resume_parse_cache')
+        op.drop_table('resume_parse_cache')
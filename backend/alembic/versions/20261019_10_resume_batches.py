@@ -0,0 +1,67 @@
+"""简历批量上传进度: resume_batches, resume_batch_items.
+
+Revision ID: 20261019_10_resume_batches
+Revises: 20261019_09_resume_parse_cache
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = '20261019_10_resume_batches'
+down_revision = '20261019_09_resume_parse_cache'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(conn, table_name: str) -> bool:
+    """检查表是否存在"""
+    return table_name in inspect(conn).get_table_names()
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    
+    if not _has_table(conn, 'resume_batches'):
+        op.create_table(
+            'resume_batches',
+            sa.Column('id', sqlmodel.sql.sqltypes.AutoString(length=32), nullable=False),
+            sa.Column('total', sa.Integer(), nullable=False),
+            sa.Column('auto_parse', sa.Boolean(), nullable=False),
+            sa.Column('analysis_level', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+    
+    if not _has_table(conn, 'resume_batch_items'):
+        op.create_table(
+            'resume_batch_items',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('batch_id', sqlmodel.sql.sqltypes.AutoString(length=32), nullable=False),
+            sa.Column('seq', sa.Integer(), nullable=False),
+            sa.Column('candidate_id', sa.Integer(), nullable=True),
+            sa.Column('file_name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column('status', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+            sa.Column('error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+            sa.Column('cached', sa.Boolean(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(
+            'uq_resume_batch_items_batch_seq', 'resume_batch_items',
+            ['batch_id', 'seq'], unique=True
+        )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    
+    if _has_table(conn, 'resume_batch_items'):
+        op.drop_index('uq_resume_batch_items_batch_seq', table_name='resume_batch_items')
+        op.drop_table('resume_batch_items')
+    if _has_table(conn, 'resume_batches'):
+        op.drop_table('resume_batches')
@@ -0,0 +1,39 @@
+"""重建题目答案计数: question_answer_counts.
+
+Revision ID: 20261019_11_rebuild_answer_counts
+Revises: 20261019_10_resume_batches
+Create Date: 2026-10-19
+
+题目ID为整数的问卷（如EPQ）此前按序号回退查找答案，计数归到了相邻题目；
+修正 answer_stats.question_answer 后从提交记录重建计数。数据迁移，无需降级。
+"""
+from alembic import op
+from sqlalchemy import inspect
+from sqlmodel import Session
+
+# revision identifiers, used by Alembic.
+revision = '20261019_11_rebuild_answer_counts'
+down_revision = '20261019_10_resume_batches'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(conn, table_name: str) -> bool:
+    """检查表是否存在"""
+    return table_name in inspect(conn).get_table_names()
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    
+    if not all(_has_table(conn, name) for name in ('questionnaires', 'submissions', 'question_answer_counts')):
+        return
+    
+    from app.api.assessments.answer_stats import rebuild_answer_stats
+    
+    with Session(bind=conn) as session:
+        rebuild_answer_stats(session)
+
+
+def downgrade() -> None:
+    pass
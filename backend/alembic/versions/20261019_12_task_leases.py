@@ -0,0 +1,46 @@
+"""后台定时任务租约: task_leases.
+
+Revision ID: 20261019_12_task_leases
+Revises: 20261019_11_rebuild_answer_counts
+Create Date: 2026-10-19
+
+多个工作进程中只由持有租约的进程执行画像缓存定时维护。
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision = '20261019_12_task_leases'
+down_revision = '20261019_11_rebuild_answer_counts'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(conn, table_name: str) -> bool:
+    """检查表是否存在"""
+    return table_name in inspect(conn).get_table_names()
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    
+    if not _has_table(conn, 'task_leases'):
+        op.create_table(
+            'task_leases',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sqlmodel.sql.sqltypes.AutoString(length=60), nullable=False),
+            sa.Column('owner', sqlmodel.sql.sqltypes.AutoString(length=120), nullable=False),
+            sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('uq_task_leases_name', 'task_leases', ['name'], unique=True)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    
+    if _has_table(conn, 'task_leases'):
+        op.drop_index('uq_task_leases_name', table_name='task_leases')
+        op.drop_table('task_leases')
@@ -0,0 +1,317 @@
+"""问卷/测评管理 - 题目级答案宽表导出（供人才分析使用）.
+
+每个问卷导出一张宽表：一行一份已完成提交，一列一道题（题目顺序同 questions_data），
+末尾为该测评类型的特质得分（来自 submission_trait_features）。
+各问卷题目不同，因此按问卷分别导出，并附列字典说明每列对应的题目内容、题型与维度。
+
+- 提交记录与特征表一次联表查询，yield_per 分批读取，每批转换后立即输出，
+  内存占用只与批大小和题目数有关，与提交数无关
+- CSV 直接流式输出；Parquet 需要安装 pyarrow（可选依赖），每批写入一个 row group
+- 单个问卷通过 /api/assessments/questionnaires/{id}/answer-matrix 导出，
+  批量导出全部问卷见 python -m app.scripts.export_answer_matrix
+"""
+
+import csv
+import io
+import json
+import tempfile
+from dataclasses import asdict, dataclass, field
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from sqlmodel import Session, and_, select
+
+from app.models_assessment import Questionnaire, Submission, SubmissionTraitFeature
+from app.api.candidates.dimension_mapping import TRAIT_AXIS
+from app.api.candidates.trait_features import FEATURE_VERSION, unpack_trait_vector
+from app.api.candidates.trait_norms import TRAIT_LABELS
+from .answer_stats import TEXT_QUESTION_TYPES, parse_questions, question_answer, question_key
+
+# 每批读取（输出）的提交数
+MATRIX_CHUNK_SIZE = 2000
+# 多选题答案的连接符
+MULTI_VALUE_SEPARATOR = "|"
+# 读取 Parquet 临时文件的块大小（字节）
+PARQUET_READ_SIZE = 64 * 1024
+
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+# 提交信息列：(列名, 说明, Parquet 类型)
+_META_COLUMNS = (
+    ("submission_id", "提交ID", "int64"),
+    ("candidate_id", "候选人ID", "int64"),
+    ("target_position", "应聘岗位", "string"),
+    ("gender", "性别", "string"),
+    ("submitted_at", "提交时间", "timestamp"),
+    ("total_score", "总分", "int64"),
+    ("grade", "等级", "string"),
+)
+
+
+@dataclass
+class MatrixColumn:
+    """宽表的一列（列字典的一行）."""
+    name: str
+    label: str  # 题目内容 / 特质名称 / 字段说明
+    kind: str  # meta / question / trait
+    dtype: str  # int64 / float64 / string / timestamp
+    question_type: Optional[str] = None
+    dimension: Optional[str] = None
+    options: Dict[str, str] = field(default_factory=dict)  # 选项值 → 选项内容
+
+
+@dataclass
+class AnswerMatrix:
+    """问卷的宽表结构."""
+    questionnaire_id: int
+    questionnaire_name: str
+    columns: List[MatrixColumn]
+    questions: List[dict]
+    traits: List[str]  # TRAIT_AXIS 中的特质（按列顺序）
+
+    @property
+    def header(self) -> List[str]:
+        return [column.name for column in self.columns]
+
+    def dictionary(self) -> List[Dict[str, Any]]:
+        """列字典（每列的说明、题型、维度与选项）."""
+        return [asdict(column) for column in self.columns]
+
+
+def _option_labels(question: dict) -> Dict[str, str]:
+    labels = {}
+    for index, option in enumerate(question.get("options") or []):
+        if isinstance(option, dict):
+            value = option.get("value", option.get("id", option.get("text", index)))
+            labels[str(value)] = str(option.get("text", option.get("label", value)))
+        else:
+            labels[str(option)] = str(option)
+    return labels
+
+
+def build_answer_matrix(questionnaire: Questionnaire) -> AnswerMatrix:
+    """根据问卷题目与类型生成宽表列（提交信息 + 每题一列 + 特质得分）."""
+    questions = parse_questions(questionnaire.questions_data)
+    columns = [MatrixColumn(name=name, label=label, kind="meta", dtype=dtype) for name, label, dtype in _META_COLUMNS]
+    used = {column.name for column in columns}
+    for index, question in enumerate(questions):
+        name = f"q_{question_key(question, index)}"
+        if name in used:  # 题目ID重复时以序号区分
+            name = f"{name}_{index + 1}"
+        used.add(name)
+        columns.append(MatrixColumn(
+            name=name,
+            label=str(question.get("text", question.get("question", f"问题 {index + 1}"))),
+            kind="question",
+            dtype="string",
+            question_type=question.get("type", "single"),
+            dimension=question.get("dimension"),
+            options=_option_labels(question),
+        ))
+    prefix = f"{(questionnaire.type or '').lower()}:"
+    traits = [trait for trait in TRAIT_AXIS if trait.startswith(prefix)]
+    for trait in traits:
+        columns.append(MatrixColumn(
+            name=f"trait_{trait.replace(':', '_')}",
+            label=TRAIT_LABELS.get(trait, trait),
+            kind="trait",
+            dtype="float64",
+            dimension=trait.split(":", 1)[1],
+        ))
+    return AnswerMatrix(
+        questionnaire_id=questionnaire.id,
+        questionnaire_name=questionnaire.name,
+        columns=columns,
+        questions=questions,
+        traits=traits,
+    )
+
+
+def _answer_cell(question: dict, index: int, answers: dict) -> Optional[str]:
+    # 与题目统计相同的查找规则：有题目ID时不按序号补位，未作答的题为空单元格
+    answer = question_answer(question, index, answers)
+    if answer is None:
+        return None
+    if isinstance(answer, list):
+        return MULTI_VALUE_SEPARATOR.join(str(value) for value in answer)
+    if question.get("type") in TEXT_QUESTION_TYPES:
+        return str(answer).strip()
+    return str(answer)
+
+
+def iter_matrix_chunks(
+    session: Session,
+    matrix: AnswerMatrix,
+    chunk_size: int = MATRIX_CHUNK_SIZE
+) -> Iterator[List[List[Any]]]:
+    """按提交ID顺序分批生成宽表行（每批最多 chunk_size 行，列顺序同 matrix.columns）."""
+    trait_index = [TRAIT_AXIS.index(trait) for trait in matrix.traits]
+    result = session.exec(
+        select(
+            Submission.id,
+            Submission.candidate_id,
+            Submission.target_position,
+            Submission.gender,
+            Submission.submitted_at,
+            Submission.total_score,
+            Submission.grade,
+            Submission.answers,
+            SubmissionTraitFeature.trait_values,
+            SubmissionTraitFeature.trait_mask,
+        )
+        .outerjoin(
+            SubmissionTraitFeature,
+            and_(
+                SubmissionTraitFeature.submission_id == Submission.id,
+                SubmissionTraitFeature.feature_version == FEATURE_VERSION,
+            )
+        )
+        .where(Submission.questionnaire_id == matrix.questionnaire_id, Submission.status == "completed")
+        .order_by(Submission.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    for rows in result.partitions():
+        chunk = []
+        for row in rows:
+            answers = row.answers
+            if isinstance(answers, str):
+                try:
+                    answers = json.loads(answers)
+                except json.JSONDecodeError:
+                    answers = {}
+            if not isinstance(answers, dict):
+                answers = {}
+            values = [
+                row.id, row.candidate_id, row.target_position, row.gender,
+                row.submitted_at, row.total_score, row.grade,
+            ]
+            values.extend(_answer_cell(question, index, answers) for index, question in enumerate(matrix.questions))
+            if trait_index:
+                if row.trait_values is not None:
+                    scores, mask = unpack_trait_vector(row.trait_values, row.trait_mask or 0)
+                    values.extend(round(float(scores[i]), 2) if mask[i] else None for i in trait_index)
+                else:
+                    values.extend([None] * len(trait_index))
+            chunk.append(values)
+        yield chunk
+
+
+def _csv_chunks(session: Session, matrix: AnswerMatrix, chunk_size: int) -> Iterator[Tuple[bytes, int]]:
+    """CSV 编码后的数据块与其行数（第一块为 UTF-8 BOM + 表头）."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(matrix.header)
+    yield b"\xef\xbb\xbf" + buffer.getvalue().encode("utf-8"), 0
+    for chunk in iter_matrix_chunks(session, matrix, chunk_size):
+        buffer.seek(0)
+        buffer.truncate()
+        for values in chunk:
+            writer.writerow([
+                value.strftime("%Y-%m-%d %H:%M:%S") if hasattr(value, "strftime") else value
+                for value in values
+            ])
+        yield buffer.getvalue().encode("utf-8"), len(chunk)
+
+
+def stream_matrix_csv(
+    session: Session,
+    matrix: AnswerMatrix,
+    chunk_size: int = MATRIX_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """流式生成宽表CSV（UTF-8 BOM，空答案为空单元格）."""
+    for data, _ in _csv_chunks(session, matrix, chunk_size):
+        yield data
+
+
+def write_matrix_csv(
+    session: Session,
+    matrix: AnswerMatrix,
+    sink: BinaryIO,
+    chunk_size: int = MATRIX_CHUNK_SIZE
+) -> int:
+    """将宽表写入CSV文件，返回写入的行数（不含表头）."""
+    rows = 0
+    for data, count in _csv_chunks(session, matrix, chunk_size):
+        sink.write(data)
+        rows += count
+    return rows
+
+
+def parquet_available() -> bool:
+    """是否已安装 pyarrow（Parquet 导出的可选依赖）."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def write_matrix_parquet(
+    session: Session,
+    matrix: AnswerMatrix,
+    sink: BinaryIO,
+    chunk_size: int = MATRIX_CHUNK_SIZE
+) -> int:
+    """将宽表写入 Parquet（每批一个 row group），列字典写入文件元数据.
+
+    Returns:
+        写入的行数
+
+    Raises:
+        ValueError: 未安装 pyarrow
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("需要安装pyarrow库来导出Parquet文件")
+
+    types = {"int64": pa.int64(), "float64": pa.float64(), "string": pa.string(), "timestamp": pa.timestamp("us")}
+    schema = pa.schema(
+        [pa.field(column.name, types[column.dtype]) for column in matrix.columns],
+        metadata={
+            "questionnaire_id": str(matrix.questionnaire_id),
+            "questionnaire_name": matrix.questionnaire_name,
+            "column_dictionary": json.dumps(matrix.dictionary(), ensure_ascii=False),
+        },
+    )
+    rows = 0
+    with pq.ParquetWriter(sink, schema) as writer:
+        for chunk in iter_matrix_chunks(session, matrix, chunk_size):
+            columns = list(zip(*chunk)) if chunk else [[] for _ in matrix.columns]
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(list(values), type=f.type) for values, f in zip(columns, schema)],
+                schema=schema,
+            ))
+            rows += len(chunk)
+    return rows
+
+
+def stream_matrix_parquet(
+    session: Session,
+    matrix: AnswerMatrix,
+    chunk_size: int = MATRIX_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """写入 Parquet 临时文件后按块输出（Parquet 文件尾部才写入元数据，无法边写边发）."""
+    with tempfile.TemporaryFile() as output:
+        write_matrix_parquet(session, matrix, output, chunk_size)
+        output.seek(0)
+        while True:
+            data = output.read(PARQUET_READ_SIZE)
+            if not data:
+                break
+            yield data
+
+
+def dictionary_csv(matrix: AnswerMatrix) -> str:
+    """列字典的CSV文本（列名、说明、类别、类型、题型、维度、选项）."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["column", "label", "kind", "dtype", "question_type", "dimension", "options"])
+    for column in matrix.columns:
+        writer.writerow([
+            column.name, column.label, column.kind, column.dtype,
+            column.question_type or "", column.dimension or "",
+            "; ".join(f"{value}={label}" for value, label in column.options.items()),
+        ])
+    return buffer.getvalue()
@@ -0,0 +1,349 @@
+"""问卷/测评管理 - 题目答案分布与每日汇总.
+
+问卷统计页原本每次请求都读取问卷的全部提交记录，并按 题目 × 提交 逐条解析答案。
+本模块维护两张聚合表，与提交记录在同一事务中增量更新：
+- question_answer_counts: (问卷, 题目, 选项值) → 计数
+- questionnaire_daily_stats: (问卷, 日期) → 提交数、得分和、用时和、等级分布
+
+submit_answers 完成时调用 record_submission_stats 累加，删除提交时以 sign=-1 扣减，
+重新评分时由 record_rescored_stats 替换得分与等级；
+统计接口只读取聚合表，耗时与题目数相关而与提交数无关。
+批量删除后通过 python -m app.scripts.rebuild_answer_stats 重建。
+"""
+
+import json
+import logging
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from app.db import upsert_rows
+from app.models_assessment import QuestionAnswerCount, Questionnaire, QuestionnaireDailyStat, Submission
+
+logger = logging.getLogger(__name__)
+
+# 视为已完成的提交状态（兼容历史数据）
+COMPLETED_STATUSES = ("completed", "已完成", "done", "submitted")
+# 文本题不统计答案内容，只计数
+TEXT_ANSWER_VALUE = ""
+TEXT_QUESTION_TYPES = ("text", "textarea")
+MULTIPLE_QUESTION_TYPES = ("multiple", "checkbox")
+# 答题用时有效范围（分钟），超出视为异常值
+MAX_DURATION_MINUTES = 120
+
+_OPTION_VALUE_MAX_LENGTH = 255
+_DAILY_COUNTERS = (
+    "submissions", "score_sum", "score_count", "duration_sum", "duration_count",
+    "grade_a", "grade_b", "grade_c", "grade_d",
+)
+_REBUILD_CHUNK_SIZE = 1000
+
+
+def parse_questions(questions_data: Any) -> List[dict]:
+    """解析问卷题目（兼容JSON字符串、{"questions": [...]} 与列表格式），跳过非字典项."""
+    if isinstance(questions_data, str):
+        try:
+            questions_data = json.loads(questions_data)
+        except json.JSONDecodeError:
+            questions_data = []
+    if isinstance(questions_data, dict):
+        questions_data = questions_data.get("questions", [])
+    if not isinstance(questions_data, list):
+        return []
+    return [question for question in questions_data if isinstance(question, dict)]
+
+
+def question_key(question: dict, index: int) -> str:
+    """题目的统计键：题目ID，未配置时为从1开始的序号."""
+    return str(question.get("id", str(index + 1)))
+
+
+def question_answer(question: dict, index: int, answers: Dict[Any, Any]) -> Any:
+    """一份答卷中第 index 题（从0开始）的答案，未作答返回None.
+
+    有题目ID的题按ID查找（JSON答案的键为字符串），找不到即视为未作答，不按序号补位；
+    没有ID的题按序号查找：从1开始，答案中有 "0" 键时视为从0开始。
+    """
+    question_id = question.get("id")
+    if question_id is not None:
+        answer = answers.get(str(question_id), answers.get(question_id))
+    else:
+        answer = answers.get(str(index if "0" in answers else index + 1))
+    return None if answer in ("", []) else answer
+
+
+def count_answers(questions: List[dict], answers: Any) -> Counter:
+    """一份答卷的 (题目键, 选项值) 计数.
+
+    答案查找见 question_answer；文本题只计非空回答数，多选题（或列表答案）逐项计数。
+    """
+    if isinstance(answers, str):
+        try:
+            answers = json.loads(answers)
+        except json.JSONDecodeError:
+            answers = {}
+    if not isinstance(answers, dict):
+        return Counter()
+
+    counts: Counter = Counter()
+    for index, question in enumerate(questions):
+        answer = question_answer(question, index, answers)
+        if answer is None:
+            continue
+        key = question_key(question, index)
+        q_type = question.get("type", "single")
+        if q_type in TEXT_QUESTION_TYPES:
+            if isinstance(answer, str) and answer.strip():
+                counts[(key, TEXT_ANSWER_VALUE)] += 1
+        elif q_type in MULTIPLE_QUESTION_TYPES or isinstance(answer, list):
+            for value in (answer if isinstance(answer, list) else [answer]):
+                counts[(key, str(value)[:_OPTION_VALUE_MAX_LENGTH])] += 1
+        else:
+            counts[(key, str(answer)[:_OPTION_VALUE_MAX_LENGTH])] += 1
+    return counts
+
+
+def daily_increments(submission: Submission) -> Dict[str, float]:
+    """一条提交对当日汇总的增量."""
+    values: Dict[str, float] = {name: 0 for name in _DAILY_COUNTERS}
+    values["submissions"] = 1
+    if submission.total_score is not None:
+        values["score_sum"] = float(submission.total_score)
+        values["score_count"] = 1
+    if submission.started_at and submission.submitted_at:
+        duration = (submission.submitted_at - submission.started_at).total_seconds() / 60
+        if 0 < duration < MAX_DURATION_MINUTES:
+            values["duration_sum"] = duration
+            values["duration_count"] = 1
+    grade = (submission.grade or "D").upper()
+    if grade in ("A", "B", "C", "D"):
+        values[f"grade_{grade.lower()}"] = 1
+    return values
+
+
+def record_submission_stats(
+    session: Session,
+    questionnaire: Questionnaire,
+    submission: Submission,
+    sign: int = 1
+) -> None:
+    """将一条已完成提交计入（sign=-1 时扣除）聚合表（不提交事务，由调用方与提交记录一起提交）.
+
+    Args:
+        session: 数据库会话
+        questionnaire: 提交所属问卷
+        submission: 已完成的提交记录（需有 submitted_at）
+        sign: 1 计入，-1 扣除
+    """
+    if submission.status not in COMPLETED_STATUSES or submission.submitted_at is None:
+        return
+
+    counts = count_answers(parse_questions(questionnaire.questions_data), submission.answers)
+    _write_answer_counts(session, questionnaire.id, {key: sign * n for key, n in counts.items()})
+
+    increments = daily_increments(submission)
+    _write_daily_stats(session, {
+        (questionnaire.id, submission.submitted_at.date()): {k: sign * v for k, v in increments.items()}
+    })
+
+
+def record_rescored_stats(session: Session, rescored: Sequence[Tuple[Any, Dict[str, Any]]]) -> None:
+    """将重新评分的得分与等级变化计入每日汇总（旧值扣除、新值计入，不提交事务）.
+
+    重新评分不改变答案，题目答案分布无需调整。
+
+    Args:
+        session: 数据库会话
+        rescored: [(已存储的提交行（含 questionnaire_id/started_at/submitted_at/total_score/grade）, 新的评分字段)]
+    """
+    days: Dict[Tuple[int, date], Dict[str, float]] = {}
+    for row, fields in rescored:
+        if row.submitted_at is None:
+            continue
+        old = daily_increments(row)
+        new = daily_increments(SimpleNamespace(**{**row._asdict(), **fields}))
+        values = days.setdefault((row.questionnaire_id, row.submitted_at.date()), {name: 0 for name in _DAILY_COUNTERS})
+        for name in _DAILY_COUNTERS:
+            values[name] += new[name] - old[name]
+    _write_daily_stats(session, days)
+
+
+def _write_answer_counts(session: Session, questionnaire_id: int, counts: Dict[Tuple[str, str], int]) -> None:
+    upsert_rows(
+        session,
+        QuestionAnswerCount,
+        [
+            {"questionnaire_id": questionnaire_id, "question_id": key, "option_value": value, "count": count}
+            for (key, value), count in counts.items()
+        ],
+        conflict_columns=["questionnaire_id", "question_id", "option_value"],
+        increment_columns=["count"],
+    )
+
+
+def _write_daily_stats(session: Session, days: Dict[Tuple[int, date], Dict[str, float]]) -> None:
+    upsert_rows(
+        session,
+        QuestionnaireDailyStat,
+        [
+            {"questionnaire_id": questionnaire_id, "day": day, **values}
+            for (questionnaire_id, day), values in days.items()
+        ],
+        conflict_columns=["questionnaire_id", "day"],
+        increment_columns=list(_DAILY_COUNTERS),
+    )
+
+
+def get_answer_counts(session: Session, questionnaire_id: int) -> Dict[str, Counter]:
+    """问卷各题的答案计数 {题目键: Counter(选项值 → 次数)}."""
+    result: Dict[str, Counter] = defaultdict(Counter)
+    for question_id, option_value, count in session.exec(
+        select(QuestionAnswerCount.question_id, QuestionAnswerCount.option_value, QuestionAnswerCount.count)
+        .where(QuestionAnswerCount.questionnaire_id == questionnaire_id)
+    ).all():
+        if count:
+            result[question_id][option_value] += count
+    return result
+
+
+def get_daily_stats(
+    session: Session,
+    questionnaire_id: int,
+    since: Optional[date] = None
+) -> List[QuestionnaireDailyStat]:
+    """问卷的每日汇总（按日期升序）."""
+    stmt = select(QuestionnaireDailyStat).where(QuestionnaireDailyStat.questionnaire_id == questionnaire_id)
+    if since is not None:
+        stmt = stmt.where(QuestionnaireDailyStat.day >= since)
+    return list(session.exec(stmt.order_by(QuestionnaireDailyStat.day)).all())
+
+
+def get_recent_text_answers(
+    session: Session,
+    questionnaire_id: int,
+    questions: Iterable[Tuple[int, dict]],
+    limit: int = 10,
+    scan_limit: int = 200
+) -> Dict[str, List[str]]:
+    """文本题的最新回答样本（只读取最近 scan_limit 条提交）.
+
+    Args:
+        session: 数据库会话
+        questionnaire_id: 问卷ID
+        questions: (题目序号, 题目) 列表，只包含文本题
+        limit: 每题最多返回的样本数
+        scan_limit: 最多扫描的提交数
+    """
+    questions = list(questions)
+    samples: Dict[str, List[str]] = {question_key(q, i): [] for i, q in questions}
+    if not questions:
+        return samples
+    rows = session.exec(
+        select(Submission.answers)
+        .where(
+            Submission.questionnaire_id == questionnaire_id,
+            Submission.status.in_(COMPLETED_STATUSES)
+        )
+        .order_by(Submission.submitted_at.desc())
+        .limit(scan_limit)
+    ).all()
+    for answers in rows:
+        if isinstance(answers, str):
+            try:
+                answers = json.loads(answers)
+            except json.JSONDecodeError:
+                continue
+        if not isinstance(answers, dict):
+            continue
+        for index, question in questions:
+            key = question_key(question, index)
+            if len(samples[key]) >= limit:
+                continue
+            answer = question_answer(question, index, answers)
+            if isinstance(answer, str) and answer.strip():
+                samples[key].append(answer.strip())
+    return samples
+
+
+def rebuild_answer_stats(
+    session: Session,
+    questionnaire_ids: Optional[List[int]] = None,
+    chunk_size: int = _REBUILD_CHUNK_SIZE
+) -> Dict[str, int]:
+    """从提交记录重建聚合表（替换指定问卷的已有计数）.
+
+    Args:
+        session: 数据库会话
+        questionnaire_ids: 只重建这些问卷（默认全部问卷）
+        chunk_size: 每批读取的提交数
+
+    Returns:
+        重建报告 {"questionnaires": N, "submissions": M, "answer_counts": K, "daily_stats": D}
+    """
+    stmt = select(Questionnaire.id, Questionnaire.questions_data)
+    if questionnaire_ids is not None:
+        stmt = stmt.where(Questionnaire.id.in_(questionnaire_ids))
+    questionnaires = {
+        questionnaire_id: parse_questions(questions_data)
+        for questionnaire_id, questions_data in session.exec(stmt).all()
+    }
+    report = {"questionnaires": len(questionnaires), "submissions": 0, "answer_counts": 0, "daily_stats": 0}
+    if not questionnaires:
+        return report
+
+    answer_counts: Dict[int, Counter] = defaultdict(Counter)
+    daily: Dict[Tuple[int, date], Dict[str, float]] = {}
+    result = session.exec(
+        select(
+            Submission.questionnaire_id,
+            Submission.answers,
+            Submission.total_score,
+            Submission.grade,
+            Submission.started_at,
+            Submission.submitted_at,
+        )
+        .where(
+            Submission.questionnaire_id.in_(list(questionnaires)),
+            Submission.status.in_(COMPLETED_STATUSES),
+            Submission.submitted_at.is_not(None),
+        )
+        .execution_options(yield_per=chunk_size)
+    )
+    for rows in result.partitions():
+        for row in rows:
+            report["submissions"] += 1
+            answer_counts[row.questionnaire_id].update(count_answers(questionnaires[row.questionnaire_id], row.answers))
+            day = daily.setdefault(
+                (row.questionnaire_id, row.submitted_at.date()), {name: 0 for name in _DAILY_COUNTERS}
+            )
+            for name, value in daily_increments(row).items():
+                day[name] += value
+
+    delete_questionnaire_stats(session, list(questionnaires))
+    for questionnaire_id, counts in answer_counts.items():
+        _write_answer_counts(session, questionnaire_id, counts)
+        report["answer_counts"] += len(counts)
+    _write_daily_stats(session, daily)
+    report["daily_stats"] = len(daily)
+    session.commit()
+
+    logger.info(
+        f"✅ 问卷答案统计重建完成: {report['questionnaires']} 个问卷, {report['submissions']} 条提交"
+    )
+    return report
+
+
+def delete_questionnaire_stats(session: Session, questionnaire_ids: Sequence[int]) -> None:
+    """删除问卷的全部聚合行（删除问卷或重建前调用，不提交事务）."""
+    session.exec(delete(QuestionAnswerCount).where(QuestionAnswerCount.questionnaire_id.in_(questionnaire_ids)))
+    session.exec(delete(QuestionnaireDailyStat).where(QuestionnaireDailyStat.questionnaire_id.in_(questionnaire_ids)))
+
+
+def last_days(days: int, today: Optional[date] = None) -> List[date]:
+    """最近 days 天（含今天），按日期升序."""
+    today = today or date.today()
+    return [today - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
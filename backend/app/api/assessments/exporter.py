@@ -0,0 +1,150 @@
+"""问卷/测评管理 - 提交记录流式导出（CSV / Excel）.
+
+导出接口不再一次读取全部提交并在内存中构建带样式的工作簿：
+- 提交记录与问卷名称一次联表查询，yield_per 分批读取
+- CSV 逐批编码后直接输出，首字节立即返回，内存占用与导出行数无关
+- Excel 使用 openpyxl 只写模式（行数据直接写入临时文件），只有表头带样式，
+  保存后按块输出临时文件
+生成器自行打开数据库会话（StreamingResponse 在请求依赖退出后才迭代），
+为同步生成器，由 StreamingResponse 在线程池中迭代，不阻塞事件循环。
+"""
+
+import csv
+import io
+import tempfile
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from sqlmodel import Session, select
+
+from app.db import get_engine
+from app.models_assessment import Questionnaire, Submission
+
+EXPORT_HEADERS = ["序号", "姓名", "电话", "问卷", "得分", "等级", "状态", "提交时间"]
+# 每批读取（CSV 每批输出）的行数
+EXPORT_CHUNK_SIZE = 2000
+# 读取 Excel 临时文件的块大小（字节）
+XLSX_READ_SIZE = 64 * 1024
+
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+_COLUMN_WIDTHS = {"A": 8, "B": 12, "C": 15, "D": 20, "E": 10, "F": 10, "G": 12, "H": 20}
+
+
+def _export_query(category: Optional[str], questionnaire_id: Optional[int]):
+    query = (
+        select(
+            Submission.candidate_name,
+            Submission.candidate_phone,
+            Questionnaire.name,
+            Submission.total_score,
+            Submission.grade,
+            Submission.status,
+            Submission.submitted_at,
+        )
+        .join(Questionnaire, Questionnaire.id == Submission.questionnaire_id, isouter=True)
+        .order_by(Submission.id)
+    )
+    if questionnaire_id:
+        query = query.where(Submission.questionnaire_id == questionnaire_id)
+    if category:
+        query = query.where(Questionnaire.category == category)
+    return query
+
+
+def iter_export_rows(
+    session: Session,
+    category: Optional[str] = None,
+    questionnaire_id: Optional[int] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[List]:
+    """按提交ID顺序逐行生成导出数据（与 EXPORT_HEADERS 对应）."""
+    result = session.exec(_export_query(category, questionnaire_id).execution_options(yield_per=chunk_size))
+    index = 0
+    for rows in result.partitions():
+        for name, phone, questionnaire_name, total_score, grade, status, submitted_at in rows:
+            index += 1
+            yield [
+                index,
+                name or "",
+                phone or "",
+                questionnaire_name or "",
+                total_score,
+                grade or "",
+                "已完成" if status == "completed" else "进行中",
+                submitted_at.strftime("%Y-%m-%d %H:%M:%S") if submitted_at else "",
+            ]
+
+
+def stream_submissions_csv(
+    category: Optional[str] = None,
+    questionnaire_id: Optional[int] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """流式生成CSV（UTF-8 BOM，Excel 可直接打开中文），每 chunk_size 行输出一次."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_HEADERS)
+    yield b"\xef\xbb\xbf" + buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+
+    with Session(get_engine()) as session:
+        pending = 0
+        for row in iter_export_rows(session, category, questionnaire_id, chunk_size):
+            writer.writerow(row)
+            pending += 1
+            if pending >= chunk_size:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+    if pending:
+        yield buffer.getvalue().encode("utf-8")
+
+
+def stream_submissions_xlsx(
+    category: Optional[str] = None,
+    questionnaire_id: Optional[int] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """以 openpyxl 只写模式生成Excel（写入临时文件），再按块输出."""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Font, PatternFill
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("提交记录")
+    for column, width in _COLUMN_WIDTHS.items():
+        ws.column_dimensions[column].width = width
+
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="4F46E5", end_color="4F46E5", fill_type="solid")
+    header_alignment = Alignment(horizontal="center", vertical="center")
+    header = []
+    for title in EXPORT_HEADERS:
+        cell = WriteOnlyCell(ws, value=title)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = header_alignment
+        header.append(cell)
+    ws.append(header)
+
+    with Session(get_engine()) as session:
+        for row in iter_export_rows(session, category, questionnaire_id, chunk_size):
+            ws.append(row)
+
+    with tempfile.TemporaryFile() as output:
+        wb.save(output)
+        output.seek(0)
+        while True:
+            data = output.read(XLSX_READ_SIZE)
+            if not data:
+                break
+            yield data
+
+
+def export_filename(extension: str) -> str:
+    """导出文件名，如 submissions_export_20261019_0930.csv."""
+    return f"submissions_export_{datetime.now().strftime('%Y%m%d_%H%M')}.{extension}"
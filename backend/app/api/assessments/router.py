@@ -1,10 +1,11 @@
 """问卷/测评管理 - API路由."""
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 
-from app.db import get_session
-from app.api.assessments import schemas, service
+from app.db import get_engine, get_session
+from app.api.assessments import answer_matrix, exporter, schemas, service
 from app.api.assessments.questionnaire_parser import parse_questionnaire_file, parse_questionnaire_file_async
 from app.models_assessment import Questionnaire
 
@@ -318,22 +319,71 @@ async def get_questionnaire_question_stats(
 @router.get("/export/excel")
 async def export_submissions_excel(
     category: Optional[str] = Query(None, description="问卷分类"),
-    questionnaire_id: Optional[int] = Query(None, description="问卷ID"),
+    questionnaire_id: Optional[int] = Query(None, description="问卷ID")
+):
+    """导出提交记录为Excel文件（只写模式生成，流式输出）."""
+    return StreamingResponse(
+        exporter.stream_submissions_xlsx(category, questionnaire_id),
+        media_type=exporter.XLSX_MEDIA_TYPE,
+        headers={"Content-Disposition": f"attachment; filename={exporter.export_filename('xlsx')}"}
+    )
+
+
+@router.get("/export/csv")
+async def export_submissions_csv(
+    category: Optional[str] = Query(None, description="问卷分类"),
+    questionnaire_id: Optional[int] = Query(None, description="问卷ID")
+):
+    """导出提交记录为CSV文件（边查询边输出，适合大批量导出）."""
+    return StreamingResponse(
+        exporter.stream_submissions_csv(category, questionnaire_id),
+        media_type=exporter.CSV_MEDIA_TYPE,
+        headers={"Content-Disposition": f"attachment; filename={exporter.export_filename('csv')}"}
+    )
+
+
+@router.get("/questionnaires/{questionnaire_id}/answer-matrix/dictionary", response_model=schemas.AnswerMatrixDictionary)
+async def get_answer_matrix_dictionary(
+    questionnaire_id: int,
     session: Session = Depends(get_session)
 ):
-    """导出提交记录为Excel文件."""
-    from fastapi.responses import StreamingResponse
-    import io
-    
-    excel_data = await service.export_submissions_to_excel(session, category, questionnaire_id)
-    
-    # 创建响应
+    """答案宽表的列字典（每列对应的题目内容、题型、维度与选项）."""
+    questionnaire = session.get(Questionnaire, questionnaire_id)
+    if not questionnaire:
+        raise HTTPException(status_code=404, detail="问卷不存在")
+    matrix = answer_matrix.build_answer_matrix(questionnaire)
+    return schemas.AnswerMatrixDictionary(
+        questionnaire_id=matrix.questionnaire_id,
+        questionnaire_name=matrix.questionnaire_name,
+        formats=["csv", "parquet"] if answer_matrix.parquet_available() else ["csv"],
+        columns=matrix.dictionary(),
+    )
+
+
+@router.get("/questionnaires/{questionnaire_id}/answer-matrix")
+async def export_answer_matrix(
+    questionnaire_id: int,
+    format: str = Query("csv", pattern="^(csv|parquet)$", description="导出格式: csv/parquet"),
+    session: Session = Depends(get_session)
+):
+    """导出问卷的题目级答案宽表（一行一份已完成提交，一列一道题，附特质得分）."""
+    questionnaire = session.get(Questionnaire, questionnaire_id)
+    if not questionnaire:
+        raise HTTPException(status_code=404, detail="问卷不存在")
+    if format == "parquet" and not answer_matrix.parquet_available():
+        raise HTTPException(status_code=400, detail="需要安装pyarrow库来导出Parquet文件")
+    matrix = answer_matrix.build_answer_matrix(questionnaire)
+    stream = answer_matrix.stream_matrix_parquet if format == "parquet" else answer_matrix.stream_matrix_csv
+
+    def _generate():
+        # 请求依赖的会话在响应开始前已关闭，流式输出使用独立会话
+        with Session(get_engine()) as stream_session:
+            yield from stream(stream_session, matrix)
+
     return StreamingResponse(
-        io.BytesIO(excel_data),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={
-            "Content-Disposition": f"attachment; filename=submissions_export.xlsx"
-        }
+        _generate(),
+        media_type=answer_matrix.PARQUET_MEDIA_TYPE if format == "parquet" else answer_matrix.CSV_MEDIA_TYPE,
+        headers={"Content-Disposition": f"attachment; filename=answer_matrix_{questionnaire_id}.{format}"}
     )
 
 
@@ -279,3 +279,23 @@ class QuestionnaireImportResponse(BaseModel):
     metadata: Dict[str, Any] = {}  # 问卷元数据（名称、描述等）
     questions: List[Dict[str, Any]] = []  # 解析出的题目列表
 
+
+# ========== 答案宽表导出 ==========
+
+class AnswerMatrixColumn(BaseModel):
+    """答案宽表的列说明."""
+    name: str
+    label: str  # 题目内容 / 特质名称 / 字段说明
+    kind: str  # meta / question / trait
+    dtype: str  # int64 / float64 / string / timestamp
+    question_type: Optional[str] = None
+    dimension: Optional[str] = None
+    options: Dict[str, str] = {}  # 选项值 → 选项内容
+
+
+class AnswerMatrixDictionary(BaseModel):
+    """答案宽表的列字典."""
+    questionnaire_id: int
+    questionnaire_name: str
+    formats: List[str]  # 可用的导出格式（parquet 需要安装 pyarrow）
+    columns: List[AnswerMatrixColumn]
@@ -0,0 +1,437 @@
+"""测评管理 - 评分流水线.
+
+score_submission_answers 是提交评分的唯一实现（submit_answers 与批量重新评分共用），
+只依赖可序列化的问卷快照 QuestionnaireSpec，可在子进程中执行。
+
+评分规则或问卷题目变化后，rescore_submissions 重新计算历史提交的
+total_score/grade/scores/result_details：
+- 按问卷/提交时间过滤，yield_per 流式读取已完成提交
+- 分块提交到进程池评分（workers<=1 时在当前进程评分）
+- 只写回结果有变化的提交，每块一次批量 UPDATE 并提交事务，
+  同时刷新特质特征并使相关候选人的画像缓存失效；
+  每日汇总、看板特质汇总与特质常模在同一事务中扣除旧值、计入新值
+- dry_run 模式只生成差异报告，不写库
+运行中按块报告吞吐量与预计剩余时间。
+"""
+
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, update
+from sqlmodel import Session, select
+
+from app.db import upsert_rows
+from app.models_assessment import Questionnaire, Submission, SubmissionTraitFeature
+from app.professional_scoring import ScoringPlan, compile_scoring_plan, score_professional_assessment
+from app.custom_scoring import calculate_custom_questionnaire_score
+from app.api.candidates.cache_manager import bump_data_revision
+from app.api.candidates.trait_features import FEATURE_VERSION, feature_values
+from app.api.candidates.trait_norms import flush_pending_norms, observe_trait_vector
+from app.services.analytics_rollup import record_trait_rollups, rollup_key
+from .answer_stats import record_rescored_stats
+
+logger = logging.getLogger(__name__)
+
+PROFESSIONAL_TYPES = ('MBTI', 'DISC', 'EPQ')
+
+# 重新评分写回的字段
+RESCORED_FIELDS = ('total_score', 'grade', 'scores', 'result_details', 'max_score', 'score_percentage')
+
+_RESCORE_CHUNK_SIZE = 500
+_DIFF_SAMPLE_LIMIT = 20
+
+
+@dataclass(frozen=True)
+class QuestionnaireSpec:
+    """评分所需的问卷快照（可序列化，供进程池使用）."""
+    id: int
+    type: str
+    custom_type: Optional[str] = None
+    scoring_config: Dict[str, Any] = field(default_factory=dict)
+    questions_data: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_model(cls, questionnaire: Questionnaire) -> "QuestionnaireSpec":
+        return cls(
+            id=questionnaire.id,
+            type=questionnaire.type or '',
+            custom_type=questionnaire.custom_type,
+            scoring_config=questionnaire.scoring_config or {},
+            questions_data=questionnaire.questions_data or {},
+        )
+
+
+def score_submission_answers(
+    spec: QuestionnaireSpec,
+    answers: Any,
+    plan: Optional[ScoringPlan] = None
+) -> Dict[str, Any]:
+    """计算一份答卷的评分字段.
+
+    Args:
+        spec: 问卷快照
+        answers: 答案（dict 或 [{question_id, answer}] 列表）
+        plan: 专业测评的预编译评分方案（缺省时按题目编译，编译结果按题目复用）
+
+    Returns:
+        要写入 Submission 的字段，专业测评为 result_details/scores/total_score/grade，
+        自定义问卷另含 max_score/score_percentage
+
+    Raises:
+        ProfessionalScoringError: 专业测评评分失败
+    """
+    questionnaire_type = spec.type.upper() if spec.type else ''
+
+    if questionnaire_type in PROFESSIONAL_TYPES:
+        # 专业测评：按题目维度评分
+        if plan is None:
+            plan = compile_scoring_plan(questionnaire_type, spec.questions_data.get('questions', []))
+        result = score_professional_assessment(questionnaire_type, answers, plan=plan)
+
+        # 构建result_details用于前端展示
+        if questionnaire_type == 'MBTI':
+            result_details = {
+                'mbti_type': result.get('mbti_type'),
+                'mbti_description': result.get('mbti_description'),
+                'mbti_dimensions': result.get('mbti_dimensions')
+            }
+        elif questionnaire_type == 'DISC':
+            result_details = {
+                'disc_type': result.get('disc_type'),
+                'disc_description': result.get('disc_description'),
+                'disc_dimensions': result.get('disc_dimensions')
+            }
+        else:
+            result_details = {
+                'personality_trait': result.get('personality_trait'),
+                'dimensions': result.get('dimensions')
+            }
+
+        return {
+            'result_details': result_details,
+            'scores': result.get('raw_scores') or result.get('dimensions', {}),
+            'total_score': result.get('total_score', 0),
+            'grade': result.get('grade', 'C'),
+        }
+
+    # 自定义问卷：使用新的评分算法
+    questionnaire_dict = {
+        "custom_type": spec.custom_type,
+        "scoring_config": spec.scoring_config,
+        "questions_data": spec.questions_data
+    }
+
+    # 转换答案格式
+    answers_list = []
+    if isinstance(answers, dict):
+        for q_id, answer_data in answers.items():
+            answers_list.append({
+                "question_id": q_id,
+                "answer": answer_data
+            })
+    elif isinstance(answers, list):
+        answers_list = answers
+
+    result = calculate_custom_questionnaire_score(questionnaire_dict, answers_list)
+    return {
+        'result_details': {
+            "custom_type": spec.custom_type,
+            "answers": result.get("detailed_answers", [])
+        },
+        'total_score': result.get("total_score"),
+        'max_score': result.get("max_score"),
+        'score_percentage': result.get("score_percentage"),
+        'grade': result.get("grade"),
+        'scores': {},  # 详细得分已在result_details中
+    }
+
+
+# ========== 批量重新评分 ==========
+
+@dataclass
+class RescoreProgress:
+    """重新评分进度（每块回调一次）."""
+    total: int
+    processed: int = 0
+    changed: int = 0
+    failed: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def rate(self) -> float:
+        """每秒处理的提交数."""
+        return self.processed / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """预计剩余时间（秒），尚无吞吐数据时为None."""
+        if not self.rate:
+            return None
+        return max(self.total - self.processed, 0) / self.rate
+
+
+@dataclass
+class RescoreReport:
+    """重新评分报告."""
+    dry_run: bool
+    scanned: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    field_changes: Dict[str, int] = field(default_factory=dict)  # 字段 → 变化的提交数
+    diffs: List[Dict[str, Any]] = field(default_factory=list)  # 差异样例
+    errors: List[Dict[str, Any]] = field(default_factory=list)  # 失败样例
+    elapsed_seconds: float = 0.0
+
+
+# 子进程内的问卷快照（进程池 initializer 设置）
+_worker_specs: Dict[int, QuestionnaireSpec] = {}
+
+
+def _init_worker(specs: Dict[int, QuestionnaireSpec], quiet: bool = True) -> None:
+    global _worker_specs
+    _worker_specs = specs
+    if quiet:
+        # 子进程不输出评分过程中的逐条日志
+        logging.disable(logging.INFO)
+
+
+def _score_chunk(rows: List[Tuple[int, int, Any]]) -> List[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """为一块 (提交ID, 问卷ID, 答案) 评分，返回 (提交ID, 评分字段, 错误信息)."""
+    results = []
+    for submission_id, questionnaire_id, answers in rows:
+        spec = _worker_specs.get(questionnaire_id)
+        if spec is None:
+            results.append((submission_id, None, "问卷不存在"))
+            continue
+        try:
+            results.append((submission_id, score_submission_answers(spec, answers), None))
+        except Exception as e:
+            results.append((submission_id, None, str(e)))
+    return results
+
+
+def rescore_submissions(
+    session: Session,
+    questionnaire_ids: Optional[Sequence[int]] = None,
+    submitted_from: Optional[datetime] = None,
+    submitted_to: Optional[datetime] = None,
+    dry_run: bool = False,
+    workers: Optional[int] = None,
+    chunk_size: int = _RESCORE_CHUNK_SIZE,
+    diff_limit: int = _DIFF_SAMPLE_LIMIT,
+    on_progress: Optional[Callable[[RescoreProgress], None]] = None
+) -> RescoreReport:
+    """按当前问卷定义与评分算法重新计算已完成提交的得分.
+
+    Args:
+        session: 数据库会话
+        questionnaire_ids: 只处理这些问卷的提交（默认全部）
+        submitted_from: 提交时间下限（含）
+        submitted_to: 提交时间上限（不含）
+        dry_run: 只生成差异报告，不写库
+        workers: 评分进程数（默认CPU核数，<=1 时在当前进程评分）
+        chunk_size: 每块的提交数（每块一个写事务）
+        diff_limit: 报告中保留的差异样例数
+        on_progress: 每处理完一块的回调
+
+    Returns:
+        重新评分报告
+    """
+    report = RescoreReport(dry_run=dry_run)
+    started = time.monotonic()
+
+    questionnaires = session.exec(select(Questionnaire)).all()
+    if questionnaire_ids is not None:
+        questionnaires = [q for q in questionnaires if q.id in set(questionnaire_ids)]
+    specs = {q.id: QuestionnaireSpec.from_model(q) for q in questionnaires}
+    test_types = {q.id: (q.type or '').lower() for q in questionnaires}
+    if not specs:
+        return report
+
+    conditions = [Submission.status == "completed", Submission.questionnaire_id.in_(list(specs))]
+    if submitted_from is not None:
+        conditions.append(Submission.submitted_at >= submitted_from)
+    if submitted_to is not None:
+        conditions.append(Submission.submitted_at < submitted_to)
+
+    progress = RescoreProgress(
+        total=session.exec(select(func.count(Submission.id)).where(*conditions)).one()
+    )
+    stored_columns = [getattr(Submission, name) for name in RESCORED_FIELDS]
+    stream = session.exec(
+        select(
+            Submission.id,
+            Submission.questionnaire_id,
+            Submission.candidate_id,
+            Submission.target_position,
+            Submission.started_at,
+            Submission.submitted_at,
+            Submission.answers,
+            *stored_columns,
+        )
+        .where(*conditions)
+        .order_by(Submission.id)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    # SQLite 允许在同一连接上边流式读取边提交；其他数据库的服务端游标在提交后失效，
+    # 写入使用独立的会话
+    same_connection = session.get_bind().dialect.name == "sqlite"
+    write_session = session if same_connection or dry_run else Session(session.get_bind())
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    executor = (
+        ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(specs,))
+        if workers > 1 else None
+    )
+    if executor is None:
+        _init_worker(specs, quiet=False)
+    # 在途的评分任务：(future 或评分结果, 该块的已存储行)
+    pending: Deque[Tuple[Any, Dict[int, Any]]] = deque()
+
+    def drain(limit: int) -> None:
+        while len(pending) > limit:
+            job, stored = pending.popleft()
+            results = job.result() if isinstance(job, Future) else job
+            _apply_chunk(write_session, report, results, stored, test_types, dry_run, diff_limit)
+            progress.processed += len(results)
+            progress.changed = report.changed
+            progress.failed = report.failed
+            eta = progress.eta_seconds
+            logger.info(
+                f"📦 重新评分: {progress.processed}/{progress.total} "
+                f"({progress.rate:.0f} 条/秒, 剩余约 {eta or 0:.0f}s)"
+            )
+            if on_progress:
+                on_progress(progress)
+
+    try:
+        for rows in stream.partitions():
+            payload = [(row.id, row.questionnaire_id, row.answers) for row in rows]
+            stored = {row.id: row for row in rows}
+            job = executor.submit(_score_chunk, payload) if executor else _score_chunk(payload)
+            pending.append((job, stored))
+            # 限制在途块数，内存占用与提交总数无关
+            drain(2 * workers if executor else 0)
+        drain(0)
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+        if write_session is not session:
+            write_session.close()
+        if not dry_run:
+            # 写回本进程累计的特质常模增量
+            flush_pending_norms()
+
+    report.elapsed_seconds = round(time.monotonic() - started, 2)
+    logger.info(
+        f"✅ 重新评分{'（试运行）' if dry_run else ''}: 扫描 {report.scanned}, "
+        f"变化 {report.changed}, 失败 {report.failed}, 耗时 {report.elapsed_seconds}s"
+    )
+    return report
+
+
+def _apply_chunk(
+    session: Session,
+    report: RescoreReport,
+    results: List[Tuple[int, Optional[Dict[str, Any]], Optional[str]]],
+    stored: Dict[int, Any],
+    test_types: Dict[int, str],
+    dry_run: bool,
+    diff_limit: int
+) -> None:
+    """比对一块评分结果与已存储的值，写回有变化的提交（dry_run 时只记录差异）."""
+    updates, features, rescored, candidate_ids = [], [], [], []
+    for submission_id, fields, error in results:
+        report.scanned += 1
+        if error is not None:
+            report.failed += 1
+            if len(report.errors) < diff_limit:
+                report.errors.append({"submission_id": submission_id, "error": error})
+            continue
+
+        row = stored[submission_id]
+        changed = {name: value for name, value in fields.items() if getattr(row, name) != value}
+        if not changed:
+            report.unchanged += 1
+            continue
+
+        report.changed += 1
+        for name in changed:
+            report.field_changes[name] = report.field_changes.get(name, 0) + 1
+        if len(report.diffs) < diff_limit:
+            report.diffs.append({
+                "submission_id": submission_id,
+                "changes": {name: {"old": getattr(row, name), "new": value} for name, value in changed.items()},
+            })
+
+        updates.append({"id": submission_id, **fields})
+        if "result_details" in changed or "score_percentage" in changed:
+            features.append(feature_values(
+                submission_id,
+                row.candidate_id,
+                test_types.get(row.questionnaire_id, ""),
+                fields["result_details"],
+                fields.get("score_percentage", row.score_percentage),
+                row.submitted_at,
+            ))
+        if "total_score" in changed or "grade" in changed:
+            rescored.append((row, fields))
+        candidate_ids.append(row.candidate_id)
+
+    if dry_run or not updates:
+        return
+    # 特质向量变化的提交：写回前读取旧向量（只有当前版本的特征计入过汇总与常模）
+    feature_ids = [values["submission_id"] for values in features]
+    old_vectors = {
+        row.submission_id: (row.trait_values, row.trait_mask)
+        for row in session.exec(
+            select(
+                SubmissionTraitFeature.submission_id,
+                SubmissionTraitFeature.trait_values,
+                SubmissionTraitFeature.trait_mask,
+            ).where(
+                SubmissionTraitFeature.submission_id.in_(feature_ids),
+                SubmissionTraitFeature.feature_version == FEATURE_VERSION,
+            )
+        ).all()
+    } if feature_ids else {}
+    new_vectors = {values["submission_id"]: (values["trait_values"], values["trait_mask"]) for values in features}
+
+    def _rollup_vectors(vectors: Dict[int, Tuple[bytes, int]]) -> List[Tuple[Any, bytes, int]]:
+        return [
+            (
+                rollup_key(stored[sid].submitted_at.date(), stored[sid].target_position,
+                           test_types.get(stored[sid].questionnaire_id)),
+                *vector,
+            )
+            for sid, vector in vectors.items()
+            if stored[sid].submitted_at is not None
+        ]
+
+    session.execute(update(Submission), updates)
+    # 测评结果变化：刷新特质特征，使候选人画像缓存失效
+    upsert_rows(session, SubmissionTraitFeature, features, conflict_columns=["submission_id"])
+    # 每日汇总与看板特质汇总：扣除旧值、计入新值（与写回同一事务）
+    record_rescored_stats(session, rescored)
+    record_trait_rollups(session, _rollup_vectors(old_vectors), sign=-1)
+    record_trait_rollups(session, _rollup_vectors(new_vectors))
+    bump_data_revision(session, candidate_ids)
+    session.commit()
+    # 提交成功后替换特质常模中的旧向量（内存增量，rescore_submissions 结束时写回）
+    for sid, vector in old_vectors.items():
+        observe_trait_vector(*vector, target_position=stored[sid].target_position, sign=-1)
+    for sid, vector in new_vectors.items():
+        observe_trait_vector(*vector, target_position=stored[sid].target_position)
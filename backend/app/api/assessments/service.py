@@ -1,18 +1,45 @@
 """问卷/测评管理 - 业务逻辑."""
+from collections import Counter
 from datetime import datetime
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
+from sqlalchemy import case, delete
 from sqlmodel import Session, select, func, and_
+import copy
+import os
 import random
 import string
+import threading
+import time
 
 from app.models_assessment import Questionnaire, Assessment, Submission
-from app.models import Candidate
+from app.models import Candidate, ProfileMatch
+from app.api.candidates.cache_manager import bump_data_revision
+from app.api.candidates.trait_features import delete_submission_features, upsert_submission_feature
+from app.api.candidates.trait_norms import load_observed_vectors, observe_trait_vector
+from app.services.analytics_rollup import (
+    is_first_completed_submission,
+    record_submission_rollup,
+    remove_match_rollups,
+    remove_submission_rollup,
+)
 from app.professional_scoring import (
-    score_professional_assessment,
+    get_scoring_plan,
+    invalidate_scoring_plan,
     score_custom_questionnaire,
     ProfessionalScoringError
 )
-from app.custom_scoring import calculate_custom_questionnaire_score
+from .answer_stats import (
+    TEXT_QUESTION_TYPES,
+    delete_questionnaire_stats,
+    get_answer_counts,
+    get_daily_stats,
+    get_recent_text_answers,
+    last_days,
+    parse_questions,
+    question_key,
+    record_submission_stats,
+)
+from .scoring_pipeline import PROFESSIONAL_TYPES, QuestionnaireSpec, score_submission_answers
 
 
 # ========== 问卷管理 ==========
@@ -77,6 +104,8 @@ async def update_questionnaire(
     questionnaire.updated_at = datetime.now()
     session.add(questionnaire)
     session.commit()
+    invalidate_scoring_plan(questionnaire_id)
+    invalidate_submission_statistics()
     session.refresh(questionnaire)
     return questionnaire
 
@@ -87,8 +116,12 @@ async def delete_questionnaire(session: Session, questionnaire_id: int) -> bool:
     if not questionnaire:
         return False
     
+    # 先删除引用问卷的答案分布与每日汇总
+    delete_questionnaire_stats(session, [questionnaire_id])
     session.delete(questionnaire)
     session.commit()
+    invalidate_scoring_plan(questionnaire_id)
+    invalidate_submission_statistics()
     return True
 
 
@@ -433,11 +466,50 @@ async def delete_submission(session: Session, submission_id: int) -> bool:
     if not submission:
         return False
     
-    session.delete(submission)
+    trait_vectors = delete_submission_records(session, [submission])
     session.commit()
+    invalidate_submission_statistics()
+    # 删除成功后从特质常模中扣除（内存增量，定时写回）
+    for trait_vector in trait_vectors:
+        observe_trait_vector(*trait_vector, sign=-1)
     return True
 
 
+def delete_submission_records(session: Session, submissions: List[Submission]) -> List[Tuple[bytes, int, Optional[str]]]:
+    """删除提交记录及其从属数据（不提交事务）.
+
+    与删除同一事务：从题目答案统计与看板汇总中扣除，删除岗位匹配记录（先从看板汇总中扣除）
+    与特质特征，并递增候选人数据修订号使画像缓存失效。
+    特质常模为内存增量，由调用方在提交事务后对返回的特质向量执行 observe_trait_vector(..., sign=-1)。
+
+    Returns:
+        已计入特质常模的特质向量（见 trait_norms.load_observed_vectors）
+    """
+    if not submissions:
+        return []
+    trait_vectors = load_observed_vectors(session, submissions)
+    _delete_submission_matches(session, [sub.id for sub in submissions])
+    for sub in submissions:
+        questionnaire = session.get(Questionnaire, sub.questionnaire_id)
+        if questionnaire:
+            record_submission_stats(session, questionnaire, sub, sign=-1)
+        remove_submission_rollup(session, sub, questionnaire.type if questionnaire else None)
+        delete_submission_features(session, [sub.id])
+        session.delete(sub)
+    # ⭐ 递增相关候选人数据修订号，使基于这些提交生成的画像缓存失效
+    bump_data_revision(session, [sub.candidate_id for sub in submissions])
+    # 先写入提交记录的删除（模型间没有 relationship，flush 不保证按外键依赖排序）
+    session.flush()
+    return trait_vectors
+
+
+def _delete_submission_matches(session: Session, submission_ids: List[int]) -> None:
+    """删除提交的岗位匹配记录（先从看板汇总中扣除，不提交事务）."""
+    criteria = ProfileMatch.submission_id.in_(submission_ids)
+    if remove_match_rollups(session, criteria):
+        session.exec(delete(ProfileMatch).where(criteria))
+
+
 async def update_assessment(session: Session, assessment_id: int, data: dict) -> Optional[Assessment]:
     """更新测评配置."""
     assessment = session.get(Assessment, assessment_id)
@@ -497,13 +569,17 @@ async def delete_assessment(
     
     # 执行删除
     deleted_submissions = 0
+    trait_vectors = []
     if submission_count > 0:
-        for sub in submissions:
-            session.delete(sub)
-            deleted_submissions = submission_count
+        trait_vectors = delete_submission_records(session, submissions)
+        deleted_submissions = submission_count
     
     session.delete(assessment)
     session.commit()
+    invalidate_submission_statistics()
+    # 删除成功后从特质常模中扣除（内存增量，定时写回）
+    for trait_vector in trait_vectors:
+        observe_trait_vector(*trait_vector, sign=-1)
     
     return {
         "success": True,
@@ -531,69 +607,11 @@ async def submit_answers(session: Session, submission_code: str, answers: dict)
     # ⭐ 根据问卷类型调用对应的评分算法
     try:
         questionnaire_type = questionnaire.type.upper() if questionnaire.type else ''
-        
-        if questionnaire_type in ['MBTI', 'DISC', 'EPQ']:
-            # 专业测评：使用专业评分算法
-            # 获取题目数据以便评分算法能根据维度评分
-            questions = questionnaire.questions_data.get('questions', [])
-            result = score_professional_assessment(questionnaire_type, answers, questions)
-            
-            # 构建result_details用于前端展示
-            if questionnaire_type == 'MBTI':
-                result_details = {
-                    'mbti_type': result.get('mbti_type'),
-                    'mbti_description': result.get('mbti_description'),
-                    'mbti_dimensions': result.get('mbti_dimensions')
-                }
-            elif questionnaire_type == 'DISC':
-                result_details = {
-                    'disc_type': result.get('disc_type'),
-                    'disc_description': result.get('disc_description'),
-                    'disc_dimensions': result.get('disc_dimensions')
-                }
-            elif questionnaire_type == 'EPQ':
-                result_details = {
-                    'personality_trait': result.get('personality_trait'),
-                    'dimensions': result.get('dimensions')
-                }
-            
-            submission.result_details = result_details
-            submission.scores = result.get('raw_scores') or result.get('dimensions', {})
-            submission.total_score = result.get('total_score', 0)
-            submission.grade = result.get('grade', 'C')
-            
-        else:
-            # 自定义问卷：使用新的评分算法
-            questionnaire_dict = {
-                "custom_type": questionnaire.custom_type,
-                "scoring_config": questionnaire.scoring_config,
-                "questions_data": questionnaire.questions_data
-            }
-            
-            # 转换答案格式
-            answers_list = []
-            if isinstance(answers, dict):
-                for q_id, answer_data in answers.items():
-                    answers_list.append({
-                        "question_id": q_id,
-                        "answer": answer_data
-                    })
-            elif isinstance(answers, list):
-                answers_list = answers
-            
-            # 使用新的评分算法
-            result = calculate_custom_questionnaire_score(questionnaire_dict, answers_list)
-            
-            # 保存结果
-            submission.result_details = {
-                "custom_type": questionnaire.custom_type,
-                "answers": result.get("detailed_answers", [])
-            }
-            submission.total_score = result.get("total_score")
-            submission.max_score = result.get("max_score")
-            submission.score_percentage = result.get("score_percentage")
-            submission.grade = result.get("grade")
-            submission.scores = {}  # 详细得分已在result_details中
+        # 专业测评使用问卷预编译的评分方案（进程内缓存），自定义问卷按评分配置计分
+        plan = get_scoring_plan(questionnaire) if questionnaire_type in PROFESSIONAL_TYPES else None
+        fields = score_submission_answers(QuestionnaireSpec.from_model(questionnaire), answers, plan=plan)
+        for name, value in fields.items():
+            setattr(submission, name, value)
         
         # 保存答案和状态
         submission.answers = answers
@@ -611,10 +629,29 @@ async def submit_answers(session: Session, submission_code: str, answers: dict)
         )
         if candidate:
             submission.candidate_id = candidate.id
+            # 新测评结果使候选人画像缓存失效（与提交同一事务）
+            bump_data_revision(session, [candidate.id])
         
         session.add(submission)
+        # 解析特质向量写入特征表（与提交同一事务）
+        feature = upsert_submission_feature(session, submission, questionnaire.type or "")
+        # 累加题目答案分布与每日汇总（与提交同一事务）
+        record_submission_stats(session, questionnaire, submission)
+        # 计入数据看板汇总（与提交同一事务）
+        record_submission_rollup(
+            session,
+            submission,
+            questionnaire.type,
+            feature=feature,
+            new_candidate=is_first_completed_submission(session, submission),
+        )
+        trait_vector = (feature.trait_values, feature.trait_mask) if feature else None
         session.commit()
+        invalidate_submission_statistics()
         session.refresh(submission)
+        # 提交成功后计入特质常模（内存增量，定时写回）
+        if trait_vector:
+            observe_trait_vector(*trait_vector, target_position=submission.target_position)
         
     except ProfessionalScoringError as e:
         raise ValueError(f"评分失败: {str(e)}")
@@ -682,41 +719,84 @@ async def _get_or_create_candidate(
 
 # ========== 统计相关 ==========
 
+# 提交统计结果的进程内缓存：按 (category, questionnaire_id) 缓存，短 TTL（0 表示不缓存）
+SUBMISSION_STATS_TTL_SECONDS = float(os.getenv("SUBMISSION_STATS_TTL_SECONDS", "10"))
+# 统计接口返回的提交样本数
+SUBMISSION_STATS_SAMPLE_SIZE = 100
+# 合格分数线
+PASS_SCORE = 60
+
+_stats_cache: Dict[Tuple[Optional[str], Optional[int]], Tuple[float, dict]] = {}
+_stats_lock = threading.Lock()
+_stats_generation = 0
+
+
+def invalidate_submission_statistics() -> None:
+    """提交完成/删除或问卷变更后调用，丢弃缓存的统计结果."""
+    global _stats_generation
+    with _stats_lock:
+        _stats_cache.clear()
+        _stats_generation += 1
+
+
 async def get_submission_statistics(
     session: Session,
     category: Optional[str] = None,
     questionnaire_id: Optional[int] = None
 ) -> dict:
-    """获取提交记录统计数据."""
-    from sqlmodel import select, func
+    """获取提交记录统计数据.
     
-    # 构建查询基础
-    base_query = select(Submission).where(Submission.status == "completed")
+    计数、平均分、合格率和等级分布由一次聚合查询得到，样本列表只查询所需列，
+    不读取 answers/result_details 等大字段。结果按 (category, questionnaire_id)
+    在进程内缓存 SUBMISSION_STATS_TTL_SECONDS 秒。
+    """
+    key = (category, questionnaire_id)
+    with _stats_lock:
+        cached = _stats_cache.get(key)
+        if cached and time.monotonic() - cached[0] <= SUBMISSION_STATS_TTL_SECONDS:
+            return copy.deepcopy(cached[1])
+        generation = _stats_generation
+    
+    stats = _query_submission_statistics(session, category, questionnaire_id)
+    
+    if SUBMISSION_STATS_TTL_SECONDS > 0:
+        with _stats_lock:
+            # 查询期间发生失效时不写入缓存，避免覆盖为旧数据
+            if generation == _stats_generation:
+                _stats_cache[key] = (time.monotonic(), copy.deepcopy(stats))
+    return stats
+
+
+def _query_submission_statistics(
+    session: Session,
+    category: Optional[str],
+    questionnaire_id: Optional[int]
+) -> dict:
+    conditions = [Submission.status == "completed"]
     
     # 如果指定了问卷ID
     if questionnaire_id:
-        base_query = base_query.where(Submission.questionnaire_id == questionnaire_id)
+        conditions.append(Submission.questionnaire_id == questionnaire_id)
     
-    # 如果指定了category，需要先获取对应的问卷ID列表
+    # 如果指定了category，限定为该分类下的问卷
     if category:
-        q_statement = select(Questionnaire.id).where(Questionnaire.category == category)
-        questionnaire_ids = session.exec(q_statement).all()
-        if questionnaire_ids:
-            base_query = base_query.where(Submission.questionnaire_id.in_(questionnaire_ids))
-        else:
-            return {
-                "total_submissions": 0,
-                "average_score": 0,
-                "pass_rate": 0,
-                "grade_distribution": {"A": 0, "B": 0, "C": 0, "D": 0},
-                "submissions": []
-            }
-    
-    # 执行查询
-    all_submissions = session.exec(base_query).all()
-    
-    # 计算统计数据
-    total = len(all_submissions)
+        conditions.append(Submission.questionnaire_id.in_(
+            select(Questionnaire.id).where(Questionnaire.category == category)
+        ))
+    
+    # 一次聚合：总数、平均分（忽略空值）、合格数、等级分布（空等级计为D）
+    grade = func.upper(func.coalesce(func.nullif(Submission.grade, ""), "D"))
+    grades = ("A", "B", "C", "D")
+    row = session.exec(
+        select(
+            func.count(Submission.id),
+            func.avg(Submission.total_score),
+            func.count(Submission.total_score),
+            func.sum(case((Submission.total_score >= PASS_SCORE, 1), else_=0)),
+            *[func.sum(case((grade == g, 1), else_=0)) for g in grades],
+        ).where(*conditions)
+    ).one()
+    total, average_score, score_count, pass_count = row[0], row[1], row[2], row[3]
     
     if total == 0:
         return {
@@ -727,25 +807,28 @@ async def get_submission_statistics(
             "submissions": []
         }
     
-    # 计算平均分（过滤掉 None 值）
-    valid_scores = [s.total_score for s in all_submissions if s.total_score is not None]
-    average_score = sum(valid_scores) / len(valid_scores) if valid_scores else 0
-    
-    # 计算合格率（假设60分及格）
-    pass_count = len([s for s in valid_scores if s >= 60])
-    pass_rate = (pass_count / len(valid_scores) * 100) if valid_scores else 0
-    
-    # 计算等级分布
-    grade_distribution = {"A": 0, "B": 0, "C": 0, "D": 0}
-    for s in all_submissions:
-        grade = (s.grade or "D").upper()
-        if grade in grade_distribution:
-            grade_distribution[grade] += 1
+    pass_rate = (pass_count / score_count * 100) if score_count else 0
+    grade_distribution = {g: int(count or 0) for g, count in zip(grades, row[4:])}
+    
+    # 样本列表：只查询返回的列
+    samples = session.exec(
+        select(
+            Submission.id,
+            Submission.candidate_name,
+            Submission.candidate_phone,
+            Submission.total_score,
+            Submission.grade,
+            Submission.submitted_at,
+        )
+        .where(*conditions)
+        .order_by(Submission.id)
+        .limit(SUBMISSION_STATS_SAMPLE_SIZE)
+    ).all()
     
     # 构建返回数据
     return {
         "total_submissions": total,
-        "average_score": round(average_score, 2),
+        "average_score": round(float(average_score or 0), 2),
         "pass_rate": round(pass_rate, 2),
         "grade_distribution": grade_distribution,
         "grade_percentages": {
@@ -761,7 +844,7 @@ async def get_submission_statistics(
                 "grade": s.grade,
                 "submitted_at": s.submitted_at.isoformat() if s.submitted_at else None
             }
-            for s in all_submissions[:100]  # 限制返回数量
+            for s in samples
         ]
     }
 
@@ -822,35 +905,15 @@ async def get_question_answer_statistics(
     V42: 获取问卷的题目答案统计数据.
     
     返回每道题的选项分布统计，用于问卷统计页面的数据可视化。
+    读取增量维护的聚合表（answer_stats），耗时与题目数相关而与提交数无关。
     """
-    from sqlmodel import select
-    from collections import Counter, defaultdict
-    from datetime import datetime, timedelta
-    
     # 获取问卷信息
     questionnaire = session.get(Questionnaire, questionnaire_id)
     if not questionnaire:
         return {"error": "问卷不存在", "questions": []}
     
-    # 获取所有提交记录（包括已完成和进行中的）
-    # V46: 修复统计数据不显示问题 - 同时查询多种完成状态
-    query = select(Submission).where(
-        Submission.questionnaire_id == questionnaire_id,
-        Submission.status.in_(["completed", "已完成", "done", "submitted"])
-    ).order_by(Submission.submitted_at.desc())
-    
-    submissions = list(session.exec(query).all())
-    
-    # 如果没找到，尝试不限制状态查询
-    if not submissions:
-        query_all = select(Submission).where(
-            Submission.questionnaire_id == questionnaire_id
-        ).order_by(Submission.submitted_at.desc())
-        all_submissions = list(session.exec(query_all).all())
-        # 过滤出有答案的提交
-        submissions = [s for s in all_submissions if s.answers and len(s.answers) > 0]
-    
-    total_submissions = len(submissions)
+    daily_stats = get_daily_stats(session, questionnaire_id)
+    total_submissions = sum(day.submissions for day in daily_stats)
     
     if total_submissions == 0:
         return {
@@ -868,70 +931,31 @@ async def get_question_answer_statistics(
         }
     
     # 解析问卷题目
-    questions_data = questionnaire.questions_data or []
-    if isinstance(questions_data, str):
-        import json
-        try:
-            questions_data = json.loads(questions_data)
-        except:
-            questions_data = []
-    
-    # 处理 {"questions": [...]} 格式
-    if isinstance(questions_data, dict):
-        questions_data = questions_data.get("questions", [])
-    
-    # 确保是列表
-    if not isinstance(questions_data, list):
-        questions_data = []
+    questions_data = parse_questions(questionnaire.questions_data)
+    answer_counts_by_question = get_answer_counts(session, questionnaire_id)
+    text_samples = get_recent_text_answers(
+        session,
+        questionnaire_id,
+        [(i, q) for i, q in enumerate(questions_data) if q.get("type", "single") in TEXT_QUESTION_TYPES]
+    )
     
     # 统计每道题的答案分布
     question_stats = []
     
     for q_idx, question in enumerate(questions_data):
-        # 跳过非字典类型的项
-        if not isinstance(question, dict):
-            continue
-        
         q_id = question.get("id", str(q_idx + 1))
         q_text = question.get("text", question.get("question", f"问题 {q_idx + 1}"))
         q_type = question.get("type", "single")  # single, multiple, text, rating
         options = question.get("options", [])
         
-        # 收集所有答案
-        answer_counts = Counter()
-        text_answers = []
-        
-        for sub in submissions:
-            answers = sub.answers or {}
-            if isinstance(answers, str):
-                import json
-                try:
-                    answers = json.loads(answers)
-                except:
-                    answers = {}
-            
-            answer = answers.get(q_id) or answers.get(str(q_idx))
-            
-            if answer is None:
-                continue
-            
-            if q_type in ("text", "textarea"):
-                # 文本题收集答案
-                if isinstance(answer, str) and answer.strip():
-                    text_answers.append(answer.strip())
-            elif q_type in ("multiple", "checkbox") or isinstance(answer, list):
-                # 多选题
-                for a in (answer if isinstance(answer, list) else [answer]):
-                    answer_counts[str(a)] += 1
-            else:
-                # 单选题
-                answer_counts[str(answer)] += 1
+        answer_counts = answer_counts_by_question.get(question_key(question, q_idx), Counter())
+        text_answers = text_samples.get(question_key(question, q_idx), [])
         
-        # 构建选项统计
+        # 构建选项统计（文本题的回答数记在 TEXT_ANSWER_VALUE 下）
         option_stats = []
-        total_answers = sum(answer_counts.values()) if answer_counts else len(text_answers)
+        total_answers = sum(answer_counts.values())
         
-        if q_type == "text" or q_type == "textarea":
+        if q_type in TEXT_QUESTION_TYPES:
             # 文本题：显示部分回答样本
             option_stats = [
                 {"text": ans, "count": 1}
@@ -999,38 +1023,28 @@ async def get_question_answer_statistics(
     # 计算平均分（仅评分问卷）
     average_score = None
     if questionnaire.category == "scored":
-        valid_scores = [s.total_score for s in submissions if s.total_score is not None]
-        if valid_scores:
-            average_score = round(sum(valid_scores) / len(valid_scores), 1)
+        score_count = sum(day.score_count for day in daily_stats)
+        if score_count:
+            average_score = round(sum(day.score_sum for day in daily_stats) / score_count, 1)
     
-    # 计算平均用时
+    # 计算平均用时（汇总时已排除异常值）
     average_duration = None
-    durations = []
-    for sub in submissions:
-        if sub.started_at and sub.submitted_at:
-            duration = (sub.submitted_at - sub.started_at).total_seconds() / 60
-            if 0 < duration < 120:  # 排除异常值
-                durations.append(duration)
-    if durations:
-        average_duration = round(sum(durations) / len(durations), 1)
+    duration_count = sum(day.duration_count for day in daily_stats)
+    if duration_count:
+        average_duration = round(sum(day.duration_sum for day in daily_stats) / duration_count, 1)
     
     # 计算每日提交趋势（最近7天）
-    daily_trend = []
-    today = datetime.now().date()
-    for i in range(6, -1, -1):
-        day = today - timedelta(days=i)
-        count = sum(1 for s in submissions if s.submitted_at and s.submitted_at.date() == day)
-        daily_trend.append({
-            "date": day.strftime("%m/%d"),
-            "count": count
-        })
+    submissions_by_day = {day.day: day.submissions for day in daily_stats}
+    daily_trend = [
+        {"date": day.strftime("%m/%d"), "count": submissions_by_day.get(day, 0)}
+        for day in last_days(7)
+    ]
     
     # 等级分布
-    grade_distribution = {"A": 0, "B": 0, "C": 0, "D": 0}
-    for sub in submissions:
-        grade = (sub.grade or "D").upper()
-        if grade in grade_distribution:
-            grade_distribution[grade] += 1
+    grade_distribution = {
+        grade: sum(getattr(day, f"grade_{grade.lower()}") for day in daily_stats)
+        for grade in ("A", "B", "C", "D")
+    }
     
     return {
         "questionnaire_id": questionnaire_id,
@@ -1049,83 +1063,3 @@ async def get_question_answer_statistics(
             for grade, count in grade_distribution.items()
         }
     }
-
-
-async def export_submissions_to_excel(
-    session: Session,
-    category: Optional[str] = None,
-    questionnaire_id: Optional[int] = None
-) -> bytes:
-    """导出提交记录为Excel文件."""
-    import io
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-    from sqlmodel import select
-    
-    # 构建查询
-    query = select(Submission)
-    
-    if questionnaire_id:
-        query = query.where(Submission.questionnaire_id == questionnaire_id)
-    
-    if category:
-        q_statement = select(Questionnaire.id).where(Questionnaire.category == category)
-        questionnaire_ids = session.exec(q_statement).all()
-        if questionnaire_ids:
-            query = query.where(Submission.questionnaire_id.in_(questionnaire_ids))
-    
-    submissions = session.exec(query).all()
-    
-    # 创建Excel工作簿
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "提交记录"
-    
-    # 定义样式
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="4F46E5", end_color="4F46E5", fill_type="solid")
-    header_alignment = Alignment(horizontal="center", vertical="center")
-    thin_border = Border(
-        left=Side(style="thin"),
-        right=Side(style="thin"),
-        top=Side(style="thin"),
-        bottom=Side(style="thin")
-    )
-    
-    # 写入表头
-    headers = ["序号", "姓名", "电话", "问卷", "得分", "等级", "状态", "提交时间"]
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_alignment
-        cell.border = thin_border
-    
-    # 设置列宽
-    ws.column_dimensions['A'].width = 8
-    ws.column_dimensions['B'].width = 12
-    ws.column_dimensions['C'].width = 15
-    ws.column_dimensions['D'].width = 20
-    ws.column_dimensions['E'].width = 10
-    ws.column_dimensions['F'].width = 10
-    ws.column_dimensions['G'].width = 12
-    ws.column_dimensions['H'].width = 20
-    
-    # 写入数据
-    for row, sub in enumerate(submissions, 2):
-        ws.cell(row=row, column=1, value=row - 1).border = thin_border
-        ws.cell(row=row, column=2, value=sub.candidate_name or "").border = thin_border
-        ws.cell(row=row, column=3, value=sub.candidate_phone or "").border = thin_border
-        ws.cell(row=row, column=4, value=sub.questionnaire_name or "").border = thin_border
-        ws.cell(row=row, column=5, value=sub.total_score).border = thin_border
-        ws.cell(row=row, column=6, value=sub.grade or "").border = thin_border
-        ws.cell(row=row, column=7, value="已完成" if sub.status == "completed" else "进行中").border = thin_border
-        ws.cell(row=row, column=8, value=sub.submitted_at.strftime("%Y-%m-%d %H:%M:%S") if sub.submitted_at else "").border = thin_border
-    
-    # 保存到字节流
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
-    
-    return output.getvalue()
-
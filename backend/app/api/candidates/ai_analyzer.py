@@ -480,7 +480,8 @@ def build_default_analysis(
     )
     
     unsuitable_positions = JobRecommender.recommend_unsuitable_positions(
-        competencies=competencies
+        competencies=competencies,
+        session=session
     )
     
     logger.info(f"🔧 降级场景岗位推荐: suitable={suitable_positions}, unsuitable={unsuitable_positions}")
@@ -0,0 +1,261 @@
+"""候选人画像 - 缓存维护模块.
+
+portrait_cache 表的容量回收：
+- 删除不可再用的记录：候选人已删除、同一候选人同一级别的重复记录、
+  版本已过期且超过该级别最长过期时长（stale_ok 也不会再返回）
+- 每个候选人最多保留 N 条记录（按最近使用时间）
+- 总字节数超过预算时，按最近使用时间淘汰（先淘汰版本已过期的记录）
+- SQLite 下删除后执行 incremental_vacuum 归还磁盘空间
+
+通过启动时的定时任务（start_maintenance_loop）或命令行脚本
+（python -m app.scripts.portrait_cache_maintenance）执行。
+多个工作进程都会启动定时任务，但只有持有 task_leases 租约的进程执行维护。
+"""
+
+import asyncio
+import logging
+import os
+import socket
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, func, or_, text, update
+from sqlmodel import Session, select
+
+from app.db import get_engine, upsert_rows
+from app.models import Candidate, PortraitCache, TaskLease
+from .cache_manager import STALE_MAX_AGE_SECONDS, compute_data_version, flush_hit_counters
+from .hot_cache import portrait_hot_cache
+
+logger = logging.getLogger(__name__)
+
+# 画像缓存总字节预算（portrait_data 列），默认 1GB
+MAX_TOTAL_BYTES = int(os.getenv("PORTRAIT_CACHE_MAX_TOTAL_BYTES", str(1024 * 1024 * 1024)))
+# 每个候选人最多保留的缓存条数（pro + expert）
+MAX_ROWS_PER_CANDIDATE = int(os.getenv("PORTRAIT_CACHE_MAX_ROWS_PER_CANDIDATE", "2"))
+# 定时维护间隔（秒，0 表示不启动定时任务），默认 6 小时
+MAINTENANCE_INTERVAL_SECONDS = int(os.getenv("PORTRAIT_CACHE_MAINTENANCE_INTERVAL_SECONDS", str(6 * 3600)))
+
+_DELETE_CHUNK_SIZE = 500
+# 定时维护的租约名与本进程标识
+_LEASE_NAME = "portrait_cache_maintenance"
+_LEASE_OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_cache_maintenance(
+    session: Session,
+    max_total_bytes: Optional[int] = None,
+    max_rows_per_candidate: Optional[int] = None,
+    dry_run: bool = False,
+    vacuum: bool = True
+) -> Dict[str, int]:
+    """执行一次画像缓存维护.
+
+    Args:
+        session: 数据库会话
+        max_total_bytes: 总字节预算（默认取环境变量配置）
+        max_rows_per_candidate: 每个候选人最多保留条数（默认取环境变量配置）
+        dry_run: 只统计不删除
+        vacuum: SQLite 下删除后是否执行 incremental_vacuum
+
+    Returns:
+        维护报告（各类删除条数、回收字节数、剩余字节数等）
+    """
+    if max_total_bytes is None:
+        max_total_bytes = MAX_TOTAL_BYTES
+    if max_rows_per_candidate is None:
+        max_rows_per_candidate = MAX_ROWS_PER_CANDIDATE
+
+    if not dry_run:
+        flush_hit_counters(session)
+
+    # 只读取元数据列和数据长度，不读取画像数据
+    rows = session.exec(
+        select(
+            PortraitCache.id,
+            PortraitCache.candidate_id,
+            PortraitCache.analysis_level,
+            PortraitCache.data_version,
+            PortraitCache.created_at,
+            PortraitCache.updated_at,
+            PortraitCache.last_hit_at,
+            func.coalesce(func.length(PortraitCache.portrait_data), 0).label("size"),
+        )
+    ).all()
+    revisions = dict(session.exec(select(Candidate.id, Candidate.data_revision)).all())
+
+    now = datetime.utcnow()
+    report = {
+        "rows_scanned": len(rows),
+        "deleted_orphan": 0,
+        "deleted_duplicate": 0,
+        "deleted_expired": 0,
+        "deleted_over_candidate_limit": 0,
+        "deleted_over_budget": 0,
+        "reclaimed_bytes": 0,
+        "remaining_bytes": 0,
+        "vacuum_reclaimed_bytes": 0,
+    }
+    to_delete: List = []
+
+    def _drop(row, reason: str) -> None:
+        to_delete.append(row)
+        report[reason] += 1
+        report["reclaimed_bytes"] += row.size
+
+    def _last_used(row) -> datetime:
+        value = row.last_hit_at or row.updated_at or row.created_at or datetime.min
+        return value.replace(tzinfo=None)
+
+    def _is_current(row) -> bool:
+        return row.data_version == compute_data_version(revisions.get(row.candidate_id))
+
+    # 1. 不可再用的记录
+    newest_by_key: Dict[tuple, object] = {}
+    survivors = []
+    for row in sorted(rows, key=_last_used, reverse=True):
+        if row.candidate_id not in revisions:
+            _drop(row, "deleted_orphan")
+            continue
+        key = (row.candidate_id, row.analysis_level)
+        if key in newest_by_key:
+            # 读取按 (candidate_id, analysis_level) 取第一条，重复记录不会被稳定命中
+            _drop(row, "deleted_duplicate")
+            continue
+        newest_by_key[key] = row
+        if not _is_current(row):
+            generated_at = (row.updated_at or row.created_at or datetime.min).replace(tzinfo=None)
+            max_age = STALE_MAX_AGE_SECONDS.get(row.analysis_level, 0)
+            if (now - generated_at).total_seconds() > max_age:
+                _drop(row, "deleted_expired")
+                continue
+        survivors.append(row)
+
+    # 2. 每个候选人的条数上限（survivors 已按最近使用时间降序）
+    per_candidate: Dict[int, int] = defaultdict(int)
+    kept = []
+    for row in survivors:
+        per_candidate[row.candidate_id] += 1
+        if max_rows_per_candidate > 0 and per_candidate[row.candidate_id] > max_rows_per_candidate:
+            _drop(row, "deleted_over_candidate_limit")
+        else:
+            kept.append(row)
+
+    # 3. 总字节预算：先淘汰版本已过期的记录，再按最近使用时间从旧到新淘汰
+    total_bytes = sum(row.size for row in kept)
+    if max_total_bytes > 0 and total_bytes > max_total_bytes:
+        for row in sorted(kept, key=lambda r: (_is_current(r), _last_used(r))):
+            if total_bytes <= max_total_bytes:
+                break
+            _drop(row, "deleted_over_budget")
+            total_bytes -= row.size
+    report["remaining_bytes"] = total_bytes
+
+    if dry_run or not to_delete:
+        return report
+
+    ids = [row.id for row in to_delete]
+    for start in range(0, len(ids), _DELETE_CHUNK_SIZE):
+        session.exec(delete(PortraitCache).where(PortraitCache.id.in_(ids[start:start + _DELETE_CHUNK_SIZE])))
+    session.commit()
+    for row in to_delete:
+        portrait_hot_cache.invalidate(row.candidate_id, row.analysis_level)
+
+    if vacuum:
+        report["vacuum_reclaimed_bytes"] = _sqlite_incremental_vacuum(session)
+
+    logger.info(
+        f"🧹 画像缓存维护完成: 删除 {len(ids)} 条，回收 {report['reclaimed_bytes']} 字节，"
+        f"剩余 {report['remaining_bytes']} 字节"
+    )
+    return report
+
+
+def _sqlite_incremental_vacuum(session: Session) -> int:
+    """SQLite 下执行 incremental_vacuum，返回归还的磁盘字节数（非 SQLite 返回0）.
+
+    需要数据库已设置 auto_vacuum=INCREMENTAL（见命令行脚本 --enable-incremental-vacuum）。
+    """
+    bind = session.get_bind()
+    if bind.dialect.name != "sqlite":
+        return 0
+
+    auto_vacuum = session.exec(text("PRAGMA auto_vacuum")).scalar()
+    if auto_vacuum != 2:
+        logger.info("ℹ️ SQLite 未启用 auto_vacuum=INCREMENTAL，跳过 incremental_vacuum")
+        return 0
+
+    page_size = session.exec(text("PRAGMA page_size")).scalar()
+    pages_before = session.exec(text("PRAGMA page_count")).scalar()
+    # sqlite3 的 execute 只执行一步（只释放一页），executescript 才会执行完毕
+    session.connection().connection.executescript("PRAGMA incremental_vacuum;")
+    session.commit()
+    pages_after = session.exec(text("PRAGMA page_count")).scalar()
+    return max(pages_before - pages_after, 0) * page_size
+
+
+def enable_sqlite_incremental_vacuum() -> bool:
+    """将 SQLite 数据库切换为 auto_vacuum=INCREMENTAL（需要一次完整 VACUUM）."""
+    engine = get_engine()
+    if engine.dialect.name != "sqlite":
+        return False
+
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        conn.execute(text("PRAGMA auto_vacuum = INCREMENTAL"))
+        conn.execute(text("VACUUM"))
+    return True
+
+
+def acquire_maintenance_lease(session: Session, ttl_seconds: int) -> bool:
+    """获取或续约定时维护租约（租约未到期时只有持有者可续约）.
+
+    Returns:
+        本进程是否持有租约
+    """
+    now = datetime.utcnow()
+    try:
+        # 租约行不存在时先插入（已存在则不修改）
+        upsert_rows(
+            session, TaskLease, [{"name": _LEASE_NAME, "owner": "", "expires_at": now}],
+            conflict_columns=["name"], update_columns=[]
+        )
+        result = session.exec(
+            update(TaskLease)
+            .where(
+                TaskLease.name == _LEASE_NAME,
+                or_(TaskLease.owner == _LEASE_OWNER, TaskLease.expires_at <= now)
+            )
+            .values(owner=_LEASE_OWNER, expires_at=now + timedelta(seconds=ttl_seconds))
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+    except Exception as e:
+        logger.warning(f"⚠️ 画像缓存维护租约获取失败: {e}")
+        session.rollback()
+        return False
+    return result.rowcount == 1
+
+
+async def start_maintenance_loop() -> None:
+    """定时执行画像缓存维护（在线程中执行，不阻塞事件循环）.
+
+    每个工作进程都会启动该任务，只有获得租约的进程执行维护；租约时长与维护间隔相同，
+    持有者每次执行时续约，持有者退出后最迟一个间隔内由其他进程接管。
+    """
+    if MAINTENANCE_INTERVAL_SECONDS <= 0:
+        return
+
+    def _run_once() -> Optional[Dict[str, int]]:
+        with Session(get_engine()) as session:
+            if not acquire_maintenance_lease(session, MAINTENANCE_INTERVAL_SECONDS):
+                return None
+            return run_cache_maintenance(session)
+
+    while True:
+        await asyncio.sleep(MAINTENANCE_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(_run_once)
+        except Exception as e:
+            logger.error(f"❌ 画像缓存维护失败: {e}")
@@ -1,63 +1,244 @@
 """候选人画像 - 缓存管理模块.
 
 负责画像数据的缓存读取、写入和版本控制。
+读取时先查进程内热缓存（hot_cache），未命中再查 portrait_cache 表并回填热缓存。
+画像数据以 zlib 压缩后存储（带格式前缀，兼容旧的明文JSON记录），
+并基于缓存元数据生成强 ETag，支持条件请求在不读取画像数据的情况下返回 304。
+stale_ok 模式下，版本过期但仍在级别过期策略内的旧画像可先返回，由后台重新生成。
 """
 
+import asyncio
+import base64
 import hashlib
 import json
 import logging
+import os
+import threading
+import zlib
 from datetime import datetime
-from typing import Optional
+from typing import Iterable, Optional, Tuple
 
+from sqlalchemy import or_, update
 from sqlmodel import Session, select
 
-from app.models import Candidate, JobProfile, PortraitCache
+from app.db import get_engine, upsert_rows
+from app.models import Candidate, PortraitCache
 from app.models_assessment import Submission
 from . import schemas
+from .hot_cache import HotPortraitEntry, portrait_hot_cache
 
 logger = logging.getLogger(__name__)
 
+# 过期画像最长可用时长（秒，按分析级别配置，0 表示不返回过期画像）
+# expert 级别生成代价更高（推理模型，耗时数分钟），默认允许更长的过期时间
+STALE_MAX_AGE_SECONDS = {
+    "pro": int(os.getenv("PORTRAIT_STALE_MAX_AGE_PRO_SECONDS", str(7 * 24 * 3600))),
+    "expert": int(os.getenv("PORTRAIT_STALE_MAX_AGE_EXPERT_SECONDS", str(30 * 24 * 3600))),
+}
 
-def compute_data_version(
-    candidate: Candidate,
-    latest_submission: Optional[Submission],
-    job_profile: Optional[JobProfile]
+# 缓存命中计数缓冲：{(candidate_id, analysis_level): (命中次数, 最后命中时间)}
+# 命中时只累计到内存，由 flush_hit_counters 批量写回，避免读路径产生写库
+# 每个工作进程按 HIT_FLUSH_INTERVAL_SECONDS 定时写回（start_hit_flush_loop），停机时再写回一次
+HIT_FLUSH_INTERVAL_SECONDS = int(os.getenv("PORTRAIT_CACHE_HIT_FLUSH_INTERVAL_SECONDS", "60"))
+_hit_buffer: dict = {}
+_hit_lock = threading.Lock()
+
+# 压缩存储格式前缀：zlib 压缩 + base64 编码（旧记录为明文JSON，以 "{" 开头）
+_ZLIB_PREFIX = "zlib:"
+
+
+def encode_portrait_data(portrait_json: str) -> str:
+    """压缩画像JSON用于存储."""
+    compressed = zlib.compress(portrait_json.encode("utf-8"), 6)
+    return _ZLIB_PREFIX + base64.b64encode(compressed).decode("ascii")
+
+
+def decode_portrait_data(stored: str) -> str:
+    """还原存储的画像数据为JSON文本（兼容未压缩的旧记录）."""
+    if stored.startswith(_ZLIB_PREFIX):
+        compressed = base64.b64decode(stored[len(_ZLIB_PREFIX):])
+        return zlib.decompress(compressed).decode("utf-8")
+    return stored
+
+
+def compute_portrait_etag(
+    data_version: str,
+    analysis_level: str,
+    ai_model: Optional[str],
+    generated_at: Optional[datetime] = None
 ) -> str:
-    """计算数据版本标识，用于判断缓存是否失效.
+    """基于缓存元数据生成强 ETag.
     
-    版本基于以下数据的更新时间：
-    - 候选人信息（updated_at）
-    - 最新测评提交（submitted_at）
-    - 关联岗位画像（updated_at）
+    generated_at 为缓存记录的更新时间，保证强制刷新（数据版本不变）后 ETag 也会变化。
+    """
+    parts = [data_version, analysis_level, ai_model or ""]
+    if generated_at:
+        parts.append(generated_at.isoformat())
+    digest = hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """判断 If-None-Match 请求头是否命中当前 ETag."""
+    if not if_none_match or not etag:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # 弱比较：忽略 W/ 前缀
+    normalized = {tag[2:] if tag.startswith("W/") else tag for tag in candidates}
+    return "*" in normalized or etag in normalized
+
+
+def compute_data_version(data_revision: Optional[int]) -> str:
+    """根据候选人的数据修订号生成数据版本标识，用于判断缓存是否失效.
+    
+    data_revision 在以下数据变更时于同一事务内递增（见 bump_data_revision）：
+    - 测评提交完成
+    - 简历上传/删除/解析
+    - 关联岗位画像创建/更新/删除（按岗位名批量扩散）
     
     Args:
-        candidate: 候选人对象
-        latest_submission: 最新测评提交
-        job_profile: 关联的岗位画像
+        data_revision: 候选人数据修订号
         
     Returns:
-        16位的MD5哈希版本标识
+        数据版本标识（如 "r3"）
     """
-    version_parts = []
+    return f"r{data_revision or 0}"
+
+
+def get_data_revision(session: Session, candidate_id: int) -> Optional[int]:
+    """按主键只查询候选人的数据修订号（候选人不存在时返回None）."""
+    return session.exec(
+        select(Candidate.data_revision).where(Candidate.id == candidate_id)
+    ).first()
+
+
+def bump_data_revision(session: Session, candidate_ids: Iterable[int]) -> int:
+    """递增候选人的数据修订号，使其画像缓存失效.
     
-    # 候选人更新时间
-    if candidate.updated_at:
-        version_parts.append(str(candidate.updated_at.timestamp()))
+    使用 UPDATE ... SET data_revision = data_revision + 1，并发写入不会丢失递增；
+    不提交事务，由调用方与业务数据变更一并提交。
     
-    # 简历上传时间
-    if candidate.resume_uploaded_at:
-        version_parts.append(str(candidate.resume_uploaded_at.timestamp()))
+    Args:
+        session: 数据库会话
+        candidate_ids: 候选人ID列表
+        
+    Returns:
+        受影响的候选人数
+    """
+    ids = sorted({cid for cid in candidate_ids if cid is not None})
+    if not ids:
+        return 0
+    
+    result = session.exec(
+        update(Candidate)
+        .where(Candidate.id.in_(ids))
+        .values(data_revision=Candidate.data_revision + 1)
+        .execution_options(synchronize_session=False)
+    )
+    _expire_revisions(session, ids)
+    return result.rowcount
+
+
+def bump_data_revision_for_positions(session: Session, positions: Iterable[Optional[str]]) -> int:
+    """岗位画像变更时，批量递增受影响候选人的数据修订号.
     
-    # 最新测评提交时间
-    if latest_submission and latest_submission.submitted_at:
-        version_parts.append(str(latest_submission.submitted_at.timestamp()))
+    受影响候选人：应聘岗位为该岗位，或有测评提交的目标岗位为该岗位。
     
-    # 岗位画像更新时间
-    if job_profile and hasattr(job_profile, 'updated_at') and job_profile.updated_at:
-        version_parts.append(str(job_profile.updated_at.timestamp()))
+    Args:
+        session: 数据库会话
+        positions: 岗位名称列表（重命名时应同时传入新旧名称）
+        
+    Returns:
+        受影响的候选人数
+    """
+    names = sorted({name for name in positions if name})
+    if not names:
+        return 0
     
-    version_string = "|".join(version_parts) or "default"
-    return hashlib.md5(version_string.encode()).hexdigest()[:16]
+    submission_candidates = select(Submission.candidate_id).where(
+        Submission.target_position.in_(names),
+        Submission.candidate_id.is_not(None)
+    )
+    result = session.exec(
+        update(Candidate)
+        .where(or_(
+            Candidate.position.in_(names),
+            Candidate.id.in_(submission_candidates)
+        ))
+        .values(data_revision=Candidate.data_revision + 1)
+        .execution_options(synchronize_session=False)
+    )
+    _expire_revisions(session)
+    logger.info(f"🔄 岗位画像变更 {names}，{result.rowcount} 位候选人画像缓存失效")
+    return result.rowcount
+
+
+def _expire_revisions(session: Session, candidate_ids: Optional[list] = None) -> None:
+    """让会话中已加载候选人的 data_revision 在下次访问时重新读取."""
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, Candidate) and (candidate_ids is None or obj.id in candidate_ids):
+            session.expire(obj, ["data_revision"])
+
+
+def record_cache_hit(candidate_id: int, analysis_level: str) -> None:
+    """记录一次缓存命中（仅写内存缓冲）."""
+    key = (candidate_id, analysis_level)
+    with _hit_lock:
+        count, _ = _hit_buffer.get(key, (0, None))
+        _hit_buffer[key] = (count + 1, datetime.utcnow())
+
+
+def flush_hit_counters(session: Session) -> int:
+    """将内存中的命中计数写回 portrait_cache（hit_count 累加，last_hit_at 取最后命中时间）.
+    
+    Returns:
+        写回的缓存条目数
+    """
+    with _hit_lock:
+        pending = dict(_hit_buffer)
+        _hit_buffer.clear()
+    if not pending:
+        return 0
+    
+    try:
+        for (candidate_id, analysis_level), (count, last_hit_at) in pending.items():
+            session.exec(
+                update(PortraitCache)
+                .where(
+                    PortraitCache.candidate_id == candidate_id,
+                    PortraitCache.analysis_level == analysis_level
+                )
+                .values(
+                    hit_count=PortraitCache.hit_count + count,
+                    last_hit_at=last_hit_at
+                )
+                .execution_options(synchronize_session=False)
+            )
+        session.commit()
+    except Exception as e:
+        logger.warning(f"⚠️ 画像缓存命中计数写回失败: {e}")
+        session.rollback()
+        return 0
+    return len(pending)
+
+
+def flush_pending_hits() -> int:
+    """使用独立会话写回命中计数（定时任务与停机时调用）."""
+    with Session(get_engine()) as session:
+        return flush_hit_counters(session)
+
+
+async def start_hit_flush_loop() -> None:
+    """定时将命中计数写回 portrait_cache（在线程中执行，不阻塞事件循环）."""
+    if HIT_FLUSH_INTERVAL_SECONDS <= 0:
+        return
+
+    while True:
+        await asyncio.sleep(HIT_FLUSH_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(flush_pending_hits)
+        except Exception as e:
+            logger.error(f"❌ 画像缓存命中计数写回失败: {e}")
 
 
 def get_cached_portrait(
@@ -77,6 +258,44 @@ def get_cached_portrait(
     Returns:
         如果缓存有效返回画像数据，否则返回None
     """
+    entry = _load_cached_entry(session, candidate_id, current_version, analysis_level)
+    return entry.portrait if entry else None
+
+
+def get_cached_portrait_body(
+    session: Session,
+    candidate_id: int,
+    current_version: str,
+    analysis_level: str = "pro"
+) -> Optional[bytes]:
+    """获取缓存画像的预序列化JSON字节（路由直接返回，避免再次序列化）.
+    
+    Args:
+        session: 数据库会话
+        candidate_id: 候选人ID
+        current_version: 当前数据版本
+        analysis_level: 分析级别 (pro/expert)
+    
+    Returns:
+        如果缓存有效返回JSON字节，否则返回None
+    """
+    entry = _load_cached_entry(session, candidate_id, current_version, analysis_level)
+    return entry.body if entry else None
+
+
+def _load_cached_entry(
+    session: Session,
+    candidate_id: int,
+    current_version: str,
+    analysis_level: str
+) -> Optional[HotPortraitEntry]:
+    """先查热缓存，未命中再查表；表命中时解析校验一次并回填热缓存."""
+    entry = portrait_hot_cache.get(candidate_id, analysis_level, current_version)
+    if entry:
+        logger.debug(f"⚡ 候选人{candidate_id}: 命中{analysis_level}热缓存 (版本: {current_version})")
+        record_cache_hit(candidate_id, analysis_level)
+        return entry
+    
     cache = session.exec(
         select(PortraitCache).where(
             PortraitCache.candidate_id == candidate_id,
@@ -94,12 +313,106 @@ def get_cached_portrait(
     
     # 解析缓存数据
     try:
-        portrait_dict = json.loads(cache.portrait_data)
+        portrait_dict = json.loads(decode_portrait_data(cache.portrait_data))
+        portrait = schemas.CandidatePortrait(**portrait_dict)
         logger.info(f"✅ 候选人{candidate_id}: 使用{analysis_level}缓存数据 (版本: {current_version})")
-        return schemas.CandidatePortrait(**portrait_dict)
     except Exception as e:
         logger.warning(f"⚠️ 候选人{candidate_id}: {analysis_level}缓存解析失败: {e}")
         return None
+    
+    etag = compute_portrait_etag(
+        cache.data_version, analysis_level, cache.ai_model,
+        cache.updated_at or cache.created_at
+    )
+    record_cache_hit(candidate_id, analysis_level)
+    entry = portrait_hot_cache.put(candidate_id, analysis_level, current_version, portrait, etag=etag)
+    if entry is None:
+        # 热缓存关闭或单条过大，仍返回本次解析结果
+        body = portrait.model_dump_json().encode("utf-8")
+        entry = HotPortraitEntry(portrait=portrait, body=body, size=len(body), stored_at=0.0, etag=etag)
+    return entry
+
+
+def get_stale_portrait(
+    session: Session,
+    candidate_id: int,
+    current_version: str,
+    analysis_level: str = "pro"
+) -> Optional[Tuple[schemas.CandidatePortrait, int]]:
+    """获取版本已过期、但仍在该级别过期策略内的旧画像（stale_ok 模式）.
+    
+    Args:
+        session: 数据库会话
+        candidate_id: 候选人ID
+        current_version: 当前数据版本
+        analysis_level: 分析级别 (pro/expert)
+    
+    Returns:
+        (旧画像, 距生成的秒数)；无旧画像、版本未过期或超过最长过期时长时返回None
+    """
+    max_age = STALE_MAX_AGE_SECONDS.get(analysis_level, 0)
+    if max_age <= 0:
+        return None
+    
+    cache = session.exec(
+        select(PortraitCache).where(
+            PortraitCache.candidate_id == candidate_id,
+            PortraitCache.analysis_level == analysis_level
+        )
+    ).first()
+    if not cache or cache.data_version == current_version or not cache.portrait_data:
+        return None
+    
+    generated_at = cache.updated_at or cache.created_at
+    if not generated_at:
+        return None
+    age_seconds = int((datetime.utcnow() - generated_at.replace(tzinfo=None)).total_seconds())
+    if age_seconds > max_age:
+        logger.info(f"📦 候选人{candidate_id}: {analysis_level}旧缓存超过最长过期时长，不再返回")
+        return None
+    
+    try:
+        portrait_dict = json.loads(decode_portrait_data(cache.portrait_data))
+        portrait = schemas.CandidatePortrait(**portrait_dict)
+    except Exception as e:
+        logger.warning(f"⚠️ 候选人{candidate_id}: {analysis_level}旧缓存解析失败: {e}")
+        return None
+    
+    return portrait, max(age_seconds, 0)
+
+
+def get_portrait_etag(
+    session: Session,
+    candidate_id: int,
+    current_version: str,
+    analysis_level: str = "pro"
+) -> Optional[str]:
+    """获取有效缓存的 ETag（只读元数据列，不读取/解压画像数据）.
+    
+    Returns:
+        缓存有效时返回 ETag，否则返回None
+    """
+    entry = portrait_hot_cache.get(candidate_id, analysis_level, current_version)
+    if entry and entry.etag:
+        return entry.etag
+    
+    row = session.exec(
+        select(
+            PortraitCache.data_version,
+            PortraitCache.ai_model,
+            PortraitCache.updated_at,
+            PortraitCache.created_at,
+        ).where(
+            PortraitCache.candidate_id == candidate_id,
+            PortraitCache.analysis_level == analysis_level
+        )
+    ).first()
+    if not row or row.data_version != current_version:
+        return None
+    return compute_portrait_etag(
+        row.data_version, analysis_level, row.ai_model,
+        row.updated_at or row.created_at
+    )
 
 
 def get_available_analysis_levels(
@@ -119,17 +432,44 @@ def get_available_analysis_levels(
     """
     result = {"pro": False, "expert": False}
     
-    caches = session.exec(
-        select(PortraitCache).where(PortraitCache.candidate_id == candidate_id)
-    ).all()
-    
-    for cache in caches:
-        if cache.data_version == current_version:
-            result[cache.analysis_level] = True
+    for level, version in _list_cache_versions(session, candidate_id):
+        if version == current_version:
+            result[level] = True
     
     return result
 
 
+def compute_cache_status_etag(
+    session: Session,
+    candidate_id: int,
+    current_version: str
+) -> str:
+    """生成缓存状态接口的 ETag（基于各级别缓存的元数据）."""
+    rows = session.exec(
+        select(
+            PortraitCache.analysis_level,
+            PortraitCache.data_version,
+            PortraitCache.ai_model,
+            PortraitCache.updated_at,
+        ).where(PortraitCache.candidate_id == candidate_id)
+    ).all()
+    parts = [current_version]
+    for row in sorted(rows, key=lambda r: r.analysis_level):
+        updated = row.updated_at.isoformat() if row.updated_at else ""
+        parts.append(f"{row.analysis_level}:{row.data_version}:{row.ai_model or ''}:{updated}")
+    digest = hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def _list_cache_versions(session: Session, candidate_id: int) -> list[Tuple[str, str]]:
+    """列出候选人各级别缓存的数据版本（不读取画像数据列）."""
+    rows = session.exec(
+        select(PortraitCache.analysis_level, PortraitCache.data_version)
+        .where(PortraitCache.candidate_id == candidate_id)
+    ).all()
+    return [(row.analysis_level, row.data_version) for row in rows]
+
+
 def save_portrait_cache(
     session: Session,
     candidate_id: int,
@@ -153,43 +493,44 @@ def save_portrait_cache(
         is_default: 是否为默认分析
     """
     try:
-        # 转换为JSON
+        # 转换为JSON，压缩后存储
         portrait_json = portrait.model_dump_json()
+        stored_data = encode_portrait_data(portrait_json)
+        generated_at = datetime.utcnow()
         
-        # 查找或创建缓存记录（按 candidate_id + analysis_level 查找）
-        cache = session.exec(
-            select(PortraitCache).where(
-                PortraitCache.candidate_id == candidate_id,
-                PortraitCache.analysis_level == analysis_level
-            )
-        ).first()
-        
-        if cache:
-            # 更新现有缓存
-            cache.portrait_data = portrait_json
-            cache.data_version = data_version
-            cache.ai_model = ai_model
-            cache.generation_time_ms = generation_time_ms
-            cache.is_default = is_default
-            cache.updated_at = datetime.utcnow()
-        else:
-            # 创建新缓存
-            cache = PortraitCache(
-                candidate_id=candidate_id,
-                analysis_level=analysis_level,
-                portrait_data=portrait_json,
-                data_version=data_version,
-                ai_model=ai_model,
-                generation_time_ms=generation_time_ms,
-                is_default=is_default
-            )
-            session.add(cache)
-        
+        # 按 candidate_id + analysis_level 原子写入（已有缓存时只覆盖内容，保留访问统计与创建时间）
+        upsert_rows(
+            session,
+            PortraitCache,
+            [{
+                "candidate_id": candidate_id,
+                "analysis_level": analysis_level,
+                "portrait_data": stored_data,
+                "data_version": data_version,
+                "ai_model": ai_model,
+                "generation_time_ms": generation_time_ms,
+                "is_default": is_default,
+                "hit_count": 0,
+                "created_at": generated_at,
+                "updated_at": generated_at,
+            }],
+            conflict_columns=["candidate_id", "analysis_level"],
+            update_columns=[
+                "portrait_data", "data_version", "ai_model",
+                "generation_time_ms", "is_default", "updated_at",
+            ],
+        )
         session.commit()
+        portrait_hot_cache.put(
+            candidate_id, analysis_level, data_version, portrait,
+            body=portrait_json.encode("utf-8"),
+            etag=compute_portrait_etag(data_version, analysis_level, ai_model, generated_at)
+        )
         logger.info(f"💾 候选人{candidate_id}: {analysis_level}缓存已保存 (版本: {data_version})")
     except Exception as e:
         logger.error(f"❌ 候选人{candidate_id}: {analysis_level}缓存保存失败: {e}")
         session.rollback()
+        portrait_hot_cache.invalidate(candidate_id, analysis_level)
 
 
 def invalidate_cache(
@@ -207,6 +548,8 @@ def invalidate_cache(
     Returns:
         是否成功删除缓存
     """
+    portrait_hot_cache.invalidate(candidate_id, analysis_level)
+    
     try:
         if analysis_level:
             # 删除指定级别的缓存
@@ -1,11 +1,19 @@
 """候选人画像 - 维度映射模块.
 
 定义测评维度与岗位维度的映射关系，用于计算岗位匹配度。
+映射表在导入时编译为别名索引和特质轴上的稀疏权重向量，维度打分为一次点积。
 """
 
 import json
 import logging
-from typing import Dict, List, Optional, Tuple
+import re
+import unicodedata
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -304,6 +312,121 @@ DIMENSION_MAPPING: Dict[str, List[Tuple[str, str, float, bool]]] = {
 }
 
 
+# 固定特质轴：各测评维度统一为 0-100 得分，MBTI 取左侧字母（E/S/T/J）的倾向强度
+TRAIT_AXIS: Tuple[str, ...] = (
+    "mbti:E", "mbti:S", "mbti:T", "mbti:J",
+    "disc:D", "disc:I", "disc:S", "disc:C",
+    "epq:E", "epq:N", "epq:P", "epq:L",
+)
+TRAIT_INDEX: Dict[str, int] = {trait: i for i, trait in enumerate(TRAIT_AXIS)}
+
+# MBTI 维度键 → (轴上的左侧字母, 是否取反)，兼容 "E-I" / "EI" / "I-E" 等写法
+_MBTI_PAIRS = (("E", "I"), ("S", "N"), ("T", "F"), ("J", "P"))
+_MBTI_KEY_ALIASES: Dict[str, Tuple[str, bool]] = {}
+for _left, _right in _MBTI_PAIRS:
+    for _key in (f"{_left}-{_right}", f"{_left}{_right}"):
+        _MBTI_KEY_ALIASES[_key] = (_left, False)
+    for _key in (f"{_right}-{_left}", f"{_right}{_left}"):
+        _MBTI_KEY_ALIASES[_key] = (_left, True)
+
+
+def resolve_trait(test_type: str, dimension_key: str) -> Optional[Tuple[str, bool]]:
+    """将 (测评类型, 测评维度) 解析为特质轴上的特质及是否取反.
+    
+    Examples:
+        >>> resolve_trait("mbti", "N-S")
+        ("mbti:S", True)  # N倾向 = 100 - S倾向
+    """
+    test_type = (test_type or "").lower()
+    key = (dimension_key or "").upper()
+    if test_type == "mbti":
+        alias = _MBTI_KEY_ALIASES.get(key)
+        if alias is None:
+            return None
+        return f"mbti:{alias[0]}", alias[1]
+    trait = f"{test_type}:{key}"
+    if trait in TRAIT_INDEX:
+        return trait, False
+    return None
+
+
+def extract_trait_scores(result_details: Any, test_type: str) -> Dict[str, float]:
+    """从测评结果中提取特质轴上的 0-100 得分（一次解析全部维度）.
+    
+    兼容 professional_scoring 的真实格式与旧的列表格式：
+    - MBTI: mbti_dimensions = {"EI": {"tendency": "E", "value": 72}, ...}
+            或 [{"key": "E-I", "leftScore": 72}, ...]
+    - DISC: disc_dimensions = {"D": {"value": 65}, ...} 或 [{"key": "D", "score": 65}, ...]
+    - EPQ: dimensions / epq_dimensions = {"E": {"t_score": 55, "value": 14}, ...}（优先使用T分）
+            或 [{"key": "E", "score": 55}, ...]
+    
+    Args:
+        result_details: 测评结果详情（字典或JSON字符串）
+        test_type: 测评类型 (mbti/disc/epq)
+    
+    Returns:
+        {特质: 得分}，无法识别的维度不返回
+    """
+    if isinstance(result_details, str):
+        try:
+            result_details = json.loads(result_details)
+        except json.JSONDecodeError:
+            return {}
+    if not isinstance(result_details, dict):
+        return {}
+    
+    test_type = (test_type or "").lower()
+    scores: Dict[str, float] = {}
+    try:
+        if test_type == "mbti":
+            dims = result_details.get("mbti_dimensions") or result_details.get("dimensions") or {}
+            for key, data in _iter_dimension_items(dims):
+                alias = _MBTI_KEY_ALIASES.get(key.upper())
+                if alias is None or not isinstance(data, dict):
+                    continue
+                left, flipped = alias
+                if data.get("leftScore") is not None:
+                    left_score = float(data["leftScore"])
+                elif data.get("value") is not None:
+                    value = float(data["value"])
+                    tendency = str(data.get("tendency", left)).upper()
+                    left_score = value if tendency == left else 100 - value
+                else:
+                    continue
+                scores[f"mbti:{left}"] = 100 - left_score if flipped else left_score
+        
+        elif test_type in ("disc", "epq"):
+            if test_type == "disc":
+                dims = result_details.get("disc_dimensions") or {}
+            else:
+                dims = result_details.get("epq_dimensions") or result_details.get("dimensions") or {}
+            for key, data in _iter_dimension_items(dims):
+                trait = f"{test_type}:{key.upper()}"
+                if trait not in TRAIT_INDEX or not isinstance(data, dict):
+                    continue
+                if test_type == "epq" and data.get("t_score") is not None:
+                    value = data["t_score"]
+                else:
+                    value = data.get("score", data.get("value"))
+                if value is not None:
+                    scores[trait] = float(value)
+    except (TypeError, ValueError) as e:
+        logger.warning(f"提取特质得分失败: test_type={test_type}, error={e}")
+    
+    return scores
+
+
+def _iter_dimension_items(dims: Any):
+    """统一遍历字典格式 {key: data} 与列表格式 [{"key": key, ...}] 的维度数据."""
+    if isinstance(dims, dict):
+        for key, data in dims.items():
+            yield str(key), data
+    elif isinstance(dims, list):
+        for data in dims:
+            if isinstance(data, dict) and data.get("key"):
+                yield str(data["key"]), data
+
+
 def extract_dimension_score(
     result_details: dict,
     test_type: str,
@@ -330,45 +453,206 @@ def extract_dimension_score(
     if not result_details:
         return None
     
-    try:
-        if test_type == "mbti":
-            # MBTI维度: "E-I", "S-N", "T-F", "J-P"
-            mbti_dims = result_details.get("mbti_dimensions", [])
-            for dim in mbti_dims:
-                if dim.get("key") == dimension_key:
-                    # 返回左侧倾向的分数 (E, S, T, J)
-                    left_score = dim.get("leftScore")
-                    if left_score is not None:
-                        return float(left_score)
-            return None
-        
-        elif test_type == "disc":
-            # DISC维度: "D", "I", "S", "C"
-            disc_dims = result_details.get("disc_dimensions", [])
-            for dim in disc_dims:
-                if dim.get("key") == dimension_key:
-                    score = dim.get("score")
-                    if score is not None:
-                        return float(score)
-            return None
-        
-        elif test_type == "epq":
-            # EPQ维度: "E", "N", "P", "L"
-            epq_dims = result_details.get("epq_dimensions", [])
-            for dim in epq_dims:
-                if dim.get("key") == dimension_key:
-                    score = dim.get("score")
-                    if score is not None:
-                        return float(score)
-            return None
-        
+    resolved = resolve_trait(test_type, dimension_key)
+    if resolved is None:
+        logger.warning(f"未知的测评维度: test_type={test_type}, dimension_key={dimension_key}")
+        return None
+    
+    trait, flipped = resolved
+    score = extract_trait_scores(result_details, test_type).get(trait)
+    if score is None:
+        return None
+    return 100 - score if flipped else score
+
+
+# ========== 编译后的维度映射索引 ==========
+# 导入时将 DIMENSION_MAPPING 编译为：
+# - 归一化别名表：去除空白/标点及"能力""意识"等后缀，近似重复的键归并到同一条目
+# - 每个岗位维度在特质轴上的稀疏权重向量（反向维度使用负权重 + 100w 偏移）
+# 未收录的维度名通过带缓存的模糊解析器匹配到最接近的条目。
+
+_NAME_SUFFIXES = ("能力", "意识", "性", "力")
+_NAME_STRIP_PATTERN = re.compile(r"[\s\-_/·、，,。.：:（）()【】\[\]]+")
+_FUZZY_MIN_RATIO = 0.6
+
+
+@dataclass(frozen=True)
+class CompiledDimension:
+    """岗位维度在特质轴上的稀疏权重向量.
+    
+    维度得分 = (Σ signed_weights·x + Σ offsets·m) / Σ weights·m
+    其中 x 为特质得分、m 为特质是否可用（0/1），只在 indices 上求和。
+    """
+    key: str  # DIMENSION_MAPPING 中的键
+    indices: Tuple[int, ...]
+    signed_weights: Tuple[float, ...]
+    offsets: Tuple[float, ...]
+    weights: Tuple[float, ...]
+
+
+def normalize_dimension_name(name: str) -> str:
+    """归一化岗位维度名称（用于别名匹配）."""
+    normalized = unicodedata.normalize("NFKC", name or "").lower()
+    normalized = _NAME_STRIP_PATTERN.sub("", normalized)
+    stripped = True
+    while stripped:
+        stripped = False
+        for suffix in _NAME_SUFFIXES:
+            if len(normalized) > len(suffix) + 1 and normalized.endswith(suffix):
+                normalized = normalized[:-len(suffix)]
+                stripped = True
+    return normalized
+
+
+def _compile_dimension(key: str, mapping: List[Tuple[str, str, float, bool]]) -> CompiledDimension:
+    accumulated: Dict[int, List[float]] = {}
+    for test_type, test_dim, weight, is_reverse in mapping:
+        resolved = resolve_trait(test_type, test_dim)
+        if resolved is None:
+            logger.warning(f"维度映射 '{key}' 包含未知测评维度: {test_type}/{test_dim}")
+            continue
+        trait, flipped = resolved
+        entry = accumulated.setdefault(TRAIT_INDEX[trait], [0.0, 0.0, 0.0])
+        if is_reverse != flipped:
+            entry[0] -= weight
+            entry[1] += 100 * weight
         else:
-            logger.warning(f"未知的测评类型: {test_type}")
-            return None
+            entry[0] += weight
+        entry[2] += weight
+    indices = tuple(sorted(accumulated))
+    return CompiledDimension(
+        key=key,
+        indices=indices,
+        signed_weights=tuple(accumulated[i][0] for i in indices),
+        offsets=tuple(accumulated[i][1] for i in indices),
+        weights=tuple(accumulated[i][2] for i in indices),
+    )
+
+
+COMPILED_DIMENSIONS: Dict[str, CompiledDimension] = {
+    key: _compile_dimension(key, mapping) for key, mapping in DIMENSION_MAPPING.items()
+}
+
+# 归一化别名 → DIMENSION_MAPPING 键（同一别名对应多个键时保留最短的原始键）
+DIMENSION_ALIASES: Dict[str, str] = {}
+for _key in sorted(DIMENSION_MAPPING, key=len):
+    DIMENSION_ALIASES.setdefault(normalize_dimension_name(_key), _key)
+_ALIASES_BY_LENGTH = sorted(DIMENSION_ALIASES, key=len, reverse=True)
+
+
+@lru_cache(maxsize=4096)
+def resolve_dimension(job_dim_name: str) -> Optional[CompiledDimension]:
+    """将岗位维度名称解析为编译后的维度（带缓存）.
+    
+    解析顺序：精确匹配 → 归一化别名 → 别名包含关系（取最长） → 相似度匹配
+    
+    Returns:
+        编译后的维度，无法匹配时返回None（调用方使用测评平均分降级）
+    """
+    if not job_dim_name:
+        return None
+    if job_dim_name in COMPILED_DIMENSIONS:
+        return COMPILED_DIMENSIONS[job_dim_name]
     
-    except Exception as e:
-        logger.error(f"提取维度得分失败: test_type={test_type}, dimension_key={dimension_key}, error={e}")
+    normalized = normalize_dimension_name(job_dim_name)
+    if not normalized:
+        return None
+    key = DIMENSION_ALIASES.get(normalized)
+    
+    if key is None:
+        # 如 "沟通协调" 包含别名 "沟通"
+        for alias in _ALIASES_BY_LENGTH:
+            if alias in normalized or (len(normalized) >= 2 and normalized in alias):
+                key = DIMENSION_ALIASES[alias]
+                break
+    
+    if key is None:
+        best_ratio = 0.0
+        for alias, alias_key in DIMENSION_ALIASES.items():
+            ratio = SequenceMatcher(None, normalized, alias).ratio()
+            if ratio > best_ratio:
+                best_ratio, key = ratio, alias_key
+        if best_ratio < _FUZZY_MIN_RATIO:
+            key = None
+    
+    if key is None:
+        logger.debug(f"岗位维度 '{job_dim_name}' 没有映射关系")
         return None
+    logger.debug(f"岗位维度 '{job_dim_name}' 解析为 '{key}'")
+    return COMPILED_DIMENSIONS[key]
+
+
+def compile_dimension_matrix(job_dim_names: Sequence[str]) -> np.ndarray:
+    """将一组岗位维度编译为稠密权重矩阵 (2T, 2D).
+    
+    [x | m] (长度 2T) 左乘后得到 [各维度分子 | 各维度有效权重]，
+    分母为0（无映射或数据缺失）的维度由调用方降级。
+    """
+    trait_count = len(TRAIT_AXIS)
+    dim_count = len(job_dim_names)
+    matrix = np.zeros((2 * trait_count, 2 * dim_count), dtype=np.float64)
+    for d, name in enumerate(job_dim_names):
+        compiled = resolve_dimension(name)
+        if compiled is None:
+            continue
+        for t, signed, offset, weight in zip(
+            compiled.indices, compiled.signed_weights, compiled.offsets, compiled.weights
+        ):
+            matrix[t, d] += signed
+            matrix[trait_count + t, d] += offset
+            matrix[trait_count + t, dim_count + d] += weight
+    return matrix
+
+
+@dataclass
+class TraitBundle:
+    """候选人的测评特质向量（解析一次，可用于多个岗位维度）."""
+    values: np.ndarray  # (T,) 特质得分，不可用处为0
+    mask: np.ndarray  # (T,) 特质是否可用（0/1）
+    fallback: float  # 测评平均分（降级分）
+
+
+def build_trait_bundle(candidate_assessments: List[dict]) -> TraitBundle:
+    """解析候选人的测评记录为特质向量.
+    
+    Args:
+        candidate_assessments: 测评记录列表，每项包含 test_type / result_details / score_percentage；
+            同一测评类型有多条时使用列表中的第一条
+    """
+    values = np.zeros(len(TRAIT_AXIS), dtype=np.float64)
+    mask = np.zeros(len(TRAIT_AXIS), dtype=np.float64)
+    seen_types = set()
+    for assessment in candidate_assessments:
+        test_type = assessment.get("test_type")
+        if not test_type or test_type in seen_types:
+            continue
+        seen_types.add(test_type)
+        for trait, score in extract_trait_scores(assessment.get("result_details"), test_type).items():
+            t = TRAIT_INDEX[trait]
+            values[t] = score
+            mask[t] = 1.0
+    return TraitBundle(
+        values=values,
+        mask=mask,
+        fallback=_calculate_average_assessment_score(candidate_assessments),
+    )
+
+
+def score_dimensions(job_dim_names: Sequence[str], bundle: TraitBundle) -> List[float]:
+    """计算候选人在一组岗位维度上的得分（一次点积）.
+    
+    Returns:
+        与 job_dim_names 对应的 0-100 得分；无映射或测评数据缺失的维度为测评平均分
+    """
+    if not job_dim_names:
+        return []
+    dim_count = len(job_dim_names)
+    product = np.concatenate([bundle.values, bundle.mask]) @ compile_dimension_matrix(job_dim_names)
+    numerator, denominator = product[:dim_count], product[dim_count:]
+    return [
+        float(num / den) if den > 0 else bundle.fallback
+        for num, den in zip(numerator, denominator)
+    ]
 
 
 def calculate_dimension_score_from_assessments(
@@ -378,6 +662,8 @@ def calculate_dimension_score_from_assessments(
     """
     基于候选人的测评数据计算岗位维度得分.
     
+    计算多个维度时请使用 build_trait_bundle + score_dimensions，避免重复解析测评结果。
+    
     Args:
         job_dim_name: 岗位维度名称 (如 "逻辑思维")
         candidate_assessments: 候选人的测评记录列表，每项包含:
@@ -389,77 +675,12 @@ def calculate_dimension_score_from_assessments(
         0-100的得分
     
     Algorithm:
-        1. 查找该岗位维度的映射关系
-        2. 遍历映射关系，提取对应的测评维度得分
-        3. 按权重加权平均
-        4. 如果没有映射或提取失败，使用测评平均分降级
-    """
-    # 获取映射关系
-    mapping = DIMENSION_MAPPING.get(job_dim_name)
-    
-    if not mapping:
-        # 没有映射，使用测评平均分
-        logger.debug(f"岗位维度 '{job_dim_name}' 没有映射关系，使用测评平均分")
-        return _calculate_average_assessment_score(candidate_assessments)
-    
-    total_score = 0.0
-    total_weight = 0.0
-    
-    for test_type, test_dim, weight, is_reverse in mapping:
-        # 查找候选人该类型的测评
-        assessment = _find_assessment_by_type(candidate_assessments, test_type)
-        if not assessment:
-            continue
-        
-        # 提取维度得分
-        result_details = assessment.get("result_details", {})
-        if isinstance(result_details, str):
-            try:
-                result_details = json.loads(result_details)
-            except json.JSONDecodeError:
-                result_details = {}
-        
-        dim_score = extract_dimension_score(result_details, test_type, test_dim)
-        
-        if dim_score is None:
-            continue
-        
-        # 处理反向维度 (如EPQ的N维度: 分数越低越好)
-        if is_reverse:
-            dim_score = 100 - dim_score
-        
-        total_score += dim_score * weight
-        total_weight += weight
-    
-    if total_weight > 0:
-        final_score = total_score / total_weight
-        logger.debug(f"岗位维度 '{job_dim_name}' 计算得分: {final_score:.1f} (基于映射)")
-        return final_score
-    
-    # 降级: 使用测评平均分
-    fallback_score = _calculate_average_assessment_score(candidate_assessments)
-    logger.debug(f"岗位维度 '{job_dim_name}' 映射失败，使用测评平均分: {fallback_score:.1f}")
-    return fallback_score
-
-
-def _find_assessment_by_type(
-    assessments: List[dict],
-    test_type: str
-) -> Optional[dict]:
+        1. 解析岗位维度名称（含别名与模糊匹配）得到特质轴上的权重向量
+        2. 与候选人的特质向量做点积，按可用特质的权重加权平均
+        3. 如果没有映射或测评数据缺失，使用测评平均分降级
     """
-    从测评列表中查找指定类型的测评.
-    
-    Args:
-        assessments: 测评列表
-        test_type: 测评类型 (mbti/disc/epq)
-    
-    Returns:
-        测评记录字典，如果找不到则返回None
-    """
-    for assessment in assessments:
-        if assessment.get("test_type") == test_type:
-            return assessment
-    return None
+    bundle = build_trait_bundle(candidate_assessments)
+    return score_dimensions([job_dim_name], bundle)[0]
 
 
 def _calculate_average_assessment_score(assessments: List[dict]) -> float:
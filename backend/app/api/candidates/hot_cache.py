@@ -0,0 +1,155 @@
+"""候选人画像 - 进程内热缓存模块.
+
+在 portrait_cache 表前增加一层进程内 LRU：
+- 缓存已校验的 CandidatePortrait 对象，以及其序列化后的 JSON 字节
+- 键为 (candidate_id, analysis_level, data_version)，数据版本变化后自然失效
+- 按字节数限制总容量，超出时淘汰最久未使用的条目
+- 设置 TTL，限制多 worker 部署下其他进程强制刷新后的不一致窗口
+
+命中热缓存时无需查库、json.loads 以及 pydantic 校验，路由可直接返回预序列化字节。
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from . import schemas
+
+logger = logging.getLogger(__name__)
+
+# 对象本身的内存开销按 JSON 字节数的倍数估算（pydantic 对象通常为 JSON 的 2~4 倍）
+_OBJECT_OVERHEAD_FACTOR = 3
+
+HotCacheKey = Tuple[int, str, str]
+
+
+@dataclass
+class HotPortraitEntry:
+    """热缓存条目."""
+    portrait: schemas.CandidatePortrait
+    body: bytes  # 预序列化的 JSON 字节
+    size: int  # 估算占用字节数
+    stored_at: float  # 写入时间（time.monotonic）
+    etag: Optional[str] = None  # 缓存记录对应的 ETag
+
+
+class PortraitHotCache:
+    """按字节数限额的线程安全 LRU 画像缓存."""
+
+    def __init__(self, max_bytes: int, ttl_seconds: float = 300.0):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[HotCacheKey, HotPortraitEntry]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(
+        self,
+        candidate_id: int,
+        analysis_level: str,
+        data_version: str
+    ) -> Optional[HotPortraitEntry]:
+        """读取热缓存，命中时刷新 LRU 顺序."""
+        if not self.enabled:
+            return None
+
+        key = (candidate_id, analysis_level, data_version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if self.ttl_seconds > 0 and time.monotonic() - entry.stored_at > self.ttl_seconds:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(
+        self,
+        candidate_id: int,
+        analysis_level: str,
+        data_version: str,
+        portrait: schemas.CandidatePortrait,
+        body: Optional[bytes] = None,
+        etag: Optional[str] = None
+    ) -> Optional[HotPortraitEntry]:
+        """写入热缓存；同一候选人同一级别只保留最新版本."""
+        if not self.enabled:
+            return None
+
+        if body is None:
+            body = portrait.model_dump_json().encode("utf-8")
+        size = len(body) * (1 + _OBJECT_OVERHEAD_FACTOR)
+        if size > self.max_bytes:
+            # 单条超过总容量，不缓存
+            return None
+
+        entry = HotPortraitEntry(
+            portrait=portrait,
+            body=body,
+            size=size,
+            stored_at=time.monotonic(),
+            etag=etag
+        )
+        with self._lock:
+            self._invalidate_locked(candidate_id, analysis_level)
+            key = (candidate_id, analysis_level, data_version)
+            self._entries[key] = entry
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes and self._entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+        return entry
+
+    def invalidate(self, candidate_id: int, analysis_level: Optional[str] = None) -> int:
+        """删除候选人（指定级别或全部级别）的热缓存，返回删除条数."""
+        with self._lock:
+            return self._invalidate_locked(candidate_id, analysis_level)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "total_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _invalidate_locked(self, candidate_id: int, analysis_level: Optional[str]) -> int:
+        keys = [
+            key for key in self._entries
+            if key[0] == candidate_id and (analysis_level is None or key[1] == analysis_level)
+        ]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def _remove(self, key: HotCacheKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry.size
+
+
+portrait_hot_cache = PortraitHotCache(
+    max_bytes=int(os.getenv("PORTRAIT_HOT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl_seconds=float(os.getenv("PORTRAIT_HOT_CACHE_TTL_SECONDS", "300")),
+)
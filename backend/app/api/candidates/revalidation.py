@@ -0,0 +1,47 @@
+"""候选人画像 - 后台重新生成模块（stale-while-revalidate）.
+
+stale_ok 模式下先返回旧画像，再由后台任务重新生成并覆盖缓存：
+- 同一候选人同一级别同时只有一个重新生成任务（进程内去重）
+- 后台任务使用独立的数据库会话，不依赖请求会话的生命周期
+"""
+
+import logging
+import threading
+
+from sqlmodel import Session
+
+from app.db import get_engine
+from . import service
+
+logger = logging.getLogger(__name__)
+
+_inflight: set = set()
+_inflight_lock = threading.Lock()
+
+
+def claim_regeneration(candidate_id: int, analysis_level: str) -> bool:
+    """登记重新生成任务，已有进行中的任务时返回False."""
+    key = (candidate_id, analysis_level)
+    with _inflight_lock:
+        if key in _inflight:
+            return False
+        _inflight.add(key)
+        return True
+
+
+async def regenerate_portrait(candidate_id: int, analysis_level: str) -> None:
+    """后台重新生成画像并写入缓存（需先通过 claim_regeneration 登记）."""
+    try:
+        with Session(get_engine()) as session:
+            await service.build_candidate_portrait(
+                session,
+                candidate_id,
+                force_refresh=True,
+                analysis_level=analysis_level
+            )
+        logger.info(f"🔄 候选人{candidate_id}: {analysis_level}画像后台重新生成完成")
+    except Exception as e:
+        logger.error(f"❌ 候选人{candidate_id}: {analysis_level}画像后台重新生成失败: {e}")
+    finally:
+        with _inflight_lock:
+            _inflight.discard((candidate_id, analysis_level))
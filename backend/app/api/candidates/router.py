@@ -1,14 +1,17 @@
 """候选人画像API路由."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Response, status
 from sqlmodel import Session
 from typing import Optional
 
 from app.db import get_session
-from . import schemas, service
-from .cache_manager import get_available_analysis_levels, compute_data_version
-from app.models import Candidate
-from app.models_assessment import Submission
+from . import revalidation, schemas, service
+from .cache_manager import (
+    compute_cache_status_etag,
+    etag_matches,
+    get_available_analysis_levels,
+)
+from .trait_norms import summarize_trait_norms
 
 
 router = APIRouter(prefix="/api/candidates", tags=["candidates"])
@@ -21,8 +24,11 @@ router = APIRouter(prefix="/api/candidates", tags=["candidates"])
 )
 async def get_candidate_portrait(
     candidate_id: int,
+    background_tasks: BackgroundTasks,
     refresh: bool = Query(False, description="强制刷新（跳过缓存）"),
     analysis_level: str = Query("pro", description="分析级别: pro(深度分析，默认)/expert(专家分析)"),
+    stale_ok: bool = Query(False, description="数据变更后先返回旧画像，后台重新生成"),
+    if_none_match: Optional[str] = Header(None),
     session: Session = Depends(get_session)
 ):
     """获取候选人的完整画像数据.
@@ -39,9 +45,12 @@ async def get_candidate_portrait(
     
     **缓存策略**：
     - 首次访问：调用AI分析，结果存入缓存
-    - 再次访问：直接返回缓存数据（毫秒级响应）
+    - 再次访问：直接返回缓存数据（毫秒级响应，进程内热缓存命中时不查库）
     - 数据变更：自动失效缓存，重新分析
     - refresh=true：强制重新分析（跳过缓存）
+    - 条件请求：响应携带 ETag，请求头 If-None-Match 命中时返回 304（不读取画像数据）
+    - stale_ok=true：数据变更后立即返回旧画像（is_stale=true，stale_age_seconds 为已生成时长），
+      后台重新生成并覆盖缓存；旧画像超过该级别最长过期时长时仍同步生成
     
     **数据来源**：
     1. Candidate 表 - 基本信息
@@ -51,12 +60,43 @@ async def get_candidate_portrait(
     5. PortraitCache 表 - 画像缓存
     """
     try:
+        # 缓存快速路径：直接返回预序列化的JSON，跳过响应模型的重复校验与序列化
+        if not refresh:
+            cached = service.get_cached_portrait_response(
+                session, candidate_id, analysis_level, if_none_match
+            )
+            if cached is not None:
+                return _cached_portrait_response(*cached)
+            
+            if stale_ok:
+                stale = service.get_stale_portrait_response(session, candidate_id, analysis_level)
+                if stale is not None:
+                    body, age_seconds = stale
+                    if revalidation.claim_regeneration(candidate_id, analysis_level):
+                        background_tasks.add_task(
+                            revalidation.regenerate_portrait, candidate_id, analysis_level
+                        )
+                    return Response(
+                        content=body,
+                        media_type="application/json",
+                        headers={
+                            "Age": str(age_seconds),
+                            "Cache-Control": "no-cache",
+                            "Warning": '110 - "Response is Stale"',
+                        }
+                    )
+        
         portrait = await service.build_candidate_portrait(
             session, 
             candidate_id,
             force_refresh=refresh,
             analysis_level=analysis_level
         )
+        
+        # 新生成的画像已写入缓存，附带 ETag 返回
+        cached = service.get_cached_portrait_response(session, candidate_id, analysis_level)
+        if cached is not None:
+            return _cached_portrait_response(*cached)
         return portrait
     except HTTPException:
         raise
@@ -67,6 +107,14 @@ async def get_candidate_portrait(
         )
 
 
+def _cached_portrait_response(etag: str, body: Optional[bytes]) -> Response:
+    """构建缓存画像响应；body 为None时返回 304."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if body is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get(
     "/portraits",
     response_model=schemas.CandidatePortraitListResponse,
@@ -102,12 +150,70 @@ async def get_candidate_portraits(
         )
 
 
+@router.get(
+    "/norms",
+    response_model=schemas.TraitNormListResponse,
+    summary="获取特质常模分布"
+)
+async def get_trait_norms(
+    target_position: Optional[str] = Query(None, description="应聘岗位分组（默认全体应聘者）"),
+    session: Session = Depends(get_session)
+):
+    """各特质在应聘者中的得分分布（样本数与 p25/p50/p75/p85/p90 分位得分）."""
+    return {"items": summarize_trait_norms(session, target_position)}
+
+
+@router.get(
+    "/{candidate_id}/profile-ranking",
+    response_model=schemas.CandidateProfileRanking,
+    summary="候选人适合的岗位画像排名"
+)
+async def get_candidate_profile_ranking(
+    candidate_id: int,
+    limit: int = Query(10, ge=1, le=500, description="返回数量"),
+    min_score: Optional[float] = Query(None, ge=0, le=100, description="最低匹配分数"),
+    session: Session = Depends(get_session)
+):
+    """对所有在用岗位画像计算该候选人的匹配度并排序.
+    
+    返回每个画像的匹配分数和各维度得分（贡献），不写入匹配记录。
+    """
+    items = await service.rank_job_profiles_for_candidates(session, [candidate_id], limit, min_score)
+    if not items:
+        raise HTTPException(status_code=404, detail="候选人不存在")
+    return items[0]
+
+
+@router.post(
+    "/profile-ranking",
+    response_model=schemas.BatchProfileRankingResponse,
+    summary="批量候选人岗位画像排名"
+)
+async def batch_candidate_profile_ranking(
+    request: schemas.BatchProfileRankingRequest,
+    session: Session = Depends(get_session)
+):
+    """批量计算候选人在所有在用岗位画像上的匹配度（不存在的候选人会被忽略）."""
+    try:
+        items = await service.rank_job_profiles_for_candidates(
+            session, request.candidate_ids, request.limit, request.min_score
+        )
+        return {"items": items}
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"岗位画像排名失败: {str(e)}"
+        )
+
+
 @router.get(
     "/{candidate_id}/portrait-cache-status",
     summary="获取候选人画像缓存状态"
 )
 async def get_portrait_cache_status(
     candidate_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     session: Session = Depends(get_session)
 ):
     """获取候选人已缓存的画像分析级别.
@@ -117,26 +223,25 @@ async def get_portrait_cache_status(
     - expert: 专家分析缓存
     
     用于前端切换查看时判断是否需要重新生成。
+    响应携带 ETag，请求头 If-None-Match 命中时返回 304。
     """
-    from sqlmodel import select
-    
-    candidate = session.get(Candidate, candidate_id)
-    if not candidate:
+    # 计算当前数据版本（与画像接口一致）
+    current_version = service.resolve_data_version(session, candidate_id)
+    if current_version is None:
         raise HTTPException(status_code=404, detail="候选人不存在")
     
-    # 获取最新测评
-    latest_submission = session.exec(
-        select(Submission)
-        .where(Submission.candidate_id == candidate_id)
-        .order_by(Submission.submitted_at.desc())
-    ).first()
-    
-    # 计算当前数据版本
-    current_version = compute_data_version(candidate, latest_submission, None)
+    etag = compute_cache_status_etag(session, candidate_id, current_version)
+    if etag_matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": "no-cache"}
+        )
     
     # 获取已缓存的级别
     cache_status = get_available_analysis_levels(session, candidate_id, current_version)
     
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
     return {
         "candidate_id": candidate_id,
         "data_version": current_version,
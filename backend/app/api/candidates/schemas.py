@@ -99,6 +99,16 @@ class CrossValidationData(BaseModel):
     contradictions: List[Contradiction] = Field(default_factory=list, description="矛盾点列表")
 
 
+class TraitPercentile(BaseModel):
+    """特质得分在应聘者常模中的百分位."""
+    trait: str = Field(description="特质，如 mbti:E / epq:N")
+    label: str = Field(description="特质名称")
+    score: float = Field(description="得分 0-100")
+    percentile: float = Field(ge=0, le=100, description="百分位：得分低于该候选人的应聘者占比")
+    segment: Optional[str] = Field(None, description="常模分组（应聘岗位），空表示全体应聘者")
+    sample_size: int = Field(ge=0, description="常模样本数")
+
+
 class CandidatePortrait(BaseModel):
     """候选人完整画像."""
     
@@ -128,11 +138,18 @@ class CandidatePortrait(BaseModel):
     # 🟢 P1-1: 交叉验证数据
     cross_validation: Optional[CrossValidationData] = Field(None, description="多测评交叉验证结果")
     
+    # 特质常模百分位
+    trait_percentiles: List[TraitPercentile] = Field(default_factory=list, description="各特质在应聘者中的百分位")
+    
     # 🟢 P1-2: 降级标识
     is_fallback_analysis: bool = Field(default=False, description="是否为降级分析 (规则引擎生成)")
     analysis_method: str = Field(default="ai", description="分析方式: ai | fallback")
     fallback_reason: Optional[str] = Field(None, description="降级原因: ai_timeout | ai_error | ai_unavailable")
     
+    # 过期重验证（stale_ok 模式）
+    is_stale: bool = Field(default=False, description="是否为过期画像（后台正在重新生成）")
+    stale_age_seconds: Optional[int] = Field(None, description="过期画像距生成的时长（秒）")
+    
     # 元数据
     portrait_version: str = "1.0"
     generated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -149,6 +166,7 @@ class CandidatePortraitSummary(BaseModel):
     match_score: Optional[float] = None
     assessment_count: int
     has_job_match: bool
+    trait_percentiles: Dict[str, float] = Field(default_factory=dict, description="特质 → 百分位")
 
 
 class CandidatePortraitListResponse(BaseModel):
@@ -156,3 +174,48 @@ class CandidatePortraitListResponse(BaseModel):
     items: List[CandidatePortraitSummary]
     total: int
 
+
+# ========== 特质常模 ==========
+
+class TraitNormSummary(BaseModel):
+    """单个特质的常模分布摘要."""
+    trait: str
+    label: str
+    segment: Optional[str] = None
+    sample_size: int
+    quantiles: Dict[str, Optional[float]] = Field(default_factory=dict, description="分位得分，如 p50/p85")
+
+
+class TraitNormListResponse(BaseModel):
+    """特质常模列表响应."""
+    items: List[TraitNormSummary]
+
+
+# ========== 反向匹配（候选人 → 岗位画像） ==========
+
+class ProfileRankingItem(BaseModel):
+    """候选人与单个岗位画像的匹配结果."""
+    profile_id: int
+    profile_name: str
+    department: Optional[str] = None
+    match_score: float = Field(ge=0, le=100, description="匹配分数")
+    dimension_scores: List[DimensionScore] = Field(default_factory=list, description="各维度得分与贡献")
+
+
+class CandidateProfileRanking(BaseModel):
+    """候选人的岗位画像排名."""
+    candidate_id: int
+    profiles: List[ProfileRankingItem]
+    total: int
+
+
+class BatchProfileRankingRequest(BaseModel):
+    """批量反向匹配请求."""
+    candidate_ids: List[int] = Field(..., min_length=1, max_length=200, description="候选人ID列表")
+    limit: int = Field(10, ge=1, le=500, description="每位候选人返回的画像数量")
+    min_score: Optional[float] = Field(None, ge=0, le=100, description="最低匹配分数")
+
+
+class BatchProfileRankingResponse(BaseModel):
+    """批量反向匹配响应."""
+    items: List[CandidateProfileRanking]
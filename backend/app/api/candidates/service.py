@@ -11,12 +11,14 @@ import asyncio
 import json
 import logging
 import time
+from dataclasses import asdict
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
 from sqlmodel import Session, select, and_, func
 from fastapi import HTTPException, status as http_status
 
+from app.db import upsert_rows
 from app.models import Candidate, JobProfile, ProfileMatch, PortraitCache
 from app.models_assessment import Submission, Assessment, Questionnaire
 from . import schemas
@@ -24,7 +26,13 @@ from . import schemas
 # 导入拆分后的模块
 from .cache_manager import (
     compute_data_version,
+    etag_matches,
     get_cached_portrait,
+    get_cached_portrait_body,
+    get_data_revision,
+    get_portrait_etag,
+    get_stale_portrait,
+    record_cache_hit,
     save_portrait_cache,
 )
 from .dimension_parser import (
@@ -35,14 +43,101 @@ from .ai_analyzer import (
     generate_ai_analysis,
     build_default_analysis,
 )
-from .dimension_mapping import calculate_dimension_score_from_assessments
+from .dimension_mapping import score_dimensions
+from .trait_features import iter_submission_traits, load_trait_bundle, trait_scores_from_vector
+from .trait_norms import TRAIT_LABELS, trait_percentiles
 from app.services.cross_validation import CrossValidationService
 from app.services.resume_quality_analyzer import ResumeQualityAnalyzer  # 🟢 P2-2
 from app.services.job_recommender import JobRecommender  # 🟢 P2-3
+from app.services.analytics_rollup import record_match_scores
+from app.api.job_profiles.match_recompute import is_match_stale
+from app.api.job_profiles.matching_engine import rank_profiles_for_candidates
 
 logger = logging.getLogger(__name__)
 
 
+def resolve_data_version(session: Session, candidate_id: int) -> Optional[str]:
+    """查询候选人当前的画像数据版本（单次主键查询）.
+    
+    Args:
+        session: 数据库会话
+        candidate_id: 候选人ID
+        
+    Returns:
+        数据版本标识，候选人不存在时返回None
+    """
+    data_revision = get_data_revision(session, candidate_id)
+    if data_revision is None:
+        return None
+    return compute_data_version(data_revision)
+
+
+def get_cached_portrait_response(
+    session: Session,
+    candidate_id: int,
+    analysis_level: str = "pro",
+    if_none_match: Optional[str] = None
+) -> Optional[Tuple[str, Optional[bytes]]]:
+    """快速路径：返回缓存画像的 ETag 与预序列化JSON字节.
+    
+    - If-None-Match 命中时只读取缓存元数据，不读取/解压画像数据，body 返回None（304）
+    - 命中进程内热缓存时不查 portrait_cache 表，也不做反序列化和校验
+    
+    Args:
+        session: 数据库会话
+        candidate_id: 候选人ID
+        analysis_level: 分析级别
+        if_none_match: 请求头 If-None-Match
+        
+    Returns:
+        缓存有效时返回 (ETag, JSON字节或None)，否则返回None（由 build_candidate_portrait 处理）
+    """
+    data_version = resolve_data_version(session, candidate_id)
+    if data_version is None:
+        return None
+    
+    etag = get_portrait_etag(session, candidate_id, data_version, analysis_level)
+    if etag is None:
+        return None
+    if etag_matches(if_none_match, etag):
+        record_cache_hit(candidate_id, analysis_level)
+        return etag, None
+    
+    body = get_cached_portrait_body(session, candidate_id, data_version, analysis_level)
+    if body is None:
+        return None
+    return etag, body
+
+
+def get_stale_portrait_response(
+    session: Session,
+    candidate_id: int,
+    analysis_level: str = "pro"
+) -> Optional[Tuple[bytes, int]]:
+    """stale_ok 模式：返回已过期但仍可用的旧画像JSON字节（标记 is_stale 与过期时长）.
+    
+    Args:
+        session: 数据库会话
+        candidate_id: 候选人ID
+        analysis_level: 分析级别
+        
+    Returns:
+        (JSON字节, 距生成的秒数)；无可用旧画像时返回None（由 build_candidate_portrait 同步生成）
+    """
+    data_version = resolve_data_version(session, candidate_id)
+    if data_version is None:
+        return None
+    
+    stale = get_stale_portrait(session, candidate_id, data_version, analysis_level)
+    if stale is None:
+        return None
+    
+    portrait, age_seconds = stale
+    portrait = portrait.model_copy(update={"is_stale": True, "stale_age_seconds": age_seconds})
+    logger.info(f"⏳ 候选人{candidate_id}: 返回{analysis_level}过期画像 (已生成 {age_seconds}s)，后台重新生成")
+    return portrait.model_dump_json().encode("utf-8"), age_seconds
+
+
 async def build_candidate_portrait(
     session: Session,
     candidate_id: int,
@@ -85,23 +180,8 @@ async def build_candidate_portrait(
             detail="候选人不存在"
         )
     
-    # 获取最新提交记录（用于计算版本）
-    latest_sub_stmt = select(Submission).where(
-        Submission.candidate_id == candidate_id
-    ).order_by(Submission.submitted_at.desc())
-    latest_submission_for_version = session.exec(latest_sub_stmt).first()
-    
-    # 获取关联的岗位画像（用于计算版本）
-    job_profile_for_version = None
-    if latest_submission_for_version and latest_submission_for_version.target_position:
-        job_profile_for_version = session.exec(
-            select(JobProfile).where(
-                JobProfile.name == latest_submission_for_version.target_position
-            )
-        ).first()
-    
     # 计算数据版本
-    data_version = compute_data_version(candidate, latest_submission_for_version, job_profile_for_version)
+    data_version = compute_data_version(candidate.data_revision)
     
     # 2. 检查缓存（除非强制刷新）- V38: 按级别缓存
     if not force_refresh:
@@ -237,8 +317,8 @@ async def build_candidate_portrait(
                 )
             ).first()
             
-            if not match_record:
-                # 创建新的匹配记录（带超时控制）
+            if not match_record or is_match_stale(match_record, job_profile):
+                # 创建新的匹配记录，或画像维度变更后就地重算（带超时控制）
                 try:
                     match_record = await asyncio.wait_for(
                         _create_match_record(session, job_profile, latest_submission),
@@ -447,16 +527,14 @@ async def build_candidate_portrait(
     cross_validation_data = None
     if len(submissions) >= 2:
         try:
-            # 准备提交记录数据（需要转换为 dict）
-            submission_dicts = []
-            for sub in submissions:
-                sub_dict = {
-                    'questionnaire': {
-                        'type': sub.questionnaire.type if sub.questionnaire else 'UNKNOWN'
-                    },
-                    'result': sub.result if isinstance(sub.result, dict) else {}
+            # 准备提交记录数据：直接使用特征表中的特质向量，无需解析 result_details
+            submission_dicts = [
+                {
+                    'questionnaire': {'type': traits.test_type.upper() or 'UNKNOWN'},
+                    'traits': trait_scores_from_vector(traits.values, traits.mask)
                 }
-                submission_dicts.append(sub_dict)
+                for traits in iter_submission_traits(session, [candidate_id])
+            ]
             
             # 调用交叉验证服务
             validation_result = CrossValidationService.calculate_cross_validation(submission_dicts)
@@ -493,6 +571,15 @@ async def build_candidate_portrait(
             logger.error(f"⚠️ 候选人{candidate_id}: 交叉验证计算失败: {str(e)}")
             cross_validation_data = None
     
+    # 特质常模百分位（优先使用应聘岗位分组）
+    trait_bundle = load_trait_bundle(session, candidate_id)
+    trait_percentile_items = [
+        schemas.TraitPercentile(label=TRAIT_LABELS.get(item.trait, item.trait), **asdict(item))
+        for item in trait_percentiles(
+            session, trait_bundle.values, trait_bundle.mask, match_target_position or target_position
+        )
+    ]
+    
     portrait = schemas.CandidatePortrait(
         basic_info=basic_info,
         assessments=assessments_info,
@@ -511,6 +598,7 @@ async def build_candidate_portrait(
         ai_summary_points=clean_summary_points(summary_points),  # 清理序号前缀
         quick_tags=quick_tags,  # 快速标签
         cross_validation=cross_validation_data,  # 🟢 P1-1: 交叉验证数据
+        trait_percentiles=trait_percentile_items,
         # 🟢 P1-2: 降级标识
         is_fallback_analysis=is_default_analysis,
         analysis_method="fallback" if is_default_analysis else "ai",
@@ -539,7 +627,7 @@ async def _create_match_record(
     job_profile: JobProfile,
     submission: Submission
 ) -> ProfileMatch:
-    """创建岗位匹配记录.
+    """创建（或重算已有的）岗位匹配记录.
     
     ⭐ V2优化: 基于维度映射的智能匹配算法
     - 不再使用统一的总分百分比
@@ -557,58 +645,23 @@ async def _create_match_record(
     # 解析岗位画像的能力维度
     dimensions = json.loads(job_profile.dimensions) if job_profile.dimensions else []
     
-    # ⭐ 获取候选人的所有测评记录（用于跨测评计算）
+    # ⭐ 读取候选人的特质向量（特征表，每类测评取最新一次提交）
     candidate_id = submission.candidate_id
-    all_submissions_stmt = select(Submission).where(
-        and_(
-            Submission.candidate_id == candidate_id,
-            Submission.status == "completed"
-        )
-    )
-    all_submissions = session.exec(all_submissions_stmt).all()
-    
-    # 构建测评数据列表（供维度映射算法使用）
-    candidate_assessments = []
-    for sub in all_submissions:
-        # 获取问卷信息，判断测评类型
-        questionnaire = session.get(Questionnaire, sub.questionnaire_id)
-        test_type = None
-        if questionnaire and questionnaire.type:
-            # 统一转小写
-            test_type = questionnaire.type.lower()
-        
-        # 解析result_details
-        result_details = sub.result_details
-        if isinstance(result_details, str):
-            try:
-                result_details = json.loads(result_details)
-            except json.JSONDecodeError:
-                result_details = {}
-        
-        candidate_assessments.append({
-            "test_type": test_type,
-            "result_details": result_details,
-            "score_percentage": sub.score_percentage
-        })
+    trait_bundle = load_trait_bundle(session, candidate_id)
     
-    logger.info(f"🔍 岗位匹配: 候选人{candidate_id}有{len(candidate_assessments)}项测评, "
-                f"测评类型: {[a['test_type'] for a in candidate_assessments]}")
+    logger.info(f"🔍 岗位匹配: 候选人{candidate_id}可用特质数={int(trait_bundle.mask.sum())}")
     
-    # ⭐ 基于维度映射计算各维度得分
+    # ⭐ 基于维度映射计算各维度得分（编译后的映射矩阵一次点积）
     dimension_scores = {}
     total_weighted_score = 0.0
     total_weight = 0.0
     
-    for dim in dimensions:
-        dim_name = dim.get("name", "")
+    dim_names = [dim.get("name", "") for dim in dimensions]
+    dim_score_list = score_dimensions(dim_names, trait_bundle)
+    
+    for dim, dim_name, dim_score in zip(dimensions, dim_names, dim_score_list):
         dim_weight = float(dim.get("weight", 0))
         
-        # ⭐ 核心: 使用维度映射算法计算得分
-        dim_score = calculate_dimension_score_from_assessments(
-            dim_name, 
-            candidate_assessments
-        )
-        
         dimension_scores[dim_name] = {
             "score": round(dim_score, 1),
             "weight": dim_weight,
@@ -623,8 +676,7 @@ async def _create_match_record(
         match_score = total_weighted_score / (total_weight / 100)
     else:
         # 降级: 使用测评平均分
-        scores = [a["score_percentage"] for a in candidate_assessments if a["score_percentage"]]
-        match_score = sum(scores) / len(scores) if scores else 60.0
+        match_score = trait_bundle.fallback
     
     match_score = round(match_score, 1)
     
@@ -640,20 +692,30 @@ async def _create_match_record(
     logger.info(f"✅ 岗位匹配: {job_profile.name} 匹配度={match_score}, "
                 f"维度数={len(dimension_scores)}")
     
-    # 创建匹配记录
-    match_record = ProfileMatch(
-        profile_id=job_profile.id,
-        submission_id=submission.id,
-        match_score=match_score,
-        dimension_scores=dimension_scores,
-        ai_analysis=ai_analysis
+    # 匹配分数计入数据看板汇总（新建记录计入，已有记录替换旧分数）
+    record_match_scores(session, job_profile.id, [(submission.id, match_score)])
+    # 按 (profile_id, submission_id) 原子写入匹配记录（并发生成画像时不会产生重复记录）
+    upsert_rows(
+        session,
+        ProfileMatch,
+        [{
+            "profile_id": job_profile.id,
+            "submission_id": submission.id,
+            "match_score": match_score,
+            "dimension_scores": dimension_scores,
+            "ai_analysis": ai_analysis,
+            "profile_revision": job_profile.revision or 0,
+        }],
+        conflict_columns=["profile_id", "submission_id"],
     )
-    
-    session.add(match_record)
     session.commit()
-    session.refresh(match_record)
     
-    return match_record
+    return session.exec(
+        select(ProfileMatch).where(
+            ProfileMatch.profile_id == job_profile.id,
+            ProfileMatch.submission_id == submission.id
+        )
+    ).one()
 
 
 def _calculate_overall_assessment(
@@ -837,6 +899,42 @@ def _calculate_overall_assessment(
     return overall_score, strengths[:5], improvements[:5]  # 最多返回5条
 
 
+async def rank_job_profiles_for_candidates(
+    session: Session,
+    candidate_ids: List[int],
+    limit: int = 10,
+    min_score: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """反向匹配：为候选人对所有在用岗位画像排序.
+    
+    使用与 _create_match_record 相同的维度映射算法，所有画像拼接为缓存的权重矩阵，
+    一次矩阵乘法完成；不写入匹配记录。
+    
+    Args:
+        session: 数据库会话
+        candidate_ids: 候选人ID列表（不存在的候选人会被忽略）
+        limit: 每位候选人返回的画像数量
+        min_score: 最低匹配分数
+        
+    Returns:
+        [{candidate_id, profiles, total}, ...]，顺序与 candidate_ids 一致
+    """
+    existing = set(session.exec(
+        select(Candidate.id).where(Candidate.id.in_(candidate_ids))
+    ).all())
+    valid_ids = [cid for cid in dict.fromkeys(candidate_ids) if cid in existing]
+    
+    rankings = rank_profiles_for_candidates(session, valid_ids, limit=limit, min_score=min_score)
+    return [
+        {
+            "candidate_id": cid,
+            "profiles": rankings.get(cid, []),
+            "total": len(rankings.get(cid, []))
+        }
+        for cid in valid_ids
+    ]
+
+
 async def get_candidate_portraits_summary(
     session: Session,
     skip: int = 0,
@@ -858,12 +956,12 @@ async def get_candidate_portraits_summary(
     statement = select(Candidate)
     
     if target_position:
-        statement = statement.where(Candidate.target_position == target_position)
+        statement = statement.where(Candidate.position == target_position)
     
     # 获取总数
     count_statement = select(func.count()).select_from(Candidate)
     if target_position:
-        count_statement = count_statement.where(Candidate.target_position == target_position)
+        count_statement = count_statement.where(Candidate.position == target_position)
     
     total = session.exec(count_statement).one()
     
@@ -871,6 +969,12 @@ async def get_candidate_portraits_summary(
     statement = statement.offset(skip).limit(limit).order_by(Candidate.created_at.desc())
     candidates = session.exec(statement).all()
     
+    # 特质常模百分位：一次读取本页候选人的特质向量（每类测评取最新一次提交）
+    latest_traits: Dict[int, Dict[str, Any]] = {}
+    for traits in iter_submission_traits(session, [candidate.id for candidate in candidates]):
+        if traits.mask.any():
+            latest_traits.setdefault(traits.candidate_id, {})[traits.test_type] = traits
+    
     # 构建摘要列表
     summaries = []
     for candidate in candidates:
@@ -886,7 +990,7 @@ async def get_candidate_portraits_summary(
         
         # 获取最新匹配记录
         latest_match = session.exec(
-            select(ProfileMatch).join(Submission).where(
+            select(ProfileMatch).join(Submission, Submission.id == ProfileMatch.submission_id).where(
                 Submission.candidate_id == candidate.id
             ).order_by(ProfileMatch.created_at.desc())
         ).first()
@@ -899,11 +1003,16 @@ async def get_candidate_portraits_summary(
         summary = schemas.CandidatePortraitSummary(
             candidate_id=candidate.id,
             name=candidate.name,
-            target_position=candidate.target_position,
+            target_position=candidate.position,
             overall_score=overall_score,
             match_score=latest_match.match_score if latest_match else None,
             assessment_count=assessment_count,
-            has_job_match=latest_match is not None
+            has_job_match=latest_match is not None,
+            trait_percentiles={
+                item.trait: item.percentile
+                for traits in latest_traits.get(candidate.id, {}).values()
+                for item in trait_percentiles(session, traits.values, traits.mask, candidate.position)
+            }
         )
         summaries.append(summary)
     
@@ -0,0 +1,342 @@
+"""候选人画像 - 测评特质特征存储.
+
+MBTI/DISC/EPQ 的 result_details 为异构 JSON，各处消费方（岗位匹配、交叉验证等）
+原本每次调用都要重新解析。本模块在测评提交时将其解析为 TRAIT_AXIS 上的定长向量，
+存入 submission_trait_features 表：
+- trait_values: float32 小端序向量（0-100），不可用处为0
+- trait_mask: 可用特质位掩码
+
+读取方通过 iter_submission_traits 按候选人顺序获取向量；缺少特征行（未回填的历史数据）
+或特征版本过期的提交会临时从 result_details 解析，不影响正确性。
+历史数据通过 python -m app.scripts.backfill_trait_features 回填。
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import delete
+from sqlmodel import Session, and_, select
+
+from app.models_assessment import Questionnaire, Submission, SubmissionTraitFeature
+from .dimension_mapping import (
+    TRAIT_AXIS,
+    TRAIT_INDEX,
+    TraitBundle,
+    extract_trait_scores,
+)
+
+logger = logging.getLogger(__name__)
+
+# 特质提取算法版本：extract_trait_scores 的结果语义变化时递增，回填任务会重算旧版本的行
+FEATURE_VERSION = 1
+
+# 无测评得分时的默认分（与 dimension_mapping 的降级逻辑一致）
+DEFAULT_FALLBACK_SCORE = 60.0
+
+_VECTOR_DTYPE = np.dtype("<f4")
+_BIT_WEIGHTS = 1 << np.arange(len(TRAIT_AXIS), dtype=np.int64)
+_BACKFILL_BATCH_SIZE = 500
+_STREAM_CHUNK_SIZE = 2000
+
+
+@dataclass
+class SubmissionTraits:
+    """一条已完成提交的特质向量."""
+    submission_id: int
+    candidate_id: Optional[int]
+    test_type: str
+    score_percentage: Optional[float]
+    values: np.ndarray  # (T,) float64
+    mask: np.ndarray  # (T,) float64，0/1
+
+
+def pack_trait_scores(scores: Dict[str, float]) -> Tuple[bytes, int]:
+    """将 {特质: 得分} 打包为 (float32 向量字节, 位掩码)."""
+    values = np.zeros(len(TRAIT_AXIS), dtype=_VECTOR_DTYPE)
+    mask = 0
+    for trait, score in scores.items():
+        index = TRAIT_INDEX.get(trait)
+        if index is None:
+            continue
+        values[index] = score
+        mask |= 1 << index
+    return values.tobytes(), mask
+
+
+def unpack_trait_vector(trait_values: bytes, trait_mask: int) -> Tuple[np.ndarray, np.ndarray]:
+    """解包特质向量，返回 (得分, 掩码) 两个 float64 数组."""
+    values = np.frombuffer(trait_values, dtype=_VECTOR_DTYPE).astype(np.float64)
+    if values.shape[0] != len(TRAIT_AXIS):
+        # 特质轴长度变化后的旧数据视为不可用
+        return np.zeros(len(TRAIT_AXIS)), np.zeros(len(TRAIT_AXIS))
+    mask = ((int(trait_mask) & _BIT_WEIGHTS) != 0).astype(np.float64)
+    return values * mask, mask
+
+
+def trait_scores_from_vector(values: np.ndarray, mask: np.ndarray) -> Dict[str, float]:
+    """特质向量转换为 {特质: 得分}（只包含可用特质）."""
+    return {TRAIT_AXIS[i]: float(values[i]) for i in np.flatnonzero(mask)}
+
+
+def upsert_submission_feature(
+    session: Session,
+    submission: Submission,
+    test_type: Optional[str] = None
+) -> Optional[SubmissionTraitFeature]:
+    """计算并写入一条提交的特质特征（不提交事务，由调用方与提交记录一起提交）.
+
+    Args:
+        session: 数据库会话
+        submission: 已完成的提交记录（需已有ID）
+        test_type: 测评类型，未传入时按问卷类型查询
+
+    Returns:
+        特征记录；提交未完成或尚无ID时返回None
+    """
+    if submission.id is None or submission.status != "completed":
+        return None
+
+    if test_type is None:
+        questionnaire = session.get(Questionnaire, submission.questionnaire_id)
+        test_type = questionnaire.type if questionnaire and questionnaire.type else ""
+    test_type = test_type.lower()
+
+    feature = session.exec(
+        select(SubmissionTraitFeature).where(SubmissionTraitFeature.submission_id == submission.id)
+    ).first()
+    feature = _apply_feature(feature, submission, test_type)
+    session.add(feature)
+    return feature
+
+
+def delete_submission_features(session: Session, submission_ids: Sequence[int]) -> int:
+    """删除提交的特征记录（删除提交前调用，不提交事务），返回删除的行数."""
+    ids = [sid for sid in submission_ids if sid is not None]
+    if not ids:
+        return 0
+    result = session.exec(delete(SubmissionTraitFeature).where(SubmissionTraitFeature.submission_id.in_(ids)))
+    return result.rowcount
+
+
+def _apply_feature(
+    feature: Optional[SubmissionTraitFeature],
+    submission: Submission,
+    test_type: str
+) -> SubmissionTraitFeature:
+    """由提交记录计算特征字段（feature 为None时新建）."""
+    values = feature_values(
+        submission.id,
+        submission.candidate_id,
+        test_type,
+        submission.result_details,
+        submission.score_percentage,
+        submission.submitted_at,
+    )
+    if feature is None:
+        return SubmissionTraitFeature(**values)
+    for name, value in values.items():
+        setattr(feature, name, value)
+    return feature
+
+
+def feature_values(
+    submission_id: int,
+    candidate_id: Optional[int],
+    test_type: str,
+    result_details: Optional[dict],
+    score_percentage: Optional[float],
+    submitted_at: Optional[datetime]
+) -> Dict[str, object]:
+    """一条提交的特征表字段（供批量写入使用）."""
+    trait_values, trait_mask = pack_trait_scores(extract_trait_scores(result_details, test_type))
+    return {
+        "submission_id": submission_id,
+        "candidate_id": candidate_id,
+        "test_type": test_type,
+        "trait_values": trait_values,
+        "trait_mask": trait_mask,
+        "score_percentage": score_percentage,
+        "submitted_at": submitted_at,
+        "feature_version": FEATURE_VERSION,
+        "computed_at": datetime.utcnow(),
+    }
+
+
+def iter_submission_traits(
+    session: Session,
+    candidate_ids: Optional[Sequence[int]] = None,
+    chunk_size: int = _STREAM_CHUNK_SIZE
+) -> Iterator[SubmissionTraits]:
+    """按 (candidate_id, submitted_at, id) 顺序流式遍历已完成提交的特质向量.
+
+    优先读取特征表；缺少特征行或版本过期的提交从 result_details 临时解析。
+    结果按 chunk_size 分批从数据库读取，内存占用与提交总数无关。
+
+    Args:
+        session: 数据库会话
+        candidate_ids: 只读取这些候选人（默认全部已关联候选人的提交）
+        chunk_size: 每批读取的提交数
+    """
+    conditions = [Submission.status == "completed", Submission.candidate_id.is_not(None)]
+    if candidate_ids is not None:
+        if not candidate_ids:
+            return
+        conditions.append(Submission.candidate_id.in_(list(candidate_ids)))
+
+    result = session.exec(
+        select(
+            Submission.id,
+            Submission.candidate_id,
+            Submission.questionnaire_id,
+            Submission.score_percentage,
+            SubmissionTraitFeature.test_type,
+            SubmissionTraitFeature.trait_values,
+            SubmissionTraitFeature.trait_mask,
+        )
+        .outerjoin(
+            SubmissionTraitFeature,
+            and_(
+                SubmissionTraitFeature.submission_id == Submission.id,
+                SubmissionTraitFeature.feature_version == FEATURE_VERSION,
+            )
+        )
+        .where(*conditions)
+        .order_by(Submission.candidate_id, Submission.submitted_at, Submission.id)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    for rows in result.partitions():
+        missing = [row.id for row in rows if row.trait_values is None]
+        parsed = _parse_missing_traits(session, missing) if missing else {}
+
+        for row in rows:
+            if row.trait_values is not None:
+                test_type = row.test_type
+                values, mask = unpack_trait_vector(row.trait_values, row.trait_mask)
+            else:
+                test_type, values, mask = parsed[row.id]
+            yield SubmissionTraits(
+                submission_id=row.id,
+                candidate_id=row.candidate_id,
+                test_type=test_type,
+                score_percentage=row.score_percentage,
+                values=values,
+                mask=mask,
+            )
+
+
+def load_trait_bundle(session: Session, candidate_id: int) -> TraitBundle:
+    """读取候选人的特质向量（每类测评取最新一次提交）与降级分."""
+    values = np.zeros(len(TRAIT_AXIS), dtype=np.float64)
+    mask = np.zeros(len(TRAIT_AXIS), dtype=np.float64)
+    percentages: List[float] = []
+    latest_by_type: Dict[str, SubmissionTraits] = {}
+    for traits in iter_submission_traits(session, [candidate_id]):
+        if traits.score_percentage is not None:
+            percentages.append(float(traits.score_percentage))
+        if traits.mask.any():
+            latest_by_type[traits.test_type] = traits
+    for traits in latest_by_type.values():
+        # 不同测评类型的特质互不重叠
+        values += traits.values
+        mask = np.maximum(mask, traits.mask)
+    return TraitBundle(
+        values=values,
+        mask=mask,
+        fallback=sum(percentages) / len(percentages) if percentages else DEFAULT_FALLBACK_SCORE,
+    )
+
+
+def backfill_trait_features(
+    session: Session,
+    batch_size: int = _BACKFILL_BATCH_SIZE,
+    rebuild: bool = False
+) -> Dict[str, int]:
+    """回填特质特征：为缺少特征行、版本过期或候选人关联已变化的已完成提交计算特征.
+
+    Args:
+        session: 数据库会话
+        batch_size: 每批处理（并提交）的提交数
+        rebuild: 重算全部已完成提交
+
+    Returns:
+        回填报告 {"scanned": N, "updated": M}
+    """
+    questionnaire_types = _questionnaire_types(session)
+    stmt = (
+        select(Submission.id)
+        .outerjoin(SubmissionTraitFeature, SubmissionTraitFeature.submission_id == Submission.id)
+        .where(Submission.status == "completed")
+    )
+    if not rebuild:
+        stmt = stmt.where(
+            (SubmissionTraitFeature.id.is_(None))
+            | (SubmissionTraitFeature.feature_version != FEATURE_VERSION)
+            | (SubmissionTraitFeature.candidate_id.is_distinct_from(Submission.candidate_id))
+        )
+    submission_ids: List[int] = list(session.exec(stmt.order_by(Submission.id)).all())
+
+    report = {"scanned": len(submission_ids), "updated": 0}
+    for start in range(0, len(submission_ids), batch_size):
+        batch_ids = submission_ids[start:start + batch_size]
+        submissions = session.exec(select(Submission).where(Submission.id.in_(batch_ids))).all()
+        existing = {
+            feature.submission_id: feature
+            for feature in session.exec(
+                select(SubmissionTraitFeature).where(SubmissionTraitFeature.submission_id.in_(batch_ids))
+            ).all()
+        }
+        processed = list(existing.values())
+        for submission in submissions:
+            processed.append(submission)
+            if submission.status != "completed":
+                continue
+            test_type = questionnaire_types.get(submission.questionnaire_id, "")
+            feature = _apply_feature(existing.get(submission.id), submission, test_type)
+            session.add(feature)
+            if submission.id not in existing:
+                processed.append(feature)
+            report["updated"] += 1
+        session.commit()
+        # 释放已处理的记录（result_details 可能很大）
+        for obj in processed:
+            session.expunge(obj)
+        logger.info(f"📦 特质特征回填: {min(start + batch_size, len(submission_ids))}/{len(submission_ids)}")
+
+    return report
+
+
+def _questionnaire_types(session: Session) -> Dict[int, str]:
+    return {
+        qid: (q_type or "").lower()
+        for qid, q_type in session.exec(select(Questionnaire.id, Questionnaire.type)).all()
+    }
+
+
+def _parse_missing_traits(
+    session: Session,
+    submission_ids: List[int]
+) -> Dict[int, Tuple[str, np.ndarray, np.ndarray]]:
+    """从 result_details 临时解析缺少特征行的提交."""
+    questionnaire_types = _questionnaire_types(session)
+    parsed: Dict[int, Tuple[str, np.ndarray, np.ndarray]] = {}
+    for start in range(0, len(submission_ids), _BACKFILL_BATCH_SIZE):
+        rows = session.exec(
+            select(Submission.id, Submission.questionnaire_id, Submission.result_details)
+            .where(Submission.id.in_(submission_ids[start:start + _BACKFILL_BATCH_SIZE]))
+        ).all()
+        for row in rows:
+            test_type = questionnaire_types.get(row.questionnaire_id, "")
+            scores = extract_trait_scores(row.result_details, test_type)
+            values = np.zeros(len(TRAIT_AXIS), dtype=np.float64)
+            mask = np.zeros(len(TRAIT_AXIS), dtype=np.float64)
+            for trait, score in scores.items():
+                values[TRAIT_INDEX[trait]] = score
+                mask[TRAIT_INDEX[trait]] = 1.0
+            parsed[row.id] = (test_type, values, mask)
+    if submission_ids:
+        logger.debug(f"特质特征缺失 {len(submission_ids)} 条，已从 result_details 临时解析")
+    return parsed
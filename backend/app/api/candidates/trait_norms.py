@@ -0,0 +1,426 @@
+"""候选人画像 - 特质常模（百分位）.
+
+HR 需要"外向性位于全体应聘者前15%"这类相对排名，逐次扫描全部提交不可行。
+本模块为特质轴（TRAIT_AXIS，已按测评类型区分，如 mbti:E / epq:N）上的每个特质维护
+得分分布，并可按应聘岗位分组：
+- 得分为 0-100 的有界值，分布用 101 个整数分桶的计数直方图表示（精确、可合并，
+  按分桶相加即可合并多个进程或分组的分布）
+- 测评提交时 observe_trait_vector 只在内存中累加增量（每个特质 O(1)），
+  删除或重新评分时以 sign=-1 扣除旧得分（删除前通过 load_observed_vectors 读取）
+- 定时任务（start_norms_flush_loop）通过 flush_trait_norms 将增量合并写回 trait_norms 表
+- 读取方通过 trait_percentiles 按内存中的直方图计算百分位，不扫描提交表
+- 历史数据通过 rebuild_trait_norms
+  （python -m app.scripts.rebuild_trait_norms）从特征表全量重建
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from app.db import get_engine
+from app.models_assessment import Submission, SubmissionTraitFeature, TraitNorm
+from .dimension_mapping import TRAIT_AXIS
+from .trait_features import FEATURE_VERSION, unpack_trait_vector
+
+logger = logging.getLogger(__name__)
+
+# 得分分桶数（0-100 每分一桶）
+NORM_BINS = 101
+# "全体"分组
+ALL_SEGMENT = ""
+# 分组样本数不足时回退到全体分布；全体也不足时不返回百分位
+NORM_MIN_SAMPLES = int(os.getenv("TRAIT_NORMS_MIN_SAMPLES", "30"))
+# 增量写回间隔（秒，0 表示不启动定时任务）
+FLUSH_INTERVAL_SECONDS = int(os.getenv("TRAIT_NORMS_FLUSH_INTERVAL_SECONDS", "60"))
+# 内存分布重新加载间隔（秒）：使其他进程写回的增量可见
+RELOAD_INTERVAL_SECONDS = int(os.getenv("TRAIT_NORMS_RELOAD_INTERVAL_SECONDS", "300"))
+
+TRAIT_LABELS: Dict[str, str] = {
+    "mbti:E": "外向(E)", "mbti:S": "实感(S)", "mbti:T": "思考(T)", "mbti:J": "判断(J)",
+    "disc:D": "支配性(D)", "disc:I": "影响性(I)", "disc:S": "稳健性(S)", "disc:C": "谨慎性(C)",
+    "epq:E": "外向性(E)", "epq:N": "神经质(N)", "epq:P": "精神质(P)", "epq:L": "掩饰性(L)",
+}
+
+_COUNT_DTYPE = np.dtype("<i8")
+_SEGMENT_MAX_LENGTH = 100
+_REBUILD_CHUNK_SIZE = 2000
+
+NormKey = Tuple[str, str]  # (特质, 分组)
+
+_pending: Dict[NormKey, np.ndarray] = {}  # 尚未写回的增量
+_norms: Optional[Dict[NormKey, np.ndarray]] = None  # 本进程可见的分布（数据库 + 未写回增量）
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+@dataclass
+class TraitPercentile:
+    """单个特质得分在常模中的百分位."""
+    trait: str
+    score: float
+    percentile: float  # 0-100，得分低于该候选人的样本占比（同分计一半）
+    segment: Optional[str]  # 使用的分组（应聘岗位），None 表示全体
+    sample_size: int
+
+
+def normalize_segment(target_position: Optional[str]) -> str:
+    """应聘岗位 → 分组键（空值为全体）."""
+    return (target_position or "").strip()[:_SEGMENT_MAX_LENGTH]
+
+
+def score_bin(score: float) -> int:
+    """得分 → 分桶下标（四舍五入并截断到 0-100）."""
+    return int(min(max(round(float(score)), 0), NORM_BINS - 1))
+
+
+def encode_counts(counts: np.ndarray) -> bytes:
+    return counts.astype(_COUNT_DTYPE).tobytes()
+
+
+def decode_counts(data: Optional[bytes]) -> np.ndarray:
+    counts = np.frombuffer(data or b"", dtype=_COUNT_DTYPE)
+    if counts.shape[0] != NORM_BINS:
+        return np.zeros(NORM_BINS, dtype=np.int64)
+    return counts.astype(np.int64)
+
+
+def percentile_rank(counts: np.ndarray, score: float) -> float:
+    """得分在直方图中的百分位（中位秩：低于该分的样本数 + 同分样本数的一半）."""
+    total = int(counts.sum())
+    if total <= 0:
+        return 0.0
+    index = score_bin(score)
+    below = int(counts[:index].sum())
+    return round((below + 0.5 * int(counts[index])) / total * 100, 1)
+
+
+def quantile_score(counts: np.ndarray, q: float) -> Optional[float]:
+    """直方图的 q 分位得分（0 <= q <= 1）."""
+    total = int(counts.sum())
+    if total <= 0:
+        return None
+    cumulative = np.cumsum(counts)
+    return float(np.searchsorted(cumulative, q * total, side="left").clip(0, NORM_BINS - 1))
+
+
+def observe_trait_vector(
+    trait_values: bytes,
+    trait_mask: int,
+    target_position: Optional[str] = None,
+    sign: int = 1
+) -> None:
+    """记录一条已完成提交的特质得分（只写内存增量，由 flush_trait_norms 写回）.
+
+    Args:
+        trait_values: 特征表的特质向量字节
+        trait_mask: 特征表的可用特质位掩码
+        target_position: 应聘岗位（同时计入该岗位分组）
+        sign: 1 计入，-1 扣除（删除提交或重新评分前的旧得分）
+    """
+    values, mask = unpack_trait_vector(trait_values, trait_mask)
+    indices = np.flatnonzero(mask)
+    if indices.size == 0:
+        return
+    segments = [ALL_SEGMENT]
+    segment = normalize_segment(target_position)
+    if segment:
+        segments.append(segment)
+
+    with _lock:
+        for index in indices:
+            bin_index = score_bin(values[index])
+            for segment in segments:
+                key = (TRAIT_AXIS[index], segment)
+                counts = _pending.get(key)
+                if counts is None:
+                    counts = _pending[key] = np.zeros(NORM_BINS, dtype=np.int64)
+                counts[bin_index] += sign
+                if _norms is not None:
+                    counts = _norms.get(key)
+                    if counts is None:
+                        counts = _norms[key] = np.zeros(NORM_BINS, dtype=np.int64)
+                    counts[bin_index] = max(counts[bin_index] + sign, 0)
+
+
+def load_observed_vectors(
+    session: Session,
+    submissions: Sequence[Submission]
+) -> List[Tuple[bytes, int, Optional[str]]]:
+    """读取已计入常模的提交（已完成且有当前版本特征）的特质向量.
+
+    删除提交或重新评分前调用，提交事务后逐条以 observe_trait_vector(*vector, sign=-1) 扣除。
+
+    Returns:
+        [(特质向量字节, 可用特质位掩码, 应聘岗位)]
+    """
+    completed = {sub.id: sub for sub in submissions if sub.id is not None and sub.status == "completed"}
+    if not completed:
+        return []
+    rows = session.exec(
+        select(
+            SubmissionTraitFeature.submission_id,
+            SubmissionTraitFeature.trait_values,
+            SubmissionTraitFeature.trait_mask,
+        ).where(
+            SubmissionTraitFeature.submission_id.in_(list(completed)),
+            SubmissionTraitFeature.feature_version == FEATURE_VERSION,
+        )
+    ).all()
+    return [
+        (row.trait_values, row.trait_mask, completed[row.submission_id].target_position)
+        for row in rows
+    ]
+
+
+def flush_trait_norms(session: Session) -> int:
+    """将内存增量合并写回 trait_norms（按分桶相加，扣除后的计数不低于0）.
+
+    写回失败时增量退回内存缓冲，下次重试。
+
+    Returns:
+        写回的 特质 × 分组 数
+    """
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+    if not pending:
+        return 0
+
+    try:
+        keys = list(pending)
+        rows = {}
+        for trait in {trait for trait, _ in keys}:
+            for row in session.exec(
+                select(TraitNorm)
+                .where(TraitNorm.trait == trait, TraitNorm.segment.in_([s for t, s in keys if t == trait]))
+                .with_for_update()
+            ).all():
+                rows[(row.trait, row.segment)] = row
+
+        now = datetime.utcnow()
+        for key, delta in pending.items():
+            row = rows.get(key)
+            counts = np.maximum(delta if row is None else decode_counts(row.counts) + delta, 0)
+            if row is None:
+                row = TraitNorm(trait=key[0], segment=key[1])
+            row.counts = encode_counts(counts)
+            row.total = int(counts.sum())
+            row.updated_at = now
+            session.add(row)
+        session.commit()
+    except Exception as e:
+        logger.warning(f"⚠️ 特质常模写回失败: {e}")
+        session.rollback()
+        with _lock:
+            for key, delta in pending.items():
+                counts = _pending.get(key)
+                _pending[key] = delta if counts is None else counts + delta
+        return 0
+    return len(pending)
+
+
+def get_trait_norms(session: Session) -> Dict[NormKey, np.ndarray]:
+    """本进程可见的全部分布（数据库快照 + 未写回增量，按 RELOAD_INTERVAL_SECONDS 重新加载）."""
+    global _norms, _loaded_at
+    with _lock:
+        if _norms is not None and time.monotonic() - _loaded_at < RELOAD_INTERVAL_SECONDS:
+            return _norms
+
+    loaded = {
+        (row.trait, row.segment): decode_counts(row.counts)
+        for row in session.exec(select(TraitNorm)).all()
+    }
+    with _lock:
+        for key, delta in _pending.items():
+            counts = loaded.get(key)
+            loaded[key] = np.maximum(delta if counts is None else counts + delta, 0)
+        _norms = loaded
+        _loaded_at = time.monotonic()
+        return _norms
+
+
+def invalidate_trait_norms() -> None:
+    """丢弃内存中的分布，下次读取时重新加载."""
+    global _norms
+    with _lock:
+        _norms = None
+
+
+def trait_percentiles(
+    session: Session,
+    values: np.ndarray,
+    mask: np.ndarray,
+    target_position: Optional[str] = None,
+    min_samples: Optional[int] = None
+) -> List[TraitPercentile]:
+    """计算候选人各可用特质的百分位.
+
+    优先使用应聘岗位分组的分布，样本不足 min_samples 时回退到全体分布。
+
+    Args:
+        session: 数据库会话（仅首次或重新加载分布时查询 trait_norms）
+        values: TRAIT_AXIS 顺序的得分
+        mask: 可用特质掩码
+        target_position: 应聘岗位
+        min_samples: 最少样本数（默认 NORM_MIN_SAMPLES）
+
+    Returns:
+        百分位列表（按 TRAIT_AXIS 顺序，样本不足的特质不返回）
+    """
+    if min_samples is None:
+        min_samples = NORM_MIN_SAMPLES
+    indices = np.flatnonzero(mask)
+    if indices.size == 0:
+        return []
+
+    norms = get_trait_norms(session)
+    segment = normalize_segment(target_position)
+    results: List[TraitPercentile] = []
+    for index in indices:
+        trait = TRAIT_AXIS[index]
+        for candidate_segment in ([segment] if segment else []) + [ALL_SEGMENT]:
+            counts = norms.get((trait, candidate_segment))
+            if counts is None:
+                continue
+            total = int(counts.sum())
+            if total < min_samples:
+                continue
+            results.append(TraitPercentile(
+                trait=trait,
+                score=round(float(values[index]), 1),
+                percentile=percentile_rank(counts, values[index]),
+                segment=candidate_segment or None,
+                sample_size=total,
+            ))
+            break
+    return results
+
+
+def summarize_trait_norms(
+    session: Session,
+    target_position: Optional[str] = None,
+    quantiles: Sequence[float] = (0.25, 0.5, 0.75, 0.85, 0.9)
+) -> List[dict]:
+    """各特质分布的样本数与分位得分（用于常模查看接口）."""
+    norms = get_trait_norms(session)
+    segment = normalize_segment(target_position)
+    summaries = []
+    for trait in TRAIT_AXIS:
+        counts = norms.get((trait, segment))
+        if counts is None:
+            continue
+        summaries.append({
+            "trait": trait,
+            "label": TRAIT_LABELS.get(trait, trait),
+            "segment": segment or None,
+            "sample_size": int(counts.sum()),
+            "quantiles": {f"p{round(q * 100)}": quantile_score(counts, q) for q in quantiles},
+        })
+    return summaries
+
+
+def rebuild_trait_norms(session: Session, chunk_size: int = _REBUILD_CHUNK_SIZE) -> Dict[str, int]:
+    """从特征表全量重建 trait_norms（替换已有分布，清空内存增量）.
+
+    只统计已有当前版本特征行的已完成提交；缺少特征行的提交先运行
+    python -m app.scripts.backfill_trait_features 回填。
+    重建期间新完成的提交可能被重复计入或漏计，可再次重建校正。
+
+    Args:
+        session: 数据库会话
+        chunk_size: 每批读取的提交数
+
+    Returns:
+        重建报告 {"submissions": N, "missing_features": M, "norms": K}
+    """
+    with _lock:
+        _pending.clear()
+
+    trait_count = len(TRAIT_AXIS)
+    segment_counts: Dict[str, np.ndarray] = {}
+    report = {"submissions": 0, "missing_features": 0, "norms": 0}
+
+    result = session.exec(
+        select(
+            Submission.target_position,
+            SubmissionTraitFeature.trait_values,
+            SubmissionTraitFeature.trait_mask,
+            SubmissionTraitFeature.feature_version,
+        )
+        .outerjoin(SubmissionTraitFeature, SubmissionTraitFeature.submission_id == Submission.id)
+        .where(Submission.status == "completed")
+        .execution_options(yield_per=chunk_size)
+    )
+    for rows in result.partitions():
+        by_segment: Dict[str, Tuple[List[np.ndarray], List[np.ndarray]]] = {}
+        for row in rows:
+            if row.trait_values is None or row.feature_version != FEATURE_VERSION:
+                report["missing_features"] += 1
+                continue
+            report["submissions"] += 1
+            values, mask = unpack_trait_vector(row.trait_values, row.trait_mask)
+            segments = [ALL_SEGMENT]
+            segment = normalize_segment(row.target_position)
+            if segment:
+                segments.append(segment)
+            for segment in segments:
+                bucket = by_segment.setdefault(segment, ([], []))
+                bucket[0].append(values)
+                bucket[1].append(mask)
+
+        # 每块按分组向量化累加：(特质, 分桶) 计数
+        for segment, (values_list, mask_list) in by_segment.items():
+            values = np.vstack(values_list)
+            mask = np.vstack(mask_list) > 0
+            bins = np.clip(np.rint(values), 0, NORM_BINS - 1).astype(np.int64)
+            traits = np.broadcast_to(np.arange(trait_count), bins.shape)
+            counts = segment_counts.setdefault(segment, np.zeros((trait_count, NORM_BINS), dtype=np.int64))
+            np.add.at(counts, (traits[mask], bins[mask]), 1)
+
+    now = datetime.utcnow()
+    session.exec(delete(TraitNorm))
+    for segment, counts in segment_counts.items():
+        for index, trait in enumerate(TRAIT_AXIS):
+            total = int(counts[index].sum())
+            if total == 0:
+                continue
+            session.add(TraitNorm(
+                trait=trait, segment=segment, counts=encode_counts(counts[index]), total=total, updated_at=now
+            ))
+            report["norms"] += 1
+    session.commit()
+    invalidate_trait_norms()
+
+    logger.info(
+        f"✅ 特质常模重建完成: {report['submissions']} 条提交, {report['norms']} 个分布"
+        + (f", {report['missing_features']} 条缺少特征" if report["missing_features"] else "")
+    )
+    return report
+
+
+async def start_norms_flush_loop() -> None:
+    """定时将特质常模增量写回数据库（在线程中执行，不阻塞事件循环）."""
+    if FLUSH_INTERVAL_SECONDS <= 0:
+        return
+
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(flush_pending_norms)
+        except Exception as e:
+            logger.error(f"❌ 特质常模写回失败: {e}")
+
+
+def flush_pending_norms() -> int:
+    """使用独立会话写回内存增量（定时任务与停机时调用）."""
+    with Session(get_engine()) as session:
+        return flush_trait_norms(session)
@@ -4,23 +4,21 @@ JD文件文本提取器。
 """
 import logging
 from pathlib import Path
+from typing import Optional
+
+from app.api.resumes.pdf_text import extract_pdf_pages
 
 logger = logging.getLogger(__name__)
 
-def extract_text_from_pdf(file_path: str) -> str:
-    """从PDF提取文本（使用pdfplumber）."""
+def extract_text_from_pdf(file_path: str, max_pages: Optional[int] = None) -> str:
+    """从PDF提取文本（PDFium 快速路径 + 逐页 pdfplumber 回退，max_pages 限制最多提取的页数）."""
     try:
-        import pdfplumber
-        
-        text_parts = []
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    text_parts.append(text)
-        
-        full_text = "\n".join(text_parts)
-        return full_text.strip()
+        extraction = extract_pdf_pages(file_path, max_pages)
+        logger.info(
+            f"PDF提取: {len(extraction.pages)}页 {extraction.seconds:.2f}s，"
+            f"pdfplumber回退 {extraction.fallback_pages} 页"
+        )
+        return extraction.text
         
     except ImportError:
         logger.warning("pdfplumber未安装，使用mock数据")
@@ -73,12 +71,15 @@ def extract_text_from_txt(file_path: str) -> str:
         raise
 
 
-def extract_jd_text(file_path: str) -> str:
+def extract_jd_text(file_path: str, max_pages: Optional[int] = None) -> str:
     """
     根据文件后缀自动选择提取器。
     
+    耗CPU，async 路由中应通过 app.services.text_extraction 在进程池中调用。
+    
     Args:
         file_path: 文件路径
+        max_pages: PDF最多提取的页数（None 表示不限制）
     
     Returns:
         提取的文本内容
@@ -86,7 +87,7 @@ def extract_jd_text(file_path: str) -> str:
     suffix = Path(file_path).suffix.lower()
     
     if suffix == '.pdf':
-        return extract_text_from_pdf(file_path)
+        return extract_text_from_pdf(file_path, max_pages)
     elif suffix in ['.doc', '.docx']:
         return extract_text_from_word(file_path)
     elif suffix == '.txt':
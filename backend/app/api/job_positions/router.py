@@ -7,7 +7,7 @@ import tempfile
 
 from app.db import get_session
 from app.api.job_positions import schemas, service
-from app.api.job_positions.jd_extractor import extract_jd_text
+from app.services.text_extraction import extract_jd_file_text
 from app.api.job_positions.jd_parser import parse_jd_with_ai
 
 router = APIRouter(prefix="/api/job-positions", tags=["job-positions"])
@@ -190,7 +190,7 @@ async def upload_and_parse_jd(
             tf.write(content)
         
         # 提取文本
-        jd_text = extract_jd_text(temp_file)
+        jd_text = await extract_jd_file_text(temp_file)
         
         if not jd_text or len(jd_text) < 20:
             raise HTTPException(
@@ -4,6 +4,9 @@ from sqlmodel import Session, select, delete
 from sqlalchemy import func
 
 from app.models import JobPosition, JobProfile, JobDimensionWeight, Candidate
+from app.api.candidates.cache_manager import bump_data_revision_for_positions
+from app.services.job_recommender import JobRecommender
+from app.api.job_profiles.matching_engine import invalidate_profile_catalog
 from app.api.job_positions import schemas
 from app.api.job_positions.ai_analyzer import (
     analyze_job_requirement,
@@ -89,7 +92,10 @@ async def create_job_profile(
         requirement_text=profile_data.requirement_text,
     )
     session.add(db_profile)
+    bump_data_revision_for_positions(session, [db_profile.name])
     session.commit()
+    JobRecommender.invalidate_catalog()
+    invalidate_profile_catalog()
     session.refresh(db_profile)
 
     # 添加维度权重
@@ -137,12 +143,16 @@ async def update_job_profile(
     if not db_profile:
         return None
 
+    previous_name = db_profile.name
     update_data = profile_data.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_profile, key, value)
 
     session.add(db_profile)
+    bump_data_revision_for_positions(session, [previous_name, db_profile.name])
     session.commit()
+    JobRecommender.invalidate_catalog()
+    invalidate_profile_catalog()
     session.refresh(db_profile)
     db_profile.dimensions = await get_dimension_weights(session, profile_id)
     return db_profile
@@ -161,8 +171,11 @@ async def delete_job_profile(session: Session, profile_id: int) -> bool:
         )
     )
 
+    bump_data_revision_for_positions(session, [db_profile.name])
     session.delete(db_profile)
     session.commit()
+    JobRecommender.invalidate_catalog()
+    invalidate_profile_catalog()
     return True
 
 
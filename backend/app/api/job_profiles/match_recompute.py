@@ -0,0 +1,186 @@
+"""岗位画像 - 匹配记录增量重算模块.
+
+岗位画像的能力维度变化后（JobProfile.revision 递增），已有的匹配记录
+（ProfileMatch.profile_revision 小于画像版本）即为过期记录。本模块在后台：
+- 分块读取过期记录，按候选人批量读取特质矩阵并向量化重新打分
+- 每块一个事务，按主键批量 UPDATE 写回
+- 进程内记录进度，供进度接口查询
+- 重算期间画像再次变更时提前结束，由新版本的任务接手
+
+读取方通过 is_match_stale 判断记录是否仍待重算。
+"""
+
+import logging
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.db import get_engine
+from app.models import JobProfile, ProfileMatch
+from app.models_assessment import Submission
+from .matching_engine import (
+    _trait_matrix_for,
+    _update_matches,
+    compile_profile,
+    score_candidates,
+)
+
+logger = logging.getLogger(__name__)
+
+_RECOMPUTE_CHUNK_SIZE = 1000
+
+
+@dataclass
+class RecomputeProgress:
+    """匹配记录重算进度."""
+    profile_id: int
+    revision: int
+    status: str = "pending"  # pending/running/completed/superseded/failed
+    total: int = 0
+    processed: int = 0
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+_progress: Dict[int, RecomputeProgress] = {}
+_progress_lock = threading.Lock()
+
+
+def is_match_stale(match: ProfileMatch, profile: JobProfile) -> bool:
+    """匹配记录是否早于画像当前的评分版本."""
+    return (match.profile_revision or 0) < (profile.revision or 0)
+
+
+def count_stale_matches(session: Session, profile: JobProfile) -> int:
+    """画像的过期匹配记录数."""
+    return session.exec(
+        select(func.count(ProfileMatch.id)).where(
+            ProfileMatch.profile_id == profile.id,
+            ProfileMatch.profile_revision < (profile.revision or 0)
+        )
+    ).one()
+
+
+def get_recompute_progress(profile_id: int) -> Optional[dict]:
+    """最近一次重算任务的进度（本进程内）."""
+    with _progress_lock:
+        progress = _progress.get(profile_id)
+        return asdict(progress) if progress else None
+
+
+def schedule_recompute(profile_id: int, revision: int) -> bool:
+    """登记重算任务，同一画像同一版本已登记时返回False."""
+    with _progress_lock:
+        current = _progress.get(profile_id)
+        if current and current.revision == revision and current.status in ("pending", "running"):
+            return False
+        _progress[profile_id] = RecomputeProgress(profile_id=profile_id, revision=revision)
+        return True
+
+
+def recompute_profile_matches(
+    profile_id: int,
+    chunk_size: int = _RECOMPUTE_CHUNK_SIZE
+) -> Optional[dict]:
+    """重新计算岗位画像的过期匹配记录（后台任务，使用独立的数据库会话）.
+
+    Args:
+        profile_id: 画像ID
+        chunk_size: 每个事务处理的记录数
+
+    Returns:
+        最终进度；画像不存在时返回None
+    """
+    with Session(get_engine()) as session:
+        profile = session.get(JobProfile, profile_id)
+        if not profile:
+            return None
+        revision = profile.revision or 0
+        total = count_stale_matches(session, profile)
+        with _progress_lock:
+            progress = _progress.get(profile_id)
+            if progress is None or progress.revision != revision:
+                progress = RecomputeProgress(profile_id=profile_id, revision=revision)
+                _progress[profile_id] = progress
+            progress.status = "running"
+            progress.started_at = datetime.utcnow()
+            progress.total = total
+
+        try:
+            compiled = compile_profile(profile)
+            last_id = 0
+            while True:
+                # 画像已再次变更：交给新版本的任务
+                current_revision = session.exec(
+                    select(JobProfile.revision).where(JobProfile.id == profile_id)
+                ).first()
+                if current_revision != revision:
+                    progress.status = "superseded"
+                    break
+
+                rows = session.exec(
+                    select(ProfileMatch.id, Submission.candidate_id)
+                    .join(Submission, Submission.id == ProfileMatch.submission_id, isouter=True)
+                    .where(
+                        ProfileMatch.profile_id == profile_id,
+                        ProfileMatch.profile_revision < revision,
+                        ProfileMatch.id > last_id,
+                    )
+                    .order_by(ProfileMatch.id)
+                    .limit(chunk_size)
+                ).all()
+                if not rows:
+                    progress.status = "completed"
+                    break
+                last_id = rows[-1].id
+
+                _rescore_chunk(session, compiled, rows)
+                session.commit()
+                progress.processed += len(rows)
+        except Exception as e:
+            session.rollback()
+            progress.status = "failed"
+            progress.error = str(e)
+            logger.error(f"❌ 岗位画像{profile_id}: 匹配记录重算失败: {e}")
+
+        progress.finished_at = datetime.utcnow()
+        if progress.status == "completed":
+            logger.info(f"✅ 岗位画像{profile_id}: 重算 {progress.processed} 条匹配记录 (版本 {revision})")
+        return asdict(progress)
+
+
+def _rescore_chunk(session: Session, compiled, rows: List) -> None:
+    """按候选人重新打分一块匹配记录（与 _create_match_record 一致：使用候选人的全部测评）."""
+    candidate_ids = [row.candidate_id for row in rows if row.candidate_id is not None]
+    unique_ids = list(dict.fromkeys(candidate_ids))
+    traits = _trait_matrix_for(session, unique_ids) if unique_ids else None
+    position = {cid: i for i, cid in enumerate(unique_ids)}
+
+    if traits is not None:
+        dim_scores, match_scores = score_candidates(compiled, traits)
+        match_scores = np.round(match_scores, 1)
+
+    match_ids, row_dims, row_scores = [], [], []
+    for row in rows:
+        index = position.get(row.candidate_id)
+        if index is None:
+            # 提交已不存在或未关联候选人：无法重算，保留过期标记
+            continue
+        match_ids.append(row.id)
+        row_dims.append(dim_scores[index])
+        row_scores.append(match_scores[index])
+
+    if match_ids:
+        _update_matches(
+            session,
+            compiled,
+            match_ids,
+            np.vstack(row_dims),
+            np.asarray(row_scores),
+        )
@@ -0,0 +1,611 @@
+"""岗位画像 - 批量匹配引擎.
+
+将候选人与岗位画像的匹配计算向量化：
+1. 从特质特征表读取每个候选人在特质轴（TRAIT_AXIS）上的得分矩阵 X 和可用掩码 M
+2. 岗位画像的能力维度通过编译后的维度映射索引（含别名与模糊匹配）组装为权重矩阵
+3. 一次矩阵乘法 [X | M] @ W 同时得到各维度的加权得分分子与有效权重分母
+
+维度得分与 candidates.service._create_match_record 的算法一致：
+按映射权重对可用的测评维度加权平均（反向维度取 100 - 得分），
+没有映射或测评数据缺失的维度降级为该候选人的测评平均分。
+
+反向匹配（候选人 → 所有岗位画像）将所有在用画像的权重矩阵横向拼接后缓存，
+一次矩阵乘法得到候选人在全部画像上的维度得分。
+"""
+
+import heapq
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from app.db import upsert_rows
+from app.models import JobProfile, ProfileMatch
+from app.api.candidates.dimension_mapping import (
+    TRAIT_AXIS,
+    TRAIT_INDEX,
+    compile_dimension_matrix,
+)
+from app.api.candidates.trait_features import (
+    DEFAULT_FALLBACK_SCORE,
+    SubmissionTraits,
+    iter_submission_traits,
+)
+from app.services.analytics_rollup import record_match_scores, record_rescored_matches
+from app.services.job_recommender import CATALOG_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+_UPSERT_CHUNK_SIZE = 1000
+# 流式 Top-K 排名每块的候选人数
+_TRAIT_CHUNK_SIZE = 2000
+
+
+@dataclass
+class CompiledProfile:
+    """编译后的岗位画像."""
+    profile_id: int
+    name: str
+    revision: int  # 画像评分版本（写入 ProfileMatch.profile_revision）
+    dimension_names: List[str]
+    dimension_weights: np.ndarray  # (D,) 岗位维度权重（0-100）
+    matrix: np.ndarray  # (2T, 2D) [X | M] 左乘后得到 [分子 | 分母]
+
+
+@dataclass
+class CandidateTraitMatrix:
+    """候选人特质矩阵（每行一个候选人）."""
+    candidate_ids: np.ndarray  # (N,)
+    submission_ids: np.ndarray  # (N,) 候选人最新一次已完成测评的提交ID
+    values: np.ndarray  # (N, T) 特质得分，不可用处为0
+    mask: np.ndarray  # (N, T) 特质是否可用（0/1）
+    fallback: np.ndarray  # (N,) 测评平均分（降级分）
+
+
+def compile_profile(profile: JobProfile) -> CompiledProfile:
+    """将岗位画像的能力维度编译为权重矩阵（见 dimension_mapping.compile_dimension_matrix）.
+
+    对维度 d 的映射项 (特质 t, 权重 w, 是否反向 r)：
+    - 分子：w * x_t（正向）或 w * (100 - x_t) = 100w * m_t - w * x_t（反向）
+    - 分母：w * m_t
+    """
+    dimensions = json.loads(profile.dimensions) if profile.dimensions else []
+    names = [dim.get("name", "") for dim in dimensions]
+    weights = np.array([float(dim.get("weight", 0)) for dim in dimensions], dtype=np.float64)
+
+    return CompiledProfile(
+        profile_id=profile.id,
+        name=profile.name,
+        revision=profile.revision or 0,
+        dimension_names=names,
+        dimension_weights=weights,
+        matrix=compile_dimension_matrix(names),
+    )
+
+
+def score_candidates(compiled: CompiledProfile, traits: CandidateTraitMatrix):
+    """计算所有候选人的各维度得分与总匹配分.
+
+    Returns:
+        (维度得分矩阵 (N, D), 总匹配分 (N,))
+    """
+    dim_count = len(compiled.dimension_names)
+    fallback = traits.fallback[:, None]
+
+    stacked = np.concatenate([traits.values, traits.mask], axis=1)
+    product = stacked @ compiled.matrix
+    numerator, denominator = product[:, :dim_count], product[:, dim_count:]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dim_scores = np.where(denominator > 0, numerator / denominator, fallback)
+
+    total_weight = compiled.dimension_weights.sum()
+    if total_weight > 0:
+        match_scores = dim_scores @ compiled.dimension_weights / total_weight
+    else:
+        match_scores = traits.fallback.copy()
+
+    return dim_scores, match_scores
+
+
+def load_candidate_traits(session: Session) -> CandidateTraitMatrix:
+    """加载所有候选人的特质矩阵（读取特质特征表，见 candidates.trait_features）."""
+    chunks = list(iter_candidate_trait_chunks(session))
+    if not chunks:
+        return _empty_trait_matrix()
+    return CandidateTraitMatrix(
+        candidate_ids=np.concatenate([c.candidate_ids for c in chunks]),
+        submission_ids=np.concatenate([c.submission_ids for c in chunks]),
+        values=np.vstack([c.values for c in chunks]),
+        mask=np.vstack([c.mask for c in chunks]),
+        fallback=np.concatenate([c.fallback for c in chunks]),
+    )
+
+
+def iter_candidate_trait_chunks(
+    session: Session,
+    chunk_size: int = _TRAIT_CHUNK_SIZE,
+    candidate_ids: Optional[Sequence[int]] = None
+) -> Iterator[CandidateTraitMatrix]:
+    """按候选人分块流式读取特质矩阵（每块最多 chunk_size 个候选人）.
+
+    每个候选人每种测评类型取最新一次已完成的提交；
+    降级分为该候选人所有已完成测评的 score_percentage 平均值。
+    """
+    trait_count = len(TRAIT_AXIS)
+    requested_ids = candidate_ids
+    candidate_ids: List[int] = []
+    submission_ids: List[int] = []
+    value_rows: List[np.ndarray] = []
+    mask_rows: List[np.ndarray] = []
+    fallback: List[float] = []
+
+    current_candidate = None
+    latest_by_type: Dict[str, SubmissionTraits] = {}
+    percentages: List[float] = []
+    latest_submission = None
+
+    def _flush() -> None:
+        values = np.zeros(trait_count, dtype=np.float64)
+        mask = np.zeros(trait_count, dtype=np.float64)
+        for traits in latest_by_type.values():
+            # 不同测评类型的特质互不重叠
+            values += traits.values
+            mask = np.maximum(mask, traits.mask)
+        candidate_ids.append(current_candidate)
+        submission_ids.append(latest_submission)
+        value_rows.append(values)
+        mask_rows.append(mask)
+        fallback.append(sum(percentages) / len(percentages) if percentages else DEFAULT_FALLBACK_SCORE)
+
+    def _take_chunk() -> CandidateTraitMatrix:
+        chunk = CandidateTraitMatrix(
+            candidate_ids=np.asarray(candidate_ids, dtype=np.int64),
+            submission_ids=np.asarray(submission_ids, dtype=np.int64),
+            values=np.vstack(value_rows),
+            mask=np.vstack(mask_rows),
+            fallback=np.asarray(fallback, dtype=np.float64),
+        )
+        for rows in (candidate_ids, submission_ids, value_rows, mask_rows, fallback):
+            rows.clear()
+        return chunk
+
+    for traits in iter_submission_traits(session, requested_ids, chunk_size=chunk_size):
+        if traits.candidate_id != current_candidate:
+            if current_candidate is not None:
+                _flush()
+                if len(candidate_ids) >= chunk_size:
+                    yield _take_chunk()
+            current_candidate = traits.candidate_id
+            latest_by_type = {}
+            percentages = []
+        latest_submission = traits.submission_id
+        if traits.score_percentage is not None:
+            percentages.append(float(traits.score_percentage))
+        if traits.mask.any():
+            latest_by_type[traits.test_type] = traits
+    if current_candidate is not None:
+        _flush()
+    if candidate_ids:
+        yield _take_chunk()
+
+
+def _empty_trait_matrix() -> CandidateTraitMatrix:
+    trait_count = len(TRAIT_AXIS)
+    return CandidateTraitMatrix(
+        candidate_ids=np.zeros(0, dtype=np.int64),
+        submission_ids=np.zeros(0, dtype=np.int64),
+        values=np.zeros((0, trait_count)),
+        mask=np.zeros((0, trait_count)),
+        fallback=np.zeros(0),
+    )
+
+
+def build_trait_matrix(
+    candidate_ids: Sequence[int],
+    submission_ids: Sequence[int],
+    row_traits: Sequence[Dict[str, float]],
+    fallback: Sequence[float]
+) -> CandidateTraitMatrix:
+    """由每个候选人的 {特质: 得分} 构建特质矩阵."""
+    values = np.zeros((len(row_traits), len(TRAIT_AXIS)), dtype=np.float64)
+    mask = np.zeros_like(values)
+    for i, scores in enumerate(row_traits):
+        for trait, score in scores.items():
+            t = TRAIT_INDEX[trait]
+            values[i, t] = score
+            mask[i, t] = 1.0
+    return CandidateTraitMatrix(
+        candidate_ids=np.asarray(candidate_ids, dtype=np.int64),
+        submission_ids=np.asarray(submission_ids, dtype=np.int64),
+        values=values,
+        mask=mask,
+        fallback=np.asarray(fallback, dtype=np.float64),
+    )
+
+
+def match_profile(
+    session: Session,
+    profile: JobProfile,
+    min_score: Optional[float] = None,
+    limit: int = 20
+) -> List[ProfileMatch]:
+    """为岗位画像批量计算所有候选人的匹配度，批量写入匹配记录.
+
+    Args:
+        session: 数据库会话
+        profile: 岗位画像
+        min_score: 返回结果的最低分数
+        limit: 返回数量
+
+    Returns:
+        匹配度最高的匹配记录（按分数倒序）
+    """
+    compiled = compile_profile(profile)
+    traits = load_candidate_traits(session)
+    if len(traits.candidate_ids) == 0:
+        return []
+
+    dim_scores, match_scores = score_candidates(compiled, traits)
+    match_scores = np.round(match_scores, 1)
+
+    _upsert_matches(session, compiled, traits.submission_ids, dim_scores, match_scores)
+    session.commit()
+
+    # 只取前 limit 名回读记录
+    order = np.argsort(-match_scores, kind="stable")
+    if min_score is not None:
+        order = order[match_scores[order] >= min_score]
+    top_submissions = [int(sid) for sid in traits.submission_ids[order[:limit]]]
+    logger.info(f"✅ 岗位匹配: {profile.name} 批量计算 {len(traits.candidate_ids)} 位候选人")
+    return _load_ranked_matches(session, profile.id, top_submissions)
+
+
+@dataclass
+class TopKResult:
+    """Top-K 排名结果."""
+    matches: List[ProfileMatch]  # 按分数倒序
+    scanned: int  # 扫描的候选人数
+    chunks: int  # 读取的块数
+
+
+def rank_top_candidates(
+    session: Session,
+    profile: JobProfile,
+    k: int = 20,
+    min_score: Optional[float] = None,
+    chunk_size: int = _TRAIT_CHUNK_SIZE
+) -> TopKResult:
+    """流式计算岗位画像的前 K 名候选人，只写入这 K 条匹配记录.
+
+    按块读取候选人特质矩阵，维护大小为 K 的最小堆，
+    只保留不低于 max(min_score, 当前第K名) 的候选人。内存占用为 O(K + chunk_size)。
+
+    Args:
+        session: 数据库会话
+        profile: 岗位画像
+        k: 返回数量
+        min_score: 最低匹配分数
+        chunk_size: 每块候选人数
+
+    Returns:
+        Top-K 排名结果
+    """
+    compiled = compile_profile(profile)
+    # 堆元素: (分数, -提交ID, 提交ID, 维度得分)；分数相同时提交ID较小者优先保留
+    heap: List[Tuple[float, int, int, np.ndarray]] = []
+    scanned = chunks = 0
+
+    for traits in iter_candidate_trait_chunks(session, chunk_size):
+        chunks += 1
+        scanned += len(traits.candidate_ids)
+        threshold = min_score if min_score is not None else -np.inf
+        if len(heap) >= k:
+            threshold = max(threshold, heap[0][0])
+
+        dim_scores, match_scores = score_candidates(compiled, traits)
+        match_scores = np.round(match_scores, 1)
+        candidates = np.flatnonzero(match_scores >= threshold)
+        if len(candidates) > k:
+            # 块内先部分排序取前 K，再合并进堆
+            candidates = candidates[np.argpartition(-match_scores[candidates], k - 1)[:k]]
+        for i in candidates:
+            item = (
+                float(match_scores[i]),
+                -int(traits.submission_ids[i]),
+                int(traits.submission_ids[i]),
+                dim_scores[i].copy(),
+            )
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, item)
+
+    ranked = sorted(heap, key=lambda item: item[:2], reverse=True)
+    if not ranked:
+        return TopKResult(matches=[], scanned=scanned, chunks=chunks)
+
+    submission_ids = [item[2] for item in ranked]
+    _upsert_matches(
+        session,
+        compiled,
+        np.asarray(submission_ids, dtype=np.int64),
+        np.vstack([item[3] for item in ranked]),
+        np.asarray([item[0] for item in ranked]),
+    )
+    session.commit()
+    logger.info(
+        f"✅ 岗位Top-{k}: {profile.name} 扫描 {scanned} 位候选人（{chunks} 块），写入 {len(ranked)} 条"
+    )
+    return TopKResult(
+        matches=_load_ranked_matches(session, profile.id, submission_ids),
+        scanned=scanned,
+        chunks=chunks,
+    )
+
+
+def _load_ranked_matches(session: Session, profile_id: int, submission_ids: List[int]) -> List[ProfileMatch]:
+    """按给定的提交顺序回读匹配记录."""
+    if not submission_ids:
+        return []
+    records = session.exec(
+        select(ProfileMatch).where(
+            ProfileMatch.profile_id == profile_id,
+            ProfileMatch.submission_id.in_(submission_ids)
+        )
+    ).all()
+    rank = {sid: i for i, sid in enumerate(submission_ids)}
+    return sorted(records, key=lambda m: rank.get(m.submission_id, len(rank)))
+
+
+def _upsert_matches(
+    session: Session,
+    compiled: CompiledProfile,
+    submission_ids: np.ndarray,
+    dim_scores: np.ndarray,
+    match_scores: np.ndarray
+) -> None:
+    """按 (profile_id, submission_id) 批量更新或插入匹配记录（INSERT ... ON CONFLICT，不提交事务）."""
+    rows = [
+        {
+            "profile_id": compiled.profile_id,
+            "submission_id": submission_id,
+            **_match_values(compiled, dim_scores[i], float(match_scores[i])),
+        }
+        for i, submission_id in enumerate(submission_ids.tolist())
+    ]
+    # 匹配分数计入数据看板汇总（新建记录计入，已有记录替换旧分数）
+    record_match_scores(session, compiled.profile_id, [(row["submission_id"], row["match_score"]) for row in rows])
+    upsert_rows(
+        session, ProfileMatch, rows,
+        conflict_columns=["profile_id", "submission_id"],
+        chunk_size=_UPSERT_CHUNK_SIZE,
+    )
+
+
+# ========== 反向匹配：一位/一批候选人 × 所有岗位画像 ==========
+
+@dataclass
+class ProfileCatalogMatrix:
+    """所有在用岗位画像拼接成的权重矩阵（进程内缓存，见 get_profile_catalog）."""
+    profile_ids: List[int]
+    profile_names: List[str]
+    departments: List[Optional[str]]
+    dimension_names: List[str]  # (Dtot,) 所有画像的维度依次拼接
+    dimension_weights: np.ndarray  # (Dtot,)
+    dimension_offsets: np.ndarray  # (P + 1,) 第 p 个画像的维度为 [offsets[p], offsets[p+1])
+    matrix: np.ndarray  # (2T, 2Dtot) [X | M] 左乘后得到 [所有维度分子 | 所有维度分母]
+    profile_weights: np.ndarray  # (Dtot, P) 维度得分 → 画像总分（按画像内权重归一化）
+    unweighted: np.ndarray  # (P,) 画像维度权重和为0（总分降级为测评平均分）
+    built_at: float = field(default_factory=time.monotonic)
+
+    @classmethod
+    def compile(cls, profiles: Sequence[JobProfile]) -> "ProfileCatalogMatrix":
+        compiled = [compile_profile(profile) for profile in profiles]
+        trait_count = len(TRAIT_AXIS)
+        offsets = np.zeros(len(compiled) + 1, dtype=np.int64)
+        for p, item in enumerate(compiled):
+            offsets[p + 1] = offsets[p] + len(item.dimension_names)
+        total_dims = int(offsets[-1])
+
+        matrix = np.zeros((2 * trait_count, 2 * total_dims))
+        profile_weights = np.zeros((total_dims, len(compiled)))
+        unweighted = np.zeros(len(compiled), dtype=bool)
+        for p, item in enumerate(compiled):
+            start, end = offsets[p], offsets[p + 1]
+            dim_count = end - start
+            matrix[:, start:end] = item.matrix[:, :dim_count]
+            matrix[:, total_dims + start:total_dims + end] = item.matrix[:, dim_count:]
+            total_weight = item.dimension_weights.sum()
+            if total_weight > 0:
+                profile_weights[start:end, p] = item.dimension_weights / total_weight
+            else:
+                unweighted[p] = True
+
+        return cls(
+            profile_ids=[item.profile_id for item in compiled],
+            profile_names=[item.name for item in compiled],
+            departments=[profile.department for profile in profiles],
+            dimension_names=[name for item in compiled for name in item.dimension_names],
+            dimension_weights=(
+                np.concatenate([item.dimension_weights for item in compiled]) if compiled else np.zeros(0)
+            ),
+            dimension_offsets=offsets,
+            matrix=matrix,
+            profile_weights=profile_weights,
+            unweighted=unweighted,
+        )
+
+    def score(self, traits: CandidateTraitMatrix):
+        """一次矩阵乘法计算所有候选人在所有画像上的维度得分与总分.
+
+        Returns:
+            (维度得分 (N, Dtot), 画像总分 (N, P))
+        """
+        total_dims = len(self.dimension_names)
+        product = np.concatenate([traits.values, traits.mask], axis=1) @ self.matrix
+        numerator, denominator = product[:, :total_dims], product[:, total_dims:]
+        fallback = traits.fallback[:, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dim_scores = np.where(denominator > 0, numerator / denominator, fallback)
+        match_scores = dim_scores @ self.profile_weights
+        match_scores = np.where(self.unweighted[None, :], fallback, match_scores)
+        return dim_scores, match_scores
+
+
+_catalog_lock = threading.Lock()
+_profile_catalog: Optional[ProfileCatalogMatrix] = None
+_catalog_generation = 0
+
+
+def get_profile_catalog(session: Session) -> ProfileCatalogMatrix:
+    """获取在用岗位画像的拼接矩阵（进程内缓存，岗位画像增删改时失效）."""
+    global _profile_catalog
+    with _catalog_lock:
+        catalog = _profile_catalog
+        if catalog is not None and (
+            CATALOG_TTL_SECONDS <= 0 or time.monotonic() - catalog.built_at <= CATALOG_TTL_SECONDS
+        ):
+            return catalog
+        generation = _catalog_generation
+
+    profiles = session.exec(
+        select(JobProfile).where(JobProfile.status == "active").order_by(JobProfile.id)
+    ).all()
+    catalog = ProfileCatalogMatrix.compile(profiles)
+    with _catalog_lock:
+        # 构建期间发生失效时不写入缓存，避免覆盖为旧数据
+        if generation == _catalog_generation:
+            _profile_catalog = catalog
+    return catalog
+
+
+def invalidate_profile_catalog() -> None:
+    """岗位画像创建/更新/删除后调用，丢弃缓存的画像矩阵."""
+    global _profile_catalog, _catalog_generation
+    with _catalog_lock:
+        _profile_catalog = None
+        _catalog_generation += 1
+
+
+def rank_profiles_for_candidates(
+    session: Session,
+    candidate_ids: Sequence[int],
+    limit: Optional[int] = None,
+    min_score: Optional[float] = None
+) -> Dict[int, List[dict]]:
+    """为候选人对所有在用岗位画像排序（与 _create_match_record 的维度映射算法一致）.
+
+    Args:
+        session: 数据库会话
+        candidate_ids: 候选人ID列表
+        limit: 每位候选人返回的画像数量（默认全部）
+        min_score: 最低匹配分数
+
+    Returns:
+        {候选人ID: [{profile_id, profile_name, department, match_score, dimension_scores}, ...]}
+        按匹配分数倒序；没有已完成测评的候选人按降级分计算
+    """
+    catalog = get_profile_catalog(session)
+    candidate_ids = list(dict.fromkeys(candidate_ids))
+    if not candidate_ids:
+        return {}
+
+    traits = _trait_matrix_for(session, candidate_ids)
+    dim_scores, match_scores = catalog.score(traits)
+    match_scores = np.round(match_scores, 1)
+
+    rankings: Dict[int, List[dict]] = {}
+    for i, candidate_id in enumerate(traits.candidate_ids.tolist()):
+        order = np.argsort(-match_scores[i], kind="stable")
+        if min_score is not None:
+            order = order[match_scores[i, order] >= min_score]
+        if limit is not None:
+            order = order[:limit]
+        items = []
+        for p in order.tolist():
+            start, end = catalog.dimension_offsets[p], catalog.dimension_offsets[p + 1]
+            items.append({
+                "profile_id": catalog.profile_ids[p],
+                "profile_name": catalog.profile_names[p],
+                "department": catalog.departments[p],
+                "match_score": float(match_scores[i, p]),
+                "dimension_scores": [
+                    {
+                        "name": catalog.dimension_names[d],
+                        "score": round(float(dim_scores[i, d]), 1),
+                        "weight": float(catalog.dimension_weights[d]),
+                        "weighted_score": float(dim_scores[i, d] * catalog.dimension_weights[d] / 100),
+                    }
+                    for d in range(start, end)
+                ],
+            })
+        rankings[candidate_id] = items
+    return rankings
+
+
+def _trait_matrix_for(session: Session, candidate_ids: List[int]) -> CandidateTraitMatrix:
+    """按给定顺序读取候选人的特质矩阵（没有测评的候选人为空向量 + 默认降级分）."""
+    rows: Dict[int, Tuple[np.ndarray, np.ndarray, float]] = {}
+    for chunk in iter_candidate_trait_chunks(session, candidate_ids=candidate_ids):
+        for i, candidate_id in enumerate(chunk.candidate_ids.tolist()):
+            rows[candidate_id] = (chunk.values[i], chunk.mask[i], float(chunk.fallback[i]))
+
+    trait_count = len(TRAIT_AXIS)
+    empty = (np.zeros(trait_count), np.zeros(trait_count), DEFAULT_FALLBACK_SCORE)
+    ordered = [rows.get(candidate_id, empty) for candidate_id in candidate_ids]
+    return CandidateTraitMatrix(
+        candidate_ids=np.asarray(candidate_ids, dtype=np.int64),
+        submission_ids=np.zeros(len(candidate_ids), dtype=np.int64),
+        values=np.vstack([row[0] for row in ordered]),
+        mask=np.vstack([row[1] for row in ordered]),
+        fallback=np.asarray([row[2] for row in ordered]),
+    )
+
+
+def _update_matches(
+    session: Session,
+    compiled: CompiledProfile,
+    match_ids: Sequence[int],
+    dim_scores: np.ndarray,
+    match_scores: np.ndarray
+) -> None:
+    """按主键批量更新匹配记录（不提交事务）."""
+    updates = [
+        {"id": match_id, **_match_values(compiled, dim_scores[i], float(match_scores[i]))}
+        for i, match_id in enumerate(match_ids)
+    ]
+    # 数据看板汇总：扣除旧分数、计入新分数
+    record_rescored_matches(session, [(row["id"], row["match_score"]) for row in updates])
+    for start in range(0, len(updates), _UPSERT_CHUNK_SIZE):
+        session.execute(update(ProfileMatch), updates[start:start + _UPSERT_CHUNK_SIZE])
+
+
+def _match_values(compiled: CompiledProfile, dim_scores: np.ndarray, match_score: float) -> dict:
+    """匹配记录的字段值（与 _create_match_record 的格式一致）."""
+    weights = compiled.dimension_weights.tolist()
+    dimension_scores = {
+        name: {
+            "score": round(score, 1),
+            "weight": weight,
+            "weighted_score": score * (weight / 100),
+        }
+        for name, score, weight in zip(compiled.dimension_names, dim_scores.tolist(), weights)
+    }
+    ai_analysis = f"候选人在 {compiled.name} 岗位的综合匹配度为 {match_score}分。"
+    if dimension_scores:
+        top_dims = sorted(dimension_scores.items(), key=lambda x: x[1]["score"], reverse=True)[:3]
+        top_names = [f"{name}({score['score']}分)" for name, score in top_dims]
+        ai_analysis += f" 优势维度: {', '.join(top_names)}。"
+    return {
+        "match_score": match_score,
+        "dimension_scores": dimension_scores,
+        "ai_analysis": ai_analysis,
+        "profile_revision": compiled.revision,
+    }
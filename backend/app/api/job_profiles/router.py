@@ -1,17 +1,19 @@
 """岗位画像API路由."""
 
 from __future__ import annotations
+import asyncio
 import json
 import logging
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status, UploadFile, File
 from pydantic import BaseModel
 from sqlmodel import Session
 
 from app.db import get_session
 from . import schemas, service, ai_helper
-from app.api.resumes.extractors import extract_text_from_file, clean_text
+from .match_recompute import is_match_stale, recompute_profile_matches
 from app.api.resumes import storage
+from app.api.resumes.parse_cache import get_resume_text, hash_bytes
 import tempfile
 import os
 
@@ -43,6 +45,11 @@ def _format_profile_response(profile) -> dict:
     }
 
 
+def _format_match_response(match, profile) -> dict:
+    """格式化匹配记录响应（附带是否待重算）."""
+    return {**match.model_dump(), "is_stale": is_match_stale(match, profile)}
+
+
 @router.post(
     "",
     response_model=schemas.JobProfileResponse,
@@ -136,11 +143,13 @@ async def get_job_profile(
 async def update_job_profile(
     profile_id: int,
     data: schemas.JobProfileUpdate,
+    background_tasks: BackgroundTasks,
     session: Session = Depends(get_session)
 ):
     """更新指定ID的岗位画像.
     
     只需要提供要更新的字段，未提供的字段保持不变。
+    能力维度变化时，已有匹配记录在后台重新计算（进度见 /match-recompute）。
     """
     try:
         profile = await service.update_job_profile(session, profile_id, data)
@@ -149,6 +158,8 @@ async def update_job_profile(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="岗位画像不存在"
             )
+        if service.schedule_match_recompute(session, profile):
+            background_tasks.add_task(recompute_profile_matches, profile.id)
         return _format_profile_response(profile)
     except Exception as e:
         raise HTTPException(
@@ -224,6 +235,51 @@ async def match_candidates(
         )
 
 
+@router.post(
+    "/{profile_id}/top-candidates",
+    response_model=schemas.TopCandidatesResponse,
+    summary="Top-K 候选人排名"
+)
+async def rank_top_candidates(
+    profile_id: int,
+    request: schemas.TopCandidatesRequest = schemas.TopCandidatesRequest(),
+    session: Session = Depends(get_session)
+):
+    """流式计算岗位画像的前 K 名候选人.
+    
+    按块扫描所有候选人并只保留前 K 名，只写入这 K 条匹配记录，
+    适合候选人数量很大时的排名。
+    
+    - **k**: 返回前K名（默认20）
+    - **min_score**: 最低匹配分数（可选）
+    """
+    try:
+        result = await service.rank_top_candidates_for_profile(
+            session,
+            profile_id,
+            request.k,
+            request.min_score
+        )
+        if result is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="岗位画像不存在"
+            )
+        
+        return {
+            "matches": result.matches,
+            "total": len(result.matches),
+            "scanned": result.scanned
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"候选人排名失败: {str(e)}"
+        )
+
+
 @router.get(
     "/{profile_id}/matches",
     response_model=schemas.MatchCandidatesResponse,
@@ -256,7 +312,7 @@ async def get_profile_matches(
         )
         
         return {
-            "matches": matches,
+            "matches": [_format_match_response(m, profile) for m in matches],
             "total": len(matches)
         }
     except HTTPException:
@@ -268,6 +324,29 @@ async def get_profile_matches(
         )
 
 
+@router.get(
+    "/{profile_id}/match-recompute",
+    response_model=schemas.MatchRecomputeStatus,
+    summary="获取匹配记录重算进度"
+)
+async def get_match_recompute_status(
+    profile_id: int,
+    session: Session = Depends(get_session)
+):
+    """获取岗位画像能力维度变更后，匹配记录的后台重算进度.
+    
+    - **stale_count**: 仍待重算的匹配记录数（为0即全部为最新版本）
+    - **status**: idle（本进程无任务）/pending/running/completed/superseded/failed
+    """
+    result = await service.get_match_recompute_status(session, profile_id)
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="岗位画像不存在"
+        )
+    return result
+
+
 # ========== Phase 5: AI辅助功能 ==========
 
 @router.post(
@@ -279,6 +358,7 @@ async def analyze_resume_for_profile(
     file: UploadFile = File(...),
     job_title: str = Query(..., description="岗位名称"),
     department: Optional[str] = Query(None, description="部门名称"),
+    session: Session = Depends(get_session),
 ):
     """上传优秀员工简历，AI分析生成岗位画像配置建议.
     
@@ -302,25 +382,22 @@ async def analyze_resume_for_profile(
             temp_file.write(content)
             temp_file_path = temp_file.name
         
-        # 2. 提取文本
-        resume_text = extract_text_from_file(temp_file_path)
-        if not resume_text:
+        # 2. 提取并清洗文本（按文件内容哈希缓存；未命中时在进程池中提取，不阻塞事件循环）
+        clean_resume_text, _ = await get_resume_text(session, temp_file_path, hash_bytes(content))
+        if not clean_resume_text:
             raise HTTPException(
                 status_code=400,
                 detail="无法提取简历文本，请确保文件格式正确（支持PDF/DOC/DOCX）"
             )
         
-        # 3. 清洗文本
-        clean_resume_text = clean_text(resume_text)
-        
-        # 4. AI分析
+        # 3. AI分析
         result = await ai_helper.analyze_resume_for_job_profile(
             resume_text=clean_resume_text,
             job_title=job_title,
             department=department
         )
         
-        # 5. 转换为 JobProfileCreate 格式
+        # 4. 转换为 JobProfileCreate 格式
         profile_suggestion = schemas.JobProfileCreate(
             name=result["name"],
             department=result["department"],
@@ -346,7 +423,7 @@ async def analyze_resume_for_profile(
             detail=f"AI分析失败: {str(e)}"
         )
     finally:
-        # 6. 删除临时文件
+        # 5. 删除临时文件
         if temp_file_path and os.path.exists(temp_file_path):
             try:
                 os.remove(temp_file_path)
@@ -363,6 +440,7 @@ async def analyze_multiple_resumes_for_profile(
     files: list[UploadFile] = File(...),
     job_title: str = Query(..., description="岗位名称"),
     department: Optional[str] = Query(None, description="部门名称"),
+    session: Session = Depends(get_session),
 ):
     """上传多份优秀员工简历，AI分析共性特征生成岗位画像配置建议.
     
@@ -372,6 +450,7 @@ async def analyze_multiple_resumes_for_profile(
     - 智能分配能力维度权重
     """
     temp_files = []
+    content_hashes = []
     resume_texts = []
     
     try:
@@ -381,12 +460,19 @@ async def analyze_multiple_resumes_for_profile(
                 content = await file.read()
                 temp_file.write(content)
                 temp_files.append(temp_file.name)
+                content_hashes.append(hash_bytes(content))
         
-        # 2. 提取所有简历文本
-        for temp_path in temp_files:
-            text = extract_text_from_file(temp_path)
-            if text:
-                resume_texts.append(clean_text(text))
+        # 2. 并行提取所有简历文本（按内容哈希缓存，未命中的在进程池中提取，单份超时或失败时跳过）
+        results = await asyncio.gather(
+            *(get_resume_text(session, temp_path, content_hash)
+              for temp_path, content_hash in zip(temp_files, content_hashes)),
+            return_exceptions=True
+        )
+        for temp_path, result in zip(temp_files, results):
+            if isinstance(result, Exception):
+                logger.warning("简历文本提取失败 %s: %s", temp_path, result)
+            elif result[0]:
+                resume_texts.append(result[0])
         
         if not resume_texts:
             raise HTTPException(
@@ -112,6 +112,8 @@ class ProfileMatchResponse(BaseModel):
     match_score: float
     dimension_scores: Optional[dict] = None
     ai_analysis: Optional[str] = None
+    profile_revision: int = Field(0, description="计算时的画像评分版本")
+    is_stale: bool = Field(False, description="画像维度已变更，记录待后台重算")
     created_at: datetime
     
     class Config:
@@ -137,3 +139,41 @@ class MatchCandidatesResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+class TopCandidatesRequest(BaseModel):
+    """Top-K 候选人排名请求."""
+    
+    k: int = Field(20, ge=1, le=500, description="返回前K名")
+    min_score: Optional[float] = Field(None, ge=0, le=100, description="最低匹配分数")
+    
+    class Config:
+        from_attributes = True
+
+
+class TopCandidatesResponse(BaseModel):
+    """Top-K 候选人排名响应."""
+    
+    matches: list[ProfileMatchResponse]
+    total: int
+    scanned: int = Field(..., description="扫描的候选人数")
+    
+    class Config:
+        from_attributes = True
+
+
+
+class MatchRecomputeStatus(BaseModel):
+    """匹配记录重算状态."""
+    
+    profile_id: int
+    revision: int = Field(..., description="画像当前评分版本")
+    stale_count: int = Field(..., description="待重算的匹配记录数")
+    status: str = Field(..., description="idle/pending/running/completed/superseded/failed")
+    total: int = 0
+    processed: int = 0
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
@@ -3,11 +3,18 @@
 from __future__ import annotations
 import json
 from typing import Optional
+from sqlalchemy import delete
 from sqlmodel import Session, select, func
 from datetime import datetime
 
-from app.models import JobProfile, ProfileMatch, Submission
+from app.db import upsert_rows
+from app.models import JobProfile, ProfileMatch
+from app.api.candidates.cache_manager import bump_data_revision_for_positions
+from app.services.analytics_rollup import record_match_scores, remove_match_rollups
+from app.services.job_recommender import JobRecommender
 from . import schemas
+from .match_recompute import count_stale_matches, get_recompute_progress, schedule_recompute
+from .matching_engine import TopKResult, invalidate_profile_catalog, match_profile, rank_top_candidates
 
 
 async def create_job_profile(session: Session, data: schemas.JobProfileCreate) -> JobProfile:
@@ -33,7 +40,11 @@ async def create_job_profile(session: Session, data: schemas.JobProfileCreate) -
     )
     
     session.add(profile)
+    # 目标岗位为该岗位的候选人画像需要重新匹配
+    bump_data_revision_for_positions(session, [profile.name])
     session.commit()
+    JobRecommender.invalidate_catalog()
+    invalidate_profile_catalog()
     session.refresh(profile)
     return profile
 
@@ -115,6 +126,7 @@ async def update_job_profile(
     
     # 更新字段
     update_data = data.dict(exclude_unset=True)
+    previous_name = profile.name
     
     if "name" in update_data:
         profile.name = update_data["name"]
@@ -125,17 +137,25 @@ async def update_job_profile(
     if "tags" in update_data:
         profile.tags = json.dumps(update_data["tags"], ensure_ascii=False)
     if "dimensions" in update_data:
-        profile.dimensions = json.dumps(
+        dimensions = json.dumps(
             [dim.dict() for dim in data.dimensions],
             ensure_ascii=False
         )
+        if dimensions != profile.dimensions:
+            # 能力维度变化后已有匹配记录过期，由后台任务重新计算（见 match_recompute）
+            profile.revision = (profile.revision or 0) + 1
+        profile.dimensions = dimensions
     if "status" in update_data:
         profile.status = update_data["status"]
     
     profile.updated_at = datetime.utcnow()
     
     session.add(profile)
+    # 重命名时新旧岗位名对应的候选人都受影响
+    bump_data_revision_for_positions(session, [previous_name, profile.name])
     session.commit()
+    JobRecommender.invalidate_catalog()
+    invalidate_profile_catalog()
     session.refresh(profile)
     return profile
 
@@ -154,15 +174,16 @@ async def delete_job_profile(session: Session, profile_id: int) -> bool:
     if not profile:
         return False
     
-    # 删除相关的匹配记录
-    statement = select(ProfileMatch).where(ProfileMatch.profile_id == profile_id)
-    matches = session.exec(statement).all()
-    for match in matches:
-        session.delete(match)
+    # 删除相关的匹配记录（先从看板汇总中扣除，与删除同一事务）
+    remove_match_rollups(session, ProfileMatch.profile_id == profile_id)
+    session.exec(delete(ProfileMatch).where(ProfileMatch.profile_id == profile_id))
     
     # 删除画像
+    bump_data_revision_for_positions(session, [profile.name])
     session.delete(profile)
     session.commit()
+    JobRecommender.invalidate_catalog()
+    invalidate_profile_catalog()
     return True
 
 
@@ -170,7 +191,7 @@ async def create_profile_match(
     session: Session,
     data: schemas.ProfileMatchCreate
 ) -> ProfileMatch:
-    """创建匹配记录.
+    """创建匹配记录（同一画像 × 提交已有记录时覆盖）.
     
     Args:
         session: 数据库会话
@@ -179,18 +200,24 @@ async def create_profile_match(
     Returns:
         创建的匹配记录
     """
-    match = ProfileMatch(
-        profile_id=data.profile_id,
-        submission_id=data.submission_id,
-        match_score=data.match_score,
-        dimension_scores=data.dimension_scores,
-        ai_analysis=data.ai_analysis
+    profile = session.get(JobProfile, data.profile_id)
+    record_match_scores(session, data.profile_id, [(data.submission_id, data.match_score)])
+    upsert_rows(
+        session,
+        ProfileMatch,
+        [{
+            **data.dict(),
+            "profile_revision": profile.revision if profile else 0,
+        }],
+        conflict_columns=["profile_id", "submission_id"],
     )
-    
-    session.add(match)
     session.commit()
-    session.refresh(match)
-    return match
+    return session.exec(
+        select(ProfileMatch).where(
+            ProfileMatch.profile_id == data.profile_id,
+            ProfileMatch.submission_id == data.submission_id
+        )
+    ).one()
 
 
 async def get_profile_matches(
@@ -222,43 +249,6 @@ async def get_profile_matches(
     return list(matches)
 
 
-def calculate_match_score(
-    profile: JobProfile,
-    submission: Submission
-) -> dict:
-    """计算候选人与岗位画像的匹配度.
-    
-    这是一个简化的匹配算法，后续可以根据实际需求优化。
-    
-    Args:
-        profile: 岗位画像
-        submission: 提交记录
-        
-    Returns:
-        包含match_score和dimension_scores的字典
-    """
-    # 解析画像维度
-    dimensions = json.loads(profile.dimensions) if profile.dimensions else []
-    
-    # TODO: 这里需要实现真实的匹配算法
-    # 目前返回Mock数据作为占位
-    dimension_scores = {}
-    total_score = 0.0
-    
-    for dim in dimensions:
-        # 简化算法：假设所有维度得分都是80分
-        # 实际应该根据submission的答案和维度定义来计算
-        score = 80.0
-        dimension_scores[dim['name']] = score
-        total_score += score * (dim['weight'] / 100)
-    
-    return {
-        "match_score": round(total_score, 2),
-        "dimension_scores": dimension_scores,
-        "ai_analysis": f"该候选人与{profile.name}岗位的整体匹配度为{total_score:.1f}分。"
-    }
-
-
 async def match_candidates_to_profile(
     session: Session,
     profile_id: int,
@@ -267,7 +257,8 @@ async def match_candidates_to_profile(
 ) -> list[ProfileMatch]:
     """为岗位画像匹配候选人.
     
-    查找所有提交记录，计算匹配度，并保存匹配结果。
+    使用批量匹配引擎一次计算所有候选人（取最新一次已完成测评）的匹配度，
+    并批量更新/插入匹配记录。
     
     Args:
         session: 数据库会话
@@ -283,49 +274,71 @@ async def match_candidates_to_profile(
     if not profile:
         return []
     
-    # 获取所有提交记录
-    statement = select(Submission)
-    submissions = session.exec(statement).all()
+    return match_profile(session, profile, min_score=min_score, limit=limit)
+
+
+async def rank_top_candidates_for_profile(
+    session: Session,
+    profile_id: int,
+    k: int = 20,
+    min_score: Optional[float] = None
+) -> Optional[TopKResult]:
+    """流式计算岗位画像的前 K 名候选人（只写入这 K 条匹配记录）.
     
-    # 计算匹配度
-    matches = []
-    for submission in submissions:
-        # 检查是否已存在匹配记录
-        existing = session.exec(
-            select(ProfileMatch).where(
-                ProfileMatch.profile_id == profile_id,
-                ProfileMatch.submission_id == submission.id
-            )
-        ).first()
+    Args:
+        session: 数据库会话
+        profile_id: 画像ID
+        k: 返回数量
+        min_score: 最低分数阈值
         
-        if existing:
-            # 更新现有记录
-            match_result = calculate_match_score(profile, submission)
-            existing.match_score = match_result["match_score"]
-            existing.dimension_scores = match_result["dimension_scores"]
-            existing.ai_analysis = match_result["ai_analysis"]
-            session.add(existing)
-            
-            if min_score is None or existing.match_score >= min_score:
-                matches.append(existing)
-        else:
-            # 创建新记录
-            match_result = calculate_match_score(profile, submission)
-            
-            if min_score is None or match_result["match_score"] >= min_score:
-                match = ProfileMatch(
-                    profile_id=profile_id,
-                    submission_id=submission.id,
-                    match_score=match_result["match_score"],
-                    dimension_scores=match_result["dimension_scores"],
-                    ai_analysis=match_result["ai_analysis"]
-                )
-                session.add(match)
-                matches.append(match)
+    Returns:
+        Top-K 排名结果，画像不存在时返回None
+    """
+    profile = session.get(JobProfile, profile_id)
+    if not profile:
+        return None
     
-    session.commit()
+    return rank_top_candidates(session, profile, k=k, min_score=min_score)
+
+
+def schedule_match_recompute(session: Session, profile: JobProfile) -> bool:
+    """画像存在过期匹配记录时登记后台重算任务.
     
-    # 按分数排序并限制数量
-    matches.sort(key=lambda x: x.match_score, reverse=True)
-    return matches[:limit]
+    Args:
+        session: 数据库会话
+        profile: 岗位画像
+        
+    Returns:
+        是否需要启动重算任务（同一版本的任务已在进行时返回False）
+    """
+    if not count_stale_matches(session, profile):
+        return False
+    return schedule_recompute(profile.id, profile.revision or 0)
+
 
+async def get_match_recompute_status(session: Session, profile_id: int) -> Optional[dict]:
+    """获取岗位画像匹配记录的重算状态.
+    
+    Args:
+        session: 数据库会话
+        profile_id: 画像ID
+        
+    Returns:
+        重算状态，画像不存在时返回None
+    """
+    profile = session.get(JobProfile, profile_id)
+    if not profile:
+        return None
+    
+    revision = profile.revision or 0
+    progress = get_recompute_progress(profile_id) or {}
+    if progress.get("revision") != revision:
+        # 进度属于旧版本（或本进程未执行过重算）
+        progress = {}
+    return {
+        "status": "idle",
+        **progress,
+        "profile_id": profile_id,
+        "revision": revision,
+        "stale_count": count_stale_matches(session, profile),
+    }
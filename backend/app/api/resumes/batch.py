@@ -0,0 +1,330 @@
+"""简历管理 - 批量上传与解析流水线.
+
+批量上传分两个阶段：
+1. 上传（请求内完成）：文件以 aiofiles 并发写入（RESUME_UPLOAD_CONCURRENCY，默认8个），
+   候选人简历字段与批次进度每 BATCH_COMMIT_SIZE 个文件提交一次事务；提交成功后再删除旧简历文件
+2. 解析（后台任务）：文本提取（进程池）+ AI解析以有界并发执行（RESUME_PARSE_CONCURRENCY，默认4个），
+   每个文件解析完成即提交；相同文件命中解析缓存时不调用模型（见 parse_cache）
+
+进度写入 resume_batches / resume_batch_items，多 worker 部署时任一进程都能查询
+GET /api/resumes/batches/{batch_id}。服务在解析途中重启时，未完成的文件停留在 uploaded/parsing 状态，
+可在候选人页面手动解析。
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from fastapi import HTTPException, UploadFile
+from sqlmodel import Session, select
+
+from app.db import get_engine
+from app.models import Candidate, ResumeBatch, ResumeBatchItem
+from app.api.candidates.cache_manager import bump_data_revision
+from . import storage
+from .parse_cache import get_parsed_resume, get_resume_text
+from .schemas import BatchItemStatus, BatchStatusResponse, ResumeParsedData
+
+logger = logging.getLogger(__name__)
+
+# 并发写入的文件数
+UPLOAD_CONCURRENCY = int(os.getenv("RESUME_UPLOAD_CONCURRENCY", "8"))
+# 并发解析（提取 + AI调用）的文件数
+PARSE_CONCURRENCY = int(os.getenv("RESUME_PARSE_CONCURRENCY", "4"))
+# 上传阶段每个事务提交的文件数
+BATCH_COMMIT_SIZE = 50
+
+STATUS_UPLOADED = "uploaded"
+STATUS_PARSING = "parsing"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+# 运行中的后台解析任务（持有引用，避免任务被回收；应用退出时取消）
+_parse_tasks: Set[asyncio.Task] = set()
+
+
+@dataclass
+class SavedFile:
+    """单个文件的上传结果."""
+    seq: int
+    file_name: str
+    candidate_id: int
+    file_path: Optional[str] = None
+    content_hash: Optional[str] = None
+    error: Optional[str] = None
+
+
+def apply_parse_result(
+    session: Session,
+    candidate: Candidate,
+    clean_resume_text: str,
+    content_hash: Optional[str],
+    parsed_data: ResumeParsedData
+) -> None:
+    """将解析结果写入候选人并递增数据修订号（不提交）."""
+    candidate.resume_text = clean_resume_text
+    candidate.resume_content_hash = content_hash
+    candidate.resume_parsed_data = parsed_data.model_dump()
+
+    # ⭐ 如果候选人没有岗位信息，从简历中获取并更新
+    if not candidate.position and parsed_data.target_position:
+        candidate.position = parsed_data.target_position
+        print(f"📄 从简历更新候选人岗位: {parsed_data.target_position}")
+
+    candidate.updated_at = datetime.utcnow()
+    session.add(candidate)
+    # ⭐ 递增数据修订号以触发画像缓存失效
+    bump_data_revision(session, [candidate.id])
+
+
+async def _save_files(
+    files: Sequence[UploadFile],
+    candidate_ids: Sequence[int],
+    existing_ids: Set[int]
+) -> List[SavedFile]:
+    """并发写入上传文件（单个文件失败不影响其他文件）."""
+    semaphore = asyncio.Semaphore(max(1, UPLOAD_CONCURRENCY))
+
+    async def save(seq: int, file: UploadFile, candidate_id: int) -> SavedFile:
+        saved = SavedFile(seq=seq, file_name=file.filename or "unknown", candidate_id=candidate_id)
+        if candidate_id not in existing_ids:
+            saved.error = "候选人不存在"
+            return saved
+        async with semaphore:
+            try:
+                file_path, original_name, _, content_hash = await storage.save_resume_file(candidate_id, file)
+            except HTTPException as e:
+                saved.error = str(e.detail)
+                return saved
+            except Exception as e:
+                saved.error = str(e)
+                return saved
+        saved.file_name, saved.file_path, saved.content_hash = original_name, file_path, content_hash
+        return saved
+
+    return list(await asyncio.gather(
+        *(save(seq, file, candidate_id) for seq, (file, candidate_id) in enumerate(zip(files, candidate_ids)))
+    ))
+
+
+def _batch_item(batch_id: str, saved: SavedFile) -> ResumeBatchItem:
+    return ResumeBatchItem(
+        batch_id=batch_id,
+        seq=saved.seq,
+        candidate_id=saved.candidate_id,
+        file_name=saved.file_name,
+        status=STATUS_FAILED if saved.error else STATUS_UPLOADED,
+        error=saved.error,
+    )
+
+
+def _commit_chunk(session: Session, batch_id: str, chunk: Sequence[SavedFile]) -> None:
+    """一个事务内更新一批候选人的简历字段并写入批次进度；失败时删除本批新文件并标记失败."""
+    uploaded = [saved for saved in chunk if saved.error is None]
+    old_paths = []
+    try:
+        candidates = {
+            candidate.id: candidate
+            for candidate in session.exec(
+                select(Candidate).where(Candidate.id.in_([saved.candidate_id for saved in uploaded]))
+            )
+        } if uploaded else {}
+        now = datetime.utcnow()
+        for saved in uploaded:
+            candidate = candidates[saved.candidate_id]
+            if candidate.resume_file_path and candidate.resume_file_path != saved.file_path:
+                old_paths.append(candidate.resume_file_path)
+            candidate.resume_file_path = saved.file_path
+            candidate.resume_original_name = saved.file_name
+            candidate.resume_uploaded_at = now
+            candidate.resume_content_hash = saved.content_hash
+            candidate.resume_text = None
+            candidate.resume_parsed_data = None
+            session.add(candidate)
+        session.add_all(_batch_item(batch_id, saved) for saved in chunk)
+        bump_data_revision(session, [saved.candidate_id for saved in uploaded])
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.error(f"❌ 批量上传提交失败 batch={batch_id}: {e}")
+        for saved in uploaded:
+            storage.delete_resume_file(saved.file_path)
+            saved.error = f"保存失败：{e}"
+        session.add_all(_batch_item(batch_id, saved) for saved in chunk)
+        session.commit()
+        return
+
+    # 新简历已提交，删除被替换的旧文件
+    for path in old_paths:
+        storage.delete_resume_file(path)
+
+
+async def ingest_batch(
+    session: Session,
+    files: Sequence[UploadFile],
+    candidate_ids: Sequence[int],
+    auto_parse: bool = True,
+    analysis_level: str = "pro"
+) -> Tuple[ResumeBatch, List[SavedFile]]:
+    """保存一批简历并记录批次进度，auto_parse 时调度后台解析.
+
+    Args:
+        session: 数据库会话
+        files: 上传的文件（与 candidate_ids 一一对应，候选人ID不重复）
+        candidate_ids: 候选人ID列表
+        auto_parse: 上传后是否自动解析
+        analysis_level: 解析级别 (pro/expert)
+
+    Returns:
+        (批次, 每个文件的上传结果)
+    """
+    existing_ids = set(session.exec(select(Candidate.id).where(Candidate.id.in_(set(candidate_ids)))).all())
+    batch = ResumeBatch(
+        id=uuid.uuid4().hex,
+        total=len(files),
+        auto_parse=auto_parse,
+        analysis_level=analysis_level,
+    )
+    session.add(batch)
+    session.commit()
+    batch_id = batch.id
+
+    saved_files = await _save_files(files, candidate_ids, existing_ids)
+    for start in range(0, len(saved_files), BATCH_COMMIT_SIZE):
+        _commit_chunk(session, batch_id, saved_files[start:start + BATCH_COMMIT_SIZE])
+
+    if auto_parse and any(saved.error is None for saved in saved_files):
+        schedule_batch_parse(batch_id)
+    else:
+        batch = session.get(ResumeBatch, batch_id)
+        batch.finished_at = datetime.utcnow()
+        session.add(batch)
+        session.commit()
+    session.refresh(batch)
+
+    success_count = sum(1 for saved in saved_files if saved.error is None)
+    logger.info(f"✅ 批量上传完成 batch={batch_id}: {success_count}/{len(saved_files)} 个文件")
+    return batch, saved_files
+
+
+async def _parse_item(item_id: int, analysis_level: str) -> None:
+    """解析批次中的一个文件（独立会话，完成后立即提交进度）."""
+    with Session(get_engine()) as session:
+        item = session.get(ResumeBatchItem, item_id)
+        if item is None:
+            return
+        item.status = STATUS_PARSING
+        session.add(item)
+        session.commit()
+        try:
+            candidate = session.get(Candidate, item.candidate_id)
+            if candidate is None or not candidate.resume_file_path:
+                raise ValueError("候选人不存在或没有简历")
+            file_path = candidate.resume_file_path
+            clean_resume_text, content_hash = await get_resume_text(
+                session, file_path, candidate.resume_content_hash
+            )
+            if not clean_resume_text:
+                raise ValueError("无法提取简历文本")
+            parsed_data, cached = await get_parsed_resume(session, content_hash, clean_resume_text, analysis_level)
+
+            # 解析期间简历可能被重新上传，此时不覆盖新简历
+            session.refresh(candidate)
+            if candidate.resume_file_path != file_path:
+                raise ValueError("解析期间简历已被替换")
+            apply_parse_result(session, candidate, clean_resume_text, content_hash, parsed_data)
+            item.status = STATUS_COMPLETED
+            item.cached = cached
+            item.error = None
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"⚠️ 批量解析失败 item={item_id}: {e}")
+            item.status = STATUS_FAILED
+            item.error = str(e) or type(e).__name__
+        session.add(item)
+        session.commit()
+
+
+async def run_batch_parse(batch_id: str) -> None:
+    """以有界并发解析批次中所有已上传的文件，全部结束后记录完成时间."""
+    with Session(get_engine()) as session:
+        batch = session.get(ResumeBatch, batch_id)
+        if batch is None:
+            return
+        analysis_level = batch.analysis_level
+        item_ids = session.exec(
+            select(ResumeBatchItem.id)
+            .where(ResumeBatchItem.batch_id == batch_id, ResumeBatchItem.status == STATUS_UPLOADED)
+            .order_by(ResumeBatchItem.seq)
+        ).all()
+
+    semaphore = asyncio.Semaphore(max(1, PARSE_CONCURRENCY))
+
+    async def parse(item_id: int) -> None:
+        async with semaphore:
+            await _parse_item(item_id, analysis_level)
+
+    logger.info(f"📄 开始批量解析 batch={batch_id}: {len(item_ids)} 个文件，并发 {PARSE_CONCURRENCY}")
+    await asyncio.gather(*(parse(item_id) for item_id in item_ids))
+
+    with Session(get_engine()) as session:
+        batch = session.get(ResumeBatch, batch_id)
+        batch.finished_at = datetime.utcnow()
+        session.add(batch)
+        session.commit()
+    logger.info(f"✅ 批量解析完成 batch={batch_id}")
+
+
+def schedule_batch_parse(batch_id: str) -> asyncio.Task:
+    """在当前事件循环中启动批次的后台解析任务."""
+    task = asyncio.create_task(run_batch_parse(batch_id))
+    _parse_tasks.add(task)
+    task.add_done_callback(_parse_tasks.discard)
+    return task
+
+
+def cancel_batch_parses() -> None:
+    """取消运行中的批量解析（应用退出时调用）."""
+    for task in list(_parse_tasks):
+        task.cancel()
+
+
+def get_batch_status(session: Session, batch_id: str) -> Optional[BatchStatusResponse]:
+    """查询批次进度（各状态文件数与每个文件的状态），批次不存在返回None."""
+    batch = session.get(ResumeBatch, batch_id)
+    if batch is None:
+        return None
+    items = session.exec(
+        select(ResumeBatchItem).where(ResumeBatchItem.batch_id == batch_id).order_by(ResumeBatchItem.seq)
+    ).all()
+    counts: Dict[str, int] = {
+        status: 0 for status in (STATUS_UPLOADED, STATUS_PARSING, STATUS_COMPLETED, STATUS_FAILED)
+    }
+    for item in items:
+        counts[item.status] = counts.get(item.status, 0) + 1
+    return BatchStatusResponse(
+        batch_id=batch.id,
+        total=batch.total,
+        auto_parse=batch.auto_parse,
+        analysis_level=batch.analysis_level,
+        finished=batch.finished_at is not None,
+        counts=counts,
+        created_at=batch.created_at,
+        finished_at=batch.finished_at,
+        items=[
+            BatchItemStatus(
+                seq=item.seq,
+                file_name=item.file_name,
+                candidate_id=item.candidate_id,
+                status=item.status,
+                error=item.error,
+                cached=item.cached,
+                updated_at=item.updated_at,
+            )
+            for item in items
+        ],
+    )
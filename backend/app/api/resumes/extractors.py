@@ -3,24 +3,26 @@ from pathlib import Path
 from typing import Optional
 import re
 
+from .pdf_text import extract_pdf_pages
 
-def extract_text_from_pdf(file_path: str) -> str:
+# 文本提取/清洗逻辑版本（修改提取方式时递增，使解析缓存失效）
+EXTRACTOR_VERSION = "2"
+
+
+def extract_text_from_pdf(file_path: str, max_pages: Optional[int] = None) -> str:
     """
     从PDF文件提取文本.
     
-    使用pdfplumber库进行提取
+    分级提取：PDFium 快速路径，质量不足的页回退 pdfplumber 版面分析（见 pdf_text），
+    max_pages 限制最多提取的页数
     """
     try:
-        import pdfplumber
-        
-        text = ""
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        
-        return text.strip()
+        extraction = extract_pdf_pages(file_path, max_pages)
+        print(
+            f"📄 PDF提取: {len(extraction.pages)}页 {extraction.seconds:.2f}s"
+            f"（pdfplumber回退 {extraction.fallback_pages} 页）"
+        )
+        return extraction.text
         
     except ImportError:
         print("pdfplumber未安装，使用mock数据")
@@ -120,12 +122,15 @@ def _get_mock_word_text() -> str:
     """
 
 
-def extract_text_from_file(file_path: str) -> Optional[str]:
+def extract_text_from_file(file_path: str, max_pages: Optional[int] = None) -> Optional[str]:
     """
     根据文件类型自动选择提取方法.
     
+    耗CPU（复杂PDF需数秒），async 路由中应通过 app.services.text_extraction 在进程池中调用。
+    
     Args:
         file_path: 文件路径
+        max_pages: PDF最多提取的页数（None 表示不限制）
         
     Returns:
         提取的文本内容，失败返回None
@@ -138,7 +143,7 @@ def extract_text_from_file(file_path: str) -> Optional[str]:
     file_ext = path.suffix.lower()
     
     if file_ext == ".pdf":
-        return extract_text_from_pdf(file_path)
+        return extract_text_from_pdf(file_path, max_pages)
     elif file_ext in [".doc", ".docx"]:
         return extract_text_from_word(file_path)
     else:
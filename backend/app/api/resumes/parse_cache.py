@@ -0,0 +1,140 @@
+"""简历管理 - 按文件内容哈希缓存提取文本与解析结果.
+
+同一份简历重复点击"解析"、上传给多个候选人、或在岗位画像分析中重复上传时，
+文件内容相同（SHA-256 相同），提取文本与AI解析结果也相同，无需重复计算：
+- 文本缓存：(内容哈希, 提取版本)，命中后跳过进程池提取
+- 解析缓存：(内容哈希, 解析版本, 分析级别)，命中后不调用模型
+- 规则解析兜底的结果不缓存，下次解析仍会重试AI
+
+上传时 storage.save_resume_file 边写入边计算哈希；此前上传的简历在首次解析时补算。
+缓存写入后立即提交，不在等待模型返回期间持有数据库写事务。
+"""
+
+import asyncio
+import hashlib
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Tuple
+
+from sqlmodel import Session, select
+
+from app.db import upsert_rows
+from app.models import ResumeParseCache
+from app.services.text_extraction import extract_resume_text
+from .extractors import EXTRACTOR_VERSION, clean_text
+from .parser import PARSER_VERSION, is_rule_based_result, parse_resume_with_ai
+from .schemas import ResumeParsedData
+
+logger = logging.getLogger(__name__)
+
+# 计算文件哈希时的读取块大小（字节）
+HASH_READ_SIZE = 1024 * 1024
+# 文本缓存记录的 analysis_level
+TEXT_CACHE_LEVEL = ""
+
+TEXT_CACHE_VERSION = f"text-{EXTRACTOR_VERSION}"
+# 解析结果同时依赖提取出的文本，提取版本变更时一并失效
+PARSE_CACHE_VERSION = f"{PARSER_VERSION}/text-{EXTRACTOR_VERSION}"
+
+
+def hash_file(file_path: str) -> Optional[str]:
+    """计算文件内容的 SHA-256，文件不存在返回None."""
+    path = Path(file_path)
+    if not path.exists():
+        return None
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_READ_SIZE):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def hash_bytes(content: bytes) -> str:
+    """计算内存中文件内容的 SHA-256."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def _get_entry(session: Session, content_hash: str, version: str, level: str) -> Optional[ResumeParseCache]:
+    return session.exec(
+        select(ResumeParseCache).where(
+            ResumeParseCache.content_hash == content_hash,
+            ResumeParseCache.parser_version == version,
+            ResumeParseCache.analysis_level == level,
+        )
+    ).first()
+
+
+def _store(session: Session, content_hash: str, version: str, level: str, **values) -> None:
+    upsert_rows(
+        session,
+        ResumeParseCache,
+        [{
+            "content_hash": content_hash,
+            "parser_version": version,
+            "analysis_level": level,
+            "updated_at": datetime.utcnow(),
+            **values,
+        }],
+        conflict_columns=["content_hash", "parser_version", "analysis_level"],
+        update_columns=[*values, "updated_at"],
+    )
+    session.commit()
+
+
+async def get_resume_text(
+    session: Session,
+    file_path: str,
+    content_hash: Optional[str] = None
+) -> Tuple[Optional[str], Optional[str]]:
+    """获取清洗后的简历文本：命中缓存直接返回，否则在进程池中提取并写入缓存.
+
+    Args:
+        session: 数据库会话（写入缓存时提交）
+        file_path: 简历文件路径
+        content_hash: 文件内容哈希（None 时读取文件计算）
+
+    Returns:
+        (清洗后的文本，提取失败为None; 内容哈希)
+
+    Raises:
+        TextExtractionError: 提取超时或提取进程异常退出
+    """
+    if not content_hash:
+        content_hash = await asyncio.to_thread(hash_file, file_path)
+    if content_hash:
+        entry = _get_entry(session, content_hash, TEXT_CACHE_VERSION, TEXT_CACHE_LEVEL)
+        if entry is not None and entry.clean_text:
+            logger.info(f"✅ 简历文本缓存命中 hash={content_hash[:12]}")
+            return entry.clean_text, content_hash
+
+    resume_text = await extract_resume_text(file_path)
+    if not resume_text:
+        return None, content_hash
+    cleaned = clean_text(resume_text)
+    if content_hash and cleaned:
+        _store(session, content_hash, TEXT_CACHE_VERSION, TEXT_CACHE_LEVEL, clean_text=cleaned)
+    return cleaned, content_hash
+
+
+async def get_parsed_resume(
+    session: Session,
+    content_hash: Optional[str],
+    resume_text: str,
+    analysis_level: str = "pro"
+) -> Tuple[ResumeParsedData, bool]:
+    """获取AI解析结果：命中缓存不调用模型，否则调用 parse_resume_with_ai 并写入缓存.
+
+    Returns:
+        (解析结果, 是否命中缓存)
+    """
+    if content_hash:
+        entry = _get_entry(session, content_hash, PARSE_CACHE_VERSION, analysis_level)
+        if entry is not None and entry.parsed_data:
+            logger.info(f"✅ 简历解析缓存命中 hash={content_hash[:12]}, level={analysis_level}")
+            return ResumeParsedData.model_validate(entry.parsed_data), True
+
+    parsed_data = await parse_resume_with_ai(resume_text, analysis_level)
+    if content_hash and not is_rule_based_result(parsed_data):
+        _store(session, content_hash, PARSE_CACHE_VERSION, analysis_level, parsed_data=parsed_data.model_dump())
+    return parsed_data, False
@@ -7,6 +7,11 @@ from app.api.resumes.schemas import ResumeParsedData, EducationItem, ExperienceI
 
 logger = logging.getLogger(__name__)
 
+# 解析逻辑版本（修改提示词或结果转换时递增，使解析缓存失效）
+PARSER_VERSION = "v38"
+# 规则解析兜底结果的摘要标记（兜底结果不写入解析缓存）
+RULE_BASED_SUMMARY = "（AI解析失败，使用规则提取基本信息）"
+
 
 async def parse_resume_with_ai(
     resume_text: str, 
@@ -329,10 +334,15 @@ def _rule_based_parse(text: str) -> ResumeParsedData:
         skills=_extract_skills_fallback(text),
         certificates=[],
         languages=[],
-        summary="（AI解析失败，使用规则提取基本信息）"
+        summary=RULE_BASED_SUMMARY
     )
 
 
+def is_rule_based_result(parsed_data: ResumeParsedData) -> bool:
+    """是否为规则解析兜底的结果（AI调用失败或返回空结果）."""
+    return parsed_data.summary == RULE_BASED_SUMMARY
+
+
 def _extract_name_fallback(lines_or_text, text: str = None) -> str:
     """提取姓名（兜底方法）."""
     if isinstance(lines_or_text, str):
@@ -0,0 +1,175 @@
+"""简历管理 - PDF 分级文本提取.
+
+pdfplumber 对每页做完整的版面分析（逐字符对象、按坐标聚合成行），复杂简历每页需要数百毫秒；
+pypdfium2（pdfplumber 的依赖，已安装）直接调用 PDFium 的文本提取，快一到两个数量级，
+但按内容流顺序输出文本，绘制顺序与阅读顺序不一致的页面会乱序。
+
+extract_pdf_pages 逐页先走 PDFium 快速路径，按质量判断决定是否对该页回退 pdfplumber：
+- 文本过少（扫描件、矢量化文字等，快速路径可能漏掉内容）
+- 替换字符/私有区字符比例过高（字体编码缺失）
+- 行序混乱：相邻文本块上移（回到页面上方）的比例过高
+返回每页使用的方法与耗时；workers > 1 时按页分段在多个进程中并行提取。
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+# 快速路径文本少于该字符数时回退
+MIN_PAGE_CHARS = 20
+# 替换字符/私有区字符占比超过该值时回退
+MAX_GARBLED_RATIO = 0.05
+# 换行处文本块向上跳回的占比超过该值时视为行序混乱（多栏排版每栏只上跳一次）
+MAX_BACKWARD_LINE_RATIO = 0.25
+# 换行数少于该值时不判断行序
+MIN_LINE_BREAKS = 4
+
+METHOD_PDFIUM = "pdfium"
+METHOD_PDFPLUMBER = "pdfplumber"
+
+
+@dataclass
+class PdfPageText:
+    """单页提取结果."""
+    page_number: int  # 从1开始
+    text: str
+    method: str  # pdfium / pdfplumber
+    seconds: float
+    fallback_reason: Optional[str] = None  # 回退 pdfplumber 的原因
+
+
+@dataclass
+class PdfExtraction:
+    """整份PDF的提取结果."""
+    pages: List[PdfPageText] = field(default_factory=list)
+    page_count: int = 0  # PDF总页数（可能大于提取的页数）
+    seconds: float = 0.0
+
+    @property
+    def text(self) -> str:
+        return "\n".join(page.text for page in self.pages if page.text).strip()
+
+    @property
+    def fallback_pages(self) -> int:
+        return sum(1 for page in self.pages if page.method == METHOD_PDFPLUMBER)
+
+
+def _garbled_ratio(text: str) -> float:
+    chars = [c for c in text if not c.isspace()]
+    if not chars:
+        return 0.0
+    bad = sum(1 for c in chars if c == "\ufffd" or "\ue000" <= c <= "\uf8ff" or ord(c) < 32)
+    return bad / len(chars)
+
+
+def _backward_line_ratio(rects: Sequence[Tuple[float, float, float, float]]) -> Tuple[float, int]:
+    """文本块（left, bottom, right, top）序列中换行处向上跳回的比例与换行数."""
+    breaks = backward = 0
+    for previous, current in zip(rects, rects[1:]):
+        height = max(previous[3] - previous[1], current[3] - current[1], 1.0)
+        shift = current[3] - previous[3]
+        if abs(shift) > height / 2:
+            breaks += 1
+            if shift > 0:
+                backward += 1
+    return (backward / breaks if breaks else 0.0), breaks
+
+
+def check_page_quality(text: str, rects: Sequence[Tuple[float, float, float, float]] = ()) -> Optional[str]:
+    """判断快速路径的提取结果是否可用，不可用时返回原因."""
+    stripped = text.strip()
+    if len(stripped) < MIN_PAGE_CHARS:
+        return "文本过少"
+    if _garbled_ratio(stripped) > MAX_GARBLED_RATIO:
+        return "乱码字符过多"
+    ratio, breaks = _backward_line_ratio(rects)
+    if breaks >= MIN_LINE_BREAKS and ratio > MAX_BACKWARD_LINE_RATIO:
+        return "行序混乱"
+    return None
+
+
+def _pdfium_page(document, index: int) -> Tuple[str, List[Tuple[float, float, float, float]]]:
+    page = document[index]
+    textpage = page.get_textpage()
+    try:
+        text = textpage.get_text_range().replace("\r\n", "\n").replace("\r", "\n")
+        rects = [textpage.get_rect(i) for i in range(textpage.count_rects())]
+    finally:
+        textpage.close()
+        page.close()
+    return text, rects
+
+
+def _extract_range(file_path: str, start: int, stop: int) -> List[PdfPageText]:
+    """提取 [start, stop) 页（从0开始），只对未通过质量判断的页调用 pdfplumber."""
+    results: List[PdfPageText] = []
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        pdfium = None
+
+    plumber = None
+    document = pdfium.PdfDocument(file_path) if pdfium is not None else None
+    try:
+        for index in range(start, stop):
+            page_start = time.perf_counter()
+            reason = "未安装pypdfium2"
+            if document is not None:
+                text, rects = _pdfium_page(document, index)
+                reason = check_page_quality(text, rects)
+                if reason is None:
+                    results.append(PdfPageText(index + 1, text.strip(), METHOD_PDFIUM, time.perf_counter() - page_start))
+                    continue
+            if plumber is None:
+                import pdfplumber
+                plumber = pdfplumber.open(file_path)
+            text = plumber.pages[index].extract_text() or ""
+            results.append(PdfPageText(
+                index + 1, text.strip(), METHOD_PDFPLUMBER, time.perf_counter() - page_start, fallback_reason=reason
+            ))
+    finally:
+        if document is not None:
+            document.close()
+        if plumber is not None:
+            plumber.close()
+    return results
+
+
+def _page_count(file_path: str) -> int:
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        import pdfplumber
+        with pdfplumber.open(file_path) as pdf:
+            return len(pdf.pages)
+    document = pdfium.PdfDocument(file_path)
+    try:
+        return len(document)
+    finally:
+        document.close()
+
+
+def extract_pdf_pages(file_path: str, max_pages: Optional[int] = None, workers: int = 1) -> PdfExtraction:
+    """分级提取PDF文本（PDFium 快速路径 + 逐页 pdfplumber 回退）.
+
+    Args:
+        file_path: PDF文件路径
+        max_pages: 最多提取的页数（None 表示不限制）
+        workers: 并行提取的进程数（按页分段；已在提取进程池中运行时保持为1）
+
+    Returns:
+        每页的文本、方法与耗时
+    """
+    start = time.perf_counter()
+    page_count = _page_count(file_path)
+    total = min(page_count, max_pages) if max_pages else page_count
+    if workers > 1 and total > 1:
+        step = -(-total // min(workers, total))
+        ranges = [(i, min(i + step, total)) for i in range(0, total, step)]
+        with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+            futures = [pool.submit(_extract_range, file_path, a, b) for a, b in ranges]
+            pages = [page for future in futures for page in future.result()]
+    else:
+        pages = _extract_range(file_path, 0, total)
+    return PdfExtraction(pages=pages, page_count=page_count, seconds=time.perf_counter() - start)
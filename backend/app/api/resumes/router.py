@@ -7,9 +7,9 @@ from datetime import datetime
 
 from app.db import get_session
 from app.models import Candidate
-from app.api.resumes import schemas, storage
-from app.api.resumes.extractors import extract_text_from_file, clean_text
-from app.api.resumes.parser import parse_resume_with_ai
+from app.api.candidates.cache_manager import bump_data_revision
+from app.api.resumes import batch, schemas, storage
+from app.api.resumes.parse_cache import get_parsed_resume, get_resume_text
 
 
 router = APIRouter(prefix="/api/resumes", tags=["resumes"])
@@ -34,17 +34,19 @@ async def upload_resume(
         storage.delete_resume_file(candidate.resume_file_path)
     
     # 保存新文件
-    file_path, original_name, file_size = await storage.save_resume_file(candidate_id, file)
+    file_path, original_name, file_size, content_hash = await storage.save_resume_file(candidate_id, file)
     
     # 更新数据库
     candidate.resume_file_path = file_path
     candidate.resume_original_name = original_name
     candidate.resume_uploaded_at = datetime.utcnow()
+    candidate.resume_content_hash = content_hash
     # 重置解析状态和数据
     candidate.resume_text = None
     candidate.resume_parsed_data = None
     
     session.add(candidate)
+    bump_data_revision(session, [candidate_id])
     session.commit()
     session.refresh(candidate)
     
@@ -67,9 +69,16 @@ async def upload_resume(
 async def batch_upload_resumes(
     files: List[UploadFile] = File(...),
     candidate_ids: str = Form(...),  # 逗号分隔的候选人ID列表
+    auto_parse: bool = Form(True),  # 上传后自动解析
+    analysis_level: str = Form("pro"),  # 自动解析的分析级别: pro/expert
     session: Session = Depends(get_session)
 ):
-    """批量上传简历."""
+    """
+    批量上传简历.
+    
+    文件并发写入，候选人记录按批提交；auto_parse 时在后台以有界并发提取文本并AI解析，
+    通过 GET /api/resumes/batches/{batch_id} 查询每个文件的进度。
+    """
     # 解析候选人ID列表
     try:
         ids = [int(id.strip()) for id in candidate_ids.split(",")]
@@ -82,68 +91,49 @@ async def batch_upload_resumes(
             detail=f"文件数量（{len(files)}）与候选人数量（{len(ids)}）不匹配"
         )
     
-    results = []
-    success_count = 0
-    failed_count = 0
+    # 同一候选人的多个文件会互相覆盖
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=400, detail="候选人ID重复")
     
-    for file, candidate_id in zip(files, ids):
-        try:
-            # 检查候选人
-            candidate = session.get(Candidate, candidate_id)
-            if not candidate:
-                results.append(schemas.BatchUploadItem(
-                    file_name=file.filename or "unknown",
-                    success=False,
-                    error="候选人不存在"
-                ))
-                failed_count += 1
-                continue
-            
-            # 删除旧文件
-            if candidate.resume_file_path:
-                storage.delete_resume_file(candidate.resume_file_path)
-            
-            # 保存新文件
-            file_path, original_name, file_size = await storage.save_resume_file(
-                candidate_id, file
-            )
-            
-            # 更新数据库
-            candidate.resume_file_path = file_path
-            candidate.resume_original_name = original_name
-            candidate.resume_uploaded_at = datetime.utcnow()
-            candidate.resume_text = None
-            candidate.resume_parsed_data = None
-            
-            session.add(candidate)
-            session.commit()
-            
-            results.append(schemas.BatchUploadItem(
-                file_name=original_name,
-                success=True,
-                candidate_id=candidate_id,
-                file_path=file_path
-            ))
-            success_count += 1
-            
-        except Exception as e:
-            results.append(schemas.BatchUploadItem(
-                file_name=file.filename or "unknown",
-                success=False,
-                error=str(e)
-            ))
-            failed_count += 1
-            # 回滚当前候选人的更改
-            session.rollback()
+    if analysis_level not in ("pro", "expert"):
+        analysis_level = "pro"
+    
+    batch_job, saved_files = await batch.ingest_batch(session, files, ids, auto_parse, analysis_level)
+    
+    results = [
+        schemas.BatchUploadItem(
+            file_name=saved.file_name,
+            success=saved.error is None,
+            candidate_id=saved.candidate_id if saved.error is None else None,
+            file_path=saved.file_path,
+            error=saved.error
+        )
+        for saved in saved_files
+    ]
+    success_count = sum(1 for item in results if item.success)
     
     return schemas.BatchUploadResponse(
         total=len(files),
         success_count=success_count,
-        failed_count=failed_count,
-        items=results
+        failed_count=len(files) - success_count,
+        items=results,
+        batch_id=batch_job.id,
+        parse_scheduled=batch_job.auto_parse and batch_job.finished_at is None
     )
 
 
+@router.get("/batches/{batch_id}", response_model=schemas.BatchStatusResponse)
+async def get_batch_status(
+    batch_id: str,
+    session: Session = Depends(get_session)
+):
+    """查询批量上传/解析进度（各状态文件数与每个文件的状态）."""
+    result = batch.get_batch_status(session, batch_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="批次不存在")
+    return result
+
+
 # ========== 获取简历信息 ==========
 
 @router.get("/candidates/{candidate_id}", response_model=schemas.ResumeInfoResponse)
@@ -217,8 +207,10 @@ async def delete_resume(
     candidate.resume_text = None
     candidate.resume_parsed_data = None
     candidate.resume_uploaded_at = None
+    candidate.resume_content_hash = None
     
     session.add(candidate)
+    bump_data_revision(session, [candidate_id])
     session.commit()
     
     return {"message": "简历已删除", "candidate_id": candidate_id}
@@ -259,41 +251,29 @@ async def parse_resume(
         analysis_level = "pro"
     
     try:
-        # 1. 提取文本
-        resume_text = extract_text_from_file(candidate.resume_file_path)
-        if not resume_text:
+        # 1. 提取并清洗文本（按文件内容哈希缓存；未命中时在进程池中提取，不阻塞事件循环）
+        clean_resume_text, content_hash = await get_resume_text(
+            session, candidate.resume_file_path, candidate.resume_content_hash
+        )
+        if not clean_resume_text:
             return schemas.ResumeParseResponse(
                 candidate_id=candidate_id,
                 status="failed",
                 message="无法提取简历文本"
             )
         
-        # 2. 清洗文本
-        clean_resume_text = clean_text(resume_text)
-        
-        # 3. AI解析（使用指定的分析级别）
+        # 2. AI解析（使用指定的分析级别；相同文件 × 级别命中缓存时不调用模型）
         print(f"📄 开始AI解析简历 candidate={candidate_id}, level={analysis_level}")
-        parsed_data = await parse_resume_with_ai(clean_resume_text, analysis_level)
-        
-        # 4. 保存到数据库
-        candidate.resume_text = clean_resume_text
-        candidate.resume_parsed_data = parsed_data.model_dump()
-        
-        # ⭐ 如果候选人没有岗位信息，从简历中获取并更新
-        if not candidate.position and parsed_data.target_position:
-            candidate.position = parsed_data.target_position
-            print(f"📄 从简历更新候选人岗位: {parsed_data.target_position}")
-        
-        # ⭐ 更新候选人的 updated_at 以触发画像缓存失效
-        candidate.updated_at = datetime.utcnow()
+        parsed_data, cached = await get_parsed_resume(session, content_hash, clean_resume_text, analysis_level)
         
-        session.add(candidate)
+        # 3. 保存到数据库（同时递增数据修订号以触发画像缓存失效）
+        batch.apply_parse_result(session, candidate, clean_resume_text, content_hash, parsed_data)
         session.commit()
         
         return schemas.ResumeParseResponse(
             candidate_id=candidate_id,
             status="success",
-            message=f"简历解析成功（{analysis_level}级别）",
+            message=f"简历解析成功（{analysis_level}级别{'，使用缓存结果' if cached else ''}）",
             parsed_data=parsed_data
         )
         
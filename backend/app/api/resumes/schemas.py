@@ -34,6 +34,32 @@ class BatchUploadResponse(BaseModel):
     success_count: int
     failed_count: int
     items: List[BatchUploadItem]
+    batch_id: Optional[str] = None  # 批次ID，用于查询进度
+    parse_scheduled: bool = False  # 是否已开始后台解析
+
+
+class BatchItemStatus(BaseModel):
+    """批次中单个文件的进度."""
+    seq: int
+    file_name: str
+    candidate_id: Optional[int] = None
+    status: str  # uploaded, parsing, completed, failed
+    error: Optional[str] = None
+    cached: bool = False  # 解析结果来自解析缓存
+    updated_at: Optional[datetime] = None
+
+
+class BatchStatusResponse(BaseModel):
+    """批量上传/解析进度."""
+    batch_id: str
+    total: int
+    auto_parse: bool
+    analysis_level: str
+    finished: bool
+    counts: Dict[str, int]  # 各状态的文件数
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    items: List[BatchItemStatus]
 
 
 # ========== 简历解析结果 ==========
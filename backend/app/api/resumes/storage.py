@@ -1,9 +1,11 @@
 """简历管理 - 文件存储服务."""
+import hashlib
 import os
 import shutil
 from datetime import datetime
 from pathlib import Path
 from typing import Tuple, Optional
+import aiofiles
 from fastapi import UploadFile, HTTPException
 
 
@@ -42,12 +44,12 @@ def validate_file(file: UploadFile) -> None:
 async def save_resume_file(
     candidate_id: int,
     file: UploadFile
-) -> Tuple[str, str, int]:
+) -> Tuple[str, str, int, str]:
     """
-    保存简历文件.
+    保存简历文件（写入时同步计算内容 SHA-256，作为解析缓存的键）.
     
     Returns:
-        (file_path, original_name, file_size)
+        (file_path, original_name, file_size, content_hash)
     """
     ensure_upload_dir()
     validate_file(file)
@@ -62,10 +64,11 @@ async def save_resume_file(
     candidate_dir = get_candidate_dir(candidate_id)
     file_path = candidate_dir / safe_name
     
-    # 保存文件
+    # 保存文件（aiofiles 在线程池中写入，批量上传时多个文件并发写入不阻塞事件循环）
     file_size = 0
+    hasher = hashlib.sha256()
     try:
-        with open(file_path, "wb") as f:
+        async with aiofiles.open(file_path, "wb") as f:
             # 分块读取，避免内存占用过大
             chunk_size = 1024 * 1024  # 1MB
             while chunk := await file.read(chunk_size):
@@ -73,16 +76,16 @@ async def save_resume_file(
                 
                 # 检查文件大小
                 if file_size > MAX_FILE_SIZE:
-                    # 删除已写入的文件
-                    f.close()
-                    file_path.unlink(missing_ok=True)
                     raise HTTPException(
                         status_code=400,
                         detail=f"文件大小超过限制（最大{MAX_FILE_SIZE / 1024 / 1024}MB）"
                     )
                 
-                f.write(chunk)
+                hasher.update(chunk)
+                await f.write(chunk)
     except HTTPException:
+        # 删除已写入的文件
+        file_path.unlink(missing_ok=True)
         raise
     except Exception as e:
         # 清理失败的文件
@@ -91,7 +94,7 @@ async def save_resume_file(
     
     # 返回相对路径（使用字符串路径，避免路径计算问题）
     relative_path = str(file_path)
-    return relative_path, original_name, file_size
+    return relative_path, original_name, file_size, hasher.hexdigest()
 
 
 def delete_resume_file(file_path: str) -> bool:
@@ -1,8 +1,13 @@
 import os
 from functools import lru_cache
-from typing import Generator
+from typing import Any, Dict, Generator, Optional, Sequence
 
-from sqlmodel import SQLModel, Session, create_engine
+from sqlalchemy import insert, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import SQLModel, Session, create_engine, select
+
+# Rows per executemany batch in upsert_rows
+UPSERT_CHUNK_SIZE = 1000
 
 
 @lru_cache(maxsize=1)
@@ -28,3 +33,85 @@ def ensure_tables() -> None:
 
     engine = get_engine()
     SQLModel.metadata.create_all(engine)
+
+
+def upsert_rows(
+    session: Session,
+    model: Any,
+    rows: Sequence[Dict[str, Any]],
+    conflict_columns: Sequence[str],
+    update_columns: Optional[Sequence[str]] = None,
+    chunk_size: int = UPSERT_CHUNK_SIZE,
+    increment_columns: Sequence[str] = (),
+) -> int:
+    """Insert rows, updating the existing row on a unique-key conflict.
+
+    SQLite and PostgreSQL use a single ``INSERT ... ON CONFLICT DO UPDATE``
+    per batch (atomic, no read round trip); other dialects fall back to
+    select-then-update/insert. ``conflict_columns`` must be covered by a
+    unique constraint/index. Does not commit.
+
+    Args:
+        session: database session
+        model: SQLModel table class
+        rows: column dicts, all with the same keys
+        conflict_columns: the unique key
+        update_columns: columns overwritten on conflict
+            (default: every key of the rows except the unique key
+            and ``increment_columns``)
+        chunk_size: rows per statement batch
+        increment_columns: counter columns added to the existing value
+            on conflict (``col = col + new``) instead of overwritten
+
+    Returns:
+        Number of rows written.
+    """
+    if not rows:
+        return 0
+    table = model.__table__
+    if update_columns is None:
+        update_columns = [
+            key for key in rows[0] if key not in conflict_columns and key not in increment_columns
+        ]
+
+    dialect = session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = dialect_insert(table)
+        set_ = {column: stmt.excluded[column] for column in update_columns}
+        set_.update({column: table.c[column] + stmt.excluded[column] for column in increment_columns})
+        if set_:
+            stmt = stmt.on_conflict_do_update(index_elements=list(conflict_columns), set_=set_)
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict_columns))
+        for start in range(0, len(rows), chunk_size):
+            session.execute(stmt, list(rows[start:start + chunk_size]))
+        return len(rows)
+
+    # Generic fallback: not atomic under concurrent writers
+    key_columns = [table.c[column] for column in conflict_columns]
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        keys = [tuple(row[column] for column in conflict_columns) for row in chunk]
+        counter_columns = [table.c[column] for column in increment_columns]
+        existing = {
+            tuple(row[:len(key_columns)]): row[len(key_columns):]
+            for row in session.execute(
+                select(*key_columns, table.c.id, *counter_columns).where(tuple_(*key_columns).in_(keys))
+            ).all()
+        }
+        updates, inserts = [], []
+        for key, row in zip(keys, chunk):
+            if key in existing:
+                if update_columns or increment_columns:
+                    row_id, *counters = existing[key]
+                    values = {c: row[c] for c in update_columns}
+                    values.update({c: (old or 0) + row[c] for c, old in zip(increment_columns, counters)})
+                    updates.append({"id": row_id, **values})
+            else:
+                inserts.append(row)
+        if updates:
+            session.execute(update(model), updates)
+        if inserts:
+            session.execute(insert(model), inserts)
+    return len(rows)
@@ -1,5 +1,7 @@
+import asyncio
 import json
 import os
+from datetime import date
 from typing import Generator, Optional
 from uuid import uuid4
 
@@ -48,13 +50,9 @@ from app.schemas import (
     AnalyticsSummary,
     CandidateOut,
     CandidateListResponse,
-    PositionBucket,
-    RadarIndicator,
-    RadarSeries,
     SubmissionRequest,
     SubmissionResponse,
     SubmissionScore,
-    TrendSeries,
 )
 
 class LoginRequest(SQLModel):
@@ -129,46 +127,6 @@ MOCK_CANDIDATES = [
     # ❌ 已删除赵六 - 只保留3个候选人对应EPQ/DISC/MBTI测评
 ]
 
-MOCK_ANALYTICS = AnalyticsSummary(
-    positionDistribution=[
-        PositionBucket(name="产品", value=32),
-        PositionBucket(name="后端", value=24),
-        PositionBucket(name="前端", value=18),
-        PositionBucket(name="数据", value=12),
-    ],
-    matchDistribution=[
-        PositionBucket(name=">90", value=8),
-        PositionBucket(name="80-90", value=14),
-        PositionBucket(name="70-80", value=22),
-        PositionBucket(name="<70", value=10),
-    ],
-    radarIndicators=[
-        RadarIndicator(name="外向 E", max=24),
-        RadarIndicator(name="神经 N", max=24),
-        RadarIndicator(name="精神 P", max=24),
-        RadarIndicator(name="掩饰 L", max=24),
-    ],
-    radarSeries=[
-        RadarSeries(name="候选人 A", value=[18, 10, 12, 16]),
-        RadarSeries(name="理想模型", value=[20, 12, 14, 18]),
-    ],
-    personalityPie=[
-        PositionBucket(name="外向型", value=40),
-        PositionBucket(name="内向型", value=32),
-        PositionBucket(name="中性", value=18),
-    ],
-    dimensionTrendLabels=["近1周", "近1月", "近3月"],
-    dimensionTrendSeries=[
-        TrendSeries(name="外向 E", data=[16, 18, 19]),
-        TrendSeries(name="神经 N", data=[8, 9, 10]),
-        TrendSeries(name="精神 P", data=[10, 11, 12]),
-        TrendSeries(name="掩饰 L", data=[14, 15, 15]),
-    ],
-    gradeCutoffs={"A": 18, "B": 12, "C": 8},
-    totalCandidates=120,
-    avgScore=79.6,
-)
-
 app = FastAPI(
     title="HR Backend", 
     version="0.1.0",
@@ -207,6 +165,39 @@ def _startup() -> None:
     _init_default_questionnaires()
 
 
+@app.on_event("startup")
+async def _start_background_tasks() -> None:
+    from app.api.candidates.cache_maintenance import start_maintenance_loop
+    from app.api.candidates.cache_manager import start_hit_flush_loop
+    from app.api.candidates.trait_norms import start_norms_flush_loop
+    
+    # 画像缓存定时维护（容量回收）
+    app.state.portrait_cache_maintenance = asyncio.create_task(start_maintenance_loop())
+    # 画像缓存命中计数定时写回
+    app.state.portrait_cache_hit_flush = asyncio.create_task(start_hit_flush_loop())
+    # 特质常模增量定时写回
+    app.state.trait_norms_flush = asyncio.create_task(start_norms_flush_loop())
+
+
+@app.on_event("shutdown")
+async def _stop_background_tasks() -> None:
+    from app.api.candidates.cache_manager import flush_pending_hits
+    from app.api.candidates.trait_norms import flush_pending_norms
+    from app.api.resumes.batch import cancel_batch_parses
+    from app.services.text_extraction import shutdown_extraction_pool
+    
+    for name in ("portrait_cache_maintenance", "portrait_cache_hit_flush", "trait_norms_flush"):
+        task = getattr(app.state, name, None)
+        if task:
+            task.cancel()
+    # 写回尚未持久化的特质常模增量与画像缓存命中计数
+    await asyncio.to_thread(flush_pending_norms)
+    await asyncio.to_thread(flush_pending_hits)
+    # 取消进行中的批量简历解析，再关闭提取进程池
+    cancel_batch_parses()
+    shutdown_extraction_pool()
+
+
 @app.get("/health", tags=["system"])
 def health() -> dict[str, str]:
     """Lightweight liveness probe."""
@@ -792,6 +783,8 @@ def delete_candidate(
 ) -> dict:
     """删除候选人及其相关数据."""
     from app.models import Candidate
+    from app.api.assessments.service import delete_submission_records, invalidate_submission_statistics
+    from app.api.candidates.trait_norms import observe_trait_vector
     from sqlalchemy import text
     
     candidate = session.get(Candidate, candidate_id)
@@ -805,22 +798,24 @@ def delete_candidate(
         # 1. 删除人员画像缓存
         conn.execute(text("DELETE FROM portrait_cache WHERE candidate_id = :cid"), {"cid": candidate_id})
         
-        # 2. 删除岗位匹配记录（如果有的话）
-        try:
-            conn.execute(text("DELETE FROM profile_matches WHERE submission_id IN (SELECT id FROM submissions WHERE candidate_id = :cid)"), {"cid": candidate_id})
-        except Exception:
-            pass
-        
-        # 3. 清除候选人的 submission_id 引用
+        # 2. 清除候选人的 submission_id 引用
         conn.execute(text("UPDATE candidates SET submission_id = NULL WHERE id = :cid"), {"cid": candidate_id})
         
-        # 4. 删除提交记录 (submissions 表)
-        conn.execute(text("DELETE FROM submissions WHERE candidate_id = :cid"), {"cid": candidate_id})
+        # 3. 删除提交记录及岗位匹配记录（从答案统计与看板汇总中扣除）
+        submissions = session.exec(select(Submission).where(Submission.candidate_id == candidate_id)).all()
+        trait_vectors = delete_submission_records(session, submissions)
         
-        # 5. 删除候选人
+        # 4. 删除候选人
         conn.execute(text("DELETE FROM candidates WHERE id = :cid"), {"cid": candidate_id})
         
         session.commit()
+        invalidate_submission_statistics()
+        # 删除成功后从特质常模中扣除（内存增量，定时写回）
+        for trait_vector in trait_vectors:
+            observe_trait_vector(*trait_vector, sign=-1)
+        
+        from app.api.candidates.hot_cache import portrait_hot_cache
+        portrait_hot_cache.invalidate(candidate_id)
         
         return {"message": "删除成功", "id": candidate_id}
     except Exception as e:
@@ -836,14 +831,17 @@ def delete_person_by_phone(
     session: Session = Depends(get_session)
 ) -> dict:
     """通过手机号删除人员及其相关数据."""
+    from app.api.assessments.service import delete_submission_records, invalidate_submission_statistics
+    from app.api.candidates.trait_norms import observe_trait_vector
     from sqlalchemy import text
     
     try:
         conn = session.connection()
         
-        # 1. 删除提交记录
-        result = conn.execute(text("DELETE FROM submissions WHERE candidate_phone = :phone"), {"phone": phone})
-        deleted_submissions = result.rowcount
+        # 1. 删除提交记录及岗位匹配记录（从答案统计与看板汇总中扣除）
+        submissions = session.exec(select(Submission).where(Submission.candidate_phone == phone)).all()
+        trait_vectors = delete_submission_records(session, submissions)
+        deleted_submissions = len(submissions)
         
         # 2. 删除候选人记录
         result = conn.execute(text("DELETE FROM candidates WHERE phone = :phone"), {"phone": phone})
@@ -856,6 +854,9 @@ def delete_person_by_phone(
         """), {"phone": phone})
         
         session.commit()
+        invalidate_submission_statistics()
+        for trait_vector in trait_vectors:
+            observe_trait_vector(*trait_vector, sign=-1)
         
         return {
             "message": "删除成功", 
@@ -876,14 +877,17 @@ def delete_person_by_name(
     session: Session = Depends(get_session)
 ) -> dict:
     """通过姓名删除人员及其相关数据."""
+    from app.api.assessments.service import delete_submission_records, invalidate_submission_statistics
+    from app.api.candidates.trait_norms import observe_trait_vector
     from sqlalchemy import text
     
     try:
         conn = session.connection()
         
-        # 1. 删除提交记录
-        result = conn.execute(text("DELETE FROM submissions WHERE candidate_name = :name"), {"name": name})
-        deleted_submissions = result.rowcount
+        # 1. 删除提交记录及岗位匹配记录（从答案统计与看板汇总中扣除）
+        submissions = session.exec(select(Submission).where(Submission.candidate_name == name)).all()
+        trait_vectors = delete_submission_records(session, submissions)
+        deleted_submissions = len(submissions)
         
         # 2. 删除候选人记录
         result = conn.execute(text("DELETE FROM candidates WHERE name = :name"), {"name": name})
@@ -896,6 +900,9 @@ def delete_person_by_name(
         """), {"name": name})
         
         session.commit()
+        invalidate_submission_statistics()
+        for trait_vector in trait_vectors:
+            observe_trait_vector(*trait_vector, sign=-1)
         
         return {
             "message": "删除成功", 
@@ -920,8 +927,12 @@ def clear_all_data(
     包括：候选人、提交记录、问卷答案等。
     不会删除：问卷模板、用户账号、岗位配置。
     """
-    from app.models import Candidate, SubmissionAnswer
-    from app.models_assessment import Submission
+    from app.models import Candidate, ProfileMatch, SubmissionAnswer
+    from app.models_assessment import Submission, SubmissionTraitFeature
+    from app.api.assessments.answer_stats import rebuild_answer_stats
+    from app.api.assessments.service import invalidate_submission_statistics
+    from app.api.candidates.trait_norms import rebuild_trait_norms
+    from app.services.analytics_rollup import rebuild_analytics_rollups
     from sqlalchemy import delete
     
     # 验证是否为管理员
@@ -938,7 +949,16 @@ def clear_all_data(
     except Exception:
         deleted_counts["submission_answers"] = 0
     
-    # 2. 删除提交记录
+    # 2. 删除提交记录（先删除引用提交的岗位匹配记录与特质特征）
+    try:
+        result = session.exec(delete(ProfileMatch))
+        deleted_counts["profile_matches"] = result.rowcount if hasattr(result, 'rowcount') else 0
+    except Exception:
+        deleted_counts["profile_matches"] = 0
+    try:
+        session.exec(delete(SubmissionTraitFeature))
+    except Exception:
+        pass
     try:
         result = session.exec(delete(Submission))
         deleted_counts["submissions"] = result.rowcount if hasattr(result, 'rowcount') else 0
@@ -953,6 +973,11 @@ def clear_all_data(
         deleted_counts["candidates"] = 0
     
     session.commit()
+    # 按剩余数据重建看板汇总、题目答案统计与特质常模（清空已删除人员的计数）
+    rebuild_analytics_rollups(session)
+    rebuild_answer_stats(session)
+    rebuild_trait_norms(session)
+    invalidate_submission_statistics()
     
     return {
         "message": "所有人员数据已清除",
@@ -1323,9 +1348,19 @@ def get_candidate_survey_submissions(candidate_id: int) -> dict:
 
 
 @app.get("/analytics/summary", response_model=AnalyticsSummary, tags=["analytics"])
-def get_analytics_summary() -> AnalyticsSummary:
-    """Mock analytics data for charts."""
-    return MOCK_ANALYTICS
+def get_analytics_summary(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    position: Optional[str] = None,
+    test_type: Optional[str] = None,
+    session: Session = Depends(get_session),
+) -> AnalyticsSummary:
+    """数据看板图表数据（按日期范围汇总每日汇总表，默认最近90天）."""
+    from app.services.analytics_rollup import get_analytics_summary as query_analytics_summary
+    
+    return query_analytics_summary(
+        session, date_from=date_from, date_to=date_to, position=position, test_type=test_type
+    )
 
 
 def _load_questionnaires_from_js():
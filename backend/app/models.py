@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Optional
 
-from sqlalchemy import JSON, Column, DateTime, func
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, func
 from sqlmodel import Field, SQLModel
 from datetime import datetime
 
@@ -119,6 +119,12 @@ class JobProfile(SQLModel, table=True):
     # 状态
     status: str = Field(default="active")  # active/inactive
     
+    # 评分版本：能力维度（名称/权重）变化时递增，匹配记录据此判断是否过期
+    revision: int = Field(
+        default=0,
+        sa_column=Column(Integer, nullable=False, server_default="0"),
+    )
+    
     created_at: datetime = Field(
         default_factory=datetime.utcnow,
         sa_column=Column(DateTime(timezone=True), server_default=func.now()),
@@ -150,6 +156,10 @@ class JobDimensionWeight(SQLModel, table=True):
 class ProfileMatch(SQLModel, table=True):
     """岗位画像匹配记录表 - 存储候选人与岗位的匹配结果."""
     __tablename__ = "profile_matches"
+    __table_args__ = (
+        # 同一画像 × 提交只保留一条匹配记录（upsert_rows 的冲突键）
+        Index("uq_profile_matches_profile_submission", "profile_id", "submission_id", unique=True),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     profile_id: int = Field(foreign_key="job_profiles.id", index=True)  # 岗位画像ID
@@ -157,6 +167,11 @@ class ProfileMatch(SQLModel, table=True):
     match_score: float = Field(default=0.0)  # 匹配分数 (0-100)
     dimension_scores: Optional[dict] = Field(default=None, sa_column=Column(JSON))  # 各维度得分
     ai_analysis: Optional[str] = None  # AI分析报告
+    # 计算时岗位画像的评分版本（小于 JobProfile.revision 表示已过期、待重新计算）
+    profile_revision: int = Field(
+        default=0,
+        sa_column=Column(Integer, nullable=False, server_default="0"),
+    )
     created_at: datetime = Field(
         default_factory=datetime.utcnow,
         sa_column=Column(DateTime(timezone=True), server_default=func.now()),
@@ -169,6 +184,10 @@ class PortraitCache(SQLModel, table=True):
     V38更新：支持按 analysis_level 分别缓存，同一候选人可有多条缓存（pro/expert）
     """
     __tablename__ = "portrait_cache"
+    __table_args__ = (
+        # 同一候选人 × 分析级别只保留一条缓存（upsert_rows 的冲突键）
+        Index("uq_portrait_cache_candidate_level", "candidate_id", "analysis_level", unique=True),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     candidate_id: int = Field(index=True)  # 候选人ID
@@ -178,6 +197,15 @@ class PortraitCache(SQLModel, table=True):
     ai_model: Optional[str] = None  # 使用的AI模型
     generation_time_ms: Optional[int] = None  # AI生成耗时（毫秒）
     is_default: bool = Field(default=False)  # 是否为默认分析（AI超时时使用）
+    # 访问统计（进程内累计后批量写回，用于容量淘汰）
+    last_hit_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True),
+    )
+    hit_count: int = Field(
+        default=0,
+        sa_column=Column(Integer, nullable=False, server_default="0"),
+    )
     created_at: datetime = Field(
         default_factory=datetime.utcnow,
         sa_column=Column(DateTime(timezone=True), server_default=func.now()),
@@ -186,8 +214,95 @@ class PortraitCache(SQLModel, table=True):
         default_factory=datetime.utcnow,
         sa_column=Column(DateTime(timezone=True), onupdate=func.now()),
     )
-    
-    # 注意：candidate_id + analysis_level 组合唯一
+
+
+class TaskLease(SQLModel, table=True):
+    """后台定时任务租约表 - 多个工作进程中只由持有租约的进程执行该任务.
+
+    进程在每次执行前续约（expires_at 前只有持有者可续约），持有者退出后租约到期由其他进程接管。
+    """
+    __tablename__ = "task_leases"
+    __table_args__ = (
+        Index("uq_task_leases_name", "name", unique=True),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str = Field(max_length=60)  # 任务名
+    owner: str = Field(default="", max_length=120)  # 持有者（主机名:进程号）
+    expires_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True),
+    )
+
+
+class ResumeParseCache(SQLModel, table=True):
+    """简历解析缓存表 - 按文件内容哈希缓存提取文本与AI解析结果.
+
+    同一文件重复解析、或上传给多个候选人时直接复用，不再重复提取文本和调用模型。
+    analysis_level 为空字符串的记录只缓存提取文本；parser_version 随提取/解析逻辑变更，旧记录自然失效。
+    """
+    __tablename__ = "resume_parse_cache"
+    __table_args__ = (
+        # 内容哈希 × 解析版本 × 分析级别只保留一条缓存（upsert_rows 的冲突键）
+        Index("uq_resume_parse_cache_key", "content_hash", "parser_version", "analysis_level", unique=True),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    content_hash: str = Field(max_length=64)  # 文件内容 SHA-256
+    parser_version: str = Field(max_length=40)  # 提取/解析逻辑版本
+    analysis_level: str = Field(default="", max_length=20)  # 分析级别: pro/expert，空字符串为文本缓存
+    clean_text: Optional[str] = None  # 清洗后的简历文本
+    parsed_data: Optional[dict] = Field(default=None, sa_column=Column(JSON))  # ResumeParsedData
+    created_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column=Column(DateTime(timezone=True), server_default=func.now()),
+    )
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column=Column(DateTime(timezone=True), onupdate=func.now()),
+    )
+
+
+class ResumeBatch(SQLModel, table=True):
+    """简历批量上传批次表 - 记录批次参数，供批次进度查询."""
+    __tablename__ = "resume_batches"
+
+    id: str = Field(primary_key=True, max_length=32)  # 批次ID（uuid4 hex）
+    total: int = Field(default=0)  # 文件数
+    auto_parse: bool = Field(default=True)  # 上传后是否自动解析
+    analysis_level: str = Field(default="pro", max_length=20)  # 解析级别: pro/expert
+    created_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column=Column(DateTime(timezone=True), server_default=func.now()),
+    )
+    finished_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True),
+    )
+
+
+class ResumeBatchItem(SQLModel, table=True):
+    """简历批量上传的单个文件进度.
+
+    status: uploaded（已保存，等待解析）/ parsing / completed / failed
+    """
+    __tablename__ = "resume_batch_items"
+    __table_args__ = (
+        Index("uq_resume_batch_items_batch_seq", "batch_id", "seq", unique=True),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    batch_id: str = Field(max_length=32)  # 所属批次
+    seq: int  # 文件在批次中的序号（从0开始）
+    candidate_id: Optional[int] = None
+    file_name: str
+    status: str = Field(default="uploaded", max_length=20)
+    error: Optional[str] = None  # 失败原因
+    cached: bool = Field(default=False)  # 解析结果是否来自解析缓存
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column=Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now()),
+    )
 
 
 class Candidate(SQLModel, table=True):
@@ -207,6 +322,7 @@ class Candidate(SQLModel, table=True):
     resume_text: Optional[str] = None  # 简历文本内容（提取的）
     resume_parsed_data: Optional[dict] = Field(default=None, sa_column=Column(JSON))  # AI解析的结构化数据
     resume_uploaded_at: Optional[datetime] = None  # 简历上传时间
+    resume_content_hash: Optional[str] = Field(default=None, max_length=64, index=True)  # 简历文件SHA-256（解析缓存键）
     
     # 测评相关
     submission_id: Optional[int] = Field(default=None, foreign_key="submission.id")
@@ -215,6 +331,12 @@ class Candidate(SQLModel, table=True):
     status: str = Field(default="new")  # 状态：new/screening/interviewing/hired/rejected
     notes: Optional[str] = None  # 备注
     
+    # 画像数据版本：测评提交、简历上传/解析、岗位画像变更时递增，用于画像缓存校验
+    data_revision: int = Field(
+        default=0,
+        sa_column=Column(Integer, nullable=False, server_default="0"),
+    )
+    
     created_at: datetime = Field(
         default_factory=datetime.utcnow,
         sa_column=Column(DateTime(timezone=True), server_default=func.now()),
@@ -1,8 +1,8 @@
 """问卷管理 - 数据模型."""
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, List
 from sqlmodel import SQLModel, Field, JSON, Column
-from sqlalchemy import Text
+from sqlalchemy import ForeignKey, Index, Integer, LargeBinary, Text
 
 
 class Questionnaire(SQLModel, table=True):
@@ -115,3 +115,141 @@ class Submission(SQLModel, table=True):
     # 关联到候选人表（通过手机号+姓名双重校验自动关联）
     candidate_id: Optional[int] = Field(default=None, foreign_key="candidates.id")
 
+
+class SubmissionTraitFeature(SQLModel, table=True):
+    """测评特质特征表 - 每条已完成提交一行，存储归一化的特质向量.
+    
+    由 result_details 在提交时解析得到（见 app.api.candidates.trait_features），
+    岗位匹配、推荐、交叉验证直接读取定长向量，无需重复解析 JSON。
+    """
+    __tablename__ = "submission_trait_features"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # 删除提交时级联删除（删除路径也会显式删除，兼容未启用外键约束的 SQLite 与旧表结构）
+    submission_id: int = Field(
+        sa_column=Column(
+            Integer,
+            ForeignKey("submissions.id", ondelete="CASCADE"),
+            nullable=False,
+            unique=True,
+            index=True,
+        )
+    )
+    candidate_id: Optional[int] = Field(default=None, foreign_key="candidates.id", index=True)
+    test_type: str = Field(default="", max_length=20)  # mbti/disc/epq/custom...（小写）
+    # TRAIT_AXIS 顺序的 float32 小端序向量（0-100），不可用处为0
+    trait_values: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    # 可用特质位掩码（第 i 位对应 TRAIT_AXIS[i]）
+    trait_mask: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default="0"))
+    score_percentage: Optional[float] = Field(default=None)  # 冗余：用于降级分
+    submitted_at: Optional[datetime] = Field(default=None)  # 冗余：用于取每类测评的最新提交
+    feature_version: int = Field(default=1)  # 特质提取算法版本，变化后由回填任务重算
+    computed_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TraitNorm(SQLModel, table=True):
+    """特质常模表 - 每个 特质 × 分组 一行，存储 0-100 得分的计数直方图.
+    
+    提交时只在内存中累加增量，由定时任务合并写回（见 app.api.candidates.trait_norms），
+    画像与列表直接按直方图计算百分位，无需扫描提交表。
+    """
+    __tablename__ = "trait_norms"
+    __table_args__ = (
+        # 同一特质 × 分组只保留一行（增量合并的冲突键）
+        Index("uq_trait_norms_trait_segment", "trait", "segment", unique=True),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    trait: str = Field(max_length=20)  # TRAIT_AXIS 中的特质，如 mbti:E / epq:N
+    segment: str = Field(default="", max_length=100)  # 应聘岗位，"" 表示全体
+    # 101 个整数分桶（0-100）的 int64 小端序计数
+    counts: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    total: int = Field(default=0)  # 样本数（counts 之和）
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class QuestionAnswerCount(SQLModel, table=True):
+    """题目答案分布计数表 - 每个 问卷 × 题目 × 选项值 一行.
+    
+    测评提交时与提交记录同一事务累加（见 app.api.assessments.answer_stats），
+    问卷统计页直接读取计数，无需遍历提交记录。
+    """
+    __tablename__ = "question_answer_counts"
+    __table_args__ = (
+        Index("uq_question_answer_counts_key", "questionnaire_id", "question_id", "option_value", unique=True),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # 删除问卷时级联删除（delete_questionnaire 也会显式删除，兼容未启用外键约束的 SQLite）
+    questionnaire_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("questionnaires.id", ondelete="CASCADE"), nullable=False)
+    )
+    question_id: str = Field(max_length=100)  # 题目ID（题目未配置ID时为序号）
+    option_value: str = Field(default="", max_length=255)  # 答案值；文本题统一为 ""
+    count: int = Field(default=0)
+
+
+class QuestionnaireDailyStat(SQLModel, table=True):
+    """问卷每日提交汇总表 - 每个 问卷 × 日期 一行（提交数、得分、用时、等级分布）."""
+    __tablename__ = "questionnaire_daily_stats"
+    __table_args__ = (
+        Index("uq_questionnaire_daily_stats_key", "questionnaire_id", "day", unique=True),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    questionnaire_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("questionnaires.id", ondelete="CASCADE"), nullable=False)
+    )
+    day: date  # 提交日期（submitted_at 的日期）
+    submissions: int = Field(default=0)
+    score_sum: float = Field(default=0.0)  # total_score 之和
+    score_count: int = Field(default=0)  # 有 total_score 的提交数
+    duration_sum: float = Field(default=0.0)  # 答题用时之和（分钟，只计 0-120 分钟）
+    duration_count: int = Field(default=0)
+    grade_a: int = Field(default=0)
+    grade_b: int = Field(default=0)
+    grade_c: int = Field(default=0)
+    grade_d: int = Field(default=0)
+
+
+class AnalyticsDailyRollup(SQLModel, table=True):
+    """数据看板每日汇总表 - 每个 日期 × 应聘岗位 × 测评类型 一行.
+    
+    测评提交完成与匹配记录创建时增量累加（见 app.services.analytics_rollup），
+    看板按日期范围对汇总行求和，不扫描提交与匹配记录。
+    """
+    __tablename__ = "analytics_daily_rollups"
+    __table_args__ = (
+        Index("uq_analytics_daily_rollups_key", "day", "position", "test_type", unique=True),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    day: date
+    position: str = Field(default="", max_length=100)  # 应聘岗位，"" 表示未填写
+    test_type: str = Field(default="", max_length=20)  # mbti/disc/epq/custom...（小写）
+    submissions: int = Field(default=0)  # 完成的测评数
+    new_candidates: int = Field(default=0)  # 首次完成测评的候选人数
+    match_count: int = Field(default=0)  # 新建的岗位匹配记录数
+    match_score_sum: float = Field(default=0.0)
+    match_ge_90: int = Field(default=0)  # 匹配分 >= 90
+    match_80_90: int = Field(default=0)  # 80 <= 匹配分 < 90
+    match_70_80: int = Field(default=0)  # 70 <= 匹配分 < 80
+    match_lt_70: int = Field(default=0)  # 匹配分 < 70
+
+
+class AnalyticsTraitRollup(SQLModel, table=True):
+    """数据看板每日特质汇总表 - 每个 日期 × 应聘岗位 × 测评类型 × 特质 一行（雷达图、趋势、性格分布）."""
+    __tablename__ = "analytics_trait_rollups"
+    __table_args__ = (
+        Index("uq_analytics_trait_rollups_key", "day", "position", "test_type", "trait", unique=True),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    day: date
+    position: str = Field(default="", max_length=100)
+    test_type: str = Field(default="", max_length=20)
+    trait: str = Field(max_length=20)  # TRAIT_AXIS 中的特质
+    score_sum: float = Field(default=0.0)
+    score_count: int = Field(default=0)
+    high_count: int = Field(default=0)  # 得分 >= 60
+    low_count: int = Field(default=0)  # 得分 <= 40
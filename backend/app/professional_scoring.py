@@ -1,8 +1,16 @@
 """
 专业测评评分模块
 实现 MBTI、DISC、EPQ 三种标准心理测评的评分算法
+
+每份问卷的题目数据预编译为评分方案（ScoringPlan）并按问卷缓存：
+- 答案key归一化表：各种key格式（"1"、"mbti_1"、1）→ 题目序号
+- 题目 → (维度序号, 是否反向) 数组
+提交评分时只需遍历一次答案并累加计数。问卷更新/删除后调用 invalidate_scoring_plan。
 """
-from typing import Dict, List, Tuple, Optional
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple, Optional
 import statistics
 
 
@@ -11,6 +19,315 @@ class ProfessionalScoringError(ValueError):
     pass
 
 
+# =====================================================
+# 评分方案（预编译）
+# =====================================================
+
+MBTI_DIMENSIONS = ('EI', 'SN', 'TF', 'JP')
+DISC_DIMENSIONS = ('D', 'I', 'S', 'C')
+EPQ_DIMENSIONS = ('E', 'N', 'P', 'L')
+
+_MBTI_OPTIONS = {'A': 0, 'B': 1}
+_MBTI_ANSWERS = {'A': 0, 'B': 1, 'a': 0, 'b': 1}
+# DISC选项映射（用于选择题格式）：A=D, B=I, C=S, D=C
+_DISC_OPTIONS = {'A': 0, 'B': 1, 'C': 2, 'D': 3}
+# EPQ "是"类答案（正向计分）
+_EPQ_YES = frozenset(['a', 'yes', 'true', '1', '是', 'y'])
+# 常见答案值的归一化结果（是否为"是"类答案），其余值现场归一化
+_EPQ_ANSWERS = {
+    value: value.lower() in _EPQ_YES
+    for value in ['是', '否', 'A', 'B', 'a', 'b', 'yes', 'no', 'y', 'n', 'true', 'false', '1', '0']
+}
+
+# 答案key优先级：str(id) > 前缀+id > int(id)（与按顺序尝试多种key格式的结果一致）
+_KEY_PRIORITY_LAST = 2
+
+
+@dataclass(frozen=True)
+class ScoringPlan:
+    """一份问卷的预编译评分方案.
+
+    MBTI/EPQ 按题目评分：primary_keys 为只对应一道题最高优先级的key（常见的 "1"）→ 题目序号，
+    其余key在 key_slots 中登记 答案key → ((题目序号, 优先级, 是否兜底key), ...)，
+    question_dimensions / question_reverse 为各题的维度序号与是否反向计分。
+    DISC 按答案评分：key_dimensions 为 答案key → 维度序号，
+    未预先登记的key按 question_dimension_map 现场解析。
+    EPQ 未提供题目时 by_range=True，评分时按答案题号选择48题/88题的题号范围方案。
+    """
+    test_type: str
+    primary_keys: Dict[Any, int] = field(default_factory=dict)
+    key_slots: Dict[Any, Tuple[Tuple[int, int, bool], ...]] = field(default_factory=dict)
+    question_dimensions: Tuple[int, ...] = ()
+    question_reverse: Tuple[bool, ...] = ()
+    key_dimensions: Dict[Any, Optional[int]] = field(default_factory=dict)
+    question_dimension_map: Dict[str, str] = field(default_factory=dict)
+    by_range: bool = False
+
+
+def compile_scoring_plan(questionnaire_type: str, questions: List[Dict] = None) -> ScoringPlan:
+    """
+    将问卷题目编译为评分方案
+    
+    同样的题目（id/dimension/reverse 相同）复用已编译的方案。
+    
+    Args:
+        questionnaire_type: 问卷类型 ('MBTI', 'DISC', 'EPQ')
+        questions: 题目列表，包含id和dimension等字段（缺省时使用题号范围规则）
+    """
+    type_upper = questionnaire_type.upper()
+    fingerprint = tuple(
+        (q.get('id', ''), q.get('dimension', ''), q.get('reverse', False)) for q in questions
+    ) if questions else ()
+    try:
+        return _compile_plan(type_upper, fingerprint)
+    except TypeError:
+        # 题目字段不可哈希时不缓存
+        return _compile_plan.__wrapped__(type_upper, fingerprint)
+
+
+@lru_cache(maxsize=64)
+def _compile_plan(type_upper: str, questions: Tuple[Tuple[Any, Any, Any], ...]) -> ScoringPlan:
+    """questions 为 (id, dimension, reverse) 元组，空元组表示未提供题目."""
+    if type_upper == 'MBTI':
+        if not questions:
+            return _default_mbti_plan()
+        entries = [
+            (question_id, MBTI_DIMENSIONS.index(dimension), False)
+            for question_id, dimension, _ in questions
+            if dimension in MBTI_DIMENSIONS
+        ]
+        return _compile_question_plan('MBTI', 'mbti_', entries)
+    elif type_upper == 'DISC':
+        return _compile_disc_plan(questions)
+    elif type_upper == 'EPQ':
+        if not questions:
+            return ScoringPlan(test_type='EPQ', by_range=True)
+        entries = []
+        for question_id, dimension, reverse in questions:
+            dimension = dimension.upper()
+            if dimension in EPQ_DIMENSIONS:
+                entries.append((question_id, EPQ_DIMENSIONS.index(dimension), bool(reverse)))
+        return _compile_question_plan('EPQ', 'epq_', entries)
+    else:
+        raise ProfessionalScoringError(
+            f"不支持的测评类型: {type_upper}，仅支持 MBTI/DISC/EPQ"
+        )
+
+
+def _compile_question_plan(test_type: str, prefix: str, entries: List[Tuple[Any, int, bool]]) -> ScoringPlan:
+    """按题目评分的方案：登记每题可接受的答案key、优先级以及是否为兜底key."""
+    slots: Dict[Any, Dict[int, Tuple[int, bool]]] = {}
+    for position, (question_id, _, _) in enumerate(entries):
+        q_id = str(question_id)
+        keys = (q_id, f'{prefix}{q_id}', int(q_id) if q_id.isdigit() else q_id)
+        for priority, key in enumerate(keys):
+            key_positions = slots.setdefault(key, {})
+            best, is_last = key_positions.get(position, (priority, False))
+            key_positions[position] = (min(best, priority), is_last or priority == _KEY_PRIORITY_LAST)
+    primary_keys, key_slots = {}, {}
+    for key, positions in slots.items():
+        entries_for_key = tuple((position, priority, is_last) for position, (priority, is_last) in positions.items())
+        if len(entries_for_key) == 1 and entries_for_key[0][1:] == (0, False):
+            primary_keys[key] = entries_for_key[0][0]
+        else:
+            key_slots[key] = entries_for_key
+    return ScoringPlan(
+        test_type=test_type,
+        primary_keys=primary_keys,
+        key_slots=key_slots,
+        question_dimensions=tuple(entry[1] for entry in entries),
+        question_reverse=tuple(entry[2] for entry in entries),
+    )
+
+
+def _compile_disc_plan(questions: Tuple[Tuple[Any, Any, Any], ...]) -> ScoringPlan:
+    """按答案评分的 DISC 方案：题目ID（含 disc_ 前缀）→ 维度."""
+    question_dimension_map = {}
+    for question_id, dimension, _ in questions:
+        q_id = str(question_id).replace('disc_', '')
+        if dimension in DISC_DIMENSIONS:
+            question_dimension_map[q_id] = dimension
+            # 也支持带前缀的ID
+            question_dimension_map[f"disc_{q_id}"] = dimension
+    
+    # 如果没有题目信息，使用默认映射（1-7=D, 8-14=I, 15-21=S, 22-28=C）
+    if not question_dimension_map:
+        for i in range(1, 29):
+            question_dimension_map[str(i)] = DISC_DIMENSIONS[(i - 1) // 7]
+    
+    candidate_keys = set(question_dimension_map)
+    candidate_keys.update(int(key) for key in question_dimension_map if key.isdigit())
+    return ScoringPlan(
+        test_type='DISC',
+        key_dimensions={key: _resolve_disc_dimension(question_dimension_map, key) for key in candidate_keys},
+        question_dimension_map=question_dimension_map,
+    )
+
+
+def _resolve_disc_dimension(question_dimension_map: Dict[str, str], key: Any) -> Optional[int]:
+    """答案key → DISC维度序号（清理 disc_ 前缀后查找，再按原key查找）."""
+    clean_key = str(key).replace('disc_', '')
+    dimension = question_dimension_map.get(clean_key) or question_dimension_map.get(str(key))
+    return DISC_DIMENSIONS.index(dimension) if dimension else None
+
+
+@lru_cache(maxsize=1)
+def _default_mbti_plan() -> ScoringPlan:
+    """兼容旧格式：93道题按题号范围分配维度（1-23 EI, 24-50 SN, 51-73 TF, 74-93 JP）."""
+    bounds = (23, 50, 73, 93)
+    entries = [(i, next(d for d, end in enumerate(bounds) if i <= end), False) for i in range(1, 94)]
+    return _compile_question_plan('MBTI', 'mbti_', entries)
+
+
+@lru_cache(maxsize=2)
+def _default_epq_plan(question_count: int) -> ScoringPlan:
+    """兼容旧逻辑：按题号范围分配维度（48题版每维度12题；88题版 E:21, N:24, P:23, L:20）."""
+    bounds = (21, 45, 68, 88) if question_count == 88 else (12, 24, 36, 48)
+    entries = [(i, next(d for d, end in enumerate(bounds) if i <= end), False) for i in range(1, question_count + 1)]
+    return _compile_question_plan('EPQ', 'epq_', entries)
+
+
+def _resolve_answers(plan: ScoringPlan, answers: Dict) -> Dict[int, Any]:
+    """一次遍历答案，得到 题目序号 → 答案值.
+
+    与依次尝试 str(id)、前缀+id、int(id) 三种key（取第一个非空值，都为空时取最后一种key的值）的结果一致。
+    """
+    hits: Dict[int, Any] = {}
+    chosen: Dict[int, Tuple[int, Any]] = {}
+    fallback: Dict[int, Any] = {}
+    primary_keys, key_slots = plan.primary_keys, plan.key_slots
+    for key, value in answers.items():
+        position = primary_keys.get(key)
+        if position is not None:
+            # 最高优先级的key：非空即为该题答案
+            if value:
+                hits[position] = value
+            continue
+        slots = key_slots.get(key)
+        if slots is None:
+            continue
+        for position, priority, is_last in slots:
+            if is_last:
+                fallback[position] = value
+            if value and (position not in chosen or priority < chosen[position][0]):
+                chosen[position] = (priority, value)
+    if not chosen and not fallback:
+        return hits
+    fallback.update((position, value) for position, (_, value) in chosen.items())
+    fallback.update(hits)
+    return fallback
+
+
+def score_with_plan(plan: ScoringPlan, answers: Dict) -> Dict:
+    """
+    按预编译的评分方案计算测评结果
+    
+    Args:
+        plan: compile_scoring_plan / get_scoring_plan 返回的评分方案
+        answers: 答案字典 {question_id: answer_value}
+    
+    Returns:
+        评分结果字典，与 score_mbti / score_disc / score_epq 一致
+    """
+    if plan.test_type == 'MBTI':
+        counts = [[0, 0] for _ in MBTI_DIMENSIONS]
+        dimensions = plan.question_dimensions
+        for position, answer in _resolve_answers(plan, answers).items():
+            option = _MBTI_ANSWERS.get(answer) if type(answer) is str else None
+            if option is None:
+                option = _MBTI_OPTIONS.get(str(answer).upper())
+            if option is not None:
+                counts[dimensions[position]][option] += 1
+        return _mbti_result(counts)
+    
+    if plan.test_type == 'DISC':
+        totals = [0, 0, 0, 0]
+        for key, value in answers.items():
+            dimension = plan.key_dimensions.get(key, -1)
+            if dimension == -1:
+                dimension = _resolve_disc_dimension(plan.question_dimension_map, key)
+            if dimension is not None:
+                # 量表题格式：值是数字1-5
+                try:
+                    score = int(value)
+                    if 1 <= score <= 5:
+                        totals[dimension] += score
+                        continue
+                except (ValueError, TypeError):
+                    pass
+            # 选择题格式：值是A/B/C/D
+            option = _DISC_OPTIONS.get(str(value).upper())
+            if option is not None:
+                totals[option] += 1
+        return _disc_result(totals)
+    
+    # EPQ
+    if plan.by_range:
+        # 检测是48题还是88题版本
+        plan = _default_epq_plan(88 if _max_epq_question_id(answers) > 48 else 48)
+    yes_counts = [0, 0, 0, 0]
+    total_counts = [0, 0, 0, 0]
+    dimensions, reverse = plan.question_dimensions, plan.question_reverse
+    for position, answer in _resolve_answers(plan, answers).items():
+        is_yes = _EPQ_ANSWERS.get(answer) if type(answer) is str else None
+        if is_yes is None:
+            answer = str(answer).lower().strip()
+            if not answer:
+                continue
+            is_yes = answer in _EPQ_YES
+        dimension = dimensions[position]
+        total_counts[dimension] += 1
+        # 检查题目是否为反向计分
+        if is_yes != reverse[position]:
+            yes_counts[dimension] += 1
+    return _epq_result(yes_counts, total_counts)
+
+
+def _max_epq_question_id(answers: Dict) -> int:
+    max_question_id = 0
+    for key in answers.keys():
+        try:
+            q_id = int(str(key).replace('epq_', ''))
+            max_question_id = max(max_question_id, q_id)
+        except (ValueError, TypeError):
+            pass
+    return max_question_id
+
+
+# 问卷评分方案缓存：{问卷ID: (版本, 评分方案)}
+_plan_cache: Dict[int, Tuple[Any, ScoringPlan]] = {}
+_plan_lock = threading.Lock()
+
+
+def get_scoring_plan(questionnaire) -> ScoringPlan:
+    """
+    获取问卷的评分方案（进程内缓存，问卷类型或更新时间变化时重新编译）
+    
+    Args:
+        questionnaire: Questionnaire 模型实例（MBTI/DISC/EPQ）
+    """
+    version = (questionnaire.type, questionnaire.updated_at)
+    with _plan_lock:
+        cached = _plan_cache.get(questionnaire.id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+    
+    questions = (questionnaire.questions_data or {}).get('questions', [])
+    plan = compile_scoring_plan(questionnaire.type or '', questions)
+    with _plan_lock:
+        _plan_cache[questionnaire.id] = (version, plan)
+    return plan
+
+
+def invalidate_scoring_plan(questionnaire_id: Optional[int] = None) -> None:
+    """问卷更新/删除后调用，丢弃缓存的评分方案（默认全部）."""
+    with _plan_lock:
+        if questionnaire_id is None:
+            _plan_cache.clear()
+        else:
+            _plan_cache.pop(questionnaire_id, None)
+
+
 # =====================================================
 # MBTI 评分算法
 # =====================================================
@@ -28,60 +345,16 @@ def score_mbti(answers: Dict[str, str], questions: List[Dict] = None) -> Dict:
     
     答案格式支持：{"1": "A"} 或 {"mbti_1": "A"} 或 {1: "A"}
     """
-    
-    # 初始化维度计数器
-    dimension_counts = {
-        'EI': {'A': 0, 'B': 0},
-        'SN': {'A': 0, 'B': 0},
-        'TF': {'A': 0, 'B': 0},
-        'JP': {'A': 0, 'B': 0}
-    }
-    
-    # 如果提供了题目数据，根据题目的dimension字段评分
-    if questions:
-        for q in questions:
-            q_id = str(q.get('id', ''))
-            dimension = q.get('dimension', '')
-            
-            # 尝试多种答案key格式
-            answer = (
-                answers.get(q_id, '') or 
-                answers.get(f'mbti_{q_id}', '') or 
-                answers.get(int(q_id) if q_id.isdigit() else q_id, '')
-            )
-            answer = str(answer).upper()
-            
-            if dimension in dimension_counts and answer in ['A', 'B']:
-                dimension_counts[dimension][answer] += 1
-    else:
-        # 兼容旧格式：尝试多种key格式
-        for i in range(1, 94):  # 93道题
-            # 尝试多种key格式
-            answer = (
-                answers.get(str(i), '') or 
-                answers.get(f'mbti_{i}', '') or
-                answers.get(i, '')
-            )
-            answer = str(answer).upper()
-            
-            if answer in ['A', 'B']:
-                # 按题号范围分配维度
-                if 1 <= i <= 23:
-                    dimension_counts['EI'][answer] += 1
-                elif 24 <= i <= 50:
-                    dimension_counts['SN'][answer] += 1
-                elif 51 <= i <= 73:
-                    dimension_counts['TF'][answer] += 1
-                elif 74 <= i <= 93:
-                    dimension_counts['JP'][answer] += 1
-    
+    return score_with_plan(compile_scoring_plan('MBTI', questions), answers)
+
+
+def _mbti_result(counts: List[List[int]]) -> Dict:
+    """由各维度 A/B 计数生成 MBTI 结果."""
     # 计算各维度倾向和百分比
     mbti_type = ""
     mbti_dimensions = {}
     
-    for dim_code in ['EI', 'SN', 'TF', 'JP']:
-        a_count = dimension_counts[dim_code]['A']
-        b_count = dimension_counts[dim_code]['B']
+    for dim_code, (a_count, b_count) in zip(MBTI_DIMENSIONS, counts):
         total = a_count + b_count
         
         if total == 0:
@@ -91,14 +364,7 @@ def score_mbti(answers: Dict[str, str], questions: List[Dict] = None) -> Dict:
             a_percentage = (a_count / total) * 100
         
         # 确定倾向（A选项代表E, S, T, J）
-        dim_mapping = {
-            'EI': ('E', 'I', '外向型', '内向型'),
-            'SN': ('S', 'N', '感觉型', '直觉型'),
-            'TF': ('T', 'F', '思考型', '情感型'),
-            'JP': ('J', 'P', '判断型', '知觉型')
-        }
-        
-        a_letter, b_letter, a_label, b_label = dim_mapping[dim_code]
+        a_letter, b_letter, a_label, b_label = _MBTI_DIMENSION_LABELS[dim_code]
         
         if a_percentage > 50:
             tendency = a_letter
@@ -117,38 +383,46 @@ def score_mbti(answers: Dict[str, str], questions: List[Dict] = None) -> Dict:
             'description': f'倾向于{label}'
         }
     
-    # MBTI类型描述映射
-    type_descriptions = {
-        'INTJ': '建筑师 - 富有想象力和战略性的思考者',
-        'INTP': '逻辑学家 - 具有创新性的发明家',
-        'ENTJ': '指挥官 - 大胆、富有想象力且意志强大的领导者',
-        'ENTP': '辩论家 - 聪明好奇的思想家',
-        'INFJ': '提倡者 - 安静而神秘且充满灵感',
-        'INFP': '调停者 - 诗意、善良且利他的人',
-        'ENFJ': '主人公 - 具有魅力且鼓舞人心的领导者',
-        'ENFP': '竞选者 - 热情、富有创造力和社交能力的自由人',
-        'ISTJ': '物流师 - 实际且注重事实的个人',
-        'ISFJ': '守卫者 - 非常专注且温暖的守护者',
-        'ESTJ': '总经理 - 出色的管理者',
-        'ESFJ': '执政官 - 极有同情心、受欢迎且乐于助人',
-        'ISTP': '鉴赏家 - 大胆而实际的实验者',
-        'ISFP': '探险家 - 灵活且富有魅力的艺术家',
-        'ESTP': '企业家 - 聪明、精力充沛且善于察言观色',
-        'ESFP': '表演者 - 自发的、精力充沛和热情的艺人'
-    }
-    
     # 计算平均分
     avg_score = sum(d['value'] for d in mbti_dimensions.values()) // 4
     
     return {
         'mbti_type': mbti_type,
-        'mbti_description': type_descriptions.get(mbti_type, f'{mbti_type}人格类型'),
+        'mbti_description': _MBTI_TYPE_DESCRIPTIONS.get(mbti_type, f'{mbti_type}人格类型'),
         'mbti_dimensions': mbti_dimensions,
         'total_score': avg_score,
         'grade': _calculate_grade(avg_score)
     }
 
 
+_MBTI_DIMENSION_LABELS = {
+    'EI': ('E', 'I', '外向型', '内向型'),
+    'SN': ('S', 'N', '感觉型', '直觉型'),
+    'TF': ('T', 'F', '思考型', '情感型'),
+    'JP': ('J', 'P', '判断型', '知觉型')
+}
+
+# MBTI类型描述映射
+_MBTI_TYPE_DESCRIPTIONS = {
+    'INTJ': '建筑师 - 富有想象力和战略性的思考者',
+    'INTP': '逻辑学家 - 具有创新性的发明家',
+    'ENTJ': '指挥官 - 大胆、富有想象力且意志强大的领导者',
+    'ENTP': '辩论家 - 聪明好奇的思想家',
+    'INFJ': '提倡者 - 安静而神秘且充满灵感',
+    'INFP': '调停者 - 诗意、善良且利他的人',
+    'ENFJ': '主人公 - 具有魅力且鼓舞人心的领导者',
+    'ENFP': '竞选者 - 热情、富有创造力和社交能力的自由人',
+    'ISTJ': '物流师 - 实际且注重事实的个人',
+    'ISFJ': '守卫者 - 非常专注且温暖的守护者',
+    'ESTJ': '总经理 - 出色的管理者',
+    'ESFJ': '执政官 - 极有同情心、受欢迎且乐于助人',
+    'ISTP': '鉴赏家 - 大胆而实际的实验者',
+    'ISFP': '探险家 - 灵活且富有魅力的艺术家',
+    'ESTP': '企业家 - 聪明、精力充沛且善于察言观色',
+    'ESFP': '表演者 - 自发的、精力充沛和热情的艺人'
+}
+
+
 # =====================================================
 # DISC 评分算法
 # =====================================================
@@ -164,59 +438,12 @@ def score_disc(answers: Dict[str, str], questions: List[Dict] = None) -> Dict:
     28道题，每个维度7道题
     量表评分规则：每题1-5分，每个维度最高35分
     """
-    
-    dimension_totals = {'D': 0, 'I': 0, 'S': 0, 'C': 0}
-    question_counts = {'D': 0, 'I': 0, 'S': 0, 'C': 0}
-    
-    # 构建题目ID到维度的映射
-    question_dimension_map = {}
-    if questions:
-        for q in questions:
-            q_id = str(q.get('id', '')).replace('disc_', '')
-            dimension = q.get('dimension', '')
-            if dimension in ['D', 'I', 'S', 'C']:
-                question_dimension_map[q_id] = dimension
-                # 也支持带前缀的ID
-                question_dimension_map[f"disc_{q_id}"] = dimension
-    
-    # 如果没有题目信息，使用默认映射（1-7=D, 8-14=I, 15-21=S, 22-28=C）
-    if not question_dimension_map:
-        for i in range(1, 8):
-            question_dimension_map[str(i)] = 'D'
-        for i in range(8, 15):
-            question_dimension_map[str(i)] = 'I'
-        for i in range(15, 22):
-            question_dimension_map[str(i)] = 'S'
-        for i in range(22, 29):
-            question_dimension_map[str(i)] = 'C'
-    
-    # DISC选项映射（用于选择题格式）
-    option_to_dimension = {'A': 'D', 'B': 'I', 'C': 'S', 'D': 'C'}
-    
-    # 遍历所有答案
-    for key, value in answers.items():
-        # 清理key
-        clean_key = str(key).replace('disc_', '')
-        
-        # 尝试获取维度
-        dimension = question_dimension_map.get(clean_key) or question_dimension_map.get(str(key))
-        
-        if dimension:
-            # 量表题格式：值是数字1-5
-            try:
-                score = int(value)
-                if 1 <= score <= 5:
-                    dimension_totals[dimension] += score
-                    question_counts[dimension] += 1
-                    continue
-            except (ValueError, TypeError):
-                pass
-        
-        # 选择题格式：值是A/B/C/D
-        answer = str(value).upper()
-        if answer in option_to_dimension:
-            dimension_totals[option_to_dimension[answer]] += 1
-            question_counts[option_to_dimension[answer]] += 1
+    return score_with_plan(compile_scoring_plan('DISC', questions), answers)
+
+
+def _disc_result(totals: List[int]) -> Dict:
+    """由各维度累计分生成 DISC 结果."""
+    dimension_totals = dict(zip(DISC_DIMENSIONS, totals))
     
     # 计算每个维度的百分比（相对于最大可能分）
     # 量表题：每个维度7题，每题最高5分，最高35分
@@ -225,7 +452,7 @@ def score_disc(answers: Dict[str, str], questions: List[Dict] = None) -> Dict:
     disc_dimensions = {}
     labels = {'D': '支配型', 'I': '影响型', 'S': '稳健型', 'C': '谨慎型'}
     
-    for dim in ['D', 'I', 'S', 'C']:
+    for dim in DISC_DIMENSIONS:
         raw = dimension_totals[dim]
         # 计算百分比
         pct = int((raw / max_per_dimension * 100)) if max_per_dimension > 0 else 0
@@ -275,98 +502,15 @@ def score_epq(answers: Dict[str, str], questions: List[Dict] = None) -> Dict:
     
     支持答案格式：{"1": "A"} 或 {"1": "是"} 或 {"epq_1": "yes"}
     """
-    
-    # 初始化各维度计数
-    dimension_counts = {
-        'E': {'yes': 0, 'total': 0},
-        'N': {'yes': 0, 'total': 0},
-        'P': {'yes': 0, 'total': 0},
-        'L': {'yes': 0, 'total': 0}
-    }
-    
-    # 如果有题目数据，根据题目的dimension字段来计分
-    if questions:
-        for q in questions:
-            q_id = str(q.get('id', ''))
-            dimension = q.get('dimension', '').upper()
-            
-            if dimension not in dimension_counts:
-                continue
-            
-            # 获取用户答案
-            answer = (
-                answers.get(q_id, '') or
-                answers.get(f'epq_{q_id}', '') or
-                answers.get(int(q_id) if q_id.isdigit() else q_id, '')
-            )
-            answer = str(answer).lower().strip()
-            
-            if not answer:
-                continue
-            
-            dimension_counts[dimension]['total'] += 1
-            
-            # 判断是否为"是"类答案（正向计分）
-            # 支持: A, 是, yes, true, 1, y
-            is_yes = answer in ['a', 'yes', 'true', '1', '是', 'y']
-            
-            # 检查题目是否为反向计分
-            reverse = q.get('reverse', False)
-            if reverse:
-                is_yes = not is_yes
-            
-            if is_yes:
-                dimension_counts[dimension]['yes'] += 1
-    else:
-        # 兼容旧逻辑：如果没有题目数据，尝试按题号范围分配
-        # 48题版本的范围
-        dimension_ranges_48 = {
-            'E': (1, 12),
-            'N': (13, 24),
-            'P': (25, 36),
-            'L': (37, 48)
-        }
-        # 88题版本的范围
-        dimension_ranges_88 = {
-            'E': (1, 21),
-            'N': (22, 45),
-            'P': (46, 68),
-            'L': (69, 88)
-        }
-        
-        # 检测是48题还是88题版本
-        max_question_id = 0
-        for key in answers.keys():
-            try:
-                q_id = int(str(key).replace('epq_', ''))
-                max_question_id = max(max_question_id, q_id)
-            except:
-                pass
-        
-        dimension_ranges = dimension_ranges_88 if max_question_id > 48 else dimension_ranges_48
-        
-        for dim_code, (start, end) in dimension_ranges.items():
-            for order in range(start, end + 1):
-                answer = (
-                    answers.get(str(order), '') or
-                    answers.get(f'epq_{order}', '') or
-                    answers.get(order, '')
-                )
-                answer = str(answer).lower().strip()
-                
-                if answer:
-                    dimension_counts[dim_code]['total'] += 1
-                    is_yes = answer in ['a', 'yes', 'true', '1', '是', 'y']
-                    if is_yes:
-                        dimension_counts[dim_code]['yes'] += 1
-    
+    return score_with_plan(compile_scoring_plan('EPQ', questions), answers)
+
+
+def _epq_result(yes_counts: List[int], total_counts: List[int]) -> Dict:
+    """由各维度"是"计数与答题数生成 EPQ 结果."""
     # 计算各维度结果
     dimension_results = {}
     
-    for dim_code in ['E', 'N', 'P', 'L']:
-        yes_count = dimension_counts[dim_code]['yes']
-        total_count = dimension_counts[dim_code]['total']
-        
+    for dim_code, yes_count, total_count in zip(EPQ_DIMENSIONS, yes_counts, total_counts):
         # 计算原始分和T分
         raw_score = yes_count
         if total_count > 0:
@@ -449,7 +593,8 @@ def _calculate_grade(score: int) -> str:
 def score_professional_assessment(
     questionnaire_type: str,
     answers: Dict[str, str],
-    questions: List[Dict] = None
+    questions: List[Dict] = None,
+    plan: Optional[ScoringPlan] = None
 ) -> Dict:
     """
     专业测评统一评分入口
@@ -458,12 +603,16 @@ def score_professional_assessment(
         questionnaire_type: 问卷类型 ('MBTI', 'DISC', 'EPQ')
         answers: 答案字典 {question_id: answer_value}
         questions: 题目列表，包含id和dimension等字段
+        plan: 问卷的预编译评分方案（get_scoring_plan），传入时忽略 questions
     
     Returns:
         评分结果字典，包含各维度分数和总分
     """
     type_upper = questionnaire_type.upper()
     
+    if plan is not None and plan.test_type == type_upper:
+        return score_with_plan(plan, answers)
+    
     if type_upper == 'MBTI':
         return score_mbti(answers, questions)
     elif type_upper == 'DISC':
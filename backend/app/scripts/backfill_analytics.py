@@ -0,0 +1,42 @@
+"""数据看板汇总回填脚本 - 从提交记录、特征表和匹配记录重建 analytics_daily_rollups / analytics_trait_rollups.
+
+首次部署或批量删除提交后执行。
+需先回填特征表（backfill_trait_features），否则雷达图与性格分布缺少历史特质数据。
+
+用法：
+    python -m app.scripts.backfill_analytics [--chunk-size N]
+"""
+
+import argparse
+import sys
+import os
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlmodel import Session
+
+from app.db import ensure_tables, get_engine
+from app.services.analytics_rollup import rebuild_analytics_rollups
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="数据看板汇总回填")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="每批读取的记录数")
+    args = parser.parse_args()
+
+    ensure_tables()
+    with Session(get_engine()) as session:
+        report = rebuild_analytics_rollups(session, chunk_size=args.chunk_size)
+
+    print("=" * 60)
+    print("数据看板汇总回填")
+    print("=" * 60)
+    print(f"📊 统计提交: {report['submissions']}")
+    print(f"🔗 统计匹配记录: {report['matches']}")
+    print(f"✅ 写入每日汇总: {report['daily_rows']}")
+    print(f"✅ 写入特质汇总: {report['trait_rows']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""特质特征回填脚本 - 为历史测评提交计算 submission_trait_features.
+
+用法：
+    python -m app.scripts.backfill_trait_features [--batch-size N] [--rebuild]
+"""
+
+import argparse
+import sys
+import os
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlmodel import Session
+
+from app.db import ensure_tables, get_engine
+from app.api.candidates.trait_features import backfill_trait_features
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="测评特质特征回填")
+    parser.add_argument("--batch-size", type=int, default=500, help="每批处理的提交数")
+    parser.add_argument("--rebuild", action="store_true", help="重算全部已完成提交")
+    args = parser.parse_args()
+
+    ensure_tables()
+    with Session(get_engine()) as session:
+        report = backfill_trait_features(session, batch_size=args.batch_size, rebuild=args.rebuild)
+
+    print("=" * 60)
+    print("测评特质特征回填" + ("（全部重算）" if args.rebuild else ""))
+    print("=" * 60)
+    print(f"📊 待处理提交: {report['scanned']}")
+    print(f"✅ 写入特征: {report['updated']}")
+
+
+if __name__ == "__main__":
+    main()
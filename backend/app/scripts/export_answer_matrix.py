@@ -0,0 +1,68 @@
+"""答案宽表导出脚本 - 按问卷导出题目级答案宽表与列字典（供人才分析使用）.
+
+每个问卷输出两个文件：
+    questionnaire_<ID>.csv|parquet        一行一份已完成提交，一列一道题，附特质得分
+    questionnaire_<ID>_dictionary.csv     列字典（题目内容、题型、维度、选项）
+
+用法：
+    python -m app.scripts.export_answer_matrix --output-dir exports [--questionnaire-id N ...] [--format csv|parquet]
+"""
+
+import argparse
+import sys
+import os
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlmodel import Session, select
+
+from app.db import ensure_tables, get_engine
+from app.models_assessment import Questionnaire
+from app.api.assessments.answer_matrix import (
+    MATRIX_CHUNK_SIZE,
+    build_answer_matrix,
+    dictionary_csv,
+    parquet_available,
+    write_matrix_csv,
+    write_matrix_parquet,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="答案宽表导出")
+    parser.add_argument("--output-dir", required=True, help="输出目录")
+    parser.add_argument("--questionnaire-id", type=int, action="append", help="只导出指定问卷（可重复）")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="导出格式")
+    parser.add_argument("--chunk-size", type=int, default=MATRIX_CHUNK_SIZE, help="每批读取的提交数")
+    args = parser.parse_args()
+
+    if args.format == "parquet" and not parquet_available():
+        print("❌ 需要安装pyarrow库来导出Parquet文件")
+        sys.exit(1)
+
+    ensure_tables()
+    os.makedirs(args.output_dir, exist_ok=True)
+    print("=" * 60)
+    print("答案宽表导出")
+    print("=" * 60)
+    with Session(get_engine()) as session:
+        stmt = select(Questionnaire).order_by(Questionnaire.id)
+        if args.questionnaire_id:
+            stmt = stmt.where(Questionnaire.id.in_(args.questionnaire_id))
+        questionnaires = session.exec(stmt).all()
+        for questionnaire in questionnaires:
+            matrix = build_answer_matrix(questionnaire)
+            base = os.path.join(args.output_dir, f"questionnaire_{questionnaire.id}")
+            with open(f"{base}_dictionary.csv", "w", encoding="utf-8-sig", newline="") as f:
+                f.write(dictionary_csv(matrix))
+            path = f"{base}.{args.format}"
+            write = write_matrix_parquet if args.format == "parquet" else write_matrix_csv
+            with open(path, "wb") as f:
+                rows = write(session, matrix, f, args.chunk_size)
+            print(f"✅ {questionnaire.name}: {rows} 行 × {len(matrix.columns)} 列 → {path}")
+    print(f"📋 问卷: {len(questionnaires)}")
+
+
+if __name__ == "__main__":
+    main()
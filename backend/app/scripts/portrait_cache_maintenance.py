@@ -0,0 +1,65 @@
+"""画像缓存维护脚本 - 回收 portrait_cache 表空间.
+
+用法：
+    python -m app.scripts.portrait_cache_maintenance [--dry-run] [--max-bytes N]
+        [--max-rows-per-candidate N] [--enable-incremental-vacuum]
+"""
+
+import argparse
+import sys
+import os
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlmodel import Session
+
+from app.db import get_engine
+from app.api.candidates.cache_maintenance import (
+    enable_sqlite_incremental_vacuum,
+    run_cache_maintenance,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="画像缓存维护")
+    parser.add_argument("--dry-run", action="store_true", help="只统计不删除")
+    parser.add_argument("--max-bytes", type=int, default=None, help="总字节预算")
+    parser.add_argument("--max-rows-per-candidate", type=int, default=None, help="每个候选人最多保留条数")
+    parser.add_argument(
+        "--enable-incremental-vacuum",
+        action="store_true",
+        help="SQLite：切换为 auto_vacuum=INCREMENTAL（执行一次完整 VACUUM）"
+    )
+    args = parser.parse_args()
+
+    if args.enable_incremental_vacuum:
+        if enable_sqlite_incremental_vacuum():
+            print("✅ 已启用 SQLite auto_vacuum=INCREMENTAL")
+        else:
+            print("ℹ️ 非 SQLite 数据库，跳过")
+
+    with Session(get_engine()) as session:
+        report = run_cache_maintenance(
+            session,
+            max_total_bytes=args.max_bytes,
+            max_rows_per_candidate=args.max_rows_per_candidate,
+            dry_run=args.dry_run,
+        )
+
+    print("=" * 60)
+    print("画像缓存维护" + ("（dry-run）" if args.dry_run else ""))
+    print("=" * 60)
+    print(f"📊 扫描记录: {report['rows_scanned']}")
+    print(f"🗑️ 候选人已删除: {report['deleted_orphan']}")
+    print(f"🗑️ 重复记录: {report['deleted_duplicate']}")
+    print(f"🗑️ 版本过期且超过最长过期时长: {report['deleted_expired']}")
+    print(f"🗑️ 超过单候选人条数上限: {report['deleted_over_candidate_limit']}")
+    print(f"🗑️ 超过总字节预算: {report['deleted_over_budget']}")
+    print(f"💾 回收数据字节: {report['reclaimed_bytes']}")
+    print(f"💾 SQLite 归还磁盘字节: {report['vacuum_reclaimed_bytes']}")
+    print(f"📦 剩余数据字节: {report['remaining_bytes']}")
+
+
+if __name__ == "__main__":
+    main()
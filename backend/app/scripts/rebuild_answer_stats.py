@@ -0,0 +1,42 @@
+"""题目答案统计重建脚本 - 从提交记录重建 question_answer_counts / questionnaire_daily_stats.
+
+首次部署或批量删除提交后执行。
+
+用法：
+    python -m app.scripts.rebuild_answer_stats [--questionnaire-id N ...] [--chunk-size N]
+"""
+
+import argparse
+import sys
+import os
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlmodel import Session
+
+from app.db import ensure_tables, get_engine
+from app.api.assessments.answer_stats import rebuild_answer_stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="题目答案统计重建")
+    parser.add_argument("--questionnaire-id", type=int, action="append", help="只重建指定问卷（可重复）")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="每批读取的提交数")
+    args = parser.parse_args()
+
+    ensure_tables()
+    with Session(get_engine()) as session:
+        report = rebuild_answer_stats(session, questionnaire_ids=args.questionnaire_id, chunk_size=args.chunk_size)
+
+    print("=" * 60)
+    print("题目答案统计重建")
+    print("=" * 60)
+    print(f"📋 问卷: {report['questionnaires']}")
+    print(f"📊 统计提交: {report['submissions']}")
+    print(f"✅ 写入答案计数: {report['answer_counts']}")
+    print(f"✅ 写入每日汇总: {report['daily_stats']}")
+
+
+if __name__ == "__main__":
+    main()
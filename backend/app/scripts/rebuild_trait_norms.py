@@ -0,0 +1,41 @@
+"""特质常模重建脚本 - 从特质特征表全量重建 trait_norms.
+
+首次部署或删除大量提交后执行。
+
+用法：
+    python -m app.scripts.rebuild_trait_norms [--chunk-size N]
+"""
+
+import argparse
+import sys
+import os
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlmodel import Session
+
+from app.db import ensure_tables, get_engine
+from app.api.candidates.trait_norms import rebuild_trait_norms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="特质常模重建")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="每批读取的提交数")
+    args = parser.parse_args()
+
+    ensure_tables()
+    with Session(get_engine()) as session:
+        report = rebuild_trait_norms(session, chunk_size=args.chunk_size)
+
+    print("=" * 60)
+    print("特质常模重建")
+    print("=" * 60)
+    print(f"📊 统计提交: {report['submissions']}")
+    print(f"✅ 写入分布: {report['norms']}")
+    if report["missing_features"]:
+        print(f"⚠️ 缺少特征: {report['missing_features']}（先运行 python -m app.scripts.backfill_trait_features）")
+
+
+if __name__ == "__main__":
+    main()
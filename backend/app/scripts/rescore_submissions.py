@@ -0,0 +1,85 @@
+"""测评重新评分脚本 - 按当前问卷定义与评分算法重新计算历史提交的得分.
+
+用法：
+    python -m app.scripts.rescore_submissions [--questionnaire-id ID ...]
+        [--from 2025-01-01] [--to 2025-07-01] [--dry-run] [--workers N] [--chunk-size N]
+"""
+
+import argparse
+import json
+import logging
+import sys
+import os
+from datetime import datetime
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlmodel import Session
+
+from app.db import get_engine
+from app.api.assessments.scoring_pipeline import RescoreProgress, rescore_submissions
+
+
+def _print_progress(progress: RescoreProgress) -> None:
+    eta = progress.eta_seconds
+    eta_text = f"剩余约 {eta:.0f}s" if eta is not None else "剩余时间估算中"
+    print(
+        f"\r⏳ {progress.processed}/{progress.total} "
+        f"| {progress.rate:.0f} 条/秒 | 变化 {progress.changed} | 失败 {progress.failed} | {eta_text}",
+        end="",
+        flush=True,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="测评提交重新评分")
+    parser.add_argument("--questionnaire-id", type=int, action="append", help="只处理指定问卷（可重复）")
+    parser.add_argument("--from", dest="submitted_from", type=datetime.fromisoformat, help="提交时间下限（含）")
+    parser.add_argument("--to", dest="submitted_to", type=datetime.fromisoformat, help="提交时间上限（不含）")
+    parser.add_argument("--dry-run", action="store_true", help="只输出差异报告，不写库")
+    parser.add_argument("--workers", type=int, default=None, help="评分进程数（默认CPU核数）")
+    parser.add_argument("--chunk-size", type=int, default=500, help="每块的提交数")
+    parser.add_argument("--diff-limit", type=int, default=20, help="输出的差异样例数")
+    args = parser.parse_args()
+    # 进度由本脚本输出
+    logging.getLogger("app.api.assessments.scoring_pipeline").setLevel(logging.WARNING)
+
+    with Session(get_engine()) as session:
+        report = rescore_submissions(
+            session,
+            questionnaire_ids=args.questionnaire_id,
+            submitted_from=args.submitted_from,
+            submitted_to=args.submitted_to,
+            dry_run=args.dry_run,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            diff_limit=args.diff_limit,
+            on_progress=_print_progress,
+        )
+
+    print()
+    print("=" * 60)
+    print("测评提交重新评分" + ("（试运行）" if report.dry_run else ""))
+    print("=" * 60)
+    print(f"📊 扫描提交: {report.scanned}")
+    print(f"🔄 结果变化: {report.changed}" + ("" if report.dry_run else "（已写回）"))
+    print(f"✅ 无变化: {report.unchanged}")
+    print(f"❌ 评分失败: {report.failed}")
+    print(f"⏱️ 耗时: {report.elapsed_seconds}s")
+    for name, count in sorted(report.field_changes.items()):
+        print(f"   - {name}: {count}")
+    if report.diffs:
+        print("\n差异样例:")
+        for diff in report.diffs:
+            print(json.dumps(diff, ensure_ascii=False, default=str))
+    if report.errors:
+        print("\n失败样例:")
+        for error in report.errors:
+            print(json.dumps(error, ensure_ascii=False))
+    if report.changed and not report.dry_run:
+        print("\n💡 答案统计、数据看板汇总与特质常模已随写回同步更新，无需重建")
+
+
+if __name__ == "__main__":
+    main()
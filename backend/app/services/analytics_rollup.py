@@ -0,0 +1,554 @@
+"""
+数据看板汇总
+按 日期 × 应聘岗位 × 测评类型 增量维护汇总行，看板对日期范围内的汇总行求和：
+- analytics_daily_rollups: 完成测评数、首次测评的候选人数、匹配记录的当前分数分布（按记录创建日期）
+- analytics_trait_rollups: 各特质得分和、样本数、高分/低分人数
+
+写入方（与业务数据同一事务，不提交）：
+- 测评提交完成：record_submission_rollup
+- 写入匹配记录：record_match_scores（新建记录计入；已有记录的重新计算扣除旧分数、计入新分数）
+- 按主键重算匹配记录：record_rescored_matches（扣除旧分数、计入新分数）
+- 删除提交或匹配记录：remove_submission_rollup / remove_match_rollups（删除前扣除）
+- 重新评分后特质向量变化：record_trait_rollups（旧向量扣除、新向量计入）
+查询方：get_analytics_summary，耗时与日期范围内的汇总行数相关，与历史数据量无关。
+历史数据通过 python -m app.scripts.backfill_analytics 回填（重建全部汇总）。
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import delete, func
+from sqlmodel import Session, select
+
+from app.db import upsert_rows
+from app.models import ProfileMatch
+from app.models_assessment import (
+    AnalyticsDailyRollup,
+    AnalyticsTraitRollup,
+    Questionnaire,
+    Submission,
+    SubmissionTraitFeature,
+)
+from app.schemas import AnalyticsSummary, PositionBucket, RadarIndicator, RadarSeries, TrendSeries
+from app.api.candidates.dimension_mapping import TRAIT_AXIS
+from app.api.candidates.trait_features import FEATURE_VERSION, unpack_trait_vector
+from app.api.candidates.trait_norms import TRAIT_LABELS, normalize_segment
+
+logger = logging.getLogger(__name__)
+
+# 默认统计范围（天）
+DEFAULT_RANGE_DAYS = 90
+# 岗位分布最多展示的岗位数（其余合并为"其他"）
+MAX_POSITION_BUCKETS = 8
+# 特质高分/低分阈值（0-100）
+HIGH_TRAIT_SCORE = 60
+LOW_TRAIT_SCORE = 40
+# 雷达图可选的测评类型（取范围内样本最多的一种）
+RADAR_TEST_TYPES = ("epq", "mbti", "disc")
+# 趋势窗口：(标签, 天数)，以统计范围的结束日期为终点
+TREND_WINDOWS = (("近1周", 7), ("近1月", 30), ("近3月", 90))
+# 性格分布使用的外向性特质
+EXTRAVERSION_TRAITS = ("mbti:E", "epq:E")
+
+_DAILY_COUNTERS = (
+    "submissions", "new_candidates", "match_count", "match_score_sum",
+    "match_ge_90", "match_80_90", "match_70_80", "match_lt_70",
+)
+_TRAIT_COUNTERS = ("score_sum", "score_count", "high_count", "low_count")
+_MATCH_BUCKETS = (("match_ge_90", ">90"), ("match_80_90", "80-90"), ("match_70_80", "70-80"), ("match_lt_70", "<70"))
+_QUERY_CHUNK_SIZE = 500
+
+RollupKey = Tuple[date, str, str]  # (日期, 应聘岗位, 测评类型)
+
+
+def _match_bucket(score: float) -> str:
+    if score >= 90:
+        return "match_ge_90"
+    if score >= 80:
+        return "match_80_90"
+    if score >= 70:
+        return "match_70_80"
+    return "match_lt_70"
+
+
+def _empty_daily() -> Dict[str, float]:
+    return {name: 0 for name in _DAILY_COUNTERS}
+
+
+def _empty_trait() -> Dict[str, float]:
+    return {name: 0 for name in _TRAIT_COUNTERS}
+
+
+def _add_traits(
+    traits: Dict[Tuple[RollupKey, str], Dict[str, float]],
+    key: RollupKey,
+    trait_values: Optional[bytes],
+    trait_mask: Optional[int],
+    sign: int = 1
+) -> None:
+    if trait_values is None:
+        return
+    values, mask = unpack_trait_vector(trait_values, trait_mask or 0)
+    for index in np.flatnonzero(mask):
+        score = float(values[index])
+        row = traits.setdefault((key, TRAIT_AXIS[index]), _empty_trait())
+        row["score_sum"] += sign * score
+        row["score_count"] += sign
+        row["high_count"] += sign * (score >= HIGH_TRAIT_SCORE)
+        row["low_count"] += sign * (score <= LOW_TRAIT_SCORE)
+
+
+def _write_rollups(
+    session: Session,
+    daily: Dict[RollupKey, Dict[str, float]],
+    traits: Dict[Tuple[RollupKey, str], Dict[str, float]]
+) -> None:
+    upsert_rows(
+        session,
+        AnalyticsDailyRollup,
+        [
+            {"day": day, "position": position, "test_type": test_type, **values}
+            for (day, position, test_type), values in daily.items()
+        ],
+        conflict_columns=["day", "position", "test_type"],
+        increment_columns=list(_DAILY_COUNTERS),
+    )
+    upsert_rows(
+        session,
+        AnalyticsTraitRollup,
+        [
+            {"day": day, "position": position, "test_type": test_type, "trait": trait, **values}
+            for ((day, position, test_type), trait), values in traits.items()
+        ],
+        conflict_columns=["day", "position", "test_type", "trait"],
+        increment_columns=list(_TRAIT_COUNTERS),
+    )
+
+
+def rollup_key(day: date, target_position: Optional[str], test_type: Optional[str]) -> RollupKey:
+    return day, normalize_segment(target_position), (test_type or "").lower()
+
+
+def record_submission_rollup(
+    session: Session,
+    submission: Submission,
+    test_type: Optional[str],
+    feature: Optional[SubmissionTraitFeature] = None,
+    new_candidate: bool = False,
+    sign: int = 1
+) -> None:
+    """将一条已完成提交计入（sign=-1 时扣除）看板汇总（不提交事务）.
+
+    Args:
+        session: 数据库会话
+        submission: 已完成的提交记录
+        test_type: 问卷类型
+        feature: 提交的特质特征（计入特质汇总）
+        new_candidate: 是否为该候选人首次完成测评
+        sign: 1 计入，-1 扣除
+    """
+    if submission.status != "completed" or submission.submitted_at is None:
+        return
+    key = rollup_key(submission.submitted_at.date(), submission.target_position, test_type)
+    daily = _empty_daily()
+    daily["submissions"] = sign
+    daily["new_candidates"] = sign if new_candidate else 0
+    traits: Dict[Tuple[RollupKey, str], Dict[str, float]] = {}
+    if feature is not None:
+        _add_traits(traits, key, feature.trait_values, feature.trait_mask, sign)
+    _write_rollups(session, {key: daily}, traits)
+
+
+def record_trait_rollups(
+    session: Session,
+    vectors: Sequence[Tuple[RollupKey, Optional[bytes], Optional[int]]],
+    sign: int = 1
+) -> None:
+    """将已完成提交的特质向量计入（sign=-1 时扣除）特质汇总（不提交事务）.
+
+    Args:
+        session: 数据库会话
+        vectors: [(汇总键 rollup_key(提交日期, 应聘岗位, 问卷类型), 特质向量字节, 可用特质位掩码)]
+        sign: 1 计入，-1 扣除
+    """
+    traits: Dict[Tuple[RollupKey, str], Dict[str, float]] = {}
+    for key, trait_values, trait_mask in vectors:
+        _add_traits(traits, key, trait_values, trait_mask, sign)
+    _write_rollups(session, {}, traits)
+
+
+def is_first_completed_submission(session: Session, submission: Submission) -> bool:
+    """提交是否为所属候选人的第一条已完成提交（新提交完成时调用：候选人没有其他已完成提交）."""
+    if submission.candidate_id is None:
+        return False
+    return _next_completed_submission(session, submission) is None
+
+
+def _next_completed_submission(session: Session, submission: Submission):
+    """候选人除该提交外最早的已完成提交 (id, submitted_at, target_position, 问卷类型)."""
+    return session.exec(
+        select(Submission.id, Submission.submitted_at, Submission.target_position, Questionnaire.type)
+        .join(Questionnaire, Questionnaire.id == Submission.questionnaire_id, isouter=True)
+        .where(
+            Submission.candidate_id == submission.candidate_id,
+            Submission.status == "completed",
+            Submission.submitted_at.is_not(None),
+            Submission.id != submission.id,
+        )
+        .order_by(Submission.submitted_at, Submission.id)
+        .limit(1)
+    ).first()
+
+
+def remove_submission_rollup(session: Session, submission: Submission, test_type: Optional[str]) -> None:
+    """删除提交前从看板汇总中扣除（不提交事务）.
+
+    被删除的是候选人最早的已完成提交时，首次测评人数转记到候选人下一条已完成提交上
+    （没有其他提交时直接扣除），与 rebuild_analytics_rollups 的口径一致。
+    """
+    if submission.status != "completed" or submission.submitted_at is None:
+        return
+    feature = session.exec(
+        select(SubmissionTraitFeature).where(
+            SubmissionTraitFeature.submission_id == submission.id,
+            SubmissionTraitFeature.feature_version == FEATURE_VERSION,
+        )
+    ).first()
+    first = False
+    if submission.candidate_id is not None:
+        following = _next_completed_submission(session, submission)
+        first = following is None or (submission.submitted_at, submission.id) < (following.submitted_at, following.id)
+        if first and following is not None:
+            daily = _empty_daily()
+            daily["new_candidates"] = 1
+            key = rollup_key(following.submitted_at.date(), following.target_position, following.type)
+            _write_rollups(session, {key: daily}, {})
+    record_submission_rollup(session, submission, test_type, feature=feature, new_candidate=first, sign=-1)
+
+
+def record_match_scores(
+    session: Session,
+    profile_id: int,
+    scores: Sequence[Tuple[int, float]],
+    created_at: Optional[datetime] = None
+) -> int:
+    """将即将写入的匹配分数计入看板汇总（在按 (profile_id, submission_id) 写入匹配记录之前调用，不提交事务）.
+
+    新建的匹配记录按创建日期计入；已存在的记录按其创建日期扣除旧分数、计入新分数
+    （匹配数不变，分数和与分数段随之调整），与 rebuild_analytics_rollups 按当前分数统计的口径一致。
+
+    Args:
+        session: 数据库会话
+        profile_id: 岗位画像ID
+        scores: [(submission_id, match_score)]
+        created_at: 新建记录的创建时间（默认当前UTC时间，与 ProfileMatch.created_at 一致）
+
+    Returns:
+        计入的新建匹配数
+    """
+    if not scores:
+        return 0
+    day = (created_at or datetime.utcnow()).date()
+    submission_ids = [sid for sid, _ in scores]
+    existing = {}
+    submissions: Dict[int, Tuple[Optional[str], str]] = {}
+    for start in range(0, len(submission_ids), _QUERY_CHUNK_SIZE):
+        chunk = submission_ids[start:start + _QUERY_CHUNK_SIZE]
+        for row in session.exec(
+            _select_matches(ProfileMatch.profile_id == profile_id, ProfileMatch.submission_id.in_(chunk))
+        ).all():
+            existing[row.submission_id] = row
+        new_ids = [sid for sid in chunk if sid not in existing]
+        if not new_ids:
+            continue
+        for sid, position, q_type in session.exec(
+            select(Submission.id, Submission.target_position, Questionnaire.type)
+            .join(Questionnaire, Questionnaire.id == Submission.questionnaire_id, isouter=True)
+            .where(Submission.id.in_(new_ids))
+        ).all():
+            submissions[sid] = (position, q_type or "")
+
+    daily: Dict[RollupKey, Dict[str, float]] = {}
+    recorded = 0
+    for sid, score in scores:
+        if sid in existing:
+            _replace_match_score(daily, existing[sid], float(score))
+            continue
+        position, q_type = submissions.get(sid, (None, ""))
+        _add_match(daily, rollup_key(day, position, q_type), float(score))
+        recorded += 1
+    _write_rollups(session, daily, {})
+    return recorded
+
+
+def record_rescored_matches(session: Session, scores: Sequence[Tuple[int, float]]) -> None:
+    """按主键改写匹配分数之前调用：扣除旧分数、计入新分数（不提交事务）.
+
+    Args:
+        session: 数据库会话
+        scores: [(匹配记录ID, 新的 match_score)]
+    """
+    daily: Dict[RollupKey, Dict[str, float]] = {}
+    for start in range(0, len(scores), _QUERY_CHUNK_SIZE):
+        chunk = dict(scores[start:start + _QUERY_CHUNK_SIZE])
+        for row in session.exec(_select_matches(ProfileMatch.id.in_(list(chunk)))).all():
+            _replace_match_score(daily, row, float(chunk[row.id]))
+    _write_rollups(session, daily, {})
+
+
+def remove_match_rollups(session: Session, *criteria) -> int:
+    """删除匹配记录前从看板汇总中扣除（不提交事务）.
+
+    与 rebuild_analytics_rollups 的口径一致：按匹配记录的创建日期 × 提交的应聘岗位 × 问卷类型，
+    扣除当前匹配分数。
+
+    Args:
+        session: 数据库会话
+        criteria: 待删除匹配记录的筛选条件（如 ProfileMatch.profile_id == profile_id）
+
+    Returns:
+        扣除的匹配记录数
+    """
+    rows = session.exec(_select_matches(*criteria)).all()
+    daily: Dict[RollupKey, Dict[str, float]] = {}
+    for row in rows:
+        _add_match(daily, _match_key(row), float(row.match_score or 0), sign=-1)
+    _write_rollups(session, daily, {})
+    return len(rows)
+
+
+def _select_matches(*criteria):
+    """匹配记录及其汇总键所需的提交字段."""
+    return (
+        select(
+            ProfileMatch.id,
+            ProfileMatch.submission_id,
+            ProfileMatch.match_score,
+            ProfileMatch.created_at,
+            Submission.target_position,
+            Questionnaire.type,
+        )
+        .join(Submission, Submission.id == ProfileMatch.submission_id, isouter=True)
+        .join(Questionnaire, Questionnaire.id == Submission.questionnaire_id, isouter=True)
+        .where(*criteria)
+    )
+
+
+def _match_key(row) -> RollupKey:
+    return rollup_key((row.created_at or datetime.utcnow()).date(), row.target_position, row.type)
+
+
+def _replace_match_score(daily: Dict[RollupKey, Dict[str, float]], row, score: float) -> None:
+    old = float(row.match_score or 0)
+    if old == score:
+        return
+    key = _match_key(row)
+    _add_match(daily, key, old, sign=-1)
+    _add_match(daily, key, score)
+
+
+def _add_match(daily: Dict[RollupKey, Dict[str, float]], key: RollupKey, score: float, sign: int = 1) -> None:
+    row = daily.setdefault(key, _empty_daily())
+    row["match_count"] += sign
+    row["match_score_sum"] += sign * score
+    row[_match_bucket(score)] += sign
+
+
+def rebuild_analytics_rollups(session: Session, chunk_size: int = _QUERY_CHUNK_SIZE * 4) -> Dict[str, int]:
+    """从提交记录、特征表和匹配记录重建全部看板汇总.
+
+    Returns:
+        重建报告 {"submissions": N, "matches": M, "daily_rows": D, "trait_rows": T}
+    """
+    daily: Dict[RollupKey, Dict[str, float]] = defaultdict(_empty_daily)
+    traits: Dict[Tuple[RollupKey, str], Dict[str, float]] = {}
+    first_submission: Dict[int, Tuple[datetime, int, RollupKey]] = {}
+    report = {"submissions": 0, "matches": 0, "daily_rows": 0, "trait_rows": 0}
+
+    result = session.exec(
+        select(
+            Submission.id,
+            Submission.candidate_id,
+            Submission.target_position,
+            Submission.submitted_at,
+            Questionnaire.type,
+            SubmissionTraitFeature.trait_values,
+            SubmissionTraitFeature.trait_mask,
+            SubmissionTraitFeature.feature_version,
+        )
+        .join(Questionnaire, Questionnaire.id == Submission.questionnaire_id, isouter=True)
+        .outerjoin(SubmissionTraitFeature, SubmissionTraitFeature.submission_id == Submission.id)
+        .where(Submission.status == "completed", Submission.submitted_at.is_not(None))
+        .execution_options(yield_per=chunk_size)
+    )
+    for rows in result.partitions():
+        for row in rows:
+            report["submissions"] += 1
+            key = rollup_key(row.submitted_at.date(), row.target_position, row.type)
+            daily[key]["submissions"] += 1
+            if row.feature_version == FEATURE_VERSION:
+                _add_traits(traits, key, row.trait_values, row.trait_mask)
+            if row.candidate_id is not None:
+                first = first_submission.get(row.candidate_id)
+                if first is None or (row.submitted_at, row.id) < first[:2]:
+                    first_submission[row.candidate_id] = (row.submitted_at, row.id, key)
+    for _, _, key in first_submission.values():
+        daily[key]["new_candidates"] += 1
+
+    result = session.exec(_select_matches().execution_options(yield_per=chunk_size))
+    for rows in result.partitions():
+        for row in rows:
+            report["matches"] += 1
+            _add_match(daily, _match_key(row), float(row.match_score or 0))
+
+    session.exec(delete(AnalyticsDailyRollup))
+    session.exec(delete(AnalyticsTraitRollup))
+    _write_rollups(session, dict(daily), traits)
+    session.commit()
+    report["daily_rows"] = len(daily)
+    report["trait_rows"] = len(traits)
+    logger.info(f"✅ 数据看板汇总重建完成: {report['submissions']} 条提交, {report['matches']} 条匹配记录")
+    return report
+
+
+TraitStats = Dict[Tuple[str, str], Tuple[float, int, int, int]]
+
+
+def _trait_stats(
+    session: Session,
+    date_from: date,
+    date_to: date,
+    filters: List,
+    by_position: bool = False
+) -> TraitStats:
+    """范围内各特质的 (得分和, 样本数, 高分数, 低分数)，键为 (应聘岗位, 特质)；不按岗位分组时岗位为 ""."""
+    group = [AnalyticsTraitRollup.trait] + ([AnalyticsTraitRollup.position] if by_position else [])
+    stmt = select(
+        *group,
+        func.sum(AnalyticsTraitRollup.score_sum),
+        func.sum(AnalyticsTraitRollup.score_count),
+        func.sum(AnalyticsTraitRollup.high_count),
+        func.sum(AnalyticsTraitRollup.low_count),
+    ).where(
+        AnalyticsTraitRollup.day >= date_from,
+        AnalyticsTraitRollup.day <= date_to,
+        *[f(AnalyticsTraitRollup) for f in filters],
+    ).group_by(*group)
+    stats: TraitStats = {}
+    for row in session.exec(stmt).all():
+        trait, position = row[0], (row[1] if by_position else "")
+        total, count, high, low = row[-4:]
+        stats[(position, trait)] = (float(total or 0), int(count or 0), int(high or 0), int(low or 0))
+    return stats
+
+
+def _trait_average(stats: TraitStats, position: str, trait: str) -> float:
+    total, count, _, _ = stats.get((position, trait), (0.0, 0, 0, 0))
+    return round(total / count, 1) if count else 0.0
+
+
+def _trait_count(stats: TraitStats, trait: str, field: int = 1) -> int:
+    return stats.get(("", trait), (0.0, 0, 0, 0))[field]
+
+
+def get_analytics_summary(
+    session: Session,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    position: Optional[str] = None,
+    test_type: Optional[str] = None
+) -> AnalyticsSummary:
+    """数据看板汇总（对日期范围内的汇总行求和）.
+
+    Args:
+        session: 数据库会话
+        date_from: 开始日期（默认结束日期前 DEFAULT_RANGE_DAYS 天）
+        date_to: 结束日期（默认今天）
+        position: 只统计该应聘岗位
+        test_type: 只统计该测评类型
+    """
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    filters = []
+    if position is not None:
+        filters.append(lambda model: model.position == normalize_segment(position))
+    if test_type:
+        filters.append(lambda model: model.test_type == test_type.lower())
+
+    # 岗位分布与匹配分布
+    daily_filter = [
+        AnalyticsDailyRollup.day >= date_from,
+        AnalyticsDailyRollup.day <= date_to,
+        *[f(AnalyticsDailyRollup) for f in filters],
+    ]
+    sums = [func.sum(getattr(AnalyticsDailyRollup, name)) for name in _DAILY_COUNTERS]
+    position_rows = session.exec(
+        select(AnalyticsDailyRollup.position, *sums).where(*daily_filter).group_by(AnalyticsDailyRollup.position)
+    ).all()
+    totals = {name: 0 for name in _DAILY_COUNTERS}
+    position_counts: List[Tuple[str, int]] = []
+    for row in position_rows:
+        for name, value in zip(_DAILY_COUNTERS, row[1:]):
+            totals[name] += value or 0
+        if row[1]:
+            position_counts.append((row[0] or "未填写", int(row[1])))
+    position_counts.sort(key=lambda item: item[1], reverse=True)
+    position_distribution = [PositionBucket(name=name, value=count) for name, count in position_counts[:MAX_POSITION_BUCKETS]]
+    other = sum(count for _, count in position_counts[MAX_POSITION_BUCKETS:])
+    if other:
+        position_distribution.append(PositionBucket(name="其他", value=other))
+
+    match_distribution = [PositionBucket(name=label, value=int(totals[name])) for name, label in _MATCH_BUCKETS]
+
+    # 雷达图：范围内样本最多的测评类型的各特质平均分（全体 + 人数最多的两个岗位）
+    overall = _trait_stats(session, date_from, date_to, filters)
+    radar_type = max(
+        RADAR_TEST_TYPES,
+        key=lambda q_type: sum(_trait_count(overall, t) for t in TRAIT_AXIS if t.startswith(f"{q_type}:"))
+    )
+    radar_traits = [t for t in TRAIT_AXIS if t.startswith(f"{radar_type}:")]
+
+    radar_series = [RadarSeries(name="全部候选人", value=[_trait_average(overall, "", t) for t in radar_traits])]
+    if position is None and position_counts:
+        by_position = _trait_stats(session, date_from, date_to, filters, by_position=True)
+        for name, _ in position_counts[:2]:
+            key = "" if name == "未填写" else name
+            if any((key, t) in by_position for t in radar_traits):
+                radar_series.append(
+                    RadarSeries(name=name, value=[_trait_average(by_position, key, t) for t in radar_traits])
+                )
+
+    # 性格分布：外向性高分/低分人数
+    high = sum(_trait_count(overall, t, 2) for t in EXTRAVERSION_TRAITS)
+    low = sum(_trait_count(overall, t, 3) for t in EXTRAVERSION_TRAITS)
+    samples = sum(_trait_count(overall, t) for t in EXTRAVERSION_TRAITS)
+    personality_pie = [
+        PositionBucket(name="外向型", value=high),
+        PositionBucket(name="内向型", value=low),
+        PositionBucket(name="中性", value=samples - high - low),
+    ]
+
+    # 特质趋势：以结束日期为终点的各窗口平均分
+    windows = [
+        _trait_stats(session, date_to - timedelta(days=days - 1), date_to, filters)
+        for _, days in TREND_WINDOWS
+    ]
+    trend_series = [
+        TrendSeries(name=TRAIT_LABELS.get(t, t), data=[_trait_average(w, "", t) for w in windows])
+        for t in radar_traits
+    ]
+
+    return AnalyticsSummary(
+        positionDistribution=position_distribution,
+        matchDistribution=match_distribution,
+        radarIndicators=[RadarIndicator(name=TRAIT_LABELS.get(t, t), max=100) for t in radar_traits],
+        radarSeries=radar_series,
+        personalityPie=personality_pie,
+        dimensionTrendLabels=[label for label, _ in TREND_WINDOWS],
+        dimensionTrendSeries=trend_series,
+        totalCandidates=int(totals["new_candidates"]),
+        avgScore=round(totals["match_score_sum"] / totals["match_count"], 1) if totals["match_count"] else None,
+    )
@@ -40,6 +40,14 @@ class CrossValidationService:
         }
     }
     
+    # 特质轴上的 MBTI 特质 → 维度键
+    MBTI_TRAIT_KEYS = {
+        'E': 'E-I',
+        'S': 'S-N',
+        'T': 'T-F',
+        'J': 'J-P'
+    }
+    
     @classmethod
     def calculate_cross_validation(
         cls,
@@ -106,7 +114,10 @@ class CrossValidationService:
             # 获取该测评的维度分数
             dimensions = {}
             
-            if q_type == 'MBTI':
+            if 'traits' in sub:
+                # 特质特征表的向量（{"mbti:E": 72, "disc:D": 65, ...}）
+                dimensions = cls._dimensions_from_traits(q_type, sub['traits'])
+            elif q_type == 'MBTI':
                 dimensions = cls._extract_mbti_dimensions(sub)
             elif q_type == 'EPQ':
                 dimensions = cls._extract_epq_dimensions(sub)
@@ -121,6 +132,22 @@ class CrossValidationService:
         
         return assessment_data
     
+    @classmethod
+    def _dimensions_from_traits(cls, q_type: str, traits: Dict[str, float]) -> Dict[str, float]:
+        """将特质向量转换为各测评的维度分数（MBTI 维度取左侧字母倾向分）"""
+        prefix = q_type.lower() + ':'
+        dimensions = {}
+        for trait, score in traits.items():
+            if not trait.startswith(prefix):
+                continue
+            key = trait[len(prefix):]
+            if q_type == 'MBTI':
+                key = cls.MBTI_TRAIT_KEYS.get(key)
+                if key is None:
+                    continue
+            dimensions[key] = score
+        return dimensions
+    
     @classmethod
     def _extract_mbti_dimensions(cls, submission: Dict[str, Any]) -> Dict[str, float]:
         """提取MBTI维度分数（转换为0-100）"""
@@ -4,19 +4,40 @@
 基于候选人的人格特质、能力维度、简历经验推荐最适合的岗位
 优化现有的岗位推荐逻辑，提高准确度
 
+岗位画像编译为 岗位 × 胜任力 的要求矩阵并在进程内缓存，
+推荐时一次向量化计算所有岗位的匹配度。
+
 🟢 P2-3增强: 支持从数据库动态读取岗位画像 + 内置默认岗位
 """
 
+from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
 import logging
 import json
+import os
+import threading
+import time
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# 岗位目录进程内缓存的有效期（秒，0 表示只依赖显式失效）
+CATALOG_TTL_SECONDS = float(os.getenv("JOB_CATALOG_TTL_SECONDS", "300"))
+# 不适合岗位的平均胜任力短板阈值（分）
+UNSUITABLE_SHORTFALL = 15.0
+
+_catalog_lock = threading.Lock()
+
 
 class JobRecommender:
     """岗位推荐引擎"""
     
+    # 编译后的岗位目录缓存（见 get_catalog）
+    _catalog: Optional["CompiledJobCatalog"] = None
+    _catalog_generation: int = 0
+    _default_catalog: Optional["CompiledJobCatalog"] = None
+    
     # 🟢 内置默认岗位特征模型 (当数据库为空时使用)
     DEFAULT_JOB_PROFILES = {
         "产品经理": {
@@ -183,6 +204,44 @@ class JobRecommender:
         
         return None
     
+    @classmethod
+    def get_catalog(cls, session=None) -> "CompiledJobCatalog":
+        """
+        获取编译后的岗位目录（进程内缓存）
+        
+        数据库目录在岗位画像增删改后通过 invalidate_catalog 失效，
+        并设置 TTL 限制多 worker 部署下其他进程修改后的不一致窗口。
+        
+        Args:
+            session: 数据库会话（为None时使用内置默认岗位）
+        """
+        if session is None:
+            if cls._default_catalog is None:
+                cls._default_catalog = CompiledJobCatalog.compile(cls.DEFAULT_JOB_PROFILES)
+            return cls._default_catalog
+        
+        with _catalog_lock:
+            catalog = cls._catalog
+            if catalog is not None and (
+                CATALOG_TTL_SECONDS <= 0 or time.monotonic() - catalog.built_at <= CATALOG_TTL_SECONDS
+            ):
+                return catalog
+            generation = cls._catalog_generation
+        
+        catalog = CompiledJobCatalog.compile(cls.load_job_profiles_from_db(session))
+        with _catalog_lock:
+            # 构建期间发生失效时不写入缓存，避免覆盖为旧数据
+            if generation == cls._catalog_generation:
+                cls._catalog = catalog
+        return catalog
+    
+    @classmethod
+    def invalidate_catalog(cls) -> None:
+        """岗位画像创建/更新/删除后调用，丢弃缓存的岗位目录"""
+        with _catalog_lock:
+            cls._catalog = None
+            cls._catalog_generation += 1
+    
     @classmethod
     def recommend_positions(
         cls,
@@ -205,37 +264,22 @@ class JobRecommender:
         Returns:
             ["产品经理", "项目管理", ...] 岗位名称列表
         """
-        # 🟢 动态加载岗位画像
-        if session:
-            job_profiles = cls.load_job_profiles_from_db(session)
-        else:
-            job_profiles = cls.DEFAULT_JOB_PROFILES
-            logger.info("🔧 使用默认岗位画像配置")
-        
-        recommendations = []
+        # 🟢 岗位目录（编译后缓存）
+        catalog = cls.get_catalog(session)
+        if not catalog.names:
+            return []
         
-        for job_name, job_profile in job_profiles.items():
-            # 跳过当前岗位
-            if current_position and job_name in current_position:
-                continue
-            
-            # 计算匹配度
-            match_score = cls._calculate_job_match(
-                job_profile,
-                competencies,
-                resume_keywords
-            )
-            
-            recommendations.append({
-                "position": job_name,
-                "match_score": match_score
-            })
+        # 一次计算所有岗位的匹配度
+        match_scores = catalog.match_scores(competencies, resume_keywords)
         
-        # 按匹配度排序
-        recommendations.sort(key=lambda x: x["match_score"], reverse=True)
+        # 跳过当前岗位
+        candidates = np.arange(len(catalog.names))
+        if current_position:
+            candidates = candidates[[name not in current_position for name in catalog.names]]
         
-        # 返回前N个岗位名称
-        top_positions = [rec["position"] for rec in recommendations[:top_n]]
+        # 按匹配度排序（分数相同时保持岗位顺序）
+        order = candidates[np.argsort(-match_scores[candidates], kind="stable")]
+        top_positions = [catalog.names[i] for i in order[:top_n]]
         
         logger.info(f"🎯 岗位推荐: {top_positions}")
         
@@ -244,13 +288,27 @@ class JobRecommender:
     @classmethod
     def recommend_unsuitable_positions(
         cls,
-        competencies: List[Dict[str, Any]]
+        competencies: List[Dict[str, Any]],
+        session = None
     ) -> List[str]:
         """
         推荐不适合的岗位
         
-        基于胜任力短板判断
+        提供数据库会话时，按岗位胜任力要求的平均短板（要求分 - 候选人得分）
+        一次计算所有岗位，返回短板最大的岗位；没有明显短板时使用规则判断。
         """
+        if session is not None and competencies:
+            catalog = cls.get_catalog(session)
+            if catalog.names:
+                shortfalls = catalog.shortfalls(competencies)
+                order = np.argsort(-shortfalls, kind="stable")
+                unsuitable = [
+                    catalog.names[i] for i in order[:3]
+                    if shortfalls[i] >= UNSUITABLE_SHORTFALL
+                ]
+                if unsuitable:
+                    return unsuitable
+        
         unsuitable = []
         
         # 找出得分低的胜任力
@@ -278,79 +336,112 @@ class JobRecommender:
             unsuitable = ["高度重复性工作", "纯体力劳动岗位"]
         
         return unsuitable[:3]  # 最多3个
+
+
+@dataclass
+class CompiledJobCatalog:
+    """
+    编译后的岗位目录
+    
+    - requirements / required: 岗位 × 胜任力 的要求分矩阵与是否要求掩码
+    - keyword_counts: 岗位 × 关键词词表 的出现次数矩阵（关键词已小写）
+    
+    匹配算法（与逐岗位计算一致）:
+    - 胜任力匹配 = 各要求项 max(0, 100 - |候选人得分 - 要求分|) 的平均（缺失得分按60）
+    - 简历匹配 = 50 + 50 * 命中关键词数 / 关键词数
+    - 总分 = 胜任力匹配 * 0.7 + 简历匹配 * 0.3
+    """
+    names: List[str]
+    competency_keys: List[str]
+    requirements: np.ndarray  # (P, C)
+    required: np.ndarray  # (P, C) 0/1
+    vocabulary: List[str]
+    keyword_counts: np.ndarray  # (P, K)
+    keyword_totals: np.ndarray  # (P,)
+    built_at: float = field(default_factory=time.monotonic)
     
     @classmethod
-    def _calculate_job_match(
-        cls,
-        job_profile: Dict[str, Any],
-        competencies: List[Dict[str, Any]],
-        resume_keywords: Optional[List[str]]
-    ) -> float:
-        """
-        计算岗位匹配度
+    def compile(cls, job_profiles: Dict[str, Dict[str, Any]]) -> "CompiledJobCatalog":
+        names = list(job_profiles)
+        competency_keys = sorted({
+            key for profile in job_profiles.values() for key in profile.get("competencies", {})
+        })
+        key_index = {key: i for i, key in enumerate(competency_keys)}
+        vocabulary = sorted({
+            str(keyword).lower() for profile in job_profiles.values() for keyword in profile.get("keywords", [])
+        })
+        word_index = {word: i for i, word in enumerate(vocabulary)}
         
-        算法: 加权融合
-        - 胜任力匹配 70%
-        - 简历经验匹配 30%
-        """
-        # 1. 胜任力匹配度 (70%)
-        comp_match = cls._match_competencies(
-            job_profile.get("competencies", {}),
-            competencies
-        )
+        requirements = np.zeros((len(names), len(competency_keys)))
+        required = np.zeros_like(requirements)
+        keyword_counts = np.zeros((len(names), len(vocabulary)))
+        keyword_totals = np.zeros(len(names))
+        for p, name in enumerate(names):
+            profile = job_profiles[name]
+            for key, score in profile.get("competencies", {}).items():
+                requirements[p, key_index[key]] = float(score)
+                required[p, key_index[key]] = 1.0
+            keywords = profile.get("keywords", [])
+            for keyword in keywords:
+                keyword_counts[p, word_index[str(keyword).lower()]] += 1
+            keyword_totals[p] = len(keywords)
         
-        # 2. 简历经验匹配度 (30%)
-        resume_match = cls._match_resume(
-            job_profile.get("keywords", []),
-            resume_keywords or []
+        return cls(
+            names=names,
+            competency_keys=competency_keys,
+            requirements=requirements,
+            required=required,
+            vocabulary=vocabulary,
+            keyword_counts=keyword_counts,
+            keyword_totals=keyword_totals,
         )
-        
-        # 加权融合
-        total_match = comp_match * 0.7 + resume_match * 0.3
-        
-        return total_match
     
-    @classmethod
-    def _match_competencies(
-        cls,
-        required_comps: Dict[str, float],
-        candidate_comps: List[Dict[str, Any]]
-    ) -> float:
-        """匹配胜任力"""
-        if not required_comps or not candidate_comps:
-            return 60.0
-        
-        # 将候选人胜任力转为字典
-        comp_dict = {c["key"]: c["score"] for c in candidate_comps}
-        
-        match_scores = []
-        for key, required_score in required_comps.items():
-            candidate_score = comp_dict.get(key, 60)
-            # 计算匹配度: 越接近要求越好
-            diff = abs(candidate_score - required_score)
-            match = max(0, 100 - diff)
-            match_scores.append(match)
-        
-        return sum(match_scores) / len(match_scores) if match_scores else 60.0
+    def candidate_vector(self, competencies: List[Dict[str, Any]]) -> np.ndarray:
+        """候选人胜任力向量（缺失项按60分）"""
+        comp_dict = {c["key"]: c["score"] for c in competencies}
+        return np.array([float(comp_dict.get(key, 60)) for key in self.competency_keys])
     
-    @classmethod
-    def _match_resume(
-        cls,
-        job_keywords: List[str],
-        resume_keywords: List[str]
-    ) -> float:
-        """匹配简历经验"""
-        if not job_keywords or not resume_keywords:
-            return 50.0
+    def match_scores(
+        self,
+        competencies: List[Dict[str, Any]],
+        resume_keywords: Optional[List[str]] = None
+    ) -> np.ndarray:
+        """所有岗位的匹配度 (P,)"""
+        required_counts = self.required.sum(axis=1)
         
-        # 简单关键词匹配
-        resume_str = " ".join([k.lower() for k in resume_keywords])
+        # 1. 胜任力匹配度 (70%)
+        if competencies:
+            closeness = np.maximum(0.0, 100 - np.abs(self.candidate_vector(competencies) - self.requirements))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                comp_match = np.where(
+                    required_counts > 0,
+                    (closeness * self.required).sum(axis=1) / required_counts,
+                    60.0
+                )
+        else:
+            comp_match = np.full(len(self.names), 60.0)
         
-        matched_count = sum(
-            1 for keyword in job_keywords
-            if keyword.lower() in resume_str
-        )
+        # 2. 简历经验匹配度 (30%)
+        resume_match = np.full(len(self.names), 50.0)
+        if resume_keywords and self.vocabulary:
+            resume_str = " ".join([k.lower() for k in resume_keywords])
+            hits = np.array([word in resume_str for word in self.vocabulary], dtype=np.float64)
+            matched = self.keyword_counts @ hits
+            with np.errstate(divide="ignore", invalid="ignore"):
+                resume_match = np.where(
+                    self.keyword_totals > 0,
+                    50 + matched / self.keyword_totals * 50,
+                    50.0
+                )
         
-        match_rate = matched_count / len(job_keywords)
-        return 50 + (match_rate * 50)  # 50-100分区间
-
+        return comp_match * 0.7 + resume_match * 0.3
+    
+    def shortfalls(self, competencies: List[Dict[str, Any]]) -> np.ndarray:
+        """各岗位胜任力要求的平均短板 (P,)（只统计候选人有得分的要求项）"""
+        comp_keys = {c["key"] for c in competencies}
+        known = np.array([key in comp_keys for key in self.competency_keys], dtype=np.float64)
+        mask = self.required * known
+        gaps = np.maximum(0.0, self.requirements - self.candidate_vector(competencies)) * mask
+        counts = mask.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(counts > 0, gaps.sum(axis=1) / counts, 0.0)
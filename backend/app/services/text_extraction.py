@@ -0,0 +1,114 @@
+"""
+文本提取服务
+PDF/Word 文本提取（pdfplumber 版面分析）是纯 CPU 计算，复杂 PDF 需要数秒；
+在 async 路由中直接调用会阻塞事件循环，同一 worker 的其他请求全部停顿。
+本模块将提取任务提交到有界进程池执行，路由只 await 结果：
+- 进程数 TEXT_EXTRACTION_WORKERS（默认 min(4, CPU 数)；0 表示在线程中执行）
+- 每个文件超时 TEXT_EXTRACTION_TIMEOUT_SECONDS（默认 30 秒），超时抛出 TextExtractionError
+- PDF 最多提取 TEXT_EXTRACTION_MAX_PAGES 页（默认 30 页），限制单个文件占用进程的时间
+- 子进程以 spawn 方式启动，不继承服务进程的线程、事件循环与数据库连接
+
+超时后请求立即返回，已开始执行的提取无法中断，会在页数上限内结束后释放进程；
+排队中尚未开始的提取随超时一并取消。
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from app.api.job_positions.jd_extractor import extract_jd_text
+from app.api.resumes.extractors import extract_text_from_file
+
+logger = logging.getLogger(__name__)
+
+# 提取进程数（0 表示不使用进程池，在线程中执行）
+EXTRACTION_WORKERS = int(os.getenv("TEXT_EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+# 单个文件的提取超时（秒）
+EXTRACTION_TIMEOUT_SECONDS = float(os.getenv("TEXT_EXTRACTION_TIMEOUT_SECONDS", "30"))
+# PDF 最多提取的页数
+EXTRACTION_MAX_PAGES = int(os.getenv("TEXT_EXTRACTION_MAX_PAGES", "30"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+class TextExtractionError(Exception):
+    """文本提取超时或提取进程异常退出."""
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=EXTRACTION_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(f"✅ 文本提取进程池已启动: {EXTRACTION_WORKERS} 个进程")
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """丢弃已损坏的进程池（下次提取时重新创建）."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_extraction_pool() -> None:
+    """关闭进程池（应用退出时调用），取消排队中的提取."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_extraction(func: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+    """在进程池中执行提取函数（func 需可被子进程导入），超时抛出 TextExtractionError."""
+    timeout = EXTRACTION_TIMEOUT_SECONDS if timeout is None else timeout
+    if EXTRACTION_WORKERS <= 0:
+        job = asyncio.to_thread(func, *args)
+        pool = None
+    else:
+        pool = _get_pool()
+        job = asyncio.get_running_loop().run_in_executor(pool, func, *args)
+    try:
+        return await asyncio.wait_for(job, timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"⚠️ 文本提取超时（{timeout:g}秒）: {args[0] if args else ''}")
+        raise TextExtractionError(f"文本提取超时（超过{timeout:g}秒）")
+    except BrokenProcessPool:
+        logger.error("❌ 文本提取进程异常退出，进程池将重建")
+        if pool is not None:
+            _discard_pool(pool)
+        raise TextExtractionError("文本提取进程异常退出")
+
+
+async def extract_resume_text(
+    file_path: str,
+    timeout: Optional[float] = None,
+    max_pages: Optional[int] = None
+) -> Optional[str]:
+    """提取简历文本（PDF/Word），提取失败返回None，超时抛出 TextExtractionError."""
+    return await run_extraction(
+        extract_text_from_file, file_path, max_pages or EXTRACTION_MAX_PAGES, timeout=timeout
+    )
+
+
+async def extract_jd_file_text(
+    file_path: str,
+    timeout: Optional[float] = None,
+    max_pages: Optional[int] = None
+) -> str:
+    """提取JD文件文本（PDF/Word/TXT），提取失败抛出原异常，超时抛出 TextExtractionError."""
+    return await run_extraction(
+        extract_jd_text, file_path, max_pages or EXTRACTION_MAX_PAGES, timeout=timeout
+    )
@@ -0,0 +1,91 @@
+"""
+匹配记录写入基准测试
+
+对比 10k 条 ProfileMatch 的两种写入方式（临时 SQLite 库，首次插入 + 再次更新）：
+1. 逐条查询后插入或更新（改造前 _create_match_record / save_portrait_cache 的写法）
+2. app.db.upsert_rows 批量 INSERT ... ON CONFLICT DO UPDATE
+
+用法：python scripts/bench_match_upsert.py [--rows 10000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app import models  # noqa: F401  # 注册表结构
+from app import models_assessment  # noqa: F401
+from app.db import upsert_rows
+from app.models import JobProfile, ProfileMatch
+
+
+def make_rows(rows: int, rng: random.Random) -> list:
+    return [
+        {
+            "profile_id": 1,
+            "submission_id": i,
+            "match_score": round(rng.uniform(40, 95), 1),
+            "dimension_scores": {"沟通能力": {"score": rng.uniform(40, 95), "weight": 100.0}},
+            "ai_analysis": "候选人在 产品经理 岗位的综合匹配度为 80.0分。",
+            "profile_revision": 0,
+        }
+        for i in range(1, rows + 1)
+    ]
+
+
+def write_row_by_row(session: Session, rows: list) -> None:
+    for row in rows:
+        match = session.exec(
+            select(ProfileMatch).where(
+                ProfileMatch.profile_id == row["profile_id"],
+                ProfileMatch.submission_id == row["submission_id"]
+            )
+        ).first()
+        if match:
+            match.match_score = row["match_score"]
+            match.dimension_scores = row["dimension_scores"]
+            match.ai_analysis = row["ai_analysis"]
+        else:
+            session.add(ProfileMatch(**row))
+    session.commit()
+
+
+def write_upsert(session: Session, rows: list) -> None:
+    upsert_rows(session, ProfileMatch, rows, conflict_columns=["profile_id", "submission_id"])
+    session.commit()
+
+
+def bench(label: str, writer, rows: int) -> None:
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            session.add(JobProfile(id=1, name="产品经理", dimensions="[]"))
+            session.commit()
+            for phase in ("首次（插入）", "再次（更新）"):
+                data = make_rows(rows, rng)
+                start = time.perf_counter()
+                writer(session, data)
+                elapsed = time.perf_counter() - start
+                session.expunge_all()
+                print(f"{label} {phase}: {rows} 条 {elapsed:.2f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="匹配记录写入基准测试")
+    parser.add_argument("--rows", type=int, default=10000)
+    args = parser.parse_args()
+
+    bench("逐条查询+写入", write_row_by_row, args.rows)
+    bench("upsert_rows", write_upsert, args.rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+画像缓存命中延迟基准测试
+
+对比三种缓存命中路径（临时 SQLite 库，不影响业务数据）：
+1. 表缓存：查询 portrait_cache + json.loads + pydantic 校验（热缓存关闭，即改造前行为）
+2. 热缓存对象：进程内 LRU 命中，直接返回已校验的画像对象
+3. 热缓存字节：进程内 LRU 命中，直接返回预序列化 JSON 字节（路由快速路径）
+
+用法：python scripts/bench_portrait_cache.py [--iterations 2000]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from app import models  # noqa: F401  # 注册表结构
+from app import models_assessment  # noqa: F401
+from app.api.candidates import cache_manager, schemas
+from app.api.candidates.hot_cache import portrait_hot_cache
+
+
+def build_sample_portrait() -> schemas.CandidatePortrait:
+    """构造一份接近真实大小的画像（多测评、多维度、长文本）."""
+    dims = [
+        {"key": k, "label": f"{k} 维度", "score": 60 + i, "description": "维度说明" * 10}
+        for i, k in enumerate(["E", "N", "P", "L", "D", "I", "S", "C"])
+    ]
+    return schemas.CandidatePortrait(
+        basic_info=schemas.CandidateBasicInfo(
+            id=1, name="张三", phone="13800000000", email="a@example.com",
+            gender="男", target_position="产品经理", created_at=datetime.utcnow()
+        ),
+        assessments=[
+            schemas.AssessmentInfo(
+                submission_id=i, assessment_name=f"测评{i}", questionnaire_name="EPQ人格测评",
+                questionnaire_type="EPQ", total_score=70, grade="B",
+                completed_at=datetime.utcnow(), personality_dimensions=dims
+            )
+            for i in range(6)
+        ],
+        overall_score=78.5,
+        strengths=["沟通能力突出" * 5] * 5,
+        improvements=["需要提升抗压能力" * 5] * 5,
+        personality_dimensions=[schemas.PersonalityDimension(**d) for d in dims],
+        competencies=[
+            schemas.CompetencyScore(key=f"c{i}", label=f"能力{i}", score=70 + i, rationale="依据" * 40)
+            for i in range(6)
+        ],
+        suitable_positions=["产品经理", "项目经理", "运营专员"],
+        unsuitable_positions=["销售岗位"],
+        ai_summary="综合评价" * 400,
+        ai_summary_points=["要点" * 50] * 3,
+        quick_tags=["善于沟通", "逻辑清晰", "执行力强"],
+    )
+
+
+def _measure(fn, iterations: int) -> dict:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "mean_ms": statistics.mean(samples),
+        "p50_ms": samples[len(samples) // 2],
+        "p95_ms": samples[int(len(samples) * 0.95)],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="画像缓存命中延迟基准测试")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+        SQLModel.metadata.create_all(engine)
+        portrait = build_sample_portrait()
+        version = "bench-version"
+
+        with Session(engine) as session:
+            cache_manager.save_portrait_cache(session, 1, portrait, version, "pro")
+            payload_kb = len(portrait.model_dump_json().encode("utf-8")) / 1024
+
+            # 1. 改造前：关闭热缓存，每次命中都查表 + 反序列化 + 校验
+            original_max_bytes = portrait_hot_cache.max_bytes
+            portrait_hot_cache.max_bytes = 0
+            table_hit = _measure(
+                lambda: cache_manager.get_cached_portrait(session, 1, version, "pro"),
+                args.iterations
+            )
+
+            # 2/3. 改造后：热缓存命中
+            portrait_hot_cache.max_bytes = original_max_bytes
+            portrait_hot_cache.clear()
+            cache_manager.get_cached_portrait(session, 1, version, "pro")  # 预热
+            hot_object = _measure(
+                lambda: cache_manager.get_cached_portrait(session, 1, version, "pro"),
+                args.iterations
+            )
+            hot_body = _measure(
+                lambda: cache_manager.get_cached_portrait_body(session, 1, version, "pro"),
+                args.iterations
+            )
+
+    print(f"画像大小: {payload_kb:.1f} KB, 迭代次数: {args.iterations}")
+    for name, result in (
+        ("表缓存(改造前)", table_hit),
+        ("热缓存-对象", hot_object),
+        ("热缓存-字节", hot_body),
+    ):
+        print(
+            f"{name:<12} mean={result['mean_ms']:.3f}ms "
+            f"p50={result['p50_ms']:.3f}ms p95={result['p95_ms']:.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+专业测评评分吞吐基准测试
+
+按 MBTI/DISC/EPQ 各占 1/3 生成提交，对比：
+1. 每次评分传入完整题目列表（每次计算题目指纹，再复用已编译的方案）
+2. 直接传入问卷预编译的评分方案（submit_answers 通过 get_scoring_plan 获取）
+
+用法：python scripts/bench_professional_scoring.py [--submissions 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.professional_scoring import compile_scoring_plan, score_professional_assessment
+
+
+def build_questions() -> dict:
+    """与初始化问卷结构一致的题目列表（MBTI 93题、DISC 28题、EPQ 88题）."""
+    mbti_bounds = [(23, "EI"), (50, "SN"), (73, "TF"), (93, "JP")]
+    epq_bounds = [(21, "E"), (45, "N"), (68, "P"), (88, "L")]
+    return {
+        "MBTI": [
+            {"id": i, "dimension": next(d for end, d in mbti_bounds if i <= end)}
+            for i in range(1, 94)
+        ],
+        "DISC": [{"id": f"disc_{i}", "dimension": "DISC"[(i - 1) // 7]} for i in range(1, 29)],
+        "EPQ": [
+            {"id": i, "dimension": next(d for end, d in epq_bounds if i <= end), "reverse": i % 5 == 0}
+            for i in range(1, 89)
+        ],
+    }
+
+
+def random_answers(test_type: str, questions: list, rng: random.Random) -> dict:
+    if test_type == "MBTI":
+        return {str(q["id"]): rng.choice("AB") for q in questions}
+    if test_type == "DISC":
+        return {q["id"]: str(rng.randint(1, 5)) for q in questions}
+    return {str(q["id"]): rng.choice(["是", "否"]) for q in questions}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="专业测评评分吞吐基准测试")
+    parser.add_argument("--submissions", type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    questions = build_questions()
+    types = list(questions)
+    submissions = [
+        (types[i % 3], random_answers(types[i % 3], questions[types[i % 3]], rng))
+        for i in range(args.submissions)
+    ]
+
+    start = time.perf_counter()
+    for test_type, answers in submissions:
+        score_professional_assessment(test_type, answers, questions[test_type])
+    per_call = time.perf_counter() - start
+    print(f"每次传入题目: {args.submissions} 份 {per_call:.2f}s ({args.submissions / per_call:,.0f} 份/秒)")
+
+    plans = {test_type: compile_scoring_plan(test_type, qs) for test_type, qs in questions.items()}
+    start = time.perf_counter()
+    for test_type, answers in submissions:
+        score_professional_assessment(test_type, answers, plan=plans[test_type])
+    planned = time.perf_counter() - start
+    print(f"预编译评分方案: {args.submissions} 份 {planned:.2f}s ({args.submissions / planned:,.0f} 份/秒)")
+
+
+if __name__ == "__main__":
+    main()
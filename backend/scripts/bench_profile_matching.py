@@ -0,0 +1,164 @@
+"""
+岗位匹配引擎基准测试
+
+对比两种匹配计算方式（只计算，不含数据库读写）：
+1. 逐候选人逐维度：calculate_dimension_score_from_assessments（改造前的算法）
+2. 批量矩阵：matching_engine.score_candidates（一次矩阵乘法）
+
+并可选地在临时 SQLite 库上跑完整的 match_profile（含测评加载与批量写入）、
+特质特征回填以及流式 Top-K 排名 rank_top_candidates。
+
+用法：python scripts/bench_profile_matching.py [--candidates 50000] [--db-candidates 5000]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from app import models  # noqa: F401  # 注册表结构
+from app import models_assessment  # noqa: F401
+from app.models import JobProfile
+from app.models_assessment import Questionnaire, Submission
+from app.api.candidates.dimension_mapping import calculate_dimension_score_from_assessments, extract_trait_scores
+from app.api.candidates.trait_features import backfill_trait_features
+from app.api.job_profiles import matching_engine
+
+PROFILE_DIMENSIONS = [
+    {"name": "沟通能力", "weight": 25},
+    {"name": "逻辑思维", "weight": 20},
+    {"name": "情绪稳定性", "weight": 15},
+    {"name": "执行能力", "weight": 15},
+    {"name": "创新能力", "weight": 15},
+    {"name": "行业经验", "weight": 10},  # 无映射，走降级分
+]
+
+
+def random_results(rng: random.Random) -> dict:
+    """生成与 professional_scoring 输出格式一致的测评结果."""
+    mbti = {}
+    for code, (left, right) in {"EI": "EI", "SN": "SN", "TF": "TF", "JP": "JP"}.items():
+        value = rng.randint(50, 100)
+        mbti[code] = {"tendency": rng.choice([left, right]), "value": value}
+    disc = {k: {"value": rng.randint(0, 100)} for k in "DISC"}
+    epq = {k: {"t_score": rng.randint(20, 80), "value": rng.randint(0, 24)} for k in "ENPL"}
+    return {
+        "mbti": {"mbti_dimensions": mbti},
+        "disc": {"disc_dimensions": disc},
+        "epq": {"dimensions": epq},
+    }
+
+
+def build_profile() -> JobProfile:
+    return JobProfile(id=1, name="产品经理", dimensions=json.dumps(PROFILE_DIMENSIONS, ensure_ascii=False))
+
+
+def bench_compute(candidates: int) -> None:
+    rng = random.Random(42)
+    bundles = [random_results(rng) for _ in range(candidates)]
+    percentages = [rng.uniform(40, 95) for _ in range(candidates)]
+    profile = build_profile()
+
+    # 1. 逐候选人逐维度（采样 2000 人后按比例换算）
+    sample = min(candidates, 2000)
+    start = time.perf_counter()
+    for bundle, pct in zip(bundles[:sample], percentages[:sample]):
+        assessments = [
+            {"test_type": t, "result_details": details, "score_percentage": pct}
+            for t, details in bundle.items()
+        ]
+        for dim in PROFILE_DIMENSIONS:
+            calculate_dimension_score_from_assessments(dim["name"], assessments)
+    per_loop = (time.perf_counter() - start) / sample
+    print(f"逐候选人算法: {per_loop * 1000:.3f}ms/人, 估算 {candidates} 人 {per_loop * candidates:.2f}s")
+
+    # 2. 批量矩阵
+    start = time.perf_counter()
+    row_traits = []
+    for bundle in bundles:
+        merged = {}
+        for t, details in bundle.items():
+            merged.update(extract_trait_scores(details, t))
+        row_traits.append(merged)
+    traits = matching_engine.build_trait_matrix(
+        list(range(candidates)), list(range(candidates)), row_traits, percentages
+    )
+    extract_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = matching_engine.compile_profile(profile)
+    dim_scores, match_scores = matching_engine.score_candidates(compiled, traits)
+    compute_s = time.perf_counter() - start
+    print(f"批量矩阵: 特质提取 {extract_s:.2f}s（一次性），匹配计算 {compute_s * 1000:.1f}ms "
+          f"({candidates} 人 × {len(PROFILE_DIMENSIONS)} 维)")
+
+
+def bench_database(candidates: int) -> None:
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            questionnaires = {}
+            for i, q_type in enumerate(["MBTI", "DISC", "EPQ"], start=1):
+                questionnaires[q_type.lower()] = i
+                session.add(Questionnaire(id=i, name=q_type, type=q_type, category="professional"))
+            session.add(build_profile())
+            now = datetime.utcnow()
+            sub_id = 0
+            for cid in range(1, candidates + 1):
+                for t, details in random_results(rng).items():
+                    sub_id += 1
+                    session.add(Submission(
+                        id=sub_id, code=f"SUB-{sub_id}", assessment_id=1,
+                        questionnaire_id=questionnaires[t], candidate_id=cid,
+                        candidate_name=f"候选人{cid}", candidate_phone=str(cid),
+                        status="completed", submitted_at=now - timedelta(minutes=sub_id),
+                        score_percentage=rng.uniform(40, 95), result_details=details,
+                    ))
+            session.commit()
+
+            profile = session.get(JobProfile, 1)
+            for label in ("首次（批量插入）", "再次（批量更新）"):
+                start = time.perf_counter()
+                matching_engine.match_profile(session, profile, limit=20)
+                print(f"match_profile {label}: {candidates} 人 {time.perf_counter() - start:.2f}s")
+
+            start = time.perf_counter()
+            backfill_trait_features(session)
+            print(f"特质特征回填: {sub_id} 条提交 {time.perf_counter() - start:.2f}s")
+            start = time.perf_counter()
+            matching_engine.match_profile(session, profile, limit=20)
+            print(f"match_profile（读取特征表）: {candidates} 人 {time.perf_counter() - start:.2f}s")
+
+            for min_score in (None, 90):
+                start = time.perf_counter()
+                result = matching_engine.rank_top_candidates(session, profile, k=20, min_score=min_score)
+                print(f"rank_top_candidates(k=20, min_score={min_score}): {candidates} 人 "
+                      f"{time.perf_counter() - start:.2f}s，{result.chunks} 块")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="岗位匹配引擎基准测试")
+    parser.add_argument("--candidates", type=int, default=50000)
+    parser.add_argument("--db-candidates", type=int, default=5000, help="完整流程测试人数（0 表示跳过）")
+    args = parser.parse_args()
+    # 改造前的算法无法解析真实格式，会逐条记录错误日志，计时时关闭日志
+    logging.disable(logging.CRITICAL)
+
+    bench_compute(args.candidates)
+    if args.db_candidates > 0:
+        bench_database(args.db_candidates)
+
+
+if __name__ == "__main__":
+    main()
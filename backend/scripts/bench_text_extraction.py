@@ -0,0 +1,166 @@
+"""
+简历文本提取并发基准测试
+
+本地生成一份版面复杂的合成PDF（每个单词单独定位），在提取期间每 10ms 请求一次 /health，
+对比 API 延迟：
+1. 在事件循环中直接调用 extract_text_from_file（原 parse_resume 的做法）
+2. 通过 app.services.text_extraction 在进程池中提取
+
+用法：python scripts/bench_text_extraction.py [--pages 25] [--lines 45] [--words 12]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Collection, List
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = (
+    "product manager python fastapi redis docker kubernetes analysis design project "
+    "team leader growth data model sql research experience education university"
+).split()
+
+
+def write_synthetic_pdf(
+    path: str,
+    pages: int,
+    lines: int = 45,
+    words: int = 12,
+    seed: int = 42,
+    shuffled_pages: Collection[int] = ()
+) -> List[List[str]]:
+    """生成合成PDF：每个单词为一个独立定位的文本对象（Helvetica，A4）.
+
+    shuffled_pages 中的页（从0开始）打乱内容流中文本对象的顺序（阅读顺序与绘制顺序不一致）。
+
+    Returns:
+        每页按阅读顺序的单词列表
+    """
+    rng = random.Random(seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # 页面树，页面对象生成后填充
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    page_words = []
+    for page in range(pages):
+        ops = []
+        page_words.append([])
+        for line in range(lines):
+            x = 50.0
+            y = 800 - line * 16
+            for _ in range(words):
+                word = rng.choice(WORDS)
+                page_words[-1].append(word)
+                ops.append(f"BT /F1 10 Tf {x:.1f} {y} Td ({word}) Tj ET")
+                x += len(word) * 5.6 + 4
+        if page in shuffled_pages:
+            rng.shuffle(ops)
+        stream = "\n".join(ops).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+    return page_words
+
+
+async def _measure(client, extract) -> dict:
+    """提取期间每 10ms 请求一次 /health，返回提取耗时与请求延迟分布（毫秒）."""
+    latencies = []
+    done = asyncio.Event()
+
+    async def probe() -> None:
+        # 延迟从计划发出请求的时刻算起（包含事件循环被阻塞、请求无法发出的时间）
+        while not done.is_set():
+            planned = time.perf_counter() + 0.01
+            await asyncio.sleep(0.01)
+            await client.get("/health")
+            latencies.append((time.perf_counter() - planned) * 1000)
+
+    prober = asyncio.create_task(probe())
+    await asyncio.sleep(0.1)
+    start = time.perf_counter()
+    try:
+        await extract()
+    finally:
+        elapsed = time.perf_counter() - start
+        await asyncio.sleep(0.05)
+        done.set()
+        await prober
+    latencies.sort()
+    return {
+        "elapsed": elapsed,
+        "requests": len(latencies),
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(len(latencies) * 0.99) - 1] if len(latencies) > 1 else latencies[-1],
+        "max": latencies[-1],
+    }
+
+
+async def run(path: str) -> None:
+    import httpx
+
+    from app.api.resumes.extractors import extract_text_from_file
+    from app.main import app
+    from app.services.text_extraction import extract_resume_text, shutdown_extraction_pool
+
+    async def inline() -> None:
+        extract_text_from_file(path)
+
+    async def pooled() -> None:
+        await extract_resume_text(path)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await extract_resume_text(path)  # 预热进程池
+        for label, extract in (("事件循环内提取", inline), ("进程池提取", pooled)):
+            r = await _measure(client, extract)
+            print(
+                f"{label}: 提取 {r['elapsed']:.2f}s, /health {r['requests']} 次, "
+                f"p50 {r['p50']:.1f}ms, p99 {r['p99']:.1f}ms, max {r['max']:.1f}ms"
+            )
+    shutdown_extraction_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="简历文本提取并发基准测试")
+    parser.add_argument("--pages", type=int, default=25)
+    parser.add_argument("--lines", type=int, default=45)
+    parser.add_argument("--words", type=int, default=12)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    path = os.path.join(workdir, "resume.pdf")
+    write_synthetic_pdf(path, args.pages, args.lines, args.words)
+    print(f"合成PDF: {args.pages} 页, {args.pages * args.lines * args.words} 个文本对象, {os.path.getsize(path) / 1024:.0f} KB")
+    asyncio.run(run(path))
+
+
+if __name__ == "__main__":
+    main()